@@ -0,0 +1,93 @@
+"""
+Benchmark: dictionary-encoded author/genre columns vs plain per-book strings
+
+Usage:
+    python benchmarks/bench_encoding.py [--books N] [--authors N] [--genres N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.book import Book
+from src.isbn import make_isbn13
+from src.library import Library
+
+
+class PlainBook:
+    """Book layout before encoding: every book holds its own strings"""
+
+    def __init__(self, title, author, isbn, genre, quantity):
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.genre = genre
+        self.quantity = quantity
+
+
+def make_rows(count, authors, genres):
+    """Generate sample rows; strings are rebuilt per row as if read from input"""
+    rng = random.Random(42)
+    for i in range(count):
+        yield (f"Title {i}", "Author %d" % rng.randrange(authors), make_isbn13(i),
+               "Genre %d" % rng.randrange(genres), rng.randrange(1, 5))
+
+
+def measure(build):
+    """Return (result, bytes allocated) for a build function"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def best_of(func, repeat=5):
+    """Best wall time in seconds over several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Run the benchmark and print a summary"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--books', type=int, default=200000)
+    parser.add_argument('--authors', type=int, default=2000)
+    parser.add_argument('--genres', type=int, default=12)
+    args = parser.parse_args()
+
+    plain, plain_bytes = measure(
+        lambda: [PlainBook(*row) for row in make_rows(args.books, args.authors, args.genres)])
+    encoded, encoded_bytes = measure(
+        lambda: [Book(*row) for row in make_rows(args.books, args.authors, args.genres)])
+
+    library = Library(verbose=False)
+    library.books = encoded  # Only find_books is exercised; indexes are not needed
+
+    def plain_genre():
+        return [book for book in plain if "genre 7" in book.genre.lower()]
+
+    def plain_author():
+        return [book for book in plain if "author 12" in book.author.lower()]
+
+    assert len(plain_genre()) == len(library.find_books(genre="genre 7"))
+
+    print(f"Books: {args.books}  distinct authors: {args.authors}  genres: {args.genres}")
+    print(f"Memory   plain: {plain_bytes / 1e6:8.1f} MB   encoded: {encoded_bytes / 1e6:8.1f} MB")
+    print(f"Genre    plain: {best_of(plain_genre) * 1000:8.1f} ms   "
+          f"encoded: {best_of(lambda: library.find_books(genre='genre 7')) * 1000:8.1f} ms")
+    print(f"Author   plain: {best_of(plain_author) * 1000:8.1f} ms   "
+          f"encoded: {best_of(lambda: library.find_books(author='author 12')) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: Bloom and cuckoo key filters (false-positive rate, memory, query cost) and federation misses
+
+Usage:
+    python benchmarks/bench_key_filters.py [--keys N] [--probes N] [--shard-latency MS]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bloom import FILTER_KINDS, make_filter
+from src.book import Book
+from src.federation import LibraryFederation
+from src.isbn import make_isbn13
+from src.library import Library
+
+
+class RemoteLibrary(Library):
+    """Library whose lookups pay a fixed round-trip delay, standing in for a remote shard"""
+
+    latency = 0.0
+
+    def find_book_by_isbn(self, isbn):
+        time.sleep(self.latency)
+        return super().find_book_by_isbn(isbn)
+
+
+def measure_filter(kind, keys, probes, error_rate):
+    """Fill a filter and probe it with absent keys"""
+    key_filter = make_filter(kind, keys, error_rate)
+    for key in range(keys):
+        key_filter.add(key)
+    start = time.perf_counter()
+    for key in range(keys, keys + probes):
+        key_filter.might_contain(key)
+    elapsed = time.perf_counter() - start
+    return key_filter, elapsed / probes
+
+
+def measure_federation(key_filters, books, misses, latency):
+    """Time lookups of absent ISBNs against shards with a simulated round trip"""
+    RemoteLibrary.latency = latency
+    federation = LibraryFederation(key_filters=key_filters)
+    for name in ('north', 'south', 'east', 'west'):
+        federation.add_branch(name, RemoteLibrary(verbose=False))
+    for i in range(books):
+        federation.add_book(Book(f"Title {i}", "Author", make_isbn13(i), "Fiction", 1))
+    start = time.perf_counter()
+    for i in range(misses):
+        federation.find_book_by_isbn(make_isbn13(books + i))
+    elapsed = time.perf_counter() - start
+    federation.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--keys', type=int, default=200000)
+    parser.add_argument('--probes', type=int, default=200000)
+    parser.add_argument('--shard-latency', type=float, default=0.5, help="simulated shard round trip in ms")
+    args = parser.parse_args()
+
+    print(f"{'filter':<8}{'target':>8}{'observed':>10}{'expected':>10}{'KB':>9}{'bits/key':>10}{'ns/query':>10}")
+    for kind in FILTER_KINDS:
+        for error_rate in (0.05, 0.01, 0.001):
+            key_filter, per_query = measure_filter(kind, args.keys, args.probes, error_rate)
+            observed = (key_filter.queries - key_filter.negatives) / key_filter.queries
+            print(f"{kind:<8}{error_rate:>8.3f}{observed:>10.4f}{key_filter.expected_false_positive_rate():>10.4f}"
+                  f"{key_filter.size_in_bytes() / 1024:>9.0f}{key_filter.size_in_bytes() * 8 / args.keys:>10.1f}"
+                  f"{per_query * 1e9:>10.0f}")
+
+    latency = args.shard_latency / 1000
+    misses = 500
+    without = measure_federation(False, 5000, misses, latency)
+    with_filters = measure_federation(True, 5000, misses, latency)
+    print(f"\n{misses} lookups of unknown ISBNs across 4 shards ({args.shard_latency} ms round trip)")
+    print(f"  without filters: {without * 1000:8.1f}ms")
+    print(f"  with filters:    {with_filters * 1000:8.1f}ms ({without / with_filters:.0f}x)")
+
+
+if __name__ == '__main__':
+    main()
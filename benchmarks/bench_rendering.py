@@ -0,0 +1,76 @@
+"""
+Benchmark: listing output with cached rows and chunked writes vs per-row rendering and print()
+
+Usage:
+    python benchmarks/bench_rendering.py [--books N] [--borrowers N] [--repeat N]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.book import Book
+from src.borrower import Borrower
+from src.isbn import make_isbn13
+from src.library import Library, write_rows
+
+
+def build(books, borrowers):
+    """Build a quiet library of generated books and borrowers"""
+    library = Library(verbose=False)
+    for i in range(books):
+        library.add_book(Book(f"Title {i}", f"Author {i % 5000}", make_isbn13(i), f"Genre {i % 12}", 1 + i % 3))
+    for i in range(borrowers):
+        library.add_borrower(Borrower(f"Member {i}", f"m{i}@example.org", f"M{i}"))
+    return library
+
+
+def print_per_row(items):
+    """Listing as before: every row rendered from scratch and printed on its own"""
+    for i, item in enumerate(items, 1):
+        if isinstance(item, Book):
+            row = item._render(item.get_quantity())
+        else:
+            row = item._render(len(item.get_borrowed_books()))
+        print(f"{i}. {row}")
+
+
+def timed(function, items, repeat):
+    """Best time of repeated runs with stdout sent to /dev/null"""
+    best = float('inf')
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(items)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--borrowers', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    library = build(args.books, args.borrowers)
+    print(f"{'listing':<12}{'rows':>9}{'per-row print':>16}{'cached+chunked':>17}{'speedup':>10}")
+    for name, items in (('books', library.books), ('borrowers', library.borrowers)):
+        before = timed(print_per_row, items, args.repeat)
+        after = timed(write_rows, items, args.repeat)
+        print(f"{name:<12}{len(items):>9}{before * 1000:>14.1f}ms{after * 1000:>15.1f}ms{before / after:>9.1f}x")
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        library.verbose = True
+        library.display_all_books()
+        elapsed = time.perf_counter() - start
+    print(f"display_all_books ({args.books} rows, snapshot + cached rows): {elapsed * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: persistent search index startup and queries vs tokenizing the catalog and scanning it
+
+Usage:
+    python benchmarks/bench_search_index.py [--books N] [--queries N]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.book import Book
+from src.isbn import make_isbn13
+from src.library import Library
+from src.search_index import SearchIndex
+
+WORDS = ("river night garden silent empire winter shadow glass ocean mountain "
+         "letters kingdom harvest iron paper storm lantern orchard crown bridge").split()
+
+
+def build(books):
+    """Build a quiet library of generated books"""
+    rng = random.Random(7)
+    library = Library(verbose=False)
+    for i in range(books):
+        title = " ".join(rng.choice(WORDS) for _ in range(3)).title()
+        library.add_book(Book(f"{title} {i}", f"Author {i % 5000}", make_isbn13(i), f"Genre {i % 12}", 1))
+    return library
+
+
+def timed(function):
+    """Run a function once and return (result, seconds)"""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--books', type=int, default=200000)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    library = build(args.books)
+    directory = tempfile.mkdtemp(prefix='search-index-')
+    try:
+        def first_start():
+            index = SearchIndex(directory, flush_docs=50000)
+            library.attach_search_index(index)
+            index.close()
+
+        _, tokenize_all = timed(first_start)
+        library.search_index = None
+
+        index, reopen = timed(lambda: SearchIndex(directory))
+        _, sync = timed(lambda: library.attach_search_index(index))
+        print(f"{args.books} books")
+        print(f"  first start (tokenize catalog, write segments): {tokenize_all:8.2f}s")
+        print(f"  restart (map segments):                          {reopen:8.3f}s")
+        print(f"  restart (map segments + fingerprint sync):       {reopen + sync:8.3f}s")
+
+        rng = random.Random(11)
+        terms = [rng.choice(WORDS)[rng.randrange(2):][:5] for _ in range(args.queries)]
+        plain = Library(verbose=False)
+        plain.books = library.books
+        _, scanned = timed(lambda: [plain.find_books(title=term) for term in terms])
+        _, indexed = timed(lambda: [library.find_books(title=term) for term in terms])
+        for term in terms[:5]:
+            assert {b.get_isbn_key() for b in library.find_books(title=term)} == \
+                   {b.get_isbn_key() for b in plain.find_books(title=term)}
+        print(f"  title search, linear scan:  {scanned / len(terms) * 1000:8.2f}ms/query")
+        print(f"  title search, index:        {indexed / len(terms) * 1000:8.2f}ms/query")
+
+        rare = [f"{rng.choice(WORDS)} {rng.randrange(args.books)}" for _ in range(args.queries)]
+        _, scanned = timed(lambda: [plain.find_books(title=term) for term in rare])
+        _, indexed = timed(lambda: [library.find_books(title=term) for term in rare])
+        print(f"  selective search, linear:   {scanned / len(rare) * 1000:8.2f}ms/query")
+        print(f"  selective search, index:    {indexed / len(rare) * 1000:8.2f}ms/query")
+        index.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Stress test: several front-desk processes lending from shared-memory inventory counters
+
+Each desk process holds its own Library with the same catalog and borrows and
+returns random titles against one SharedInventory. Independently of the
+counters, every desk records its open loans per title in a shared array; at
+no point may the loans of a title exceed its copies.
+
+Usage:
+    python benchmarks/stress_shared_inventory.py [--desks N] [--ops N] [--titles N] [--copies N] [--unsafe]
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.book import Book
+from src.borrower import Borrower
+from src.isbn import make_isbn13
+from src.library import Library
+from src.shared_inventory import SharedInventory
+
+
+class UnsafeInventory(SharedInventory):
+    """Counters updated with a plain read-modify-write, to show what the locks prevent"""
+
+    def try_checkout(self, isbn_key):
+        slot = self.slots.get(isbn_key)
+        if slot is None or self._counters[slot] <= 0:
+            return False
+        time.sleep(0)  # Let another desk read the same value
+        self._counters[slot] -= 1
+        return True
+
+    def checkin(self, isbn_key):
+        slot = self.slots.get(isbn_key)
+        if slot is None:
+            return False
+        value = self._counters[slot]
+        time.sleep(0)
+        self._counters[slot] = value + 1
+        return True
+
+
+def build_desk(titles, copies, members):
+    """Build one desk's Library: the shared catalog plus its own members"""
+    library = Library(verbose=False)
+    for i in range(titles):
+        library.add_book(Book(f"Title {i}", f"Author {i % 7}", make_isbn13(i), "Fiction", copies))
+    for member in members:
+        library.add_borrower(Borrower(f"Member {member}", f"{member}@example.com", member))
+    return library
+
+
+def desk(number, inventory, on_loan, peak, titles, copies, ops, seed):
+    """
+    Run one desk: random borrows and returns against the shared inventory
+
+    on_loan[t] counts open loans of title t across all desks and peak[t] the
+    highest value it reached; both are updated under the array's own lock.
+    """
+    members = [f"D{number}M{i}" for i in range(20)]
+    library = build_desk(titles, copies, members)
+    library.attach_inventory(inventory)
+    rng = random.Random(seed)
+    loans = []
+
+    for _ in range(ops):
+        if loans and rng.random() < 0.45:
+            member, title = loans.pop(rng.randrange(len(loans)))
+            with on_loan.get_lock():
+                on_loan[title] -= 1
+            library.return_book(member, make_isbn13(title))
+        else:
+            member, title = rng.choice(members), rng.randrange(titles)
+            if library.borrow_book(member, make_isbn13(title)):
+                loans.append((member, title))
+                with on_loan.get_lock():
+                    on_loan[title] += 1
+                    peak[title] = max(peak[title], on_loan[title])
+    inventory.close()
+
+
+def run(desks, ops, titles, copies, unsafe=False):
+    """
+    Run the stress test
+
+    Returns:
+        tuple: (oversold titles, counter mismatches, seconds)
+    """
+    catalog = build_desk(titles, copies, [])
+    kind = UnsafeInventory if unsafe else SharedInventory
+    inventory = kind.from_library(catalog)
+    on_loan = multiprocessing.Array('q', titles)
+    peak = multiprocessing.Array('q', titles)
+
+    start = time.perf_counter()
+    processes = [multiprocessing.Process(target=desk, args=(n, inventory, on_loan, peak,
+                                                            titles, copies, ops, n))
+                 for n in range(desks)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    oversold = [t for t in range(titles) if peak[t] > copies]
+    mismatched = [t for t in range(titles)
+                  if inventory.available(catalog.books[t].get_isbn_key()) != copies - on_loan[t]]
+    inventory.unlink()
+    return oversold, mismatched, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--desks', type=int, default=8, help="desk processes")
+    parser.add_argument('--ops', type=int, default=5000, help="operations per desk")
+    parser.add_argument('--titles', type=int, default=20, help="titles in the catalog")
+    parser.add_argument('--copies', type=int, default=2, help="copies per title")
+    parser.add_argument('--unsafe', action='store_true', help="use unlocked counters")
+    args = parser.parse_args()
+
+    oversold, mismatched, elapsed = run(args.desks, args.ops, args.titles, args.copies, args.unsafe)
+    total = args.desks * args.ops
+    print(f"{args.desks} desks x {args.ops} ops on {args.titles} titles x {args.copies} copies "
+          f"({'unlocked' if args.unsafe else 'locked'} counters)")
+    print(f"  {total} operations in {elapsed:.2f}s ({total / elapsed:,.0f} ops/s)")
+    print(f"  titles oversold: {len(oversold)}")
+    print(f"  counters not matching open loans: {len(mismatched)}")
+    if oversold or mismatched:
+        print("❌ FAILED")
+        sys.exit(1)
+    print("✅ No copy was lent twice")
+
+
+if __name__ == '__main__':
+    main()
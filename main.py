@@ -3,9 +3,26 @@ Library Management System - Main Entry Point
 Interactive console-based menu system
 """
 
+import argparse
+import os
+import sys
+import tempfile
+
 from src.library import Library
 from src.book import Book
 from src.borrower import Borrower
+from src.copies import DEFAULT_BRANCH, is_barcode
+from src import export
+from src.batch import run_batch
+from src.analytics import CirculationAnalytics
+from src.history import LoanHistoryStore
+from src.notifications import FileTransport, collect_notices, send_in_background
+from src.search_index import SearchIndex
+from src.workload import TraceRecorder
+
+
+OUTBOX_DIR = "outbox"  # Directory overdue notices are written to
+NOTIFICATION_STATS = "notification_runs.jsonl"  # Per-run notification throughput log
 
 
 def print_header():
@@ -40,7 +57,10 @@ def print_book_menu():
     print("4. Display All Books")
     print("5. Display Available Books")
     print("6. Display Unavailable Books")
-    print("7. Back to Main Menu")
+    print("7. Browse Books Sorted (Title/Author/Genre)")
+    print("8. Books in Alphabetical Range")
+    print("9. Manage Copies (Barcodes/Branches)")
+    print("10. Back to Main Menu")
     print("=" * 80)
 
 
@@ -54,7 +74,9 @@ def print_borrower_menu():
     print("3. Remove Borrower")
     print("4. Display All Borrowers")
     print("5. Display Borrower History")
-    print("6. Back to Main Menu")
+    print("6. Browse Borrowers Sorted by Name")
+    print("7. Find Borrower (name, email or phone)")
+    print("8. Back to Main Menu")
     print("=" * 80)
 
 
@@ -66,7 +88,8 @@ def print_borrow_return_menu():
     print("1. Borrow a Book")
     print("2. Return a Book")
     print("3. Check Overdue Books")
-    print("4. Back to Main Menu")
+    print("4. Copy Availability Forecast")
+    print("5. Back to Main Menu")
     print("=" * 80)
 
 
@@ -80,7 +103,9 @@ def print_search_menu():
     print("3. Search by Genre")
     print("4. Search by ISBN")
     print("5. Advanced Search (Multiple Criteria)")
-    print("6. Back to Main Menu")
+    print("6. Autocomplete Title/Author")
+    print("7. Faceted Search (Counts by Availability, Genre, Author)")
+    print("8. Back to Main Menu")
     print("=" * 80)
 
 
@@ -93,7 +118,13 @@ def print_reports_menu():
     print("2. Overdue Books Report")
     print("3. Available Books")
     print("4. Unavailable Books")
-    print("5. Back to Main Menu")
+    print("5. Export Report (CSV/JSONL)")
+    print("6. Circulation Analytics")
+    print("7. Memory Usage")
+    print("8. Send Overdue Notices")
+    print("9. Detailed Statistics")
+    print("10. Find Duplicate Titles")
+    print("11. Back to Main Menu")
     print("=" * 80)
 
 
@@ -134,11 +165,52 @@ def get_valid_input(prompt, input_type=str, allow_empty=False):
             return None
 
 
+def get_sort_field():
+    """
+    Ask which book field to sort by
+    
+    Returns:
+        str or None: 'title', 'author' or 'genre', or None if invalid
+    """
+    field = get_valid_input("Sort by (title/author/genre) [title]: ", allow_empty=True) or 'title'
+    field = field.lower()
+    if field not in ('title', 'author', 'genre'):
+        print("❌ Invalid field. Use title, author or genre.")
+        return None
+    return field
+
+
+def browse_pages(display_page, total, page_size=20):
+    """
+    Page through a sorted listing until the user stops
+    
+    Args:
+        display_page (callable): Displays one page, given its number
+        total (int): Total number of entries
+        page_size (int): Entries per page
+    """
+    total_pages = max(1, -(-total // page_size))
+    page = 1
+    while True:
+        display_page(page)
+        if total_pages == 1:
+            return
+        answer = get_valid_input("[n]ext, [p]revious, page number, or Enter to stop: ", allow_empty=True)
+        if not answer:
+            return
+        if answer.lower() == 'n':
+            page = min(page + 1, total_pages)
+        elif answer.lower() == 'p':
+            page = max(page - 1, 1)
+        elif answer.isdigit():
+            page = min(max(int(answer), 1), total_pages)
+
+
 def book_management_menu(library):
     """Handle book management operations"""
     while True:
         print_book_menu()
-        choice = get_valid_input("\nEnter your choice (1-7): ")
+        choice = get_valid_input("\nEnter your choice (1-10): ")
         
         if choice == '1':  # Add New Book
             print("\n--- Add New Book ---")
@@ -208,18 +280,61 @@ def book_management_menu(library):
         elif choice == '6':  # Display Unavailable Books
             library.display_unavailable_books()
         
-        elif choice == '7':  # Back to Main Menu
+        elif choice == '7':  # Browse Books Sorted
+            field = get_sort_field()
+            if field:
+                browse_pages(lambda page: library.display_books_sorted(field, page),
+                             library.get_total_books())
+        
+        elif choice == '8':  # Books in Alphabetical Range
+            field = get_sort_field()
+            if not field:
+                continue
+            start = get_valid_input("From (e.g. M): ")
+            end = get_valid_input("To (e.g. N): ")
+            if start and end:
+                library.display_books_in_range(field, start, end)
+        
+        elif choice == '9':  # Manage Copies
+            manage_copies_prompt(library)
+        
+        elif choice == '10':  # Back to Main Menu
             break
         
         else:
-            print("❌ Invalid choice. Please enter 1-7.")
+            print("❌ Invalid choice. Please enter 1-10.")
+
+
+def manage_copies_prompt(library):
+    """Show the copies of a book, then add copies or change a copy's state"""
+    isbn = get_valid_input("\nEnter ISBN: ")
+    if not isbn or not library.find_book_by_isbn(isbn):
+        print(f"❌ Book with ISBN {isbn} not found!")
+        return
+    library.display_copies(isbn)
+    
+    action = (get_valid_input("Action - (a)dd copies, (s)et copy state, Enter to go back: ",
+                              allow_empty=True) or '').lower()
+    if not action:
+        return
+    if action == 'a':
+        count = get_valid_input("Number of copies: ", int)
+        if count is None:
+            return
+        branch = get_valid_input(f"Branch [{DEFAULT_BRANCH}]: ", allow_empty=True) or DEFAULT_BRANCH
+        library.add_copies(isbn, count, branch)
+    elif action == 's':
+        barcode = get_valid_input("Copy barcode: ")
+        state = get_valid_input("New state (available/damaged/lost/withdrawn): ")
+        if barcode and state:
+            library.set_copy_state(barcode, state.lower())
 
 
 def borrower_management_menu(library):
     """Handle borrower management operations"""
     while True:
         print_borrower_menu()
-        choice = get_valid_input("\nEnter your choice (1-6): ")
+        choice = get_valid_input("\nEnter your choice (1-8): ")
         
         if choice == '1':  # Register New Borrower
             print("\n--- Register New Borrower ---")
@@ -272,18 +387,26 @@ def borrower_management_menu(library):
             if membership_id:
                 library.display_borrower_history(membership_id)
         
-        elif choice == '6':  # Back to Main Menu
+        elif choice == '6':  # Browse Borrowers Sorted
+            browse_pages(library.display_borrowers_sorted, library.get_total_borrowers())
+        
+        elif choice == '7':  # Find Borrower
+            query = get_valid_input("\nEnter name, email or phone: ")
+            if query:
+                library.search_borrowers(query)
+        
+        elif choice == '8':  # Back to Main Menu
             break
         
         else:
-            print("❌ Invalid choice. Please enter 1-6.")
+            print("❌ Invalid choice. Please enter 1-8.")
 
 
 def borrow_return_menu(library):
     """Handle borrowing and returning operations"""
     while True:
         print_borrow_return_menu()
-        choice = get_valid_input("\nEnter your choice (1-4): ")
+        choice = get_valid_input("\nEnter your choice (1-5): ")
         
         if choice == '1':  # Borrow Book
             print("\n--- Borrow a Book ---")
@@ -303,27 +426,64 @@ def borrow_return_menu(library):
             if not membership_id:
                 continue
             
-            isbn = get_valid_input("Enter ISBN of book to return: ")
+            isbn = get_valid_input("Enter ISBN or copy barcode of book to return: ")
             if not isbn:
                 continue
             
-            library.return_book(membership_id, isbn)
+            if is_barcode(isbn):
+                library.return_book(membership_id, barcode=isbn)
+            else:
+                library.return_book(membership_id, isbn)
         
         elif choice == '3':  # Check Overdue Books
             library.check_overdue_books()
         
-        elif choice == '4':  # Back to Main Menu
+        elif choice == '4':  # Availability Forecast
+            isbn = get_valid_input("\nEnter ISBN: ")
+            if isbn:
+                library.display_availability_forecast(isbn)
+        
+        elif choice == '5':  # Back to Main Menu
             break
         
         else:
-            print("❌ Invalid choice. Please enter 1-4.")
+            print("❌ Invalid choice. Please enter 1-5.")
+
+
+def autocomplete_prompt(library):
+    """Suggest titles or authors for a partial entry, then search the chosen one"""
+    field = get_valid_input("\nComplete (title/author) [title]: ", allow_empty=True) or 'title'
+    field = field.lower()
+    if field not in ('title', 'author'):
+        print("❌ Invalid field. Use title or author.")
+        return
+    
+    prefix = get_valid_input(f"Start typing the {field}: ")
+    if not prefix:
+        return
+    
+    suggestions = library.suggest(prefix, field)
+    if not suggestions:
+        print(f"\n❌ No {field}s start with '{prefix}'")
+        return
+    
+    print("\n💡 Suggestions:")
+    for i, suggestion in enumerate(suggestions, 1):
+        print(f"{i}. {suggestion}")
+    
+    pick = get_valid_input("\nPick a number to search (Enter to skip): ", allow_empty=True)
+    if pick and pick.isdigit() and 1 <= int(pick) <= len(suggestions):
+        if field == 'title':
+            library.search_by_title(suggestions[int(pick) - 1])
+        else:
+            library.search_by_author(suggestions[int(pick) - 1])
 
 
 def search_menu(library):
     """Handle search operations"""
     while True:
         print_search_menu()
-        choice = get_valid_input("\nEnter your choice (1-6): ")
+        choice = get_valid_input("\nEnter your choice (1-8): ")
         
         if choice == '1':  # Search by Title
             query = get_valid_input("\nEnter title to search: ")
@@ -357,18 +517,77 @@ def search_menu(library):
             else:
                 print("❌ Please provide at least one search criterion.")
         
-        elif choice == '6':  # Back to Main Menu
+        elif choice == '6':  # Autocomplete
+            autocomplete_prompt(library)
+        
+        elif choice == '7':  # Faceted Search
+            print("\n--- Faceted Search ---")
+            print("Enter search criteria (press Enter to skip):")
+            title = get_valid_input("Title: ", allow_empty=True)
+            author = get_valid_input("Author: ", allow_empty=True)
+            genre = get_valid_input("Genre: ", allow_empty=True)
+            
+            if title or author or genre:
+                library.display_faceted_search(title, author, genre)
+            else:
+                print("❌ Please provide at least one search criterion.")
+        
+        elif choice == '8':  # Back to Main Menu
             break
         
         else:
-            print("❌ Invalid choice. Please enter 1-6.")
+            print("❌ Invalid choice. Please enter 1-8.")
+
+
+def export_report_prompt(library):
+    """Prompt for report, format and path, then stream the export to disk"""
+    print("\n--- Export Report ---")
+    print(f"Reports: {', '.join(export.REPORTS)}")
+    report = get_valid_input("Report to export: ")
+    if not report:
+        return
+    
+    fmt = get_valid_input("Format (csv/jsonl) [csv]: ", allow_empty=True) or 'csv'
+    path = get_valid_input("Output file path (add .gz to compress): ")
+    if not path:
+        return
+    
+    try:
+        count = export.export_report(library, report.lower(), path, fmt.lower())
+        print(f"✅ Exported {count} row(s) to {path}")
+    except (ValueError, OSError, ImportError) as e:
+        print(f"❌ Export failed: {e}")
+
+
+def send_notices_prompt(library):
+    """Send overdue and due-soon notices in the background, writing them to the outbox"""
+    notices = collect_notices(library)
+    if not notices:
+        print("\n✅ No overdue or soon-due loans to notify.")
+        return
+    
+    outbox = get_valid_input(f"Outbox directory [{OUTBOX_DIR}]: ", allow_empty=True) or OUTBOX_DIR
+    future = send_in_background(library, FileTransport(outbox), notices=notices,
+                                stats_path=NOTIFICATION_STATS)
+    
+    def report(done):
+        try:
+            result = done.result()
+        except Exception as e:
+            print(f"\n❌ Notification run failed: {e}")
+            return
+        print(f"\n📨 Notices sent: {result.sent}, failed: {len(result.failed)} "
+              f"({result.throughput:.0f}/s) - written to {outbox}/")
+    
+    future.add_done_callback(report)
+    print(f"📨 Sending {len(notices)} notice(s) in the background...")
 
 
 def reports_menu(library):
     """Handle reports and statistics"""
     while True:
         print_reports_menu()
-        choice = get_valid_input("\nEnter your choice (1-5): ")
+        choice = get_valid_input("\nEnter your choice (1-11): ")
         
         if choice == '1':  # Library Statistics
             library.display_library_stats()
@@ -382,16 +601,74 @@ def reports_menu(library):
         elif choice == '4':  # Unavailable Books
             library.display_unavailable_books()
         
-        elif choice == '5':  # Back to Main Menu
+        elif choice == '5':  # Export Report
+            export_report_prompt(library)
+        
+        elif choice == '6':  # Circulation Analytics
+            library.analytics.display_dashboard(now=library.clock())
+        
+        elif choice == '7':  # Memory Usage
+            library.display_memory_report()
+        
+        elif choice == '8':  # Send Overdue Notices
+            send_notices_prompt(library)
+        
+        elif choice == '9':  # Detailed Statistics
+            library.display_detailed_stats()
+        
+        elif choice == '10':  # Find Duplicate Titles
+            library.display_duplicate_books()
+        
+        elif choice == '11':  # Back to Main Menu
             break
         
         else:
-            print("❌ Invalid choice. Please enter 1-5.")
+            print("❌ Invalid choice. Please enter 1-11.")
+
+
+def parse_args():
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Library Management System")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="run commands from FILE ('-' for stdin) instead of the menus")
+    parser.add_argument('--output', metavar='FILE',
+                        help="write batch results to FILE instead of stdout")
+    parser.add_argument('--record-trace', metavar='FILE',
+                        help="record this session's operations to FILE for replay with src.workload")
+    return parser.parse_args()
+
+
+def run_batch_mode(commands, output_path=None):
+    """Run a command file without menus, writing one JSON result per command"""
+    library = Library(verbose=False)
+    library.attach_analytics(CirculationAnalytics())
+    
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as output:
+            succeeded, failed = run_batch(commands, library, output)
+    else:
+        succeeded, failed = run_batch(commands, library)
+    print(f"Batch finished: {succeeded} succeeded, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
 
 
 def main():
     """Main function - Entry point of the application"""
+    args = parse_args()
+    if args.batch:
+        sys.exit(run_batch_mode(args.batch, args.output))
+    
+    # The catalog and its borrowers live in memory, so the loan history and
+    # search index only last the session
+    session_dir = tempfile.TemporaryDirectory(prefix='library-session-')
     library = Library()
+    library.attach_analytics(CirculationAnalytics())
+    library.attach_history(LoanHistoryStore(os.path.join(session_dir.name, "history"), compress=True))
+    library.attach_search_index(SearchIndex(os.path.join(session_dir.name, "search_index")))
+    recorder = None
+    if args.record_trace:
+        recorder = TraceRecorder(args.record_trace)
+        recorder.attach(library)
     
     # Optional: Pre-populate with sample data for testing
     print("💡 Tip: Starting with empty library. Use Book Management to add books.")
@@ -400,6 +677,18 @@ def main():
     print("Welcome to the Library Management System!")
     print("Manage books, borrowers, and track borrowing activities.")
     
+    try:
+        run_main_menu(library)
+    finally:
+        library.history.close()
+        library.search_index.close()  # Stop the merger before the directory goes
+        session_dir.cleanup()
+        if recorder is not None:
+            print(f"📼 Recorded {recorder.close()} operation(s) to {args.record_trace}")
+
+
+def run_main_menu(library):
+    """Run the main menu loop until the user exits"""
     while True:
         print_main_menu()
         choice = get_valid_input("\nEnter your choice (1-6): ")
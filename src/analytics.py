@@ -0,0 +1,398 @@
+"""
+Circulation analytics for Library Management System
+Incremental counters and heavy-hitter sketches fed by borrows and returns
+"""
+
+import hashlib
+import heapq
+import time
+from collections import Counter, deque
+
+from .isbn import canonical_isbn, try_isbn_key
+
+
+class CountMinSketch:
+    """
+    Count-Min sketch: approximate frequency counts in fixed memory
+
+    Estimates never undercount; they overcount by at most about
+    e/width * total with probability 1 - e^-depth.
+
+    Attributes:
+        width (int): Counters per row
+        depth (int): Number of hash rows
+        total (int): Sum of all added counts
+    """
+
+    def __init__(self, width=2048, depth=4):
+        """
+        Initialize an empty sketch
+
+        Args:
+            width (int): Counters per row
+            depth (int): Number of hash rows
+        """
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        self._rows = [[0] * width for _ in range(depth)]
+
+    def _positions(self, key):
+        """Get one counter position per row for a key"""
+        digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest()
+        h1 = int.from_bytes(digest[:4], 'little')
+        h2 = int.from_bytes(digest[4:], 'little') | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        """
+        Add occurrences of a key
+
+        Args:
+            key: Hashable key
+            count (int): Occurrences to add
+        """
+        self.total += count
+        for row, position in zip(self._rows, self._positions(key)):
+            row[position] += count
+
+    def estimate(self, key):
+        """
+        Estimate how often a key was added
+
+        Args:
+            key: Hashable key
+
+        Returns:
+            int: Estimated count (never below the true count)
+        """
+        return min(row[position] for row, position in zip(self._rows, self._positions(key)))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary tracking the top keys in fixed memory
+
+    Keeps at most `capacity` counters. When a new key arrives and the summary
+    is full, the smallest counter is reassigned to it and its old value is
+    recorded as the new key's maximum overcount.
+
+    Attributes:
+        capacity (int): Maximum number of tracked keys
+    """
+
+    def __init__(self, capacity=100):
+        """
+        Initialize an empty summary
+
+        Args:
+            capacity (int): Maximum number of tracked keys
+        """
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []  # (count, key) entries; stale ones are skipped lazily
+
+    def add(self, key, count=1):
+        """
+        Add occurrences of a key
+
+        Args:
+            key: Hashable key
+            count (int): Occurrences to add
+        """
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+            self.errors[key] = 0
+        else:
+            floor, victim = self._pop_min()
+            del self.counts[victim]
+            del self.errors[victim]
+            self.counts[key] = floor + count
+            self.errors[key] = floor
+
+        heapq.heappush(self._heap, (self.counts[key], key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(value, item) for item, value in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        """Pop the currently smallest counter, skipping stale heap entries"""
+        while True:
+            value, key = heapq.heappop(self._heap)
+            if self.counts.get(key) == value:
+                return value, key
+
+    def top(self, k):
+        """
+        Get the k heaviest keys
+
+        Args:
+            k (int): Number of keys
+
+        Returns:
+            list: (key, count, max_error) tuples, heaviest first
+        """
+        best = heapq.nlargest(k, self.counts.items(), key=lambda item: item[1])
+        return [(key, value, self.errors[key]) for key, value in best]
+
+
+def _timestamp(when):
+    """Unix time of a datetime, or None to let a window use the current time"""
+    return None if when is None else when.timestamp()
+
+
+class SlidingWindow:
+    """
+    Time-bucketed counters covering the most recent `window` seconds
+
+    Attributes:
+        window (float): Window length in seconds
+        bucket (float): Bucket length in seconds
+    """
+
+    def __init__(self, window, bucket, capacity=100):
+        """
+        Initialize an empty window
+
+        Args:
+            window (float): Window length in seconds
+            bucket (float): Bucket length in seconds
+            capacity (int): Space-Saving capacity per bucket for titles and borrowers
+        """
+        self.window = window
+        self.bucket = bucket
+        self.capacity = capacity
+        self._buckets = deque()  # [start, total, genres Counter, titles, borrowers]
+
+    def _expire(self, now):
+        """Drop buckets that fell out of the window"""
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+    def add(self, when, genre, title_key, borrower_key):
+        """
+        Record one borrow
+
+        Args:
+            when (float): Unix time of the borrow
+            genre (str): Book genre
+            title_key: Title key (ISBN)
+            borrower_key: Borrower key (membership ID)
+        """
+        start = when - (when % self.bucket)
+        if not self._buckets or self._buckets[-1][0] < start:
+            self._buckets.append([start, 0, Counter(), SpaceSaving(self.capacity),
+                                  SpaceSaving(self.capacity)])
+        current = self._buckets[-1]
+        current[1] += 1
+        current[2][genre] += 1
+        current[3].add(title_key)
+        current[4].add(borrower_key)
+        self._expire(when)
+
+    def total(self, now=None):
+        """Get the number of borrows in the window"""
+        self._expire(time.time() if now is None else now)
+        return sum(bucket[1] for bucket in self._buckets)
+
+    def top(self, field, k, now=None):
+        """
+        Get the k heaviest keys in the window
+
+        Args:
+            field (str): 'genres', 'titles' or 'borrowers'
+            k (int): Number of keys
+            now (float, optional): Reference time (defaults to now)
+
+        Returns:
+            list: (key, count) tuples, heaviest first
+        """
+        self._expire(time.time() if now is None else now)
+        position = {'genres': 2, 'titles': 3, 'borrowers': 4}[field]
+        merged = Counter()
+        for bucket in self._buckets:
+            summary = bucket[position]
+            merged.update(summary if field == 'genres' else summary.counts)
+        return merged.most_common(k)
+
+
+class CirculationAnalytics:
+    """
+    Incremental circulation analytics fed by borrows and returns
+
+    Low-cardinality genres are counted exactly. Titles and borrowers use a
+    Space-Saving summary for top-k and a Count-Min sketch for point
+    estimates, so memory stays fixed however many keys are seen. Queries
+    read only the summaries, never the loans or the catalog.
+
+    Attributes:
+        total_borrows (int): Borrows since tracking started
+        total_returns (int): Returns since tracking started
+        genre_counts (Counter): Exact borrows per genre
+        windows (dict): Window name -> SlidingWindow
+    """
+
+    # Window name -> (length, bucket) in seconds
+    DEFAULT_WINDOWS = {
+        'last 24h': (24 * 3600, 3600),
+        'last 7 days': (7 * 24 * 3600, 6 * 3600),
+    }
+
+    def __init__(self, capacity=1000, windows=None):
+        """
+        Initialize empty analytics
+
+        Args:
+            capacity (int): Space-Saving capacity (tracked heavy hitters)
+            windows (dict, optional): Window name -> (length, bucket) seconds
+        """
+        self.total_borrows = 0
+        self.total_returns = 0
+        self.genre_counts = Counter()
+        self.top_titles_summary = SpaceSaving(capacity)
+        self.top_borrowers_summary = SpaceSaving(capacity)
+        self.title_sketch = CountMinSketch()
+        self.borrower_sketch = CountMinSketch()
+        self.titles = {}  # ISBN key -> title, for tracked heavy hitters only
+        if windows is None:
+            windows = self.DEFAULT_WINDOWS
+        self.windows = {name: SlidingWindow(length, bucket, max(10, capacity // 10))
+                        for name, (length, bucket) in windows.items()}
+
+    # ==================== INGEST ====================
+
+    def record_borrow(self, book, borrower, when=None):
+        """
+        Count one borrow
+
+        Args:
+            book (Book): Borrowed book
+            borrower (Borrower): Borrower
+            when (datetime, optional): Borrow time (defaults to now)
+        """
+        timestamp = time.time() if when is None else when.timestamp()
+        isbn = book.get_isbn_key()
+        membership_id = borrower.get_membership_id()
+        genre = book.get_genre()
+
+        self.total_borrows += 1
+        self.genre_counts[genre] += 1
+        self.top_titles_summary.add(isbn)
+        self.top_borrowers_summary.add(membership_id)
+        self.title_sketch.add(isbn)
+        self.borrower_sketch.add(membership_id)
+        if isbn in self.top_titles_summary.counts:
+            self.titles[isbn] = book.get_title()
+        for window in self.windows.values():
+            window.add(timestamp, genre, isbn, membership_id)
+
+        # Forget titles of keys evicted from the summary
+        if len(self.titles) > 2 * self.top_titles_summary.capacity:
+            self.titles = {key: self.titles[key] for key in self.top_titles_summary.counts
+                           if key in self.titles}
+
+    def record_return(self, book, borrower, when=None):
+        """
+        Count one return
+
+        Args:
+            book (Book): Returned book
+            borrower (Borrower): Borrower
+            when (datetime, optional): Return time (defaults to now)
+        """
+        self.total_returns += 1
+
+    # ==================== QUERIES ====================
+
+    def top_titles(self, k=10, window=None, now=None):
+        """
+        Get the most borrowed titles
+
+        Args:
+            k (int): Number of titles
+            window (str, optional): Window name; all time if omitted
+            now (datetime, optional): End of the window (defaults to now)
+
+        Returns:
+            list: (isbn, title, count) tuples, most borrowed first
+        """
+        if window:
+            ranked = self.windows[window].top('titles', k, _timestamp(now))
+        else:
+            ranked = [(key, count) for key, count, _ in self.top_titles_summary.top(k)]
+        return [(canonical_isbn(key), self.titles.get(key, canonical_isbn(key)), count)
+                for key, count in ranked]
+
+    def top_genres(self, k=10, window=None, now=None):
+        """
+        Get the busiest genres
+
+        Args:
+            k (int): Number of genres
+            window (str, optional): Window name; all time if omitted
+            now (datetime, optional): End of the window (defaults to now)
+
+        Returns:
+            list: (genre, count) tuples, busiest first
+        """
+        if window:
+            return self.windows[window].top('genres', k, _timestamp(now))
+        return self.genre_counts.most_common(k)
+
+    def top_borrowers(self, k=10, window=None, now=None):
+        """
+        Get the most active borrowers
+
+        Args:
+            k (int): Number of borrowers
+            window (str, optional): Window name; all time if omitted
+            now (datetime, optional): End of the window (defaults to now)
+
+        Returns:
+            list: (membership_id, count) tuples, most active first
+        """
+        if window:
+            return self.windows[window].top('borrowers', k, _timestamp(now))
+        return [(key, count) for key, count, _ in self.top_borrowers_summary.top(k)]
+
+    def estimate_title_borrows(self, isbn):
+        """Estimate all-time borrows of one title (any ISBN spelling)"""
+        return self.title_sketch.estimate(try_isbn_key(isbn))
+
+    def estimate_borrower_borrows(self, membership_id):
+        """Estimate all-time borrows by one borrower"""
+        return self.borrower_sketch.estimate(membership_id)
+
+    def display_dashboard(self, k=5, now=None):
+        """
+        Display circulation dashboards (all time and per window)
+
+        Args:
+            k (int): Entries per ranking
+            now (datetime, optional): End of the windows (defaults to now)
+        """
+        print("\n" + "=" * 80)
+        print("📈 CIRCULATION ANALYTICS")
+        print("=" * 80)
+        print(f"Total Borrows: {self.total_borrows} | Total Returns: {self.total_returns}")
+
+        for window in [None] + list(self.windows):
+            label = window or "all time"
+            print(f"\n--- {label.upper()} ---")
+            if window:
+                print(f"Borrows: {self.windows[window].total(_timestamp(now))}")
+
+            print("Most borrowed titles:")
+            for i, (isbn, title, count) in enumerate(self.top_titles(k, window, now), 1):
+                print(f"  {i}. {title} (ISBN: {isbn}) - {count}")
+            print("Busiest genres:")
+            for i, (genre, count) in enumerate(self.top_genres(k, window, now), 1):
+                print(f"  {i}. {genre} - {count}")
+            print("Most active borrowers:")
+            for i, (membership_id, count) in enumerate(self.top_borrowers(k, window, now), 1):
+                print(f"  {i}. {membership_id} - {count}")
+
+        print("=" * 80 + "\n")
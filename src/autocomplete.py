@@ -0,0 +1,301 @@
+"""
+Prefix autocomplete for Library Management System
+Token prefix index over titles and authors with popularity-weighted suggestions
+"""
+
+import heapq
+import re
+
+from .indexes import SortedIndex, PREFIX_END
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+TOKEN_END = "\x00"  # Sorts after a token and before its longer completions
+
+CACHED_RESULTS = 20           # Suggestions kept per cached prefix (max k served from cache)
+MAX_CACHED_PREFIXES = 50000   # Bound on the number of cached prefixes
+
+
+def tokenize(text):
+    """
+    Split text into normalized (lowercase, alphanumeric) tokens
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Tokens in order of appearance
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class PrefixIndex:
+    """
+    Autocomplete index mapping token prefixes to ranked completions
+
+    Every token of an entry's text is stored as a (token, key) pair in a
+    SortedIndex, so all entries with a token starting with a prefix form
+    one contiguous range. The best CACHED_RESULTS entries of each queried
+    prefix are cached and kept current on every add, remove and
+    popularity bump, so repeated queries cost O(k) regardless of catalog
+    size. Entries rank by popularity, then alphabetically.
+
+    Entries are also kept in a second SortedIndex in rank order. A query
+    whose candidates are plentiful (a cold one-letter prefix, or several
+    common words) walks that order and stops after k matches; a query
+    with few candidates scans only the postings of its rarest word.
+
+    Several callers may add the same key (e.g. one author with many
+    books); the entry lives until each of them has removed it.
+    """
+
+    def __init__(self):
+        """Initialize an empty PrefixIndex"""
+        self._pairs = SortedIndex()
+        self._entries = {}  # key -> [display, tokens, score, refcount]
+        self._cache = {}    # prefix -> ranked list of keys
+        self._by_rank = SortedIndex()  # rank tuples, best first
+
+    def __len__(self):
+        """Number of distinct entries"""
+        return len(self._entries)
+
+    def _rank(self, key):
+        """Sort key for ranking: most popular first, then alphabetical"""
+        display, _, score, _ = self._entries[key]
+        return (-score, display.lower(), key)
+
+    def _cached_prefixes(self, tokens):
+        """Yield cached prefixes that cover any of the given tokens"""
+        seen = set()
+        for token in tokens:
+            for end in range(1, len(token) + 1):
+                prefix = token[:end]
+                if prefix in self._cache and prefix not in seen:
+                    seen.add(prefix)
+                    yield prefix
+
+    def _offer(self, key):
+        """Place an added or re-scored entry into the cached rankings it belongs to"""
+        rank = self._rank(key)
+        for prefix in self._cached_prefixes(self._entries[key][1]):
+            ranked = self._cache[prefix]
+            if key in ranked:
+                ranked.remove(key)
+            elif len(ranked) >= CACHED_RESULTS and rank >= self._rank(ranked[-1]):
+                continue
+            ranked.append(key)
+            ranked.sort(key=self._rank)
+            del ranked[CACHED_RESULTS:]
+
+    # ==================== MAINTENANCE ====================
+
+    def add(self, key, display, score=0):
+        """
+        Add an entry (or another reference to an existing one)
+
+        Args:
+            key: Entry identifier (e.g. ISBN, normalized author)
+            display (str): Text to index and suggest
+            score (int): Initial popularity
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry[3] += 1
+            return
+
+        tokens = sorted(set(tokenize(display)))
+        self._entries[key] = [display, tokens, score, 1]
+        for token in tokens:
+            self._pairs.insert((token, key))
+        self._by_rank.insert(self._rank(key))
+        self._offer(key)
+
+    def remove(self, key):
+        """
+        Drop one reference to an entry, removing it when none remain
+
+        Args:
+            key: Entry identifier
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry[3] -= 1
+        if entry[3] > 0:
+            return
+
+        tokens = entry[1]
+        for token in tokens:
+            self._pairs.discard((token, key))
+        self._by_rank.discard(self._rank(key))
+        # The removed entry may have displaced others: recompute lazily
+        for prefix in list(self._cached_prefixes(tokens)):
+            if key in self._cache[prefix]:
+                del self._cache[prefix]
+        del self._entries[key]
+
+    def bump(self, key, amount=1):
+        """
+        Increase an entry's popularity
+
+        Args:
+            key: Entry identifier
+            amount (int): Popularity to add
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        self._by_rank.discard(self._rank(key))
+        entry[2] += amount
+        self._by_rank.insert(self._rank(key))
+        self._offer(key)
+
+    def score(self, key):
+        """Get an entry's popularity (0 if unknown)"""
+        entry = self._entries.get(key)
+        return entry[2] if entry else 0
+
+    # ==================== QUERIES ====================
+
+    def _keys_with_prefix(self, prefix):
+        """Iterate over distinct keys having a token that starts with prefix"""
+        seen = set()
+        for _, key in self._pairs.irange((prefix,), (prefix + PREFIX_END,)):
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    def _keys_with_token(self, token):
+        """Iterate over keys having exactly the given token"""
+        for _, key in self._pairs.irange((token,), (token + TOKEN_END,)):
+            yield key
+
+    def _count_prefix(self, prefix):
+        """Count postings of tokens starting with prefix (an upper bound on matching keys)"""
+        return self._pairs.count((prefix,), (prefix + PREFIX_END,))
+
+    def _count_token(self, token):
+        """Count keys having exactly the given token"""
+        return self._pairs.count((token,), (token + TOKEN_END,))
+
+    def _best(self, n, matches, candidates, estimate):
+        """
+        Get the n best-ranked keys satisfying a predicate
+
+        Walking the rank order costs about n * len(self) / estimate steps
+        and scanning the candidates costs about estimate, so the walk is
+        tried first only when it is expected to be cheaper. Matches may be
+        rarer than estimated or cluster at the bottom of the ranking, so
+        the walk gives up after estimate steps and falls back to the scan,
+        at worst doubling its cost.
+
+        Args:
+            n (int): Number of keys wanted
+            matches (callable): Predicate on a key
+            candidates (callable): Returns an iterable of keys that is a superset of the matches
+            estimate (int): Upper bound on the number of candidates
+
+        Returns:
+            list: Up to n keys, best first
+        """
+        if estimate and estimate * estimate > n * len(self._entries):
+            found = []
+            for steps, rank in enumerate(self._by_rank):
+                if steps >= estimate:
+                    break
+                if matches(rank[-1]):
+                    found.append(rank[-1])
+                    if len(found) == n:
+                        return found
+            else:
+                return found
+        return heapq.nsmallest(n, (key for key in candidates() if matches(key)), key=self._rank)
+
+    def _ranked(self, prefix):
+        """Get the cached ranking for a single-token prefix, computing it if needed"""
+        ranked = self._cache.get(prefix)
+        if ranked is None:
+            ranked = self._best(CACHED_RESULTS,
+                                lambda key: any(token.startswith(prefix) for token in self._entries[key][1]),
+                                lambda: self._keys_with_prefix(prefix),
+                                self._count_prefix(prefix))
+            if len(self._cache) >= MAX_CACHED_PREFIXES:
+                del self._cache[next(iter(self._cache))]
+            self._cache[prefix] = ranked
+        return ranked
+
+    def _phrase(self, needed, last, n):
+        """
+        Rank entries having every needed token and a token starting with last
+
+        Candidates come from the postings of the rarest word: the rarest
+        needed token, or the last prefix if that is rarer still.
+
+        Args:
+            needed (set): Whole tokens that must all be present
+            last (str): Prefix that some token must start with
+            n (int): Number of keys wanted
+
+        Returns:
+            list: Up to n keys, best first
+        """
+        def matches(key):
+            tokens = self._entries[key][1]
+            return needed.issubset(tokens) and any(token.startswith(last) for token in tokens)
+
+        estimate = self._count_prefix(last)
+        candidates = lambda: self._keys_with_prefix(last)
+        for word in needed:
+            count = self._count_token(word)
+            if count < estimate:
+                estimate = count
+                candidates = lambda word=word: self._keys_with_token(word)
+        return self._best(n, matches, candidates, estimate)
+
+    def suggest(self, prefix, k=10):
+        """
+        Get the top-k completions for a prefix
+
+        The last word of the prefix matches any token it starts; earlier
+        words must match whole tokens.
+
+        Args:
+            prefix (str): Text typed so far
+            k (int): Maximum number of suggestions
+
+        Returns:
+            list: Display strings, most popular first (duplicates removed)
+        """
+        words = tokenize(prefix)
+        if not words:
+            return []
+        *required, last = words
+
+        if not required and k <= CACHED_RESULTS:
+            keys = self._ranked(last)
+        else:
+            keys = self._phrase(set(required), last, k * 2)
+
+        results = []
+        for key in keys:
+            display = self._entries[key][0]
+            if display not in results:
+                results.append(display)
+                if len(results) == k:
+                    break
+        return results
+
+    def warm(self, depth=2):
+        """
+        Precompute cached rankings for every prefix up to a given length
+
+        Args:
+            depth (int): Longest prefix length to precompute
+        """
+        prefixes = set()
+        for token, _ in self._pairs:
+            for end in range(1, min(depth, len(token)) + 1):
+                prefixes.add(token[:end])
+        for prefix in prefixes:
+            self._ranked(prefix)
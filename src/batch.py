@@ -0,0 +1,351 @@
+"""
+Batch mode for Library Management System
+Runs a stream of text commands against a Library and writes one JSON result per command
+"""
+
+import inspect
+import json
+import shlex
+import sys
+
+from .book import Book
+from .borrower import Borrower, is_contact_query
+from .copies import is_barcode
+from .export import DEFAULT_CHUNK_SIZE, book_rows, borrower_rows, overdue_rows, stats_rows
+
+
+# Command name -> usage, shown in error results
+USAGE = {
+    'add_book': 'add_book ISBN QUANTITY TITLE AUTHOR GENRE',
+    'update_book': 'update_book ISBN [title=..] [author=..] [genre=..] [quantity=N]',
+    'remove_book': 'remove_book ISBN',
+    'add_copies': 'add_copies ISBN COUNT [BRANCH]',
+    'copy_state': 'copy_state BARCODE STATE',
+    'add_borrower': 'add_borrower MEMBERSHIP_ID NAME CONTACT',
+    'update_borrower': 'update_borrower MEMBERSHIP_ID [name=..] [contact=..]',
+    'remove_borrower': 'remove_borrower MEMBERSHIP_ID',
+    'borrow': 'borrow MEMBERSHIP_ID ISBN',
+    'return': 'return MEMBERSHIP_ID ISBN|BARCODE',
+    'search': 'search title|author|genre|isbn QUERY',
+    'suggest': 'suggest title|author PREFIX',
+    'book': 'book ISBN',
+    'borrower': 'borrower MEMBERSHIP_ID',
+    'forecast': 'forecast ISBN [DAYS]',
+    'find_borrower': 'find_borrower NAME|EMAIL|PHONE',
+    'available': 'available',
+    'unavailable': 'unavailable',
+    'overdue': 'overdue',
+    'stats': 'stats',
+    'detailed_stats': 'detailed_stats',
+    'duplicates': 'duplicates [THRESHOLD]',
+}
+
+
+class BatchError(Exception):
+    """A command could not be parsed"""
+
+
+def parse_command(line):
+    """
+    Split a command line into words
+
+    Plain lines are split on whitespace; lines containing quotes are split
+    with shell rules so titles and names may contain spaces.
+
+    Args:
+        line (str): Command line
+
+    Returns:
+        list: Words (empty for blank lines and # comments)
+    """
+    line = line.strip()
+    if not line or line.startswith('#'):
+        return []
+    if '"' in line or "'" in line:
+        try:
+            return shlex.split(line)
+        except ValueError as e:
+            raise BatchError(str(e))
+    return line.split()
+
+
+def _options(words, allowed):
+    """Parse key=value words into a dict"""
+    options = {}
+    for word in words:
+        key, sep, value = word.partition('=')
+        if not sep or key not in allowed:
+            raise BatchError(f"Unexpected argument '{word}'")
+        options[key] = value
+    return options
+
+
+def _failure(library):
+    """Build the error text for a failed operation from the library's last message"""
+    message = library.last_message or "Operation failed"
+    return message.lstrip("❌ ").replace("Error: ", "", 1)
+
+
+class BatchRunner:
+    """
+    Execute batch commands against a Library and stream JSON Lines results
+
+    Each result line holds the input line number, the command, an "ok"
+    flag and either the command's result fields or an "error". Results
+    are buffered and written every chunk_size commands.
+
+    Attributes:
+        library (Library): Library the commands run against (quiet mode)
+        succeeded (int): Commands that succeeded
+        failed (int): Commands that failed
+    """
+
+    def __init__(self, library, output, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Initialize a BatchRunner
+
+        Args:
+            library (Library): Library to drive; its messages are silenced
+            output (file): Writable text stream for results
+            chunk_size (int): Results per buffered write
+        """
+        self.library = library
+        self.library.verbose = False
+        self.output = output
+        self.chunk_size = chunk_size
+        self.succeeded = 0
+        self.failed = 0
+        self._chunk = []
+        self._handlers = {
+            'add_book': self._add_book,
+            'update_book': self._update_book,
+            'remove_book': self._remove_book,
+            'add_copies': self._add_copies,
+            'copy_state': self._copy_state,
+            'add_borrower': self._add_borrower,
+            'update_borrower': self._update_borrower,
+            'remove_borrower': self._remove_borrower,
+            'borrow': self._borrow,
+            'return': self._return,
+            'search': self._search,
+            'suggest': self._suggest,
+            'book': self._book,
+            'borrower': self._borrower,
+            'forecast': self._forecast,
+            'find_borrower': self._find_borrower,
+            'available': lambda: {'books': list(book_rows(self.library.iter_available_books()))},
+            'unavailable': lambda: {'books': list(book_rows(self.library.iter_unavailable_books()))},
+            'overdue': lambda: {'loans': list(overdue_rows(self.library))},
+            'stats': lambda: {row['metric']: row['value'] for row in stats_rows(self.library)},
+            'detailed_stats': lambda: self.library.detailed_stats(),
+            'duplicates': self._duplicates,
+        }
+        self._signatures = {name: inspect.signature(handler) for name, handler in self._handlers.items()}
+
+    # ==================== EXECUTION ====================
+
+    def run(self, lines):
+        """
+        Execute every command of an iterable of lines
+
+        Args:
+            lines (iterable): Command lines (e.g. an open file or sys.stdin)
+
+        Returns:
+            tuple: (succeeded, failed) command counts
+        """
+        for number, line in enumerate(lines, 1):
+            self.execute(line, number)
+        self.flush()
+        return self.succeeded, self.failed
+
+    def execute(self, line, number=None):
+        """
+        Execute one command line and buffer its result
+
+        Args:
+            line (str): Command line
+            number (int, optional): Line number reported in the result
+        """
+        try:
+            words = parse_command(line)
+        except BatchError as e:
+            self._emit({'line': number, 'ok': False, 'error': str(e)})
+            return
+        if not words:
+            return
+
+        command, args = words[0].lower(), words[1:]
+        handler = self._handlers.get(command)
+        result = {'line': number, 'cmd': command}
+        if handler is None:
+            result.update(ok=False, error=f"Unknown command '{command}'")
+            self._emit(result)
+            return
+
+        try:
+            self._signatures[command].bind(*args)
+        except TypeError:
+            result.update(ok=False, error="Wrong number of arguments", usage=USAGE[command])
+            self._emit(result)
+            return
+
+        self.library.last_message = None
+        try:
+            fields = handler(*args)
+        except (BatchError, ValueError, ImportError) as e:
+            result.update(ok=False, error=str(e), usage=USAGE[command])
+        except Exception as e:  # Including TypeErrors raised inside the library
+            result.update(ok=False, error=f"{type(e).__name__}: {e}")
+        else:
+            if fields is None:
+                result.update(ok=False, error=_failure(self.library))
+            else:
+                result['ok'] = True
+                result.update(fields)
+        self._emit(result)
+
+    def _emit(self, result):
+        """Buffer one result, writing the buffer out when it is full"""
+        if result['ok']:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        self._chunk.append(json.dumps(result, ensure_ascii=False))
+        if len(self._chunk) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write buffered results to the output stream"""
+        if self._chunk:
+            self.output.write("\n".join(self._chunk) + "\n")
+            self._chunk = []
+        self.output.flush()
+
+    # ==================== COMMANDS ====================
+    # Each handler returns a dict of result fields, or None when the
+    # library rejected the operation (the error is taken from its message).
+
+    def _add_book(self, isbn, quantity, title, author, genre):
+        book = Book(title, author, isbn, genre, int(quantity))
+        return {'isbn': isbn} if self.library.add_book(book) else None
+
+    def _update_book(self, isbn, *words):
+        options = _options(words, ('title', 'author', 'genre', 'quantity'))
+        quantity = int(options['quantity']) if 'quantity' in options else None
+        ok = self.library.update_book(isbn, options.get('title'), options.get('author'),
+                                      options.get('genre'), quantity)
+        return {'isbn': isbn} if ok else None
+
+    def _remove_book(self, isbn):
+        return {'isbn': isbn} if self.library.remove_book(isbn) else None
+
+    def _add_copies(self, isbn, count, branch=None):
+        args = (isbn, int(count)) if branch is None else (isbn, int(count), branch)
+        barcodes = self.library.add_copies(*args)
+        return {'barcodes': barcodes} if barcodes else None
+
+    def _copy_state(self, barcode, state):
+        return {'barcode': barcode} if self.library.set_copy_state(barcode, state.lower()) else None
+
+    def _add_borrower(self, membership_id, name, contact):
+        ok = self.library.add_borrower(Borrower(name, contact, membership_id))
+        return {'membership_id': membership_id} if ok else None
+
+    def _update_borrower(self, membership_id, *words):
+        options = _options(words, ('name', 'contact'))
+        ok = self.library.update_borrower(membership_id, options.get('name'), options.get('contact'))
+        return {'membership_id': membership_id} if ok else None
+
+    def _remove_borrower(self, membership_id):
+        return {'membership_id': membership_id} if self.library.remove_borrower(membership_id) else None
+
+    def _borrow(self, membership_id, isbn):
+        if not self.library.borrow_book(membership_id, isbn):
+            return None
+        borrower = self.library.find_borrower_by_id(membership_id)
+        record = borrower.get_borrowed_books()[-1]
+        return {'membership_id': membership_id, 'isbn': record['book'].get_isbn(),
+                'barcode': record['barcode'], 'due_date': record['due_date'].isoformat()}
+
+    def _return(self, membership_id, isbn_or_barcode):
+        if is_barcode(isbn_or_barcode):
+            ok = self.library.return_book(membership_id, barcode=isbn_or_barcode)
+        else:
+            ok = self.library.return_book(membership_id, isbn_or_barcode)
+        return {'membership_id': membership_id, 'item': isbn_or_barcode} if ok else None
+
+    def _search(self, field, *words):
+        query = " ".join(words)
+        if not query:
+            raise BatchError("Search query cannot be empty")
+        if field == 'isbn':
+            book = self.library.find_book_by_isbn(query)
+            books = [book] if book else []
+        elif field in ('title', 'author', 'genre'):
+            books = self.library.find_books(**{field: query})
+        else:
+            raise BatchError(f"Cannot search by '{field}'")
+        return {'count': len(books), 'books': list(book_rows(books))}
+
+    def _suggest(self, field, *words):
+        return {'suggestions': self.library.suggest(" ".join(words), field)}
+
+    def _book(self, isbn):
+        book = self.library.find_book_by_isbn(isbn)
+        if book is None:
+            self.library.last_message = f"Book with ISBN {isbn} not found!"
+            return None
+        return next(book_rows([book]))
+
+    def _borrower(self, membership_id):
+        borrower = self.library.find_borrower_by_id(membership_id)
+        if borrower is None:
+            self.library.last_message = f"Borrower with ID {membership_id} not found!"
+            return None
+        row = next(borrower_rows([borrower]))
+        row['loans'] = [{'isbn': record['book'].get_isbn(), 'barcode': record.get('barcode'),
+                         'due_date': record['due_date'].isoformat()}
+                        for record in borrower.get_borrowed_books()]
+        return row
+
+    def _forecast(self, isbn, days=14):
+        if self.library.find_book_by_isbn(isbn) is None:
+            self.library.last_message = f"Book with ISBN {isbn} not found!"
+            return None
+        due = self.library.next_available(isbn)
+        timeline = self.library.availability_timeline(isbn, int(days))
+        return {'isbn': isbn, 'next_available': due.isoformat() if due else None,
+                'timeline': [{'date': day.isoformat(), 'copies': copies} for day, copies in timeline]}
+
+    def _find_borrower(self, *words):
+        query = " ".join(words)
+        if is_contact_query(query):
+            borrowers = self.library.find_borrowers_by_contact(query)
+        else:
+            borrowers = self.library.find_borrowers_by_name(query)
+        return {'count': len(borrowers), 'borrowers': list(borrower_rows(borrowers))}
+
+    def _duplicates(self, threshold=None):
+        clusters = self.library.find_duplicate_books(float(threshold) if threshold else None)
+        return {'count': len(clusters), 'clusters': clusters}
+
+
+def run_batch(path, library, output=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Run a command file (or stdin) against a Library
+
+    Args:
+        path (str): Command file path, or '-' for standard input
+        library (Library): Library to drive
+        output (file, optional): Result stream (defaults to standard output)
+        chunk_size (int): Results per buffered write
+
+    Returns:
+        tuple: (succeeded, failed) command counts
+    """
+    runner = BatchRunner(library, output or sys.stdout, chunk_size)
+    if path == '-':
+        return runner.run(sys.stdin)
+    with open(path, encoding='utf-8') as f:
+        return runner.run(f)
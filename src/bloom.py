@@ -0,0 +1,439 @@
+"""
+Key filters for Library Management System
+Bloom and cuckoo filters over ISBN keys and membership IDs, to skip lookups of keys a store doesn't hold
+"""
+
+import math
+import random
+from array import array
+from hashlib import blake2b
+
+
+DEFAULT_CAPACITY = 100000
+DEFAULT_ERROR_RATE = 0.01
+FILTER_KINDS = ('cuckoo', 'bloom')
+
+CUCKOO_BUCKET_SIZE = 4
+CUCKOO_LOAD_FACTOR = 0.95  # Highest fill a cuckoo table is sized for
+CUCKOO_MAX_KICKS = 500
+
+
+def _hash128(key):
+    """Hash a key (int or str) to two independent 64-bit values, stable across processes"""
+    digest = blake2b(str(key).encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+class KeyFilter:
+    """
+    Approximate set membership with query statistics
+
+    might_contain never answers False for a key that was added (and not
+    removed), but may answer True for a key that wasn't: a false positive.
+    Callers report the lookups a positive answer didn't pay off for, so the
+    observed false-positive rate can be compared with the configured one.
+
+    Attributes:
+        capacity (int): Keys the filter is sized for
+        error_rate (float): Target false-positive rate at capacity
+        count (int): Keys currently added
+        queries (int): might_contain calls
+        negatives (int): Queries answered "definitely not" (lookups skipped)
+        false_positives (int): Positive answers whose lookup found nothing
+    """
+
+    supports_remove = False
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        """
+        Initialize the statistics
+
+        Args:
+            capacity (int): Keys to size the filter for
+            error_rate (float): Target false-positive rate at capacity
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.count = 0
+        self.queries = 0
+        self.negatives = 0
+        self.false_positives = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        return self._contains(key)
+
+    def might_contain(self, key):
+        """
+        Check whether a key may be in the set (counted in the statistics)
+
+        Args:
+            key: ISBN key or membership ID
+
+        Returns:
+            bool: False if the key is definitely absent
+        """
+        self.queries += 1
+        if self._contains(key):
+            return True
+        self.negatives += 1
+        return False
+
+    def record_false_positive(self):
+        """Report that a positive answer led to a lookup that found nothing"""
+        self.false_positives += 1
+
+    def observed_false_positive_rate(self):
+        """
+        Get the share of queries for absent keys that were answered "maybe"
+
+        Returns:
+            float: false positives / (false positives + negatives), 0.0 without data
+        """
+        absent = self.false_positives + self.negatives
+        return self.false_positives / absent if absent else 0.0
+
+    def stats(self):
+        """
+        Get the filter's size and query statistics
+
+        Returns:
+            dict: Configuration, fill, memory and false-positive rates
+        """
+        return {
+            'kind': self.kind,
+            'keys': self.count,
+            'capacity': self.capacity,
+            'bytes': self.size_in_bytes(),
+            'queries': self.queries,
+            'lookups_skipped': self.negatives,
+            'false_positives': self.false_positives,
+            'target_fpr': self.error_rate,
+            'expected_fpr': round(self.expected_false_positive_rate(), 6),
+            'observed_fpr': round(self.observed_false_positive_rate(), 6),
+        }
+
+
+class BloomFilter(KeyFilter):
+    """
+    Bloom filter: k bit positions per key, set on add
+
+    Sized with the standard formulas m = -n ln(p) / ln(2)^2 bits and
+    k = (m / n) ln(2) hash functions for n = capacity and p = error_rate;
+    positions come from double hashing of one 128-bit hash. Keys can't be
+    removed: remove() only counts keys that now linger as false positives
+    until the filter is rebuilt.
+
+    Attributes:
+        bits (int): Size of the bit array
+        hashes (int): Bit positions per key
+        removed (int): Keys removed since the last rebuild (still set)
+    """
+
+    kind = 'bloom'
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        super().__init__(capacity, error_rate)
+        self.bits = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / self.capacity * math.log(2)))
+        self.removed = 0
+        self._array = bytearray((self.bits + 7) // 8)
+
+    def _positions(self, key):
+        """Get the bit positions of a key"""
+        first, second = _hash128(key)
+        second |= 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def _contains(self, key):
+        data = self._array
+        for position in self._positions(key):
+            if not data[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, key):
+        """
+        Add a key
+
+        Returns:
+            bool: False if the filter is over capacity (the key is still
+                added, but the false-positive rate is above target)
+        """
+        data = self._array
+        new = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not data[position >> 3] & mask:
+                data[position >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return self.count + self.removed <= self.capacity
+
+    def remove(self, key):
+        """Forget a key (its bits stay set; see the class docstring)"""
+        self.count -= 1
+        self.removed += 1
+        return False
+
+    def expected_false_positive_rate(self):
+        """Estimated false-positive rate at the current fill: (1 - e^(-kn/m))^k"""
+        fill = self.count + self.removed
+        return (1 - math.exp(-self.hashes * fill / self.bits)) ** self.hashes
+
+    def size_in_bytes(self):
+        """Memory of the bit array"""
+        return len(self._array)
+
+
+class CuckooFilter(KeyFilter):
+    """
+    Cuckoo filter: short key fingerprints in a bucketed cuckoo hash table
+
+    Each key has a fingerprint and two candidate buckets (the second is
+    the first XOR a hash of the fingerprint, so either bucket can be found
+    from the other and the fingerprint alone). A full pair of buckets
+    evicts a resident fingerprint to its other bucket, up to
+    CUCKOO_MAX_KICKS times. Unlike a Bloom filter, keys can be removed.
+    The fingerprint width f is the smallest of 8, 16 or 32 bits with
+    2b / 2^f <= error_rate for bucket size b; the table holds capacity
+    fingerprints at a load of at most CUCKOO_LOAD_FACTOR.
+
+    Attributes:
+        buckets (int): Number of buckets (a power of two)
+        bucket_size (int): Fingerprint slots per bucket
+        fingerprint_bits (int): Bits per fingerprint
+    """
+
+    kind = 'cuckoo'
+    supports_remove = True
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE,
+                 bucket_size=CUCKOO_BUCKET_SIZE, seed=0):
+        super().__init__(capacity, error_rate)
+        self.bucket_size = bucket_size
+        needed = math.log2(2 * bucket_size / error_rate)
+        self.fingerprint_bits, typecode = next((bits, code) for bits, code in ((8, 'B'), (16, 'H'), (32, 'I'))
+                                               if bits >= needed or bits == 32)
+        self.buckets = 1 << max(0, math.ceil(math.log2(self.capacity / (bucket_size * CUCKOO_LOAD_FACTOR))))
+        self._mask = self.buckets - 1
+        self._table = array(typecode, bytes(array(typecode).itemsize * self.buckets * bucket_size))
+        self._stash = {}  # (bucket, fingerprint) -> count, for keys no eviction chain could place
+        self._random = random.Random(seed)
+
+    def _locate(self, key):
+        """Get a key's fingerprint (never 0, which marks an empty slot) and first bucket"""
+        first, second = _hash128(key)
+        fingerprint = second % ((1 << self.fingerprint_bits) - 1) + 1
+        return fingerprint, first & self._mask
+
+    def _alternate(self, bucket, fingerprint):
+        """Get the other bucket of a fingerprint"""
+        return (bucket ^ (fingerprint * 0x5BD1E995)) & self._mask
+
+    def _slots(self, bucket):
+        """Get the slot range of a bucket"""
+        start = bucket * self.bucket_size
+        return range(start, start + self.bucket_size)
+
+    def _place(self, bucket, fingerprint):
+        """Put a fingerprint in a free slot of a bucket; False if the bucket is full"""
+        table = self._table
+        for slot in self._slots(bucket):
+            if not table[slot]:
+                table[slot] = fingerprint
+                return True
+        return False
+
+    def _contains(self, key):
+        fingerprint, bucket = self._locate(key)
+        table, size = self._table, self.bucket_size
+        other = self._alternate(bucket, fingerprint)
+        if fingerprint in table[bucket * size:(bucket + 1) * size] or \
+                fingerprint in table[other * size:(other + 1) * size]:
+            return True
+        return bool(self._stash) and (min(bucket, other), fingerprint) in self._stash
+
+    def add(self, key):
+        """
+        Add a key
+
+        Returns:
+            bool: False if the table is over capacity (the key is still
+                added, but the filter should be rebuilt larger)
+        """
+        fingerprint, bucket = self._locate(key)
+        self.count += 1
+        if self._place(bucket, fingerprint) or self._place(self._alternate(bucket, fingerprint), fingerprint):
+            return self.count <= self.capacity
+        table = self._table
+        if self._random.random() < 0.5:
+            bucket = self._alternate(bucket, fingerprint)
+        for _ in range(CUCKOO_MAX_KICKS):
+            slot = self._slots(bucket)[self._random.randrange(self.bucket_size)]
+            fingerprint, table[slot] = table[slot], fingerprint
+            bucket = self._alternate(bucket, fingerprint)
+            if self._place(bucket, fingerprint):
+                return self.count <= self.capacity
+        # No room along the eviction chain: keep the homeless fingerprint exactly
+        pair = (min(bucket, self._alternate(bucket, fingerprint)), fingerprint)
+        self._stash[pair] = self._stash.get(pair, 0) + 1
+        return False
+
+    def remove(self, key):
+        """
+        Remove a key that was added
+
+        Removing a key that was never added may remove another key's
+        matching fingerprint, so callers only remove keys they hold.
+
+        Returns:
+            bool: True if a fingerprint was removed
+        """
+        fingerprint, bucket = self._locate(key)
+        table = self._table
+        other = self._alternate(bucket, fingerprint)
+        for slot in (*self._slots(bucket), *self._slots(other)):
+            if table[slot] == fingerprint:
+                table[slot] = 0
+                self.count -= 1
+                return True
+        pair = (min(bucket, other), fingerprint)
+        if pair in self._stash:
+            self._stash[pair] -= 1
+            if not self._stash[pair]:
+                del self._stash[pair]
+            self.count -= 1
+            return True
+        return False
+
+    def expected_false_positive_rate(self):
+        """Estimated false-positive rate at the current fill: 2b * load / 2^f"""
+        load = self.count / (self.buckets * self.bucket_size)
+        return min(1.0, 2 * self.bucket_size * load / ((1 << self.fingerprint_bits) - 1))
+
+    def size_in_bytes(self):
+        """Memory of the fingerprint table"""
+        return self._table.itemsize * len(self._table)
+
+
+def make_filter(kind='cuckoo', capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+    """
+    Create an empty key filter
+
+    Args:
+        kind (str): 'cuckoo' (supports removal) or 'bloom'
+        capacity (int): Keys to size the filter for
+        error_rate (float): Target false-positive rate at capacity
+
+    Returns:
+        KeyFilter: New filter
+
+    Raises:
+        ValueError: If kind is unknown
+    """
+    if kind == 'cuckoo':
+        return CuckooFilter(capacity, error_rate)
+    if kind == 'bloom':
+        return BloomFilter(capacity, error_rate)
+    raise ValueError(f"Unknown filter kind '{kind}' (expected one of {', '.join(FILTER_KINDS)})")
+
+
+class KeyFilters:
+    """
+    ISBN and membership ID filters of one store (a Library or federation shard)
+
+    A filter that goes over capacity, or a Bloom filter with too many
+    removed keys, is rebuilt at twice the size from the store's keys, so
+    the false-positive rate stays near the configured one as the store
+    grows. Query statistics survive rebuilds.
+
+    Attributes:
+        kind (str): Filter kind ('cuckoo' or 'bloom')
+        capacity (int): Initial keys per filter
+        error_rate (float): Target false-positive rate
+        filters (dict): 'isbn' / 'member' -> KeyFilter
+        rebuilds (int): Number of filter rebuilds
+    """
+
+    NAMES = ('isbn', 'member')
+
+    def __init__(self, kind='cuckoo', capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        """
+        Create empty filters
+
+        Args:
+            kind (str): 'cuckoo' (supports removal) or 'bloom'
+            capacity (int): Keys each filter is sized for initially
+            error_rate (float): Target false-positive rate
+        """
+        self.kind = kind
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.filters = {name: make_filter(kind, capacity, error_rate) for name in self.NAMES}
+        self.rebuilds = 0
+
+    def rebuild(self, name, keys):
+        """
+        Rebuild a filter from a store's keys, at least twice as large as they need
+
+        Args:
+            name (str): 'isbn' or 'member'
+            keys (iterable): Every key the store holds (a dict or set works)
+        """
+        keys = list(keys)
+        old = self.filters[name]
+        new = make_filter(self.kind, max(self.capacity, 2 * len(keys)), self.error_rate)
+        for key in keys:
+            new.add(key)
+        new.queries, new.negatives, new.false_positives = old.queries, old.negatives, old.false_positives
+        self.filters[name] = new
+        self.rebuilds += 1
+
+    def add(self, name, key, keys):
+        """
+        Add a key, rebuilding the filter from keys if it has outgrown its size
+
+        Args:
+            name (str): 'isbn' or 'member'
+            key: Key to add
+            keys (iterable): Every key the store holds, including key
+        """
+        if not self.filters[name].add(key):
+            self.rebuild(name, keys)
+
+    def remove(self, name, key, keys):
+        """
+        Remove a key (rebuilding a Bloom filter once removed keys pile up)
+
+        Args:
+            name (str): 'isbn' or 'member'
+            key: Key to remove
+            keys (iterable): Every key the store still holds
+        """
+        key_filter = self.filters[name]
+        key_filter.remove(key)
+        if not key_filter.supports_remove and key_filter.removed > key_filter.capacity // 2:
+            self.rebuild(name, keys)
+
+    def might_contain(self, name, key):
+        """Check whether a store may hold a key (False means it definitely doesn't)"""
+        return self.filters[name].might_contain(key)
+
+    def record_false_positive(self, name):
+        """Report that a positive answer led to a lookup that found nothing"""
+        self.filters[name].record_false_positive()
+
+    def stats(self):
+        """
+        Get per-filter statistics
+
+        Returns:
+            dict: 'isbn' / 'member' -> KeyFilter.stats()
+        """
+        return {name: key_filter.stats() for name, key_filter in self.filters.items()}
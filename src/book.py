@@ -3,6 +3,11 @@ Book class for Library Management System
 Represents a book entity with all its attributes and methods
 """
 
+from .copies import DEFAULT_BRANCH, CopySet
+from .encoding import AUTHORS, GENRES
+from .isbn import canonical_isbn, try_isbn_key
+
+
 class Book:
     """
     Book class to store book information and manage availability
@@ -10,9 +15,25 @@ class Book:
     Attributes:
         title (str): Title of the book
         author (str): Author name
-        isbn (str): International Standard Book Number (unique identifier)
+        isbn (str): International Standard Book Number, as entered (used for display)
+        isbn_key (int or None): Canonical ISBN-13 integer key used for lookups
+            (None if the ISBN is malformed or fails its checksum)
         genre (str): Genre/category of the book
-        quantity (int): Number of copies available
+        quantity (int): Number of copies available (derived from the copy records)
+        copies (CopySet): Per-copy records (barcode, state, branch)
+        author_code (int): Code of the author in the shared AUTHORS table
+        genre_code (int): Code of the genre in the shared GENRES table
+    
+    Author and genre repeat across many books, so they are dictionary-encoded:
+    each book stores a small integer code and the strings live once in the
+    shared tables. The author and genre attributes decode transparently.
+    
+    Each physical copy has its own record in a CopySet. Setting quantity adds
+    or withdraws available copies; reading it counts the copies on the shelf.
+    
+    The rendered listing row is cached together with the available count it
+    shows: update_details drops it, and any change in available copies
+    (quantity updates, checkouts, returns, copy states) makes it stale.
     """
     
     def __init__(self, title, author, isbn, genre, quantity):
@@ -29,8 +50,43 @@ class Book:
         self.title = title
         self.author = author
         self.isbn = isbn
+        self.isbn_key = try_isbn_key(isbn)
         self.genre = genre
+        prefix = canonical_isbn(self.isbn_key) if self.isbn_key is not None else str(isbn)
+        self.copies = CopySet(prefix)
         self.quantity = quantity
+        self._row = None  # (available count, rendered row) cache for __str__
+    
+    @property
+    def quantity(self):
+        """Number of available copies (popcount of the availability bitmap)"""
+        return self.copies.available_count()
+    
+    @quantity.setter
+    def quantity(self, value):
+        available = self.copies.available_count()
+        if value > available:
+            self.copies.add_copies(value - available)
+        elif value < available:
+            self.copies.withdraw_available(available - value)
+    
+    @property
+    def author(self):
+        """Author name (decoded from the shared AUTHORS table)"""
+        return AUTHORS.values[self.author_code]
+    
+    @author.setter
+    def author(self, value):
+        self.author_code = AUTHORS.encode(value)
+    
+    @property
+    def genre(self):
+        """Genre (decoded from the shared GENRES table)"""
+        return GENRES.values[self.genre_code]
+    
+    @genre.setter
+    def genre(self, value):
+        self.genre_code = GENRES.encode(value)
     
     def update_quantity(self, new_quantity):
         """
@@ -49,14 +105,55 @@ class Book:
             print("Error: Quantity cannot be negative.")
             return False
     
+    def add_copies(self, count, branch=DEFAULT_BRANCH):
+        """
+        Add new physical copies to the shelf
+        
+        Args:
+            count (int): Number of copies
+            branch (str): Branch holding the copies
+            
+        Returns:
+            list: Barcodes of the new copies
+        """
+        return self.copies.add_copies(count, branch)
+    
+    def checkout_copy(self):
+        """
+        Take the lowest-numbered available copy off the shelf
+        
+        Returns:
+            str or None: Barcode of the copy, None if no copy is available
+        """
+        index = self.copies.checkout()
+        return None if index is None else self.copies.barcode(index)
+    
+    def checkin_copy(self, barcode=None):
+        """
+        Put a copy on loan back on the shelf
+        
+        Args:
+            barcode (str, optional): Barcode of the copy; any copy on loan if omitted
+            
+        Returns:
+            str or None: Barcode of the copy returned, None if it was not on loan
+        """
+        index = None
+        if barcode is not None:
+            index = self.copies.index_of(barcode)
+            if index is None:
+                return None
+        index = self.copies.checkin(index)
+        return None if index is None else self.copies.barcode(index)
+    
     def is_available(self):
         """
         Check if the book is available for borrowing
         
         Returns:
-            bool: True if quantity > 0, False otherwise
+            bool: True if any copy is on the shelf, False otherwise
         """
-        return self.quantity > 0
+        return self.copies.available_count() > 0
     
     def get_title(self):
         """Get book title"""
@@ -70,6 +167,10 @@ class Book:
         """Get book ISBN"""
         return self.isbn
     
+    def get_isbn_key(self):
+        """Get canonical integer ISBN key"""
+        return self.isbn_key
+    
     def get_genre(self):
         """Get book genre"""
         return self.genre
@@ -78,6 +179,10 @@ class Book:
         """Get book quantity"""
         return self.quantity
     
+    def get_total_copies(self):
+        """Get number of copy records (in any state)"""
+        return len(self.copies)
+    
     def update_details(self, title=None, author=None, genre=None):
         """
         Update book details (title, author, or genre)
@@ -93,16 +198,25 @@ class Book:
             self.author = author
         if genre:
             self.genre = genre
+        self._row = None
+    
+    def _render(self, quantity):
+        """Format the listing row for a given number of available copies"""
+        availability = "Available" if quantity > 0 else "Not Available"
+        return f"[ISBN: {self.isbn}] {self.title} by {self.author} | Genre: {self.genre} | Quantity: {quantity} | Status: {availability}"
     
     def __str__(self):
         """
-        String representation of Book object
+        String representation of Book object (cached until the book changes)
         
         Returns:
             str: Formatted book information
         """
-        availability = "Available" if self.is_available() else "Not Available"
-        return f"[ISBN: {self.isbn}] {self.title} by {self.author} | Genre: {self.genre} | Quantity: {self.quantity} | Status: {availability}"
+        quantity = self.copies.available_count()
+        row = self._row
+        if row is None or row[0] != quantity:
+            row = self._row = (quantity, self._render(quantity))
+        return row[1]
     
     def __repr__(self):
         """Developer-friendly representation"""
@@ -3,6 +3,36 @@ Borrower class for Library Management System
 Represents a library member who can borrow books
 """
 
+import re
+
+from .isbn import try_isbn_key
+
+
+def normalize_contact(contact):
+    """
+    Normalize contact information for exact lookups
+    
+    Emails are trimmed and lowercased; phone numbers keep only their digits,
+    so "+1 (555) 010-2000" and "15550102000" match.
+    
+    Args:
+        contact (str): Email address or phone number
+        
+    Returns:
+        str: Normalized contact
+    """
+    contact = contact.strip().lower()
+    if '@' in contact:
+        return contact
+    digits = re.sub(r"\D", "", contact)
+    return digits or contact
+
+
+def is_contact_query(query):
+    """Check whether a search query is an email or phone number rather than a name"""
+    return '@' in query or (not re.search(r"[^\W\d_]", query) and len(re.sub(r"\D", "", query)) >= 5)
+
+
 class Borrower:
     """
     Borrower class to store borrower information and track borrowed books
@@ -11,7 +41,10 @@ class Borrower:
         name (str): Borrower's full name
         contact (str): Contact information (phone/email)
         membership_id (str): Unique membership identifier
-        borrowed_books (list): List of tuples (book, borrow_date, due_date)
+        borrowed_books (list): List of loan dicts (book, borrow_date, due_date, barcode)
+    
+    The rendered listing row is cached with the loan count it shows; name and
+    contact updates drop it and a change in loan count makes it stale.
     """
     
     def __init__(self, name, contact, membership_id):
@@ -27,26 +60,33 @@ class Borrower:
         self.contact = contact
         self.membership_id = membership_id
         self.borrowed_books = []  # List to track borrowed books with dates
+        self._row = None  # (loan count, rendered row) cache for __str__
     
-    def update_contact(self, new_contact):
+    def update_contact(self, new_contact, verbose=True):
         """
         Update borrower's contact information
         
         Args:
             new_contact (str): New contact information
+            verbose (bool): Print a confirmation message
         """
         self.contact = new_contact
-        print(f"Contact updated successfully for {self.name}")
+        self._row = None
+        if verbose:
+            print(f"Contact updated successfully for {self.name}")
     
-    def update_name(self, new_name):
+    def update_name(self, new_name, verbose=True):
         """
         Update borrower's name
         
         Args:
             new_name (str): New name
+            verbose (bool): Print a confirmation message
         """
         self.name = new_name
-        print(f"Name updated successfully to {self.name}")
+        self._row = None
+        if verbose:
+            print(f"Name updated successfully to {self.name}")
     
     def get_name(self):
         """Get borrower name"""
@@ -64,7 +104,7 @@ class Borrower:
         """Get list of borrowed books"""
         return self.borrowed_books
     
-    def add_borrowed_book(self, book, borrow_date, due_date):
+    def add_borrowed_book(self, book, borrow_date, due_date, barcode=None):
         """
         Add a book to borrower's borrowed books list
         
@@ -72,25 +112,29 @@ class Borrower:
             book (Book): Book object being borrowed
             borrow_date (datetime): Date when book was borrowed
             due_date (datetime): Due date for return
+            barcode (str, optional): Barcode of the copy lent out
         """
         self.borrowed_books.append({
             'book': book,
             'borrow_date': borrow_date,
-            'due_date': due_date
+            'due_date': due_date,
+            'barcode': barcode
         })
     
-    def remove_borrowed_book(self, isbn):
+    def remove_borrowed_book(self, isbn, barcode=None):
         """
         Remove a book from borrower's borrowed books list (when returned)
         
         Args:
-            isbn (str): ISBN of the book being returned
+            isbn (str): ISBN of the book being returned (any ISBN-10/13 spelling)
+            barcode (str, optional): Barcode of the copy; any copy of the book if omitted
             
         Returns:
             bool: True if removed successfully, False otherwise
         """
+        key = try_isbn_key(isbn)
         for i, record in enumerate(self.borrowed_books):
-            if record['book'].get_isbn() == isbn:
+            if record['book'].get_isbn_key() == key and barcode in (None, record.get('barcode')):
                 self.borrowed_books.pop(i)
                 return True
         return False
@@ -104,15 +148,22 @@ class Borrower:
         """
         return len(self.borrowed_books) > 0
     
+    def _render(self, books_count):
+        """Format the listing row for a given number of loans"""
+        return f"[ID: {self.membership_id}] {self.name} | Contact: {self.contact} | Borrowed Books: {books_count}"
+    
     def __str__(self):
         """
-        String representation of Borrower object
+        String representation of Borrower object (cached until the borrower changes)
         
         Returns:
             str: Formatted borrower information
         """
         books_count = len(self.borrowed_books)
-        return f"[ID: {self.membership_id}] {self.name} | Contact: {self.contact} | Borrowed Books: {books_count}"
+        row = self._row
+        if row is None or row[0] != books_count:
+            row = self._row = (books_count, self._render(books_count))
+        return row[1]
     
     def __repr__(self):
         """Developer-friendly representation"""
@@ -0,0 +1,303 @@
+"""
+Catalog analytics for Library Management System
+Columnar (NumPy) breakdowns of copies, availability, authors and loans
+
+NumPy is optional: the rest of the system runs on the standard library,
+and these reports raise ImportError with install instructions without it.
+"""
+
+
+from operator import attrgetter
+
+from .encoding import AUTHORS, GENRES
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+
+GENRE_STATS_FIELDS = ['genre', 'titles', 'copies', 'available', 'on_loan', 'availability', 'utilization']
+
+TOP_AUTHORS = 10
+QUANTITY_BINS = [(1, 1, "1"), (2, 2, "2"), (3, 5, "3-5"), (6, 10, "6-10"), (11, None, "11+")]
+UTILIZATION_BINS = ["0%", "1-25%", "26-50%", "51-75%", "76-99%", "100%"]
+LOAN_BINS = ["0", "1", "2", "3", "4", "5+"]
+
+# Integer fields read from each BookView, in the order of the BOOK_COLUMNS record
+BOOK_FIELDS = attrgetter('genre_code', 'author_code', 'quantity', 'total_copies', 'on_loan')
+BOOK_COLUMNS = [('genre', 'i8'), ('author', 'i8'), ('available', 'i8'), ('copies', 'i8'), ('on_loan', 'i8')]
+
+
+def require_numpy():
+    """
+    Check that NumPy is installed
+
+    Raises:
+        ImportError: If NumPy is missing, with installation instructions
+    """
+    if np is None:
+        raise ImportError("Detailed statistics need NumPy. Install it with: pip install numpy")
+
+
+def _shared_fields(view, book):
+    """
+    Read a BookView's BOOK_FIELDS against the shared shelf
+
+    Every desk circulates the same copies, so the circulating copies not
+    on the shared shelf are on loan from some desk.
+    """
+    circulating = book.quantity + book.on_loan
+    available = min(view.shelf_count(book), circulating)
+    return book.genre_code, book.author_code, available, book.total_copies, circulating - available
+
+
+def _columns(view, current_date):
+    """
+    Read the catalog and loans into columns in one pass over each
+
+    Book columns are filled by np.fromiter straight from the snapshot's
+    integer fields; genres and authors stay as their interned codes,
+    renumbered densely so group-bys are bincounts sized by the values in
+    use, and only those values are decoded. With a shared inventory the
+    shelf is the shared one (see _shared_fields).
+
+    Args:
+        view (LibrarySnapshot): Snapshot to read
+        current_date (datetime): Reference time for overdue loans
+
+    Returns:
+        dict: NumPy columns plus the genre and author labels
+    """
+    if view.inventory is None:
+        rows = map(BOOK_FIELDS, view.iter_books())
+    else:
+        rows = (_shared_fields(view, book) for book in view.iter_books())
+    table = np.fromiter(rows, dtype=BOOK_COLUMNS)
+    genre_values, genre_codes = np.unique(table['genre'], return_inverse=True)
+    author_values, author_codes = np.unique(table['author'], return_inverse=True)
+
+    overdue_days, loans_per_borrower = [], []
+    for borrower in view.iter_borrowers():
+        records = borrower.borrowed_books
+        loans_per_borrower.append(len(records))
+        for record in records:
+            due_date = record['due_date']
+            if current_date > due_date:
+                overdue_days.append((current_date - due_date).days)
+
+    return {
+        'available': table['available'],
+        'copies': table['copies'],
+        'on_loan': table['on_loan'],
+        'genre_labels': np.array([GENRES.values[code] for code in genre_values.tolist()], dtype=str),
+        'genre_codes': genre_codes.ravel(),
+        'author_values': author_values,
+        'author_codes': author_codes.ravel(),
+        'overdue_days': np.array(overdue_days, dtype=np.int64),
+        'loans_per_borrower': np.array(loans_per_borrower, dtype=np.int64),
+    }
+
+
+def _top_authors(titles_per_author, author_values, k=TOP_AUTHORS):
+    """Dense author codes of the k authors with most titles, ties in alphabetical order"""
+    if titles_per_author.size > k:
+        cutoff = np.partition(titles_per_author, -k)[-k]
+        candidates = np.flatnonzero(titles_per_author >= cutoff).tolist()
+    else:
+        candidates = range(titles_per_author.size)
+    name = lambda a: AUTHORS.values[int(author_values[a])]
+    return sorted(candidates, key=lambda a: (-int(titles_per_author[a]), name(a)))[:k]
+
+
+def _ratio(numerator, denominator):
+    """Element-wise ratio that is 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def _percentiles(values, points=(25, 50, 75, 90)):
+    """Linearly interpolated percentiles of a column, as floats"""
+    if values.size == 0:
+        return {f"p{p}": 0.0 for p in points}
+    return {f"p{p}": float(q) for p, q in zip(points, np.percentile(values, points))}
+
+
+def _histogram(values, edges, labels):
+    """Count values per bin; edges are inclusive upper bounds (the last bin is open)"""
+    codes = np.searchsorted(np.asarray(edges), values, side='left')
+    counts = np.bincount(codes, minlength=len(labels))
+    return [(label, int(count)) for label, count in zip(labels, counts)]
+
+
+def catalog_stats(view, current_date=None):
+    """
+    Compute the detailed catalog and loan breakdowns
+
+    Columns are built in one pass over the books and one over the loans;
+    every breakdown is then a vectorized group-by (bincount over genre and
+    author codes) or a distribution over a column.
+
+    Args:
+        view (LibrarySnapshot): Consistent view of the library (Library.snapshot())
+        current_date (datetime, optional): Reference time for overdue loans
+            (defaults to the library's clock)
+
+    Returns:
+        dict: 'totals', 'by_genre', 'authors', 'quantity', 'utilization',
+            'loans_per_borrower' and 'overdue_days' sections (plain Python values)
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    require_numpy()
+    if current_date is None:
+        current_date = view.clock()
+    columns = _columns(view, current_date)
+    available, copies, on_loan = columns['available'], columns['copies'], columns['on_loan']
+    circulating = available + on_loan  # Copies on the shelf or out (not damaged, lost, withdrawn)
+    loans = columns['loans_per_borrower']
+
+    # Genre breakdown: one bincount per measure over the genre codes
+    genre_codes, genre_count = columns['genre_codes'], len(columns['genre_labels'])
+    by_genre_titles = np.bincount(genre_codes, minlength=genre_count)
+    by_genre_copies = np.bincount(genre_codes, weights=copies, minlength=genre_count)
+    by_genre_available = np.bincount(genre_codes, weights=available, minlength=genre_count)
+    by_genre_on_loan = np.bincount(genre_codes, weights=on_loan, minlength=genre_count)
+    by_genre_circulating = by_genre_available + by_genre_on_loan
+    availability = _ratio(by_genre_available, by_genre_circulating)
+    utilization = _ratio(by_genre_on_loan, by_genre_circulating)
+    order = np.lexsort((columns['genre_labels'], -by_genre_copies))
+    by_genre = [{
+        'genre': str(columns['genre_labels'][g]),
+        'titles': int(by_genre_titles[g]),
+        'copies': int(by_genre_copies[g]),
+        'available': int(by_genre_available[g]),
+        'on_loan': int(by_genre_on_loan[g]),
+        'availability': round(float(availability[g]), 4),
+        'utilization': round(float(utilization[g]), 4),
+    } for g in order]
+
+    # Author concentration: titles per author, top share, HHI and Gini
+    titles_per_author = np.bincount(columns['author_codes'], minlength=len(columns['author_values']))
+    total_titles = int(titles_per_author.sum())
+    shares = titles_per_author / total_titles if total_titles else titles_per_author.astype(np.float64)
+    top = _top_authors(titles_per_author, columns['author_values'])
+    ascending = np.sort(titles_per_author)
+    n = ascending.size
+    gini = (float((2 * np.arange(1, n + 1) - n - 1) @ ascending) / (n * total_titles)
+            if n and total_titles else 0.0)
+    authors = {
+        'authors': int(n),
+        'top': [(AUTHORS.values[int(columns['author_values'][a])], int(titles_per_author[a]),
+                 round(float(shares[a]), 4)) for a in top],
+        'top_share': round(float(shares[top].sum()), 4) if n else 0.0,
+        'hhi': round(float((shares ** 2).sum()), 6),
+        'gini': round(gini, 4),
+    }
+
+    # Per-title distributions
+    quantity_edges = [high for _, high, _ in QUANTITY_BINS[:-1]]
+    quantity = {'mean': round(float(copies.mean()), 2) if copies.size else 0.0,
+                'max': int(copies.max()) if copies.size else 0}
+    quantity.update(_percentiles(copies))
+    quantity['histogram'] = _histogram(copies[copies > 0], quantity_edges,
+                                       [label for _, _, label in QUANTITY_BINS])
+    quantity['no_copies'] = int((copies == 0).sum())
+
+    title_utilization = _ratio(on_loan, circulating)[circulating > 0]
+    buckets = np.where(title_utilization <= 0, 0,
+                       np.where(title_utilization >= 1, 5, np.ceil(title_utilization * 4).astype(np.int64)))
+    utilization_histogram = np.bincount(buckets.astype(np.int64), minlength=len(UTILIZATION_BINS))
+    title_utilization_stats = {'mean': round(float(title_utilization.mean()), 4) if title_utilization.size else 0.0,
+                               'histogram': list(zip(UTILIZATION_BINS, map(int, utilization_histogram)))}
+
+    loan_histogram = np.bincount(np.minimum(loans, len(LOAN_BINS) - 1), minlength=len(LOAN_BINS))
+    overdue = columns['overdue_days']
+
+    totals = {
+        'titles': int(copies.size),
+        'copies': int(copies.sum()),
+        'available': int(available.sum()),
+        'on_loan': int(on_loan.sum()),
+        'out_of_circulation': int((copies - circulating).sum()),
+        'borrowers': int(loans.size),
+        'active_borrowers': int((loans > 0).sum()),
+        'loans': int(loans.sum()),
+        'overdue_loans': int(overdue.size),
+    }
+    return {
+        'totals': totals,
+        'by_genre': by_genre,
+        'authors': authors,
+        'quantity': quantity,
+        'utilization': title_utilization_stats,
+        'loans_per_borrower': {'mean': round(float(loans.mean()), 2) if loans.size else 0.0,
+                               'histogram': list(zip(LOAN_BINS, map(int, loan_histogram)))},
+        'overdue_days': dict(_percentiles(overdue, (50, 90, 99)),
+                             max=int(overdue.max()) if overdue.size else 0),
+    }
+
+
+def genre_rows(view):
+    """
+    Build export rows of the genre breakdown
+
+    Args:
+        view (LibrarySnapshot): Snapshot to report on
+
+    Returns:
+        iterator: One dict per genre (see GENRE_STATS_FIELDS); computed
+            eagerly, so a missing NumPy fails before any file is opened
+    """
+    return iter(catalog_stats(view)['by_genre'])
+
+
+def _bar(count, largest, width=30):
+    """Text bar proportional to count"""
+    return "█" * (round(width * count / largest) if largest else 0)
+
+
+def display_catalog_stats(stats):
+    """
+    Display the detailed statistics report
+
+    Args:
+        stats (dict): Output of catalog_stats
+    """
+    totals = stats['totals']
+    print("\n" + "=" * 80)
+    print("📊 DETAILED LIBRARY STATISTICS")
+    print("=" * 80)
+    print(f"Titles: {totals['titles']} | Copies: {totals['copies']} | On shelf: {totals['available']} | "
+          f"On loan: {totals['on_loan']} | Out of circulation: {totals['out_of_circulation']}")
+    print(f"Borrowers: {totals['borrowers']} ({totals['active_borrowers']} with loans) | "
+          f"Loans: {totals['loans']} | Overdue: {totals['overdue_loans']}")
+
+    print(f"\n{'Genre':<24}{'Titles':>8}{'Copies':>9}{'Avail':>8}{'On loan':>9}{'Avail%':>8}{'Util%':>8}")
+    print("-" * 80)
+    for row in stats['by_genre']:
+        print(f"{row['genre'][:23]:<24}{row['titles']:>8}{row['copies']:>9}{row['available']:>8}"
+              f"{row['on_loan']:>9}{row['availability']:>8.0%}{row['utilization']:>8.0%}")
+
+    authors = stats['authors']
+    print(f"\nAuthors: {authors['authors']} | Top {TOP_AUTHORS} share of titles: {authors['top_share']:.1%} | "
+          f"HHI: {authors['hhi']:.4f} | Gini: {authors['gini']:.3f}")
+    for name, titles, share in authors['top']:
+        print(f"  {name[:40]:<42}{titles:>7} titles {share:>7.1%}")
+
+    for title, section, label in (("Copies per title", stats['quantity'], "titles"),
+                                  ("Utilization per title (on loan / circulating)", stats['utilization'], "titles"),
+                                  ("Loans per borrower", stats['loans_per_borrower'], "borrowers")):
+        extras = " | ".join(f"{key}: {value}" for key, value in section.items()
+                            if key not in ('histogram',))
+        print(f"\n{title} ({extras})")
+        largest = max((count for _, count in section['histogram']), default=0)
+        for bucket, count in section['histogram']:
+            print(f"  {bucket:>7} {_bar(count, largest):<30} {count} {label}")
+
+    overdue = stats['overdue_days']
+    print(f"\nDays overdue: median {overdue['p50']:.0f} | p90 {overdue['p90']:.0f} | "
+          f"p99 {overdue['p99']:.0f} | max {overdue['max']}")
+    print("=" * 80 + "\n")
@@ -0,0 +1,724 @@
+"""
+Change-data-capture stream for Library Management System
+Records every Library mutation as an ordered event so read replicas can follow it
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from .book import Book
+from .borrower import Borrower
+from .copies import STATE_CODES, CopySet
+
+
+# Event operation names
+BOOK_ADDED = 'book_added'
+BOOK_UPDATED = 'book_updated'
+BOOK_REMOVED = 'book_removed'
+QUANTITY_CHANGED = 'quantity_changed'
+BORROWER_ADDED = 'borrower_added'
+BORROWER_UPDATED = 'borrower_updated'
+BORROWER_REMOVED = 'borrower_removed'
+BOOK_BORROWED = 'book_borrowed'
+BOOK_RETURNED = 'book_returned'
+COPIES_ADDED = 'copies_added'
+COPY_STATE_CHANGED = 'copy_state_changed'
+
+
+class ChangeEvent:
+    """
+    One sequence-numbered mutation event
+
+    Attributes:
+        seq (int): Sequence number (1-based, strictly increasing)
+        op (str): Operation name
+        data (dict): JSON-serializable operation payload
+        timestamp (float): Unix time the event was recorded
+    """
+
+    def __init__(self, seq, op, data, timestamp):
+        """
+        Initialize a ChangeEvent
+
+        Args:
+            seq (int): Sequence number
+            op (str): Operation name
+            data (dict): Operation payload
+            timestamp (float): Unix time
+        """
+        self.seq = seq
+        self.op = op
+        self.data = data
+        self.timestamp = timestamp
+
+    def to_dict(self):
+        """Convert the event to a JSON-serializable dict"""
+        return {'seq': self.seq, 'op': self.op, 'data': self.data, 'ts': self.timestamp}
+
+    @classmethod
+    def from_dict(cls, record):
+        """Build an event from a dict produced by to_dict"""
+        return cls(record['seq'], record['op'], record['data'], record['ts'])
+
+    def __repr__(self):
+        """Developer-friendly representation"""
+        return f"ChangeEvent({self.seq}, '{self.op}', {self.data})"
+
+
+class ChangeLog:
+    """
+    Ordered, append-only log of Library change events
+
+    Events are kept in memory for in-process followers and, when a path is
+    given, also appended to a JSON Lines file that followers in other
+    processes can tail.
+
+    Memory is bounded two ways: a checkpoint of a file-mirrored log drops
+    the in-memory events it covers (see take_checkpoint), and with
+    max_events only the newest events are kept, trimmed in batches once
+    twice that many have piled up. Events dropped from memory are read
+    back from the file by events_after; a log without a file loses them.
+
+    Attributes:
+        path (str or None): JSON Lines file the log is mirrored to
+        last_seq (int): Sequence number of the newest event
+        max_events (int or None): Newest events always kept in memory (None keeps all)
+    """
+
+    def __init__(self, path=None, start_seq=0, max_events=None):
+        """
+        Initialize a ChangeLog
+
+        Args:
+            path (str, optional): JSON Lines file to append events to
+            start_seq (int): Sequence number to continue from
+            max_events (int, optional): Bound the in-memory events to the newest
+                max_events (up to twice that between trims)
+        """
+        if max_events is not None and max_events < 1:
+            raise ValueError("max_events must be at least 1")
+        self.path = path
+        self.max_events = max_events
+        self.last_seq = start_seq
+        self._events = []
+        self._first_seq = start_seq + 1
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+        self._cond = threading.Condition()
+
+    def append(self, op, data, timestamp=None):
+        """
+        Append an event
+
+        Args:
+            op (str): Operation name
+            data (dict): JSON-serializable payload
+            timestamp (float, optional): Unix time of the change (defaults to now)
+
+        Returns:
+            ChangeEvent: The recorded event
+        """
+        with self._cond:
+            self.last_seq += 1
+            event = ChangeEvent(self.last_seq, op, data, time.time() if timestamp is None else timestamp)
+            self._events.append(event)
+            if self.max_events is not None and len(self._events) >= 2 * self.max_events:
+                self.truncate_before(self.last_seq - self.max_events)
+            if self._file:
+                self._file.write(json.dumps(event.to_dict()) + "\n")
+                self._file.flush()
+            self._cond.notify_all()
+        return event
+
+    def read_from(self, seq, limit=None):
+        """
+        Get events after a sequence number
+
+        Args:
+            seq (int): Last sequence number already seen
+            limit (int, optional): Maximum number of events to return
+
+        Returns:
+            list: ChangeEvent objects with seq greater than the given one
+        """
+        with self._cond:
+            start = max(0, seq + 1 - self._first_seq)
+            end = len(self._events) if limit is None else start + limit
+            return self._events[start:end]
+
+    def wait_for(self, seq, timeout=None):
+        """
+        Block until an event newer than seq exists
+
+        Args:
+            seq (int): Last sequence number already seen
+            timeout (float, optional): Maximum seconds to wait
+
+        Returns:
+            bool: True if newer events are available
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self.last_seq > seq, timeout)
+
+    def offset(self):
+        """
+        Get the byte offset of the end of the mirrored file
+
+        Returns:
+            int or None: Offset the next event will be written at, None without a file
+        """
+        with self._cond:
+            return self._file.tell() if self._file else None
+
+    def events_after(self, seq, offset=None):
+        """
+        Get every event after a sequence number, even ones truncated from memory
+
+        Events still held in memory are returned directly; older ones are
+        read back from the mirrored file, starting at offset when known.
+
+        Args:
+            seq (int): Last sequence number already seen
+            offset (int, optional): File offset at or before the first wanted event
+
+        Returns:
+            iterable: ChangeEvent objects in sequence order
+
+        Raises:
+            ValueError: If the events were truncated and there is no file
+        """
+        with self._cond:
+            if seq + 1 >= self._first_seq:
+                return self.read_from(seq)
+        if not self.path:
+            raise ValueError(f"Events after {seq} were truncated and the log has no file")
+        source = FileChangeSource(self.path, offset or 0)
+        return [event for event in source.read_new() if event.seq > seq]
+
+    def truncate_before(self, seq):
+        """
+        Drop in-memory events up to and including seq (the file is kept)
+
+        Args:
+            seq (int): Highest sequence number every follower has applied
+        """
+        with self._cond:
+            drop = max(0, min(len(self._events), seq + 1 - self._first_seq))
+            del self._events[:drop]
+            self._first_seq += drop
+
+    def close(self):
+        """Close the mirrored file, if any"""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class FileChangeSource:
+    """
+    Reads change events from a ChangeLog's JSON Lines file
+
+    Used by followers running in another process. Only complete lines are
+    consumed, so a half-written event is picked up on the next read.
+
+    Attributes:
+        path (str): JSON Lines file to read
+        offset (int): Byte offset of the next unread line
+    """
+
+    def __init__(self, path, offset=0):
+        """
+        Initialize a FileChangeSource
+
+        Args:
+            path (str): JSON Lines file to read
+            offset (int): Byte offset to resume from
+        """
+        self.path = path
+        self.offset = offset
+        self.last_seq = 0
+
+    def read_new(self):
+        """
+        Read events appended since the last call
+
+        Returns:
+            list: New ChangeEvent objects
+        """
+        if not os.path.exists(self.path):
+            return []
+
+        events = []
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.offset += len(line)
+                event = ChangeEvent.from_dict(json.loads(line))
+                self.last_seq = event.seq
+                events.append(event)
+        return events
+
+
+# ==================== STATE SERIALIZATION ====================
+
+def _date(value):
+    """Format a datetime for an event payload"""
+    return value.isoformat()
+
+
+def book_data(book):
+    """Build the event payload describing a book"""
+    return {
+        'title': book.get_title(),
+        'author': book.get_author(),
+        'isbn': book.get_isbn(),
+        'genre': book.get_genre(),
+        'quantity': book.get_quantity(),
+    }
+
+
+def borrower_data(borrower):
+    """Build the event payload describing a borrower"""
+    return {
+        'name': borrower.get_name(),
+        'contact': borrower.get_contact(),
+        'membership_id': borrower.get_membership_id(),
+    }
+
+
+def dump_state(library):
+    """
+    Serialize a Library's books, borrowers and loans
+
+    Args:
+        library (Library): Library to serialize
+
+    Returns:
+        dict: JSON-serializable state
+    """
+    borrowers = []
+    for borrower in library.borrowers:
+        data = borrower_data(borrower)
+        data['loans'] = [
+            dict(book_data(record['book']),
+                 borrow_date=_date(record['borrow_date']),
+                 due_date=_date(record['due_date']),
+                 barcode=record.get('barcode'))
+            for record in borrower.get_borrowed_books()
+        ]
+        borrowers.append(data)
+    books = [dict(book_data(book), copies=book.copies.to_dict()) for book in library.books]
+    return {'books': books, 'borrowers': borrowers}
+
+
+def load_state(state, library=None):
+    """
+    Rebuild a Library from dump_state output
+
+    Args:
+        state (dict): Serialized state
+        library (Library, optional): Empty Library to fill (a quiet one is created if omitted)
+
+    Returns:
+        Library: The populated Library
+    """
+    if library is None:
+        from .library import Library
+        library = Library(verbose=False)
+
+    for data in state['books']:
+        book = Book(data['title'], data['author'], data['isbn'], data['genre'], 0)
+        if 'copies' in data:
+            book.copies = CopySet.from_dict(book.copies.prefix, data['copies'])
+        else:
+            book.quantity = data['quantity']
+        library.add_book(book)
+
+    for data in state['borrowers']:
+        borrower = Borrower(data['name'], data['contact'], data['membership_id'])
+        library.add_borrower(borrower)
+        for loan in data['loans']:
+            book = _loan_book(library, loan)
+            library.record_loan(borrower, book,
+                                datetime.fromisoformat(loan['borrow_date']),
+                                datetime.fromisoformat(loan['due_date']),
+                                loan.get('barcode'))
+    return library
+
+
+def _loan_book(library, data):
+    """Get the local Book for a loan, or a detached copy if it lives elsewhere"""
+    book = library.find_book_by_isbn(data['isbn'])
+    if book is None:
+        book = Book(data['title'], data['author'], data['isbn'], data['genre'], 0)
+    return book
+
+
+# ==================== EVENT APPLICATION ====================
+
+def apply_event(library, event):
+    """
+    Apply one change event to a Library
+
+    Args:
+        library (Library): Library to update (normally quiet)
+        event (ChangeEvent): Event to apply
+    """
+    op = event.op
+    data = event.data
+
+    if op == BOOK_ADDED:
+        library.add_book(Book(data['title'], data['author'], data['isbn'],
+                              data['genre'], data['quantity']))
+    elif op == BOOK_UPDATED:
+        library.update_book(data['isbn'], data.get('title'), data.get('author'), data.get('genre'))
+    elif op == BOOK_REMOVED:
+        library.remove_book(data['isbn'])
+    elif op == QUANTITY_CHANGED:
+        library.update_book(data['isbn'], quantity=data['quantity'])
+    elif op == BORROWER_ADDED:
+        library.add_borrower(Borrower(data['name'], data['contact'], data['membership_id']))
+    elif op == BORROWER_UPDATED:
+        library.update_borrower(data['membership_id'], data.get('name'), data.get('contact'))
+    elif op == BORROWER_REMOVED:
+        library.remove_borrower(data['membership_id'])
+    elif op == BOOK_BORROWED:
+        borrower = library.find_borrower_by_id(data['membership_id'])
+        if borrower:
+            library.record_loan(borrower, _loan_book(library, data),
+                                datetime.fromisoformat(data['borrow_date']),
+                                datetime.fromisoformat(data['due_date']),
+                                data.get('barcode'))
+    elif op == BOOK_RETURNED:
+        borrower = library.find_borrower_by_id(data['membership_id'])
+        if borrower:
+            library.close_loan(borrower, data['isbn'], data.get('barcode'))
+    elif op == COPIES_ADDED:
+        library.add_copies(data['isbn'], data['count'], data['branch'])
+    elif op == COPY_STATE_CHANGED:
+        book = library.find_book_by_isbn(data['isbn'])
+        index = book.copies.index_of(data['barcode']) if book else None
+        if index is not None:
+            with library.versions.changing(book):
+                book.copies.set_state(index, STATE_CODES[data['state']])
+    else:
+        raise ValueError(f"Unknown change event '{op}'")
+
+
+# ==================== TIME TRAVEL ====================
+
+def _timestamp(when):
+    """Convert a datetime (local time when naive) or Unix time to Unix time"""
+    return when.timestamp() if isinstance(when, datetime) else float(when)
+
+
+class CheckpointStore:
+    """
+    Library states saved at change log positions, for time-travel queries
+
+    Each checkpoint records the state (dump_state) after event seq, the
+    time of that event and the log file offset that follows it, so a past
+    state is rebuilt from the nearest earlier checkpoint plus the events
+    after it. Checkpoints live in memory, or in a directory as JSON files
+    (the same format as LibraryReplica checkpoints).
+
+    Attributes:
+        directory (str or None): Directory checkpoint files are written to
+        keep (int or None): Most recent checkpoints retained (None keeps all)
+        last_seq (int or None): Sequence number of the newest checkpoint
+    """
+
+    def __init__(self, directory=None, keep=None):
+        """
+        Initialize a CheckpointStore, indexing checkpoint files already in the directory
+
+        Args:
+            directory (str, optional): Directory for checkpoint files (in memory if omitted)
+            keep (int, optional): Number of most recent checkpoints to retain
+        """
+        self.directory = directory
+        self.keep = keep
+        self._times = []        # Checkpoint times, ascending
+        self._checkpoints = []  # Checkpoint dicts (in memory) or file paths
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for name in sorted(os.listdir(directory)):
+                if name.startswith('checkpoint-') and name.endswith('.json'):
+                    self._times.append(float(name[len('checkpoint-') + 13:-len('.json')]))
+                    self._checkpoints.append(os.path.join(directory, name))
+        self.last_seq = self._seq(self._checkpoints[-1]) if self._checkpoints else None
+
+    def __len__(self):
+        return len(self._checkpoints)
+
+    @staticmethod
+    def _seq(checkpoint):
+        """Get the sequence number of a checkpoint dict or file"""
+        if isinstance(checkpoint, dict):
+            return checkpoint['seq']
+        return int(os.path.basename(checkpoint)[len('checkpoint-'):][:12])
+
+    def save(self, seq, timestamp, offset, state):
+        """
+        Add a checkpoint (times must not go backwards)
+
+        Args:
+            seq (int): Sequence number of the last event included in state
+            timestamp (float): Unix time of that event (or of the checkpoint)
+            offset (int or None): Log file offset after that event
+            state (dict): dump_state output
+        """
+        checkpoint = {'seq': seq, 'ts': timestamp, 'offset': offset, 'state': state}
+        if self.directory:
+            path = os.path.join(self.directory, f"checkpoint-{seq:012d}-{timestamp:.6f}.json")
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f)
+            os.replace(path + '.tmp', path)
+            checkpoint = path
+        self._times.append(timestamp)
+        self._checkpoints.append(checkpoint)
+        self.last_seq = seq
+        if self.keep is not None and len(self._checkpoints) > self.keep:
+            for dropped in self._checkpoints[:-self.keep]:
+                if not isinstance(dropped, dict):
+                    os.remove(dropped)
+            del self._times[:-self.keep]
+            del self._checkpoints[:-self.keep]
+
+    def nearest(self, timestamp):
+        """
+        Get the newest checkpoint taken at or before a time
+
+        Args:
+            timestamp (float): Unix time
+
+        Returns:
+            dict or None: Checkpoint ('seq', 'ts', 'offset', 'state'), None if
+                every checkpoint is newer
+        """
+        position = bisect.bisect_right(self._times, timestamp)
+        if not position:
+            return None
+        checkpoint = self._checkpoints[position - 1]
+        if isinstance(checkpoint, dict):
+            return checkpoint
+        with open(checkpoint, encoding='utf-8') as f:
+            return json.load(f)
+
+
+def take_checkpoint(library, store, changelog):
+    """
+    Checkpoint a library's current state at its change log's position
+
+    When the log is mirrored to a file, the events the checkpoint covers
+    are dropped from memory (time travel and lagging followers read them
+    back from the file), so an attached checkpoint store keeps the log's
+    memory bounded by the checkpoint interval.
+
+    Args:
+        library (Library): Library whose changes the log records
+        store (CheckpointStore): Store to add the checkpoint to
+        changelog (ChangeLog): The library's change log
+
+    Returns:
+        int: Sequence number of the checkpoint
+    """
+    events = changelog.read_from(changelog.last_seq - 1)
+    timestamp = events[-1].timestamp if events else library.clock().timestamp()
+    store.save(changelog.last_seq, timestamp, changelog.offset(), dump_state(library))
+    if changelog.path:
+        # The file and this checkpoint cover the older events; keep the newest for the next timestamp
+        changelog.truncate_before(changelog.last_seq - 1)
+    return changelog.last_seq
+
+
+def state_as_of(changelog, store, when):
+    """
+    Rebuild a library as it was at a past time
+
+    Loads the nearest checkpoint at or before the time and replays the
+    events recorded after it up to the time, so the replay covers only the
+    gap since that checkpoint, never the full history.
+
+    Args:
+        changelog (ChangeLog): Log holding (or mirroring to file) the events
+        store (CheckpointStore): Checkpoints of the same library
+        when (datetime or float): Point in time (datetime, or Unix time)
+
+    Returns:
+        Library: New quiet Library with the state at that time
+
+    Raises:
+        ValueError: If the time is before the first checkpoint
+    """
+    timestamp = _timestamp(when)
+    checkpoint = store.nearest(timestamp)
+    if checkpoint is None:
+        raise ValueError(f"No checkpoint at or before {datetime.fromtimestamp(timestamp).isoformat()}")
+    library = load_state(checkpoint['state'])
+    for event in changelog.events_after(checkpoint['seq'], checkpoint.get('offset')):
+        if event.timestamp > timestamp:
+            break
+        apply_event(library, event)
+    return library
+
+
+class LibraryReplica:
+    """
+    Read replica that follows a change stream and applies it incrementally
+
+    The source is either a ChangeLog in the same process or the path of a
+    ChangeLog's JSON Lines file written by another process.
+
+    Attributes:
+        library (Library): Replica Library (quiet, read-only by convention)
+        applied_seq (int): Sequence number of the last applied event
+        applied_timestamp (float or None): Time the last applied event was recorded
+    """
+
+    def __init__(self, source, library=None, checkpoint_path=None):
+        """
+        Initialize a replica, resuming from a checkpoint if one exists
+
+        Args:
+            source (ChangeLog or str): Change log, or path of its JSON Lines file
+            library (Library, optional): Library to apply events to
+            checkpoint_path (str, optional): File used by checkpoint()/resume
+        """
+        if library is None:
+            from .library import Library
+            library = Library(verbose=False)
+        self.library = library
+        self.applied_seq = 0
+        self.applied_timestamp = None
+        self.checkpoint_path = checkpoint_path
+        self._log = source if isinstance(source, ChangeLog) else None
+        self._file_source = FileChangeSource(source) if self._log is None else None
+        self._stop = threading.Event()
+        self._thread = None
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            self._resume()
+
+    def _read_new(self):
+        """Fetch events not yet applied"""
+        if self._log is not None:
+            return self._log.events_after(self.applied_seq)
+        return [event for event in self._file_source.read_new() if event.seq > self.applied_seq]
+
+    def poll(self):
+        """
+        Apply all events published since the last poll
+
+        Returns:
+            int: Number of events applied
+        """
+        events = self._read_new()
+        for event in events:
+            apply_event(self.library, event)
+            self.applied_seq = event.seq
+            self.applied_timestamp = event.timestamp
+        return len(events)
+
+    def source_seq(self):
+        """Get the newest sequence number known at the source"""
+        if self._log is not None:
+            return self._log.last_seq
+        return max(self._file_source.last_seq, self.applied_seq)
+
+    def lag(self):
+        """
+        Get how many events the replica is behind the source
+
+        Returns:
+            int: Number of unapplied events
+        """
+        return self.source_seq() - self.applied_seq
+
+    def lag_seconds(self, now=None):
+        """
+        Get how stale the replica is
+
+        Args:
+            now (datetime or float, optional): Current time, on the source
+                library's clock (defaults to now)
+
+        Returns:
+            float: Seconds since the last applied event was recorded
+                (0.0 when fully caught up)
+        """
+        if self.lag() == 0 or self.applied_timestamp is None:
+            return 0.0
+        return (time.time() if now is None else _timestamp(now)) - self.applied_timestamp
+
+    # ==================== FOLLOWING ====================
+
+    def start(self, interval=0.05):
+        """
+        Follow the source in a background thread
+
+        Args:
+            interval (float): Poll interval in seconds for file sources
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._follow, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def _follow(self, interval):
+        """Background loop: wait for events and apply them"""
+        while not self._stop.is_set():
+            if self._log is not None:
+                self._log.wait_for(self.applied_seq, timeout=interval)
+            elif not self.poll():
+                self._stop.wait(interval)
+                continue
+            self.poll()
+
+    def stop(self):
+        """Stop the background follower thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # ==================== CHECKPOINTS ====================
+
+    def checkpoint(self):
+        """
+        Save the replica state and stream position so it can resume later
+
+        Returns:
+            int: Sequence number saved in the checkpoint
+        """
+        if not self.checkpoint_path:
+            raise ValueError("Replica has no checkpoint_path")
+
+        checkpoint = {
+            'seq': self.applied_seq,
+            'ts': self.applied_timestamp,
+            'offset': self._file_source.offset if self._file_source else None,
+            'state': dump_state(self.library),
+        }
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+        return self.applied_seq
+
+    def _resume(self):
+        """Restore state and stream position from the checkpoint file"""
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        load_state(checkpoint['state'], self.library)
+        self.applied_seq = checkpoint['seq']
+        self.applied_timestamp = checkpoint['ts']
+        if self._file_source and checkpoint['offset'] is not None:
+            self._file_source.offset = checkpoint['offset']
+            self._file_source.last_seq = self.applied_seq
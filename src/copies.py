@@ -0,0 +1,248 @@
+"""
+Per-copy tracking for Library Management System
+Compact copy records per title: availability bitmap, state array and branch codes
+"""
+
+from array import array
+
+from .encoding import ValueDictionary
+
+
+# Copy states
+AVAILABLE = 0
+ON_LOAN = 1
+DAMAGED = 2
+LOST = 3
+WITHDRAWN = 4
+
+STATE_NAMES = {
+    AVAILABLE: 'available',
+    ON_LOAN: 'on_loan',
+    DAMAGED: 'damaged',
+    LOST: 'lost',
+    WITHDRAWN: 'withdrawn',
+}
+STATE_CODES = {name: code for code, name in STATE_NAMES.items()}
+
+DEFAULT_BRANCH = 'Main'
+BARCODE_MARKER = '-C'
+
+# Shared table of branch names; copies store the small integer code
+BRANCHES = ValueDictionary()
+
+if hasattr(int, 'bit_count'):
+    def popcount(value):
+        """Count set bits (Python 3.10+ fast path)"""
+        return value.bit_count()
+else:
+    def popcount(value):
+        """Count set bits"""
+        return bin(value).count('1')
+
+
+def make_barcode(prefix, index):
+    """
+    Build the barcode of a copy
+
+    Args:
+        prefix (str): Title part of the barcode (canonical ISBN)
+        index (int): Copy index within the title (0-based)
+
+    Returns:
+        str: Barcode such as "9780131103627-C0001"
+    """
+    return f"{prefix}{BARCODE_MARKER}{index + 1:04d}"
+
+
+def parse_barcode(barcode):
+    """
+    Split a barcode into its title prefix and copy index
+
+    Args:
+        barcode (str): Barcode such as "9780131103627-C0001"
+
+    Returns:
+        tuple: (prefix, index), or (None, None) if it is not a barcode
+    """
+    prefix, marker, number = str(barcode).strip().rpartition(BARCODE_MARKER)
+    if not marker or not prefix or not number.isdigit() or int(number) < 1:
+        return None, None
+    return prefix, int(number) - 1
+
+
+def is_barcode(text):
+    """Check whether text looks like a copy barcode"""
+    return parse_barcode(text)[0] is not None
+
+
+class CopySet:
+    """
+    Physical copies of one title
+
+    Bit i of an integer bitmap is set when copy i is available, so the
+    available count is a popcount and checkout picks the lowest set bit,
+    both independent of how many copies are out. Per-copy states and
+    branch codes are kept in a bytearray and an unsigned short array.
+
+    Attributes:
+        prefix (str): Barcode prefix (canonical ISBN of the title)
+    """
+
+    def __init__(self, prefix, count=0, branch=DEFAULT_BRANCH):
+        """
+        Initialize a CopySet
+
+        Args:
+            prefix (str): Barcode prefix
+            count (int): Number of initial available copies
+            branch (str): Branch holding the initial copies
+        """
+        self.prefix = prefix
+        self._available = 0
+        self._states = bytearray()
+        self._branches = array('H')
+        if count > 0:
+            self.add_copies(count, branch)
+
+    def __len__(self):
+        """Total number of copy records (in any state)"""
+        return len(self._states)
+
+    def available_count(self):
+        """Number of copies on the shelf (popcount of the bitmap)"""
+        return popcount(self._available)
+
+    def on_loan_count(self):
+        """Number of copies out on loan"""
+        return self._states.count(ON_LOAN)
+
+    def add_copies(self, count, branch=DEFAULT_BRANCH):
+        """
+        Add new available copies
+
+        Args:
+            count (int): Number of copies
+            branch (str): Branch holding them
+
+        Returns:
+            list: Barcodes of the new copies
+        """
+        start = len(self._states)
+        self._states.extend(bytes([AVAILABLE]) * count)
+        self._branches.extend([BRANCHES.encode(branch)] * count)
+        self._available |= ((1 << count) - 1) << start
+        return [make_barcode(self.prefix, index) for index in range(start, start + count)]
+
+    def withdraw_available(self, count):
+        """
+        Withdraw available copies, highest index first
+
+        Args:
+            count (int): Number of copies to withdraw
+
+        Returns:
+            int: Number actually withdrawn
+        """
+        withdrawn = 0
+        while withdrawn < count and self._available:
+            index = self._available.bit_length() - 1
+            self.set_state(index, WITHDRAWN)
+            withdrawn += 1
+        return withdrawn
+
+    def checkout(self):
+        """
+        Take the lowest-numbered available copy off the shelf
+
+        Returns:
+            int or None: Copy index, or None if no copy is available
+        """
+        if not self._available:
+            return None
+        index = (self._available & -self._available).bit_length() - 1
+        self.set_state(index, ON_LOAN)
+        return index
+
+    def checkin(self, index=None):
+        """
+        Put a copy back on the shelf
+
+        Args:
+            index (int, optional): Copy index; any copy on loan if omitted
+
+        Returns:
+            int or None: Index of the copy returned, None if nothing was on loan
+        """
+        if index is None:
+            index = self._states.find(ON_LOAN)
+            if index == -1:
+                return None
+        elif not 0 <= index < len(self._states) or self._states[index] != ON_LOAN:
+            return None
+        self.set_state(index, AVAILABLE)
+        return index
+
+    def set_state(self, index, state):
+        """
+        Change the state of a copy
+
+        Args:
+            index (int): Copy index
+            state (int): New state (AVAILABLE, ON_LOAN, DAMAGED, LOST, WITHDRAWN)
+        """
+        self._states[index] = state
+        if state == AVAILABLE:
+            self._available |= 1 << index
+        else:
+            self._available &= ~(1 << index)
+
+    def state(self, index):
+        """Get the state of a copy"""
+        return self._states[index]
+
+    def branch(self, index):
+        """Get the branch holding a copy"""
+        return BRANCHES.values[self._branches[index]]
+
+    def barcode(self, index):
+        """Get the barcode of a copy"""
+        return make_barcode(self.prefix, index)
+
+    def index_of(self, barcode):
+        """
+        Get the copy index for one of this title's barcodes
+
+        Returns:
+            int or None: Copy index, or None if the barcode is not one of ours
+        """
+        prefix, index = parse_barcode(barcode)
+        if prefix != self.prefix or index >= len(self._states):
+            return None
+        return index
+
+    def counts_by_state(self):
+        """
+        Count copies per state
+
+        Returns:
+            dict: State name -> number of copies
+        """
+        return {name: self._states.count(code) for code, name in STATE_NAMES.items()}
+
+    def to_dict(self):
+        """Serialize copy states and branches"""
+        return {
+            'states': self._states.hex(),
+            'branches': [BRANCHES.values[code] for code in self._branches],
+        }
+
+    @classmethod
+    def from_dict(cls, prefix, data):
+        """Rebuild a CopySet serialized with to_dict"""
+        copies = cls(prefix)
+        copies._states = bytearray.fromhex(data['states'])
+        copies._branches = array('H', (BRANCHES.encode(branch) for branch in data['branches']))
+        for index, state in enumerate(copies._states):
+            if state == AVAILABLE:
+                copies._available |= 1 << index
+        return copies
@@ -0,0 +1,94 @@
+"""
+Dictionary encoding for Library Management System
+Interned value tables that let books store small integer codes for repeated strings
+"""
+
+GRAM = 3  # Length of the substrings indexed for matching_codes (two-character terms have their own)
+
+
+class ValueDictionary:
+    """
+    Interned table of distinct string values with precomputed lowercase forms
+
+    Each distinct value is stored once and identified by a small integer
+    code. Filters evaluate a predicate once per distinct value and then
+    compare codes, instead of re-lowercasing the string of every row.
+
+    Values are never removed: a value that is no longer used only costs
+    one table slot, and keeping codes stable keeps them safe to cache.
+    Because the tables only grow, substring lookups don't scan them: each
+    value's two- and three-character substrings are indexed, a
+    two-character term reads its postings directly, and a longer term is
+    only checked against the values holding its rarest trigrams.
+
+    Attributes:
+        values (list): Code -> original value
+        lowered (list): Code -> lowercase value
+    """
+
+    def __init__(self):
+        """Initialize an empty ValueDictionary"""
+        self.values = []
+        self.lowered = []
+        self._codes = {}
+        self._grams = {}  # 2- or 3-character substring -> codes of the values containing it, in code order
+
+    def __len__(self):
+        """Number of distinct values"""
+        return len(self.values)
+
+    def encode(self, value):
+        """
+        Get the code of a value, interning it if new
+
+        Args:
+            value (str): Value to encode
+
+        Returns:
+            int: Value code
+        """
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+            lowered = value.lower()
+            self.lowered.append(lowered)
+            grams = {lowered[i:i + size] for size in (GRAM - 1, GRAM) for i in range(len(lowered) - size + 1)}
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(code)
+        return code
+
+    def decode(self, code):
+        """Get the value for a code"""
+        return self.values[code]
+
+    def matching_codes(self, term):
+        """
+        Get the codes of all values containing a term (case-insensitive)
+
+        Args:
+            term (str): Substring to look for
+
+        Returns:
+            set: Codes of matching values
+        """
+        term = term.lower()
+        lowered = self.lowered
+        if len(term) < GRAM - 1:
+            return {code for code, value in enumerate(lowered) if term in value}
+        if len(term) == GRAM - 1:
+            return set(self._grams.get(term, ()))
+        postings = sorted((self._grams.get(term[i:i + GRAM], ()) for i in range(len(term) - GRAM + 1)),
+                          key=len)
+        candidates = set(postings[0])
+        for codes in postings[1:]:
+            if len(candidates) <= len(codes) // 8:
+                break  # Few enough left to check the text directly
+            candidates.intersection_update(codes)
+        return {code for code in candidates if term in lowered[code]}
+
+
+# Shared tables used by every Book
+AUTHORS = ValueDictionary()
+GENRES = ValueDictionary()
@@ -0,0 +1,233 @@
+"""
+Report export helpers for Library Management System
+Streams report rows to CSV or JSON Lines files with buffered, chunked writes
+"""
+
+import csv
+import gzip
+import io
+import json
+
+from .catalog_stats import GENRE_STATS_FIELDS, genre_rows
+from .dedup import DUPLICATE_FIELDS, catalog_duplicates, duplicate_rows
+
+DEFAULT_CHUNK_SIZE = 1000
+
+BOOK_FIELDS = ['isbn', 'title', 'author', 'genre', 'quantity', 'status']
+BORROWER_FIELDS = ['membership_id', 'name', 'contact', 'borrowed_books']
+OVERDUE_FIELDS = ['isbn', 'title', 'membership_id', 'borrower', 'contact',
+                  'borrow_date', 'due_date', 'days_overdue']
+STATS_FIELDS = ['metric', 'value']
+
+
+# ==================== ROW GENERATORS ====================
+
+def book_rows(books):
+    """
+    Generate export rows for books
+
+    Args:
+        books (iterable): Iterable of Book objects
+
+    Yields:
+        dict: One row per book
+    """
+    for book in books:
+        yield {
+            'isbn': book.get_isbn(),
+            'title': book.get_title(),
+            'author': book.get_author(),
+            'genre': book.get_genre(),
+            'quantity': book.get_quantity(),
+            'status': "Available" if book.is_available() else "Not Available",
+        }
+
+
+def borrower_rows(borrowers):
+    """
+    Generate export rows for borrowers
+
+    Args:
+        borrowers (iterable): Iterable of Borrower objects
+
+    Yields:
+        dict: One row per borrower
+    """
+    for borrower in borrowers:
+        yield {
+            'membership_id': borrower.get_membership_id(),
+            'name': borrower.get_name(),
+            'contact': borrower.get_contact(),
+            'borrowed_books': len(borrower.get_borrowed_books()),
+        }
+
+
+def overdue_rows(library, current_date=None):
+    """
+    Generate export rows for overdue loans
+
+    Args:
+        library (Library): Library to report on
+        current_date (datetime, optional): Reference time (defaults to now)
+
+    Yields:
+        dict: One row per overdue loan
+    """
+    for borrower, record, days_overdue in library.iter_overdue_records(current_date):
+        book = record['book']
+        yield {
+            'isbn': book.get_isbn(),
+            'title': book.get_title(),
+            'membership_id': borrower.get_membership_id(),
+            'borrower': borrower.get_name(),
+            'contact': borrower.get_contact(),
+            'borrow_date': record['borrow_date'].isoformat(),
+            'due_date': record['due_date'].isoformat(),
+            'days_overdue': days_overdue,
+        }
+
+
+def stats_rows(library):
+    """
+    Generate export rows for library statistics
+
+    Args:
+        library (Library): Library to report on
+
+    Yields:
+        dict: One row per metric
+    """
+    yield {'metric': 'total_books', 'value': library.get_total_books()}
+    yield {'metric': 'total_copies', 'value': library.get_total_copies()}
+    yield {'metric': 'total_borrowers', 'value': library.get_total_borrowers()}
+
+
+# Report name -> (row generator factory, CSV field names)
+REPORTS = {
+    'overdue': (lambda library: overdue_rows(library), OVERDUE_FIELDS),
+    'available': (lambda library: book_rows(library.iter_available_books()), BOOK_FIELDS),
+    'unavailable': (lambda library: book_rows(library.iter_unavailable_books()), BOOK_FIELDS),
+    'books': (lambda library: book_rows(library.iter_books()), BOOK_FIELDS),
+    'borrowers': (lambda library: borrower_rows(library.iter_borrowers()), BORROWER_FIELDS),
+    'stats': (stats_rows, STATS_FIELDS),
+    'genre_stats': (genre_rows, GENRE_STATS_FIELDS),
+    'duplicates': (lambda library: duplicate_rows(catalog_duplicates(library)), DUPLICATE_FIELDS),
+}
+
+
+# ==================== WRITERS ====================
+
+def open_output(path, compress=False):
+    """
+    Open a text output file, optionally gzip-compressed
+
+    Args:
+        path (str): Output file path
+        compress (bool): Write gzip-compressed output
+
+    Returns:
+        file: Writable text file object
+    """
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_csv(rows, path, fieldnames, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream rows to a CSV file
+
+    Rows are formatted into an in-memory buffer and flushed to the file
+    every chunk_size rows, so memory use does not grow with the row count.
+
+    Args:
+        rows (iterable): Iterable of row dicts
+        path (str): Output file path
+        fieldnames (list): Column names, in order
+        compress (bool): Write gzip-compressed output
+        chunk_size (int): Rows per buffered write
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+
+    with open_output(path, compress) as output:
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if count % chunk_size == 0:
+                output.write(buffer.getvalue())
+                buffer.seek(0)
+                buffer.truncate()
+        output.write(buffer.getvalue())
+
+    return count
+
+
+def export_jsonl(rows, path, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream rows to a JSON Lines file (one JSON object per line)
+
+    Args:
+        rows (iterable): Iterable of row dicts
+        path (str): Output file path
+        compress (bool): Write gzip-compressed output
+        chunk_size (int): Rows per buffered write
+
+    Returns:
+        int: Number of rows written
+    """
+    count = 0
+    chunk = []
+    dumps = json.dumps
+
+    with open_output(path, compress) as output:
+        for row in rows:
+            chunk.append(dumps(row, ensure_ascii=False))
+            count += 1
+            if len(chunk) >= chunk_size:
+                output.write("\n".join(chunk) + "\n")
+                chunk = []
+        if chunk:
+            output.write("\n".join(chunk) + "\n")
+
+    return count
+
+
+def export_report(library, report, path, fmt='csv', compress=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Export a named report to a file, read from a consistent snapshot
+
+    Args:
+        library (Library): Library to report on (must support snapshot())
+        report (str): Report name (see REPORTS)
+        path (str): Output file path
+        fmt (str): 'csv' or 'jsonl'
+        compress (bool, optional): Gzip output (defaults to path ending in .gz)
+        chunk_size (int): Rows per buffered write
+
+    Returns:
+        int: Number of rows written
+
+    Raises:
+        ValueError: If the report name or format is unknown
+    """
+    if report not in REPORTS:
+        raise ValueError(f"Unknown report '{report}'. Choose from: {', '.join(REPORTS)}")
+    if compress is None:
+        compress = path.endswith('.gz')
+
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown export format '{fmt}'. Use 'csv' or 'jsonl'")
+
+    # Rows come from a snapshot so the file is consistent while loans continue
+    make_rows, fieldnames = REPORTS[report]
+    with library.snapshot() as view:
+        rows = make_rows(view)
+        if fmt == 'csv':
+            return export_csv(rows, path, fieldnames, compress, chunk_size)
+        return export_jsonl(rows, path, compress, chunk_size)
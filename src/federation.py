@@ -0,0 +1,524 @@
+"""
+Federation layer for Library Management System
+Routes books and borrowers across several Library shards (one per branch)
+"""
+
+import bisect
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .bloom import KeyFilters
+from .copies import DEFAULT_BRANCH, parse_barcode
+from .isbn import canonical_isbn, try_isbn_key
+from .library import Library
+
+
+class ConsistentHashRing:
+    """
+    Consistent-hash ring mapping keys (ISBNs, membership IDs) to shard names
+
+    Each shard is placed on the ring at several virtual points so keys
+    spread evenly and adding a shard only moves a small share of keys.
+
+    Attributes:
+        replicas (int): Virtual points per shard
+    """
+
+    def __init__(self, nodes=(), replicas=64):
+        """
+        Initialize the ring
+
+        Args:
+            nodes (iterable): Initial shard names
+            replicas (int): Virtual points per shard
+        """
+        self.replicas = replicas
+        self._points = []  # Sorted hash positions
+        self._owners = {}  # Hash position -> shard name
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(key):
+        """Hash a key to a 64-bit ring position"""
+        digest = hashlib.md5(str(key).encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    def add_node(self, node):
+        """
+        Add a shard to the ring
+
+        Args:
+            node (str): Shard name
+        """
+        for i in range(self.replicas):
+            point = self._hash(f"{node}#{i}")
+            if point not in self._owners:
+                bisect.insort(self._points, point)
+            self._owners[point] = node
+
+    def remove_node(self, node):
+        """
+        Remove a shard from the ring
+
+        Args:
+            node (str): Shard name
+        """
+        for i in range(self.replicas):
+            point = self._hash(f"{node}#{i}")
+            if self._owners.get(point) == node:
+                del self._owners[point]
+                self._points.pop(bisect.bisect_left(self._points, point))
+
+    def get_node(self, key):
+        """
+        Find the shard that owns a key
+
+        Args:
+            key (str): Key to route
+
+        Returns:
+            str or None: Shard name, or None if the ring is empty
+        """
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+
+class ShardStats:
+    """
+    Load and latency counters for one shard
+
+    Attributes:
+        name (str): Shard name
+        operations (int): Number of operations served
+        total_latency (float): Sum of operation latencies in seconds
+        max_latency (float): Slowest operation in seconds
+    """
+
+    def __init__(self, name):
+        """
+        Initialize empty counters
+
+        Args:
+            name (str): Shard name
+        """
+        self.name = name
+        self.operations = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed):
+        """
+        Record one operation
+
+        Args:
+            elapsed (float): Operation latency in seconds
+        """
+        with self._lock:
+            self.operations += 1
+            self.total_latency += elapsed
+            if elapsed > self.max_latency:
+                self.max_latency = elapsed
+
+    def average_latency(self):
+        """
+        Get the mean operation latency
+
+        Returns:
+            float: Mean latency in seconds (0.0 if no operations)
+        """
+        if not self.operations:
+            return 0.0
+        return self.total_latency / self.operations
+
+
+class LibraryFederation:
+    """
+    Federation of Library shards with consistent-hash routing
+
+    Books are routed by ISBN and borrowers by membership ID. Searches and
+    overdue checks are scattered to every shard in parallel and gathered.
+    A borrower may borrow a book held by another shard (inter-branch loan).
+
+    Shards should be added before data is loaded: adding a shard later
+    changes the owner of some keys and existing records are not moved.
+
+    Every shard keeps key filters (see bloom.KeyFilters) over its ISBNs and
+    membership IDs; ISBN and member lookups consult the owning shard's
+    filter first and only call the shard when the key may be there.
+
+    Attributes:
+        shards (dict): Shard name -> Library
+        stats (dict): Shard name -> ShardStats
+        inter_branch_loans (int): Number of loans that crossed shards
+        filter_options (dict or None): KeyFilters arguments for new shards
+            (kind, capacity, error_rate); None disables shard filters
+        clock (callable): Returns the current time (shared with the shards it creates)
+    """
+
+    def __init__(self, branches=(), replicas=64, max_workers=None, filter_options=None, key_filters=True,
+                 clock=None):
+        """
+        Initialize the federation
+
+        Args:
+            branches (iterable): Initial shard names
+            replicas (int): Virtual ring points per shard
+            max_workers (int, optional): Scatter-gather thread pool size
+            filter_options (dict, optional): KeyFilters arguments for every shard
+            key_filters (bool): Keep key filters per shard
+            clock (callable, optional): Returns the current time as a datetime
+                (defaults to datetime.now)
+        """
+        self.clock = clock or datetime.now
+        self.shards = {}
+        self.stats = {}
+        self.inter_branch_loans = 0
+        self.filter_options = dict(filter_options or {}) if key_filters else None
+        self._ring = ConsistentHashRing(replicas=replicas)
+        self._max_workers = max_workers
+        self._executor = None
+        for name in branches:
+            self.add_branch(name)
+
+    # ==================== SHARD MANAGEMENT ====================
+
+    def add_branch(self, name, library=None):
+        """
+        Add a branch shard
+
+        Args:
+            name (str): Shard name
+            library (Library, optional): Existing Library to use for the shard
+
+        Returns:
+            Library: The shard's Library
+        """
+        if library is None:
+            library = Library(verbose=False, clock=self.clock)
+        if self.filter_options is not None and library.key_filters is None:
+            library.attach_key_filters(KeyFilters(**self.filter_options))
+        self.shards[name] = library
+        self.stats[name] = ShardStats(name)
+        self._ring.add_node(name)
+        return library
+
+    def shard_name_for(self, key):
+        """Get the name of the shard that owns a key"""
+        name = self._ring.get_node(key)
+        if name is None:
+            raise ValueError("Federation has no branches")
+        return name
+
+    @staticmethod
+    def _isbn_route(isbn):
+        """Get the routing key of an ISBN (canonical, so every spelling routes alike)"""
+        key = try_isbn_key(isbn)
+        return canonical_isbn(key) if key is not None else isbn
+
+    def shard_for_isbn(self, isbn):
+        """Get the Library shard that owns an ISBN"""
+        return self.shards[self.shard_name_for(self._isbn_route(isbn))]
+
+    def shard_for_member(self, membership_id):
+        """Get the Library shard that owns a membership ID"""
+        return self.shards[self.shard_name_for(membership_id)]
+
+    def _routed(self, key, operation, *args):
+        """Run a Library method on the shard owning key and record its latency"""
+        name = self.shard_name_for(key)
+        start = time.perf_counter()
+        try:
+            return getattr(self.shards[name], operation)(*args)
+        finally:
+            self.stats[name].record(time.perf_counter() - start)
+
+    def _scatter(self, operation, *args):
+        """
+        Run a Library method on every shard in parallel
+
+        Returns:
+            list: Per-shard results, in shard order
+        """
+        return self._scatter_call(lambda library: getattr(library, operation)(*args))
+
+    def _scatter_call(self, func):
+        """Run func(library) on every shard in parallel, recording latency"""
+        if self._executor is None:
+            workers = self._max_workers or max(1, len(self.shards))
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+
+        def run(name):
+            start = time.perf_counter()
+            try:
+                return func(self.shards[name])
+            finally:
+                self.stats[name].record(time.perf_counter() - start)
+
+        return list(self._executor.map(run, list(self.shards)))
+
+    def close(self):
+        """Shut down the scatter-gather thread pool"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # ==================== ROUTED OPERATIONS ====================
+
+    def add_book(self, book):
+        """Add a book to the shard owning its ISBN"""
+        return self._routed(self._isbn_route(book.get_isbn()), 'add_book', book)
+
+    def remove_book(self, isbn):
+        """Remove a book from the shard owning its ISBN"""
+        return self._routed(self._isbn_route(isbn), 'remove_book', isbn)
+
+    def update_book(self, isbn, title=None, author=None, genre=None, quantity=None):
+        """Update a book on the shard owning its ISBN"""
+        return self._routed(self._isbn_route(isbn), 'update_book', isbn, title, author, genre, quantity)
+
+    def add_copies(self, isbn, count, branch=DEFAULT_BRANCH):
+        """Add copies of a book on the shard owning its ISBN"""
+        return self._routed(self._isbn_route(isbn), 'add_copies', isbn, count, branch)
+
+    def set_copy_state(self, barcode, state):
+        """Change the state of a copy on the shard owning its title"""
+        isbn = parse_barcode(barcode)[0]
+        if isbn is None:
+            return False
+        return self._routed(self._isbn_route(isbn), 'set_copy_state', barcode, state)
+
+    def _filtered_find(self, key, name, operation, *args):
+        """Look a key up on its shard unless the shard's filter rules it out"""
+        shard = self.shards[self.shard_name_for(key)]
+        probe = shard.might_have_book if name == 'isbn' else shard.might_have_borrower
+        if not probe(*args):
+            return None
+        found = self._routed(key, operation, *args)
+        if found is None and shard.key_filters is not None:
+            shard.key_filters.record_false_positive(name)
+        return found
+
+    def find_book_by_isbn(self, isbn):
+        """Find a book on the shard owning its ISBN (skipped when its filter rules the ISBN out)"""
+        return self._filtered_find(self._isbn_route(isbn), 'isbn', 'find_book_by_isbn', isbn)
+
+    def add_borrower(self, borrower):
+        """Add a borrower to the shard owning their membership ID"""
+        return self._routed(borrower.get_membership_id(), 'add_borrower', borrower)
+
+    def remove_borrower(self, membership_id):
+        """Remove a borrower from the shard owning their membership ID"""
+        return self._routed(membership_id, 'remove_borrower', membership_id)
+
+    def update_borrower(self, membership_id, name=None, contact=None):
+        """Update a borrower on the shard owning their membership ID"""
+        return self._routed(membership_id, 'update_borrower', membership_id, name, contact)
+
+    def find_borrower_by_id(self, membership_id):
+        """Find a borrower on the shard owning their membership ID (skipped when its filter rules the ID out)"""
+        return self._filtered_find(membership_id, 'member', 'find_borrower_by_id', membership_id)
+
+    def find_borrowers_by_name(self, name):
+        """Find borrowers by name words across all shards"""
+        results = []
+        for shard_results in self._scatter('find_borrowers_by_name', name):
+            results.extend(shard_results)
+        return sorted(results, key=lambda b: (b.get_name().lower(), b.get_membership_id()))
+
+    def find_borrowers_by_contact(self, contact):
+        """Find borrowers by email or phone number across all shards"""
+        results = []
+        for shard_results in self._scatter('find_borrowers_by_contact', contact):
+            results.extend(shard_results)
+        return results
+
+    # ==================== INTER-BRANCH LOANS ====================
+
+    def borrow_book(self, membership_id, isbn):
+        """
+        Borrow a book, possibly from another branch than the borrower's
+
+        Args:
+            membership_id (str): Membership ID of borrower
+            isbn (str): ISBN of book to borrow
+
+        Returns:
+            bool: True if borrowed successfully, False otherwise
+        """
+        member_shard = self.shard_for_member(membership_id)
+        book_shard = self.shard_for_isbn(isbn)
+        if member_shard is book_shard:
+            return self._routed(self._isbn_route(isbn), 'borrow_book', membership_id, isbn)
+
+        borrower = self.find_borrower_by_id(membership_id)
+        if not borrower:
+            return False
+
+        book, barcode = self._routed(self._isbn_route(isbn), 'checkout_copy', isbn)
+        if not book:
+            return False
+
+        self._routed(membership_id, 'record_loan', borrower, book, None, None, barcode)
+        self.inter_branch_loans += 1
+        return True
+
+    def return_book(self, membership_id, isbn=None, barcode=None):
+        """
+        Return a book, possibly to another branch than the borrower's
+
+        Args:
+            membership_id (str): Membership ID of borrower
+            isbn (str, optional): ISBN of book to return (may be omitted when a barcode is given)
+            barcode (str, optional): Barcode of the returned copy
+
+        Returns:
+            bool: True if returned successfully, False otherwise
+        """
+        if isbn is None:
+            isbn = parse_barcode(barcode)[0]
+            if isbn is None:
+                return False
+
+        member_shard = self.shard_for_member(membership_id)
+        book_shard = self.shard_for_isbn(isbn)
+        if member_shard is book_shard:
+            return self._routed(self._isbn_route(isbn), 'return_book', membership_id, isbn, barcode)
+
+        borrower = self.find_borrower_by_id(membership_id)
+        book = self.find_book_by_isbn(isbn)
+        if not borrower or not book:
+            return False
+
+        record = member_shard.find_loan(borrower, isbn, barcode)
+        if not record:
+            return False
+
+        barcode = record.get('barcode')
+        self._routed(self._isbn_route(isbn), 'checkin_copy', book, barcode)
+        self._routed(membership_id, 'close_loan', borrower, isbn, barcode)
+        return True
+
+    # ==================== SCATTER-GATHER QUERIES ====================
+
+    def find_books(self, title=None, author=None, genre=None, sort_by=None):
+        """Find matching books across all shards (shard by shard, or ordered by sort_by)"""
+        results = []
+        for shard_results in self._scatter('find_books', title, author, genre, sort_by):
+            results.extend(shard_results)
+        if sort_by is not None:
+            results.sort(key=lambda book: (Library._book_sort_key(book, sort_by), book.get_isbn_key()))
+        return results
+
+    def search_by_title(self, title):
+        """Search all shards by title"""
+        return self.find_books(title=title)
+
+    def search_by_author(self, author):
+        """Search all shards by author"""
+        return self.find_books(author=author)
+
+    def search_by_genre(self, genre):
+        """Search all shards by genre"""
+        return self.find_books(genre=genre)
+
+    def advanced_search(self, title=None, author=None, genre=None):
+        """Search all shards with combined criteria (AND logic)"""
+        return self.find_books(title, author, genre)
+
+    def next_available(self, isbn, current_date=None):
+        """
+        Get when a copy of a book is next expected on a shelf
+
+        Inter-branch loans are recorded on the borrower's shard, so every
+        shard is asked and the earliest answer wins.
+        """
+        if current_date is None:
+            current_date = self.clock()
+        answers = [due for due in self._scatter('next_available', isbn, current_date) if due is not None]
+        return min(answers) if answers else None
+
+    def availability_timeline(self, isbn, days=14, current_date=None):
+        """Forecast copies on the shelf per day, summing the shelf and loans of every shard"""
+        if current_date is None:
+            current_date = self.clock()
+        timelines = self._scatter('availability_timeline', isbn, days, current_date)
+        return [(day, sum(timeline[i][1] for timeline in timelines))
+                for i, (day, _) in enumerate(timelines[0])] if timelines else []
+
+    def get_overdue_records(self, current_date=None):
+        """
+        Gather overdue loans from all shards
+
+        Args:
+            current_date (datetime, optional): Reference time (defaults to the federation's clock)
+
+        Returns:
+            list: (borrower, loan record, days overdue) tuples
+        """
+        if current_date is None:
+            current_date = self.clock()
+
+        def collect(library):
+            return list(library.iter_overdue_records(current_date))
+
+        results = []
+        for shard_results in self._scatter_call(collect):
+            results.extend(shard_results)
+        return results
+
+    def check_overdue_books(self):
+        """
+        Check and display overdue books across all branches
+        """
+        records = self.get_overdue_records()
+
+        print("\n" + "=" * 80)
+        print("⚠️  OVERDUE BOOKS REPORT (ALL BRANCHES)")
+        print("=" * 80)
+
+        for borrower, record, days_overdue in records:
+            book = record['book']
+            print(f"\n📕 Book: {book.get_title()} (ISBN: {book.get_isbn()})")
+            print(f"   Borrower: {borrower.get_name()} (ID: {borrower.get_membership_id()})")
+            print(f"   Due Date: {record['due_date'].strftime('%Y-%m-%d')}")
+            print(f"   Days Overdue: {days_overdue} day(s)")
+            print(f"   Contact: {borrower.get_contact()}")
+
+        if not records:
+            print("\n✅ No overdue books! All borrowers are on time.")
+
+        print("=" * 80 + "\n")
+        return records
+
+    # ==================== STATISTICS ====================
+
+    def display_shard_stats(self):
+        """
+        Display per-shard data volume, load and latency
+        """
+        print("\n" + "=" * 80)
+        print("🏛️  BRANCH SHARD STATISTICS")
+        print("=" * 80)
+        for name, library in self.shards.items():
+            stats = self.stats[name]
+            print(f"{name}: {library.get_total_books()} book(s), "
+                  f"{library.get_total_borrowers()} borrower(s) | "
+                  f"Ops: {stats.operations} | "
+                  f"Avg: {stats.average_latency() * 1000:.3f} ms | "
+                  f"Max: {stats.max_latency * 1000:.3f} ms")
+            if library.key_filters is not None:
+                for key_name, key_stats in library.key_filters.stats().items():
+                    print(f"   {key_name} {key_stats['kind']} filter: {key_stats['keys']} key(s), "
+                          f"{key_stats['bytes'] / 1024:.1f} KB | "
+                          f"Lookups skipped: {key_stats['lookups_skipped']}/{key_stats['queries']} | "
+                          f"FPR observed {key_stats['observed_fpr']:.4%} / "
+                          f"expected {key_stats['expected_fpr']:.4%} / target {key_stats['target_fpr']:.2%}")
+        print(f"Inter-branch loans: {self.inter_branch_loans}")
+        print("=" * 80 + "\n")
@@ -0,0 +1,814 @@
+"""
+Differential test harness for Library Management System
+Checks an optimized engine against the list-based reference and gates hot operations on timing budgets
+
+An engine is anything with Library's public methods: the indexed Library
+itself, a Library with a search index and key filters attached, or a new
+storage backend. The differential run drives the reference engine
+(src/reference.py) and a candidate with the same random operations (books
+and borrowers added, updated and removed, borrows and returns, every search
+variant, overdue checks against a simulated clock, snapshots held across
+writes, printed reports and exports) and stops at the first
+result or final state that differs. The budget run times the hot
+operations on a large catalog and fails when one is over its budget.
+
+Usage:
+    python -m src.harness check [--candidate indexed]          # both; exits 1 on any failure
+    python -m src.harness diff --candidate indexed --runs 20 --ops 3000
+    python -m src.harness budgets --candidate library [--baseline FILE] [--save-baseline FILE]
+
+A candidate is an engine name (see ENGINES) or "module:factory", where
+factory(clock, directory) returns an engine for the given clock with any
+files it needs under directory.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from .book import Book
+from .borrower import Borrower
+from .copies import STATE_NAMES, make_barcode
+from .isbn import canonical_isbn, make_isbn13
+
+
+DEFAULT_START = datetime(2026, 1, 5, 9, 0, 0)
+WORDS = ("river night garden silent empire winter shadow glass ocean mountain "
+         "letters kingdom harvest iron paper storm lantern orchard crown bridge").split()
+AUTHORS = ("Ada Lovelace", "Alan Turing", "Grace Hopper", "Barbara Liskov", "Donald Knuth",
+           "Edsger Dijkstra", "Frances Allen", "Ken Thompson", "Leslie Lamport", "Niklaus Wirth")
+GENRES = ("Fiction", "Science Fiction", "Mystery", "History", "Science", "Poetry", "Biography")
+FIRST_NAMES = ("Alice", "Alistair", "Bob", "Carol", "Dave", "Erin", "Frank", "Grace", "Heidi", "Ivan")
+LAST_NAMES = ("Smith", "Smithers", "Jones", "Brown", "Taylor", "Wilson", "Moore", "Clark")
+
+# Results whose order the API does not promise are compared as sorted lists
+UNORDERED = {'iter_overdue_records', 'get_available_books', 'get_unavailable_books'}
+
+# Relative frequency of each generated operation
+OPERATION_WEIGHTS = {
+    'add_book': 6, 'remove_book': 2, 'update_book': 4,
+    'add_borrower': 3, 'remove_borrower': 1, 'update_borrower': 2,
+    'borrow_book': 14, 'return_book': 7, 'advance_clock': 4, 'iter_overdue_records': 3,
+    'next_available': 2, 'find_book_by_isbn': 4, 'find_borrower_by_id': 2,
+    'find_books': 6, 'search_by_title': 2, 'search_by_author': 2, 'search_by_genre': 2,
+    'search_by_isbn': 1, 'advanced_search': 3, 'search_with_availability': 2, 'faceted_search': 3,
+    'find_borrowers_by_name': 3, 'find_borrowers_by_contact': 2, 'search_borrowers': 2,
+    'suggest': 4, 'get_books_sorted': 2, 'get_books_in_range': 2, 'get_borrowers_sorted': 1,
+    'get_available_books': 1, 'get_unavailable_books': 1,
+    'get_total_books': 1, 'get_total_copies': 1, 'get_total_borrowers': 1,
+    'open_snapshot': 1, 'read_snapshot': 2, 'export_report': 2, 'check_overdue_books': 1,
+    'display_all_books': 1, 'display_all_borrowers': 1, 'display_available_books': 1,
+    'display_unavailable_books': 1, 'display_library_stats': 1,
+}
+
+# Report operations compared by the text they print
+PRINTED = {
+    'check_overdue_books', 'display_all_books', 'display_all_borrowers',
+    'display_available_books', 'display_unavailable_books', 'display_library_stats',
+}
+EXPORTED_REPORTS = ('books', 'borrowers', 'available', 'unavailable', 'overdue', 'stats')
+
+# Per-call budgets (microseconds) per engine for the hot operations on the budget catalog:
+# several times the engine's cost today, so machine noise passes and a lookup that turns
+# into a scan fails. The plain Library scans titles; the indexed engine must not.
+BUDGET_BOOKS = 20000
+BUDGET_BORROWERS = 5000
+_SHARED_BUDGETS_US = {
+    'find_book_by_isbn': 50,
+    'find_borrower_by_id': 20,
+    'borrow_and_return': 1000,
+    'find_borrowers_by_name': 500,
+    'suggest': 200,
+    'get_books_sorted': 200,
+    'next_available': 100,
+}
+BUDGETS_US = {
+    'library': dict(_SHARED_BUDGETS_US, find_books_selective=15000),
+    'indexed': dict(_SHARED_BUDGETS_US, find_books_selective=1000),
+}
+DEFAULT_BUDGET_ENGINE = 'indexed'  # Budgets for "module:factory" candidates
+DEFAULT_TOLERANCE = 1.5  # Allowed slowdown against a saved baseline
+
+
+class SimulatedClock:
+    """
+    Clock injected into the engines so loan dates and overdue checks are reproducible
+
+    Attributes:
+        now (datetime): Current simulated time
+    """
+
+    def __init__(self, start=DEFAULT_START):
+        """
+        Initialize the clock
+
+        Args:
+            start (datetime): Starting time
+        """
+        self.now = start
+
+    def __call__(self):
+        """Get the current simulated time"""
+        return self.now
+
+    def advance(self, **delta):
+        """Move the clock forward (timedelta keyword arguments)"""
+        self.now += timedelta(**delta)
+
+
+def isbn10(number):
+    """ISBN-10 spelling of make_isbn13(number), the same book under another ISBN"""
+    digits = f"{number:09d}"
+    check = (11 - sum((10 - i) * int(ch) for i, ch in enumerate(digits)) % 11) % 11
+    return digits + ('X' if check == 10 else str(check))
+
+
+# ==================== ENGINES ====================
+
+def reference_engine(clock, directory):
+    """List-based reference engine"""
+    from .reference import ReferenceLibrary
+
+    return ReferenceLibrary(clock=clock)
+
+
+def library_engine(clock, directory):
+    """Library with its in-memory indexes"""
+    from .library import Library
+
+    return Library(verbose=False, clock=clock)
+
+
+def indexed_engine(clock, directory):
+    """Library with a persistent search index and small key filters (so they are rebuilt as it grows)"""
+    from .bloom import KeyFilters
+    from .library import Library
+    from .search_index import SearchIndex
+
+    library = Library(verbose=False, clock=clock)
+    library.attach_search_index(SearchIndex(directory, flush_docs=64, merge_factor=3, background=False))
+    library.attach_key_filters(KeyFilters(capacity=64))
+    return library
+
+
+ENGINES = {
+    'reference': reference_engine,
+    'library': library_engine,
+    'indexed': indexed_engine,
+}
+
+
+def load_engine(spec):
+    """
+    Resolve an engine factory
+
+    Args:
+        spec (str): Name in ENGINES or "module:factory"
+
+    Returns:
+        callable: factory(clock, directory) -> engine
+
+    Raises:
+        ValueError: If the spec names no engine
+    """
+    if spec in ENGINES:
+        return ENGINES[spec]
+    module, _, name = spec.partition(':')
+    if not name:
+        raise ValueError(f"Unknown engine '{spec}'. Use one of: {', '.join(ENGINES)} or module:factory")
+    return getattr(importlib.import_module(module), name)
+
+
+def close_engine(engine):
+    """Release files an engine holds (its search index, if any)"""
+    index = getattr(engine, 'search_index', None)
+    if index is not None:
+        index.close()
+
+
+# ==================== OPERATIONS ====================
+
+class OperationGenerator:
+    """
+    Random operation sequences over a small, collision-prone universe
+
+    Arguments are drawn from pools that mix existing and unknown ISBNs
+    (also in ISBN-10 and hyphenated spellings), membership IDs, barcodes,
+    names and search terms, so both the success and the error paths run.
+    The reference engine's current state is consulted to pick plausible
+    targets (e.g. a copy that is actually on loan) most of the time.
+    """
+
+    def __init__(self, seed, isbns=400, members=120):
+        """
+        Initialize a generator
+
+        Args:
+            seed (int): Random seed
+            isbns (int): Size of the ISBN universe
+            members (int): Size of the membership ID universe
+        """
+        self.rng = random.Random(seed)
+        self.isbns = isbns
+        self.members = members
+        self.kinds = list(OPERATION_WEIGHTS)
+        self.weights = [OPERATION_WEIGHTS[kind] for kind in self.kinds]
+
+    # ---- argument pools ----
+
+    def isbn(self):
+        """An ISBN from the universe, in any spelling, or occasionally an invalid one"""
+        rng = self.rng
+        roll = rng.random()
+        if roll < 0.03:
+            return rng.choice(("123", "978-0000000000", "not an isbn"))
+        number = rng.randrange(self.isbns)
+        if roll < 0.15:
+            return isbn10(number)
+        if roll < 0.22:
+            isbn = make_isbn13(number)
+            return f"{isbn[:3]}-{isbn[3:12]}-{isbn[12]}"
+        return make_isbn13(number)
+
+    def member_id(self, reference=None):
+        """A membership ID from the universe, usually a registered one when the reference is given"""
+        if reference is not None and reference.borrowers and self.rng.random() < 0.8:
+            return self.rng.choice(reference.borrowers).get_membership_id()
+        return f"M{self.rng.randrange(self.members):04d}"
+
+    def title(self):
+        """A title of two or three words, sometimes numbered"""
+        rng = self.rng
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 3))).title()
+        return f"{words} {rng.randrange(50)}" if rng.random() < 0.5 else words
+
+    def name(self):
+        """A borrower name"""
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def contact(self):
+        """An email or a phone number in one of several formattings"""
+        rng = self.rng
+        number = rng.randrange(40)
+        if rng.random() < 0.5:
+            return rng.choice((f"user{number}@example.org", f"USER{number}@Example.org "))
+        digits = f"555010{number:04d}"
+        return rng.choice((digits, f"({digits[:3]}) {digits[3:6]}-{digits[6:]}", f"+1 {digits}"))
+
+    def fragment(self, text):
+        """A substring of text with random case, or a random term"""
+        rng = self.rng
+        if not text or rng.random() < 0.2:
+            return rng.choice(WORDS + ["zz", "a", "", "Fiction", "ada l"])
+        start = rng.randrange(len(text))
+        piece = text[start:start + rng.randint(1, 12)]
+        return piece.upper() if rng.random() < 0.2 else piece
+
+    def existing_book(self, reference):
+        """A book in the reference catalog, or None if it is empty"""
+        return self.rng.choice(reference.books) if reference.books else None
+
+    def book_term(self, reference, field):
+        """A search term for a field, usually taken from a catalog book"""
+        book = self.existing_book(reference)
+        text = getattr(book, f"get_{field}")() if book else ""
+        return self.fragment(text)
+
+    def loan(self, reference):
+        """An outstanding (borrower, loan record) pair, or None"""
+        loans = [(borrower, record) for borrower in reference.borrowers
+                 for record in borrower.get_borrowed_books()]
+        return self.rng.choice(loans) if loans else None
+
+    # ---- operations ----
+
+    def next_operation(self, reference):
+        """
+        Draw the next operation
+
+        Args:
+            reference (ReferenceLibrary): Reference engine, consulted for plausible arguments
+
+        Returns:
+            tuple: (operation name, args list, kwargs dict)
+        """
+        rng = self.rng
+        kind = rng.choices(self.kinds, self.weights)[0]
+        book = self.existing_book(reference)
+
+        if kind == 'add_book':
+            number = rng.randrange(self.isbns)
+            isbn = rng.choice((make_isbn13(number), make_isbn13(number), isbn10(number), "12345"))
+            return kind, [Book(self.title(), rng.choice(AUTHORS), isbn, rng.choice(GENRES),
+                               rng.randint(0, 4))], {}
+        if kind in ('remove_book', 'find_book_by_isbn', 'search_by_isbn', 'next_available'):
+            isbn = book.get_isbn() if book and rng.random() < 0.7 else self.isbn()
+            return kind, [isbn], {}
+        if kind == 'update_book':
+            isbn = book.get_isbn() if book and rng.random() < 0.8 else self.isbn()
+            changes = {}
+            if rng.random() < 0.4:
+                changes['title'] = self.title()
+            if rng.random() < 0.3:
+                changes['author'] = rng.choice(AUTHORS)
+            if rng.random() < 0.3:
+                changes['genre'] = rng.choice(GENRES)
+            if rng.random() < 0.4:
+                changes['quantity'] = rng.randint(-1, 5)
+            return kind, [isbn], changes
+        if kind == 'add_borrower':
+            return kind, [Borrower(self.name(), self.contact(), self.member_id())], {}
+        if kind in ('remove_borrower', 'find_borrower_by_id'):
+            return kind, [self.member_id(reference)], {}
+        if kind == 'update_borrower':
+            changes = {}
+            if rng.random() < 0.6:
+                changes['name'] = self.name()
+            if rng.random() < 0.5:
+                changes['contact'] = self.contact()
+            return kind, [self.member_id(reference)], changes
+        if kind == 'borrow_book':
+            isbn = book.get_isbn() if book and rng.random() < 0.85 else self.isbn()
+            return kind, [self.member_id(reference), isbn], {}
+        if kind == 'return_book':
+            pair = self.loan(reference) if rng.random() < 0.85 else None
+            if pair is None:
+                return kind, [self.member_id(), self.isbn()], {}
+            borrower, record = pair
+            membership_id = borrower.get_membership_id() if rng.random() < 0.95 else self.member_id()
+            isbn, barcode = record['book'].get_isbn(), record.get('barcode')
+            mode = rng.random()
+            if mode < 0.2:
+                return kind, [membership_id], {'barcode': barcode}
+            if mode < 0.3:
+                return kind, [membership_id, isbn], {'barcode': barcode}
+            if mode < 0.35:
+                other = make_barcode(canonical_isbn(record['book'].get_isbn_key()), rng.randrange(6))
+                return kind, [membership_id], {'barcode': other}
+            return kind, [membership_id, isbn], {}
+        if kind == 'advance_clock':
+            return kind, [], {'days': rng.choice((0, 1, 3, 7, 15, 30)), 'hours': rng.randrange(24)}
+        if kind == 'iter_overdue_records':
+            if rng.random() < 0.3:
+                return kind, [], {'current_date': DEFAULT_START + timedelta(days=rng.randrange(120))}
+            return kind, [], {}
+        if kind in ('find_books', 'advanced_search', 'faceted_search'):
+            criteria = {field: self.book_term(reference, field) for field in ('title', 'author', 'genre')
+                        if rng.random() < 0.5}
+            if kind == 'faceted_search':
+                criteria['top'] = rng.choice((1, 3, 10, None))
+            elif kind == 'find_books' and rng.random() < 0.3:
+                criteria['sort_by'] = rng.choice(('title', 'author', 'genre', 'isbn'))
+            return kind, [], criteria
+        if kind in ('search_by_title', 'search_by_author', 'search_by_genre'):
+            field = kind.rsplit('_', 1)[1]
+            return kind, [self.book_term(reference, field)], {}
+        if kind == 'search_with_availability':
+            field = rng.choice(('title', 'author', 'genre', 'isbn'))
+            return kind, [field, self.book_term(reference, 'title' if field == 'isbn' else field)], {}
+        if kind == 'find_borrowers_by_name':
+            borrower = rng.choice(reference.borrowers) if reference.borrowers else None
+            name = borrower.get_name() if borrower else self.name()
+            words = rng.sample(name.split(), rng.randint(1, len(name.split())))
+            query = " ".join(word[:rng.randint(1, len(word))] for word in words)
+            return kind, [query if rng.random() < 0.9 else "  "], {}
+        if kind == 'find_borrowers_by_contact':
+            return kind, [self.contact()], {}
+        if kind == 'search_borrowers':
+            return kind, [self.contact() if rng.random() < 0.5 else self.name()[:rng.randint(1, 8)]], {}
+        if kind == 'suggest':
+            field = rng.choice(('title', 'title', 'author', 'isbn'))
+            text = (book.get_author() if field == 'author' else book.get_title()) if book else self.title()
+            return kind, [text[:rng.randint(1, len(text))]], {'field': field, 'k': rng.choice((1, 3, 10))}
+        if kind == 'get_books_sorted':
+            return kind, [rng.choice(('title', 'author', 'genre'))], {'page': rng.randint(1, 4),
+                                                                      'page_size': rng.choice((5, 20))}
+        if kind == 'get_books_in_range':
+            start, end = sorted(rng.choice("abcdefghilmnoprstw") for _ in range(2))
+            return kind, [rng.choice(('title', 'author', 'genre')), start, end], {}
+        if kind == 'export_report':
+            return kind, [rng.choice(EXPORTED_REPORTS), rng.choice(('csv', 'jsonl'))], {}
+        if kind == 'get_borrowers_sorted':
+            return kind, [], {'page': rng.randint(1, 3), 'page_size': rng.choice((5, 20))}
+        return kind, [], {}
+
+
+def describe(value):
+    """
+    Reduce a result to plain comparable values
+
+    Books, borrowers and loan records (of any engine, or snapshot views of
+    them) become tuples of their observable fields, so results from engines
+    holding different objects compare equal.
+    """
+    if hasattr(value, 'get_isbn_key'):
+        return ('book', value.get_isbn_key(), value.get_title(), value.get_author(),
+                value.get_genre(), value.get_quantity())
+    if hasattr(value, 'get_membership_id'):
+        return ('borrower', value.get_membership_id(), value.get_name(), value.get_contact(),
+                len(value.get_borrowed_books()))
+    if isinstance(value, dict) and 'book' in value:
+        return ('loan', value['book'].get_isbn_key(), value.get('barcode'),
+                value['borrow_date'], value['due_date'])
+    if isinstance(value, dict):
+        return {key: describe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) or hasattr(value, '__next__'):
+        return [describe(item) for item in value]
+    return value
+
+
+def copy_states(book):
+    """State names of a book's copies in barcode order (reference records list their own)"""
+    if hasattr(book, 'copy_states'):
+        return book.copy_states()
+    copies = book.copies
+    return [STATE_NAMES[copies.state(index)] for index in range(len(copies))]
+
+
+def engine_state(engine):
+    """
+    Describe an engine's books, borrowers and loans, independent of storage order
+
+    Returns:
+        dict: 'books' sorted by ISBN key (with copy states), 'borrowers' sorted by ID (with loans in order)
+    """
+    books = sorted((describe(book) + (book.get_isbn(), copy_states(book))
+                    for book in engine.books), key=lambda row: row[1])
+    borrowers = sorted((describe(borrower) + (describe(borrower.get_borrowed_books()),)
+                        for borrower in engine.borrowers), key=lambda row: row[1])
+    return {'books': books, 'borrowers': borrowers}
+
+
+def export_text(engine, report, fmt):
+    """Export a report from an engine's snapshot and return (rows, file text)"""
+    from .export import export_report
+
+    with tempfile.TemporaryDirectory(prefix='harness-export-') as directory:
+        path = os.path.join(directory, f"{report}.{fmt}")
+        rows = export_report(engine, report, path, fmt)
+        with open(path, encoding='utf-8') as f:
+            return [rows, f.read()]
+
+
+def held_snapshot(engine, op, session):
+    """
+    Open a snapshot held across later operations, or read and release the held one
+
+    Reads are sorted: a versioned snapshot lists entities removed since it
+    was taken after the live ones.
+    """
+    held = session.pop('snapshot', None)
+    if op == 'open_snapshot':
+        if held is not None:
+            held.release()
+        session['snapshot'] = engine.snapshot()
+        return None
+    if held is None:
+        return None
+    with held as view:
+        return {
+            'books': sorted(describe(list(view.iter_books())), key=repr),
+            'borrowers': sorted((describe(borrower) + (describe(borrower.get_borrowed_books()),)
+                                 for borrower in view.iter_borrowers()), key=repr),
+            'overdue': sorted(describe(list(view.iter_overdue_records())), key=repr),
+            'totals': [view.get_total_books(), view.get_total_copies(), view.get_total_borrowers()],
+        }
+
+
+def apply(engine, clock, op, args, kwargs, session=None):
+    """
+    Run one operation on an engine
+
+    Args:
+        session (dict, optional): Per-engine state kept between operations (a held snapshot)
+
+    Returns:
+        Described result (printed text for PRINTED reports), or ('raised', exception type name)
+    """
+    if op == 'advance_clock':
+        clock.advance(**kwargs)
+        return None
+    try:
+        if op in ('open_snapshot', 'read_snapshot'):
+            result = held_snapshot(engine, op, {} if session is None else session)
+        elif op == 'export_report':
+            result = export_text(engine, *args)
+        elif op in PRINTED:
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                getattr(engine, op)(*args, **kwargs)
+            result = output.getvalue()
+        else:
+            result = describe(getattr(engine, op)(*args, **kwargs))
+    except Exception as error:  # Both engines must fail the same way
+        return ('raised', type(error).__name__)
+    if op in UNORDERED and isinstance(result, list):
+        result.sort(key=repr)
+    return result
+
+
+def _format_call(op, args, kwargs):
+    """Render an operation as a method call"""
+    parts = [repr(arg) for arg in args] + [f"{key}={value!r}" for key, value in kwargs.items()]
+    return f"{op}({', '.join(parts)})"
+
+
+def _copy_arg(value):
+    """Give each engine its own Book/Borrower object for an argument"""
+    if isinstance(value, Book):
+        return Book(value.title, value.author, value.isbn, value.genre, value.quantity)
+    if isinstance(value, Borrower):
+        return Borrower(value.name, value.contact, value.membership_id)
+    return value
+
+
+# ==================== DIFFERENTIAL RUNS ====================
+
+class Mismatch:
+    """
+    First divergence found by a differential run
+
+    Attributes:
+        seed (int): Seed of the run
+        step (int): Index of the operation (-1 for the final state check)
+        operation (str): Operation (or 'state')
+        expected: Reference result
+        actual: Candidate result
+        trail (list): Last operations before the divergence, as text
+    """
+
+    def __init__(self, seed, step, operation, expected, actual, trail):
+        self.seed = seed
+        self.step = step
+        self.operation = operation
+        self.expected = expected
+        self.actual = actual
+        self.trail = trail
+
+    def display(self):
+        """Print the divergence and the operations that led to it"""
+        print(f"❌ Mismatch (seed {self.seed}, step {self.step}): {self.operation}")
+        if isinstance(self.expected, dict) and isinstance(self.actual, dict):
+            for part in self.expected:
+                missing = [row for row in self.expected[part] if row not in self.actual[part]]
+                extra = [row for row in self.actual[part] if row not in self.expected[part]]
+                for row in missing[:5]:
+                    print(f"   - reference {part}: {row}")
+                for row in extra[:5]:
+                    print(f"   + candidate {part}: {row}")
+        else:
+            print(f"   reference: {self.expected!r}")
+            print(f"   candidate: {self.actual!r}")
+        print("   Last operations:")
+        for line in self.trail:
+            print(f"     {line}")
+
+
+def run_differential(candidate, seed, ops=2000, reference='reference', check_every=100, trail=15):
+    """
+    Run one random operation sequence against the reference and a candidate
+
+    Args:
+        candidate (callable): Candidate engine factory
+        seed (int): Random seed (the same seed replays the same sequence)
+        ops (int): Number of operations
+        reference (str or callable): Reference engine name or factory
+        check_every (int): Compare full states every this many operations
+        trail (int): Operations kept for the mismatch report
+
+    Returns:
+        Mismatch or None: First divergence, None if the engines agreed throughout
+    """
+    if isinstance(reference, str):
+        reference = load_engine(reference)
+    generator = OperationGenerator(seed)
+    clocks = (SimulatedClock(), SimulatedClock())
+    sessions = ({}, {})
+    recent = []
+    with tempfile.TemporaryDirectory(prefix='harness-ref-') as ref_dir, \
+            tempfile.TemporaryDirectory(prefix='harness-cand-') as cand_dir:
+        expected_engine = reference(clocks[0], ref_dir)
+        actual_engine = candidate(clocks[1], cand_dir)
+        try:
+            for step in range(ops):
+                op, args, kwargs = generator.next_operation(expected_engine)
+                recent.append(f"{step}: {_format_call(op, args, kwargs)}")
+                del recent[:-trail]
+                expected = apply(expected_engine, clocks[0], op, args, kwargs, sessions[0])
+                actual = apply(actual_engine, clocks[1], op, [_copy_arg(arg) for arg in args], kwargs,
+                               sessions[1])
+                if expected != actual:
+                    return Mismatch(seed, step, op, expected, actual, recent)
+                if (step + 1) % check_every == 0 or step == ops - 1:
+                    expected, actual = engine_state(expected_engine), engine_state(actual_engine)
+                    if expected != actual:
+                        return Mismatch(seed, step, 'state', expected, actual, recent)
+        finally:
+            for session in sessions:
+                if 'snapshot' in session:
+                    session.pop('snapshot').release()
+            close_engine(expected_engine)
+            close_engine(actual_engine)
+    return None
+
+
+def run_differential_suite(candidate, seeds, ops, reference='reference'):
+    """
+    Run differential sequences for several seeds
+
+    Returns:
+        bool: True if every run agreed
+    """
+    factory = load_engine(candidate)
+    start = time.perf_counter()
+    for seed in seeds:
+        mismatch = run_differential(factory, seed, ops, reference)
+        if mismatch is not None:
+            mismatch.display()
+            print(f"   Replay: python -m src.harness diff --candidate {candidate} --seed {seed} --runs 1 "
+                  f"--ops {mismatch.step + 1}")
+            return False
+    print(f"✅ {candidate} matched {reference} on {len(seeds)} run(s) x {ops} operations "
+          f"({time.perf_counter() - start:.1f}s)")
+    return True
+
+
+# ==================== TIMING BUDGETS ====================
+
+def _budget_library(factory, directory, books, borrowers):
+    """Build the budget catalog in a candidate engine"""
+    rng = random.Random(3)
+    clock = SimulatedClock()
+    engine = factory(clock, directory)
+    for i in range(books):
+        title = " ".join(rng.choice(WORDS) for _ in range(3)).title()
+        engine.add_book(Book(f"{title} {i}", f"Author {i % 2000}", make_isbn13(i), rng.choice(GENRES), 3))
+    for i in range(borrowers):
+        engine.add_borrower(Borrower(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}",
+                                     f"member{i}@example.org", f"M{i:06d}"))
+    for i in range(borrowers):
+        engine.borrow_book(f"M{i:06d}", make_isbn13(rng.randrange(books)))
+    return engine
+
+
+def _hot_operations(engine, books, borrowers):
+    """Hot operations as name -> (argument maker taking an rng, operation)"""
+    def borrow_and_return(membership_id, isbn):
+        if engine.borrow_book(membership_id, isbn):
+            engine.return_book(membership_id, isbn)
+
+    isbn = lambda rng: (make_isbn13(rng.randrange(books)),)
+    member = lambda rng: (f"M{rng.randrange(borrowers):06d}",)
+    return {
+        'find_book_by_isbn': (isbn, engine.find_book_by_isbn),
+        'find_borrower_by_id': (member, engine.find_borrower_by_id),
+        'borrow_and_return': (lambda rng: member(rng) + isbn(rng), borrow_and_return),
+        'find_books_selective': (lambda rng: (f"{rng.choice(WORDS)} {rng.randrange(books)}",),
+                                 lambda title: engine.find_books(title=title)),
+        'find_borrowers_by_name': (lambda rng: (f"{rng.choice(FIRST_NAMES)[:3]} {rng.choice(LAST_NAMES)[:2]} "
+                                                f"{rng.randrange(borrowers)}",), engine.find_borrowers_by_name),
+        'suggest': (lambda rng: (rng.choice(WORDS)[:rng.randint(2, 4)],), engine.suggest),
+        'get_books_sorted': (lambda rng: (rng.choice(('title', 'author')), rng.randint(1, 50)),
+                             engine.get_books_sorted),
+        'next_available': (isbn, engine.next_available),
+    }
+
+
+def measure_operations(candidate, books=BUDGET_BOOKS, borrowers=BUDGET_BORROWERS, calls=200, rounds=5):
+    """
+    Time the hot operations of a candidate engine
+
+    Each operation is called `calls` times per round with random arguments
+    made before the clock starts; the best round is kept, which filters
+    out scheduler and GC noise.
+
+    Returns:
+        dict: Operation -> microseconds per call
+    """
+    factory = load_engine(candidate)
+    timings = {}
+    with tempfile.TemporaryDirectory(prefix='harness-budget-') as directory:
+        engine = _budget_library(factory, directory, books, borrowers)
+        try:
+            for name, (make_args, operation) in _hot_operations(engine, books, borrowers).items():
+                rng = random.Random(name)
+                best = float('inf')
+                for _ in range(rounds):
+                    arguments = [make_args(rng) for _ in range(calls)]
+                    start = time.perf_counter()
+                    for args in arguments:
+                        operation(*args)
+                    best = min(best, (time.perf_counter() - start) / calls)
+                timings[name] = best * 1e6
+        finally:
+            close_engine(engine)
+    return timings
+
+
+def budgets_for(candidate):
+    """Get the operation -> microseconds budgets of a candidate engine"""
+    return BUDGETS_US.get(candidate, BUDGETS_US[DEFAULT_BUDGET_ENGINE])
+
+
+def check_budgets(timings, budgets=None, baseline=None, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare timings with absolute budgets and, if given, a saved baseline
+
+    Args:
+        timings (dict): Operation -> microseconds per call
+        budgets (dict, optional): Operation -> budget in microseconds (defaults to
+            the indexed engine's budgets)
+        baseline (dict, optional): Operation -> microseconds from an earlier run
+        tolerance (float): Allowed ratio over the baseline
+
+    Returns:
+        list: (operation, measured, limit, reason) for every operation over its limit
+    """
+    budgets = budgets_for(DEFAULT_BUDGET_ENGINE) if budgets is None else budgets
+    failures = []
+    for name, measured in timings.items():
+        if name in budgets and measured > budgets[name]:
+            failures.append((name, measured, budgets[name], "budget"))
+        elif baseline and name in baseline and measured > baseline[name] * tolerance:
+            failures.append((name, measured, baseline[name] * tolerance, f"baseline x{tolerance}"))
+    return failures
+
+
+def display_budgets(candidate, timings, failures, books, borrowers, budgets):
+    """Print the timing table with the verdict per operation"""
+    failed = {name for name, *_ in failures}
+    print(f"\n⏱️  Hot operations: {candidate}, {books} books, {borrowers} borrowers")
+    print(f"{'Operation':<26}{'us/call':>12}{'Budget':>10}  Status")
+    print("-" * 60)
+    for name, measured in timings.items():
+        status = "❌ over" if name in failed else "✅"
+        print(f"{name:<26}{measured:>12.1f}{budgets.get(name, 0):>10}  {status}")
+    for name, measured, limit, reason in failures:
+        print(f"❌ {name}: {measured:.1f}us > {limit:.1f}us ({reason})")
+
+
+def run_budgets(candidate, books, borrowers, baseline_path=None, save_path=None, tolerance=DEFAULT_TOLERANCE):
+    """
+    Measure the hot operations and gate them on budgets
+
+    Returns:
+        bool: True if every operation is within its limits
+    """
+    timings = measure_operations(candidate, books, borrowers)
+    baseline = None
+    if baseline_path:
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+    budgets = budgets_for(candidate) if books <= BUDGET_BOOKS else {}  # Set for the default catalog
+    failures = check_budgets(timings, budgets, baseline, tolerance)
+    display_budgets(candidate, timings, failures, books, borrowers, budgets)
+    if save_path:
+        with open(save_path, 'w', encoding='utf-8') as f:
+            json.dump({name: round(value, 2) for name, value in timings.items()}, f, indent=2)
+        print(f"💾 Baseline saved to {save_path}")
+    return not failures
+
+
+def main(argv=None):
+    """Command-line entry point (exit status 1 when a check fails)"""
+    parser = argparse.ArgumentParser(prog='python -m src.harness',
+                                     description="Differential and timing-budget checks for Library engines")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, help_text in (('diff', "compare a candidate with the reference on random operations"),
+                            ('budgets', "time hot operations against their budgets"),
+                            ('check', "run both")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument('--candidate', default='indexed', help="engine name or module:factory")
+        if name != 'budgets':
+            sub.add_argument('--reference', default='reference')
+            sub.add_argument('--seed', type=int, default=1, help="first seed")
+            sub.add_argument('--runs', type=int, default=10, help="sequences, one per seed")
+            sub.add_argument('--ops', type=int, default=2000, help="operations per sequence")
+        if name != 'diff':
+            sub.add_argument('--books', type=int, default=BUDGET_BOOKS)
+            sub.add_argument('--borrowers', type=int, default=BUDGET_BORROWERS)
+            sub.add_argument('--baseline', help="JSON timings to compare against")
+            sub.add_argument('--save-baseline', help="write the measured timings as JSON")
+            sub.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    passed = True
+    if args.command in ('diff', 'check'):
+        seeds = range(args.seed, args.seed + args.runs)
+        passed = run_differential_suite(args.candidate, seeds, args.ops, args.reference)
+    if args.command in ('budgets', 'check') and passed:
+        passed = run_budgets(args.candidate, args.books, args.borrowers, args.baseline,
+                             args.save_baseline, args.tolerance)
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
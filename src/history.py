@@ -0,0 +1,239 @@
+"""
+Loan history archive for Library Management System
+Append-only, month-partitioned store of completed loans with per-member and per-title indexes
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+
+from .isbn import canonical_isbn, try_isbn_key
+
+
+INDEX_FILE = 'index.json'  # Whole-store index written by earlier versions, split on open
+DEFAULT_BUFFER_SIZE = 500
+
+
+class LoanHistoryStore:
+    """
+    Append-only archive of returned loans, partitioned by return month
+
+    Each partition is a JSON Lines file (optionally gzip-compressed) of
+    compact array records. Each partition also has its own index file
+    listing the membership IDs and ISBNs it holds, so a history query only
+    reads the partitions that hold its key. Writes are buffered per
+    partition; a flush appends the keys new to a partition to its index
+    (before the records, so a crash can only leave an index entry
+    pointing at nothing) and never rewrites other partitions' indexes.
+    Partition indexes are loaded when first needed: appending loads only
+    the partitions being written, queries load the rest.
+
+    Attributes:
+        directory (str): Directory holding partitions and the index
+        compress (bool): Gzip new partition data
+    """
+
+    # Position of each field inside a stored record
+    FIELDS = ('membership_id', 'isbn', 'title', 'author', 'borrow_date', 'due_date', 'return_date')
+
+    def __init__(self, directory, compress=False, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Initialize a LoanHistoryStore, loading its index if present
+
+        Args:
+            directory (str): Directory for partitions and index
+            compress (bool): Gzip partition files
+            buffer_size (int): Buffered records before an automatic flush
+        """
+        self.directory = directory
+        self.compress = compress
+        self.buffer_size = buffer_size
+        self._buffers = {}  # Partition key -> list of pending records
+        self._pending = 0
+        self._indexes = {}  # Partition key -> (membership IDs, ISBNs) it holds, once loaded
+        os.makedirs(directory, exist_ok=True)
+        self._split_legacy_index()
+
+    # ==================== PARTITIONS ====================
+
+    @staticmethod
+    def partition_key(when):
+        """Get the partition key (YYYY-MM) for a datetime"""
+        return when.strftime('%Y-%m')
+
+    @staticmethod
+    def _isbn(isbn):
+        """Normalize an ISBN to its canonical 13-digit spelling when valid"""
+        key = try_isbn_key(isbn)
+        return canonical_isbn(key) if key is not None else isbn
+
+    def _partition_path(self, key):
+        """Get the file path for a partition"""
+        suffix = '.jsonl.gz' if self.compress else '.jsonl'
+        return os.path.join(self.directory, f"loans-{key}{suffix}")
+
+    def _index_path(self, key):
+        """Get the file path for a partition's index"""
+        return os.path.join(self.directory, f"index-{key}.jsonl")
+
+    def partitions(self):
+        """
+        List partitions present on disk
+
+        Returns:
+            list: Sorted partition keys (YYYY-MM)
+        """
+        keys = set()
+        for name in os.listdir(self.directory):
+            if name.startswith('loans-'):
+                keys.add(name[len('loans-'):len('loans-') + 7])
+        return sorted(keys | set(self._buffers))
+
+    # ==================== WRITING ====================
+
+    def append(self, membership_id, book, borrow_date, due_date, return_date=None):
+        """
+        Archive one completed loan
+
+        Args:
+            membership_id (str): Borrower's membership ID
+            book (Book): Returned book
+            borrow_date (datetime): Loan start
+            due_date (datetime): Loan due date
+            return_date (datetime, optional): Return time (defaults to now)
+        """
+        if return_date is None:
+            return_date = datetime.now()
+
+        key = self.partition_key(return_date)
+        isbn = self._isbn(book.get_isbn())
+        record = [membership_id, isbn, book.get_title(), book.get_author(),
+                  int(borrow_date.timestamp()), int(due_date.timestamp()),
+                  int(return_date.timestamp())]
+
+        self._buffers.setdefault(key, []).append(record)
+        self._pending += 1
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered records to their partitions, appending new keys to their indexes
+        """
+        for key, records in self._buffers.items():
+            self._index_records(key, records)
+            data = "".join(json.dumps(record, separators=(',', ':')) + "\n" for record in records)
+            path = self._partition_path(key)
+            if self.compress:
+                with gzip.open(path, 'at', encoding='utf-8') as f:
+                    f.write(data)
+            else:
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(data)
+        self._buffers = {}
+        self._pending = 0
+
+    def close(self):
+        """Flush pending records"""
+        self.flush()
+
+    # ==================== INDEX ====================
+
+    def _partition_index(self, key):
+        """Get the (membership IDs, ISBNs) a partition holds on disk, loading its index once"""
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = (set(), set())
+            path = self._index_path(key)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        members, isbns = json.loads(line)
+                        index[0].update(members)
+                        index[1].update(isbns)
+        return index
+
+    def _index_records(self, key, records):
+        """Append the membership IDs and ISBNs of records that are new to a partition's index"""
+        members, isbns = self._partition_index(key)
+        new_members = sorted({record[0] for record in records} - members)
+        new_isbns = sorted({record[1] for record in records} - isbns)
+        if not new_members and not new_isbns:
+            return
+        with open(self._index_path(key), 'a', encoding='utf-8') as f:
+            f.write(json.dumps([new_members, new_isbns], separators=(',', ':')) + "\n")
+        members.update(new_members)
+        isbns.update(new_isbns)
+
+    def _split_legacy_index(self):
+        """Convert a whole-store index from earlier versions into partition indexes"""
+        path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            index = json.load(f)
+        split = {}
+        for position, field in enumerate(('members', 'isbns')):
+            for value, parts in index[field].items():
+                for key in parts:
+                    split.setdefault(key, ([], []))[position].append(value)
+        for key, (members, isbns) in split.items():
+            with open(self._index_path(key), 'a', encoding='utf-8') as f:
+                f.write(json.dumps([sorted(members), sorted(isbns)], separators=(',', ':')) + "\n")
+        os.remove(path)
+
+    # ==================== QUERIES ====================
+
+    def _read_partition(self, key):
+        """Yield raw records from one partition, including unflushed ones"""
+        for suffix, opener in (('.jsonl', open), ('.jsonl.gz', gzip.open)):
+            path = os.path.join(self.directory, f"loans-{key}{suffix}")
+            if os.path.exists(path):
+                with opener(path, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        yield json.loads(line)
+        yield from self._buffers.get(key, [])
+
+    def _query(self, position, value):
+        """Collect records whose field at position equals value, from the partitions that hold it"""
+        results = []
+        for key in self.partitions():
+            if value not in self._partition_index(key)[position] and not any(
+                    record[position] == value for record in self._buffers.get(key, ())):
+                continue
+            for record in self._read_partition(key):
+                if record[position] == value:
+                    results.append(self._to_dict(record))
+        return results
+
+    def _to_dict(self, record):
+        """Expand a compact record into a dict with datetimes"""
+        loan = dict(zip(self.FIELDS, record))
+        for field in ('borrow_date', 'due_date', 'return_date'):
+            loan[field] = datetime.fromtimestamp(loan[field])
+        return loan
+
+    def borrower_history(self, membership_id):
+        """
+        Get all archived loans of a borrower, oldest first
+
+        Args:
+            membership_id (str): Borrower's membership ID
+
+        Returns:
+            list: Loan dicts
+        """
+        return self._query(0, membership_id)
+
+    def title_history(self, isbn):
+        """
+        Get all archived loans of a title, oldest first
+
+        Args:
+            isbn (str): Book ISBN
+
+        Returns:
+            list: Loan dicts
+        """
+        return self._query(1, self._isbn(isbn))
@@ -0,0 +1,260 @@
+"""
+Ordered index structures for Library Management System
+Sorted containers used for sorted listings, pagination and range queries
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+
+class SortedIndex:
+    """
+    Sorted collection of comparable items (usually (key, id) tuples)
+
+    Items are kept in a list of sorted blocks of bounded size, B-tree style:
+    a binary search over block maxima finds the block, and inserts or
+    deletes only shift items inside that one block. This keeps insert and
+    delete at O(log n) search plus a small bounded shift. A Fenwick tree
+    over the block lengths finds the block holding a sorted position in
+    O(log blocks); it is updated in place as items come and go and rebuilt
+    lazily after a block is split or dropped.
+
+    Attributes:
+        load (int): Target block size
+    """
+
+    def __init__(self, items=(), load=512):
+        """
+        Initialize a SortedIndex
+
+        Args:
+            items (iterable): Initial items
+            load (int): Target block size
+        """
+        self.load = load
+        self._blocks = []
+        self._maxes = []
+        self._len = 0
+        self._tree = None  # Fenwick tree over block lengths (1-based), None until needed
+        items = sorted(items)
+        for start in range(0, len(items), load):
+            block = items[start:start + load]
+            self._blocks.append(block)
+            self._maxes.append(block[-1])
+        self._len = len(items)
+
+    def __len__(self):
+        """Number of items in the index"""
+        return self._len
+
+    def __iter__(self):
+        """Iterate over items in sorted order"""
+        for block in self._blocks:
+            yield from block
+
+    def insert(self, item):
+        """
+        Insert an item
+
+        Args:
+            item: Comparable item
+        """
+        if not self._blocks:
+            self._blocks.append([item])
+            self._maxes.append(item)
+            self._len = 1
+            self._tree = None
+            return
+
+        pos = bisect_left(self._maxes, item)
+        if pos == len(self._maxes):
+            pos -= 1
+            self._blocks[pos].append(item)
+            self._maxes[pos] = item
+        else:
+            insort(self._blocks[pos], item)
+        self._len += 1
+        self._add_to_tree(pos, 1)
+
+        block = self._blocks[pos]
+        if len(block) > 2 * self.load:
+            half = block[self.load:]
+            del block[self.load:]
+            self._maxes[pos] = block[-1]
+            self._blocks.insert(pos + 1, half)
+            self._maxes.insert(pos + 1, half[-1])
+            self._tree = None
+
+    def remove(self, item):
+        """
+        Remove an item
+
+        Args:
+            item: Item to remove
+
+        Raises:
+            ValueError: If the item is not in the index
+        """
+        pos = bisect_left(self._maxes, item)
+        if pos == len(self._maxes):
+            raise ValueError(f"{item!r} not in index")
+
+        block = self._blocks[pos]
+        i = bisect_left(block, item)
+        if i == len(block) or block[i] != item:
+            raise ValueError(f"{item!r} not in index")
+
+        del block[i]
+        self._len -= 1
+        if block:
+            self._maxes[pos] = block[-1]
+            self._add_to_tree(pos, -1)
+        else:
+            del self._blocks[pos]
+            del self._maxes[pos]
+            self._tree = None
+
+    def discard(self, item):
+        """Remove an item if present"""
+        try:
+            self.remove(item)
+        except ValueError:
+            pass
+
+    def _add_to_tree(self, pos, change):
+        """Apply a change in one block's length to the Fenwick tree, if built"""
+        tree = self._tree
+        if tree is None:
+            return
+        i = pos + 1
+        while i < len(tree):
+            tree[i] += change
+            i += i & -i
+
+    def _build_tree(self):
+        """Build the Fenwick tree over the current block lengths in O(blocks)"""
+        tree = [0] + [len(block) for block in self._blocks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+        return tree
+
+    def _prefix_length(self, pos):
+        """Number of items in the blocks before block pos"""
+        tree = self._tree if self._tree is not None else self._build_tree()
+        total = 0
+        while pos:
+            total += tree[pos]
+            pos -= pos & -pos
+        return total
+
+    def _locate(self, index):
+        """
+        Find the block holding a sorted position
+
+        Args:
+            index (int): Position, 0 <= index < len(self)
+
+        Returns:
+            tuple: (block pos, offset inside the block)
+        """
+        tree = self._tree if self._tree is not None else self._build_tree()
+        pos = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            if pos + step < len(tree) and tree[pos + step] <= index:
+                pos += step
+                index -= tree[pos]
+            step >>= 1
+        return pos, index
+
+    def slice(self, start, count):
+        """
+        Get items by sorted position (for pagination)
+
+        The first block is found through the Fenwick tree, so only the
+        blocks holding the returned items are visited.
+
+        Args:
+            start (int): Position of the first item
+            count (int): Maximum number of items
+
+        Returns:
+            list: Up to count items starting at position start
+        """
+        if start >= self._len or count <= 0:
+            return []
+        pos, offset = self._locate(start)
+        results = []
+        for block_pos in range(pos, len(self._blocks)):
+            results.extend(self._blocks[block_pos][offset:offset + count - len(results)])
+            offset = 0
+            if len(results) >= count:
+                break
+        return results
+
+    def irange(self, low, high):
+        """
+        Iterate over items with low <= item <= high, in sorted order
+
+        Args:
+            low: Lower bound (inclusive)
+            high: Upper bound (inclusive)
+
+        Yields:
+            Items in the range
+        """
+        pos = bisect_left(self._maxes, low)
+        for block_pos in range(pos, len(self._blocks)):
+            block = self._blocks[block_pos]
+            start = bisect_left(block, low) if block_pos == pos else 0
+            end = bisect_right(block, high)
+            yield from block[start:end]
+            if end < len(block):
+                return
+
+    def count(self, low, high):
+        """
+        Count items with low <= item <= high without visiting them
+
+        Only the two boundary blocks are searched; the blocks in between
+        contribute their lengths through the Fenwick tree, so the cost is
+        O(log n).
+
+        Args:
+            low: Lower bound (inclusive)
+            high: Upper bound (inclusive)
+
+        Returns:
+            int: Number of items in the range
+        """
+        first = bisect_left(self._maxes, low)
+        if first == len(self._blocks):
+            return 0
+        last = min(bisect_right(self._maxes, high), len(self._blocks) - 1)
+        if last < first:
+            return 0
+        start = bisect_left(self._blocks[first], low)
+        end = bisect_right(self._blocks[last], high)
+        if first == last:
+            return max(0, end - start)
+        return self._prefix_length(last) - self._prefix_length(first) - start + end
+
+
+# Upper bound that sorts after any real text with the same prefix
+PREFIX_END = "\U0010ffff"
+
+
+def prefix_range(start, end):
+    """
+    Build (low, high) bounds for a key range whose end is an inclusive prefix
+
+    Args:
+        start (str): First key prefix (e.g. "m")
+        end (str): Last key prefix (e.g. "n" includes every key starting with "n")
+
+    Returns:
+        tuple: (low, high) bounds for (key, id) items
+    """
+    return (start,), (end + PREFIX_END,)
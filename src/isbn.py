@@ -0,0 +1,141 @@
+"""
+ISBN utilities for Library Management System
+Normalization, checksum validation and canonical integer keys for ISBN-10/13
+"""
+
+ISBN_SEPARATORS = " -"
+
+
+def clean_isbn(text):
+    """
+    Strip separators from an ISBN and upper-case a trailing 'x'
+
+    Args:
+        text (str): ISBN as typed (e.g. "978-0-13-110362-7")
+
+    Returns:
+        str: Bare ISBN characters (e.g. "9780131103627")
+    """
+    return "".join(ch for ch in str(text).strip() if ch not in ISBN_SEPARATORS).upper()
+
+
+def is_valid_isbn10(digits):
+    """
+    Check an ISBN-10 checksum
+
+    Args:
+        digits (str): 10 bare characters, the last may be 'X'
+
+    Returns:
+        bool: True if the checksum is valid
+    """
+    if len(digits) != 10 or not digits[:9].isdigit():
+        return False
+    if not (digits[9].isdigit() or digits[9] == 'X'):
+        return False
+    total = sum((10 - i) * int(ch) for i, ch in enumerate(digits[:9]))
+    total += 10 if digits[9] == 'X' else int(digits[9])
+    return total % 11 == 0
+
+
+def isbn13_check_digit(first12):
+    """
+    Compute the ISBN-13 check digit
+
+    Args:
+        first12 (str): First 12 digits
+
+    Returns:
+        int: Check digit (0-9)
+    """
+    total = sum(int(ch) * (3 if i % 2 else 1) for i, ch in enumerate(first12))
+    return (10 - total % 10) % 10
+
+
+def is_valid_isbn13(digits):
+    """
+    Check an ISBN-13 checksum
+
+    Args:
+        digits (str): 13 bare digits
+
+    Returns:
+        bool: True if the checksum is valid
+    """
+    if len(digits) != 13 or not digits.isdigit():
+        return False
+    return isbn13_check_digit(digits[:12]) == int(digits[12])
+
+
+def isbn_key(text):
+    """
+    Convert an ISBN-10 or ISBN-13 to its canonical integer key
+
+    ISBN-10s are converted to their 978-prefixed ISBN-13 form, so both
+    spellings of the same book get the same key. The key is the ISBN-13
+    read as a number and always fits in 64 bits.
+
+    Args:
+        text (str): ISBN in any common spelling
+
+    Returns:
+        int: Canonical key
+
+    Raises:
+        ValueError: If the ISBN is malformed or its checksum is wrong
+    """
+    digits = clean_isbn(text)
+    if len(digits) == 10:
+        if not is_valid_isbn10(digits):
+            raise ValueError(f"Invalid ISBN-10 checksum: {text}")
+        first12 = "978" + digits[:9]
+        return int(first12 + str(isbn13_check_digit(first12)))
+    if len(digits) == 13:
+        if not is_valid_isbn13(digits):
+            raise ValueError(f"Invalid ISBN-13 checksum: {text}")
+        return int(digits)
+    raise ValueError(f"ISBN must have 10 or 13 digits: {text}")
+
+
+def try_isbn_key(text):
+    """
+    Convert an ISBN to its canonical key, or None if it is invalid
+
+    Args:
+        text (str): ISBN in any common spelling
+
+    Returns:
+        int or None: Canonical key
+    """
+    try:
+        return isbn_key(text)
+    except ValueError:
+        return None
+
+
+def canonical_isbn(key):
+    """
+    Format a canonical key as a bare 13-digit ISBN string
+
+    Args:
+        key (int): Canonical key
+
+    Returns:
+        str: 13-digit ISBN
+    """
+    return f"{key:013d}"
+
+
+def make_isbn13(number, prefix="978"):
+    """
+    Build a valid ISBN-13 from a serial number (useful for sample data)
+
+    Args:
+        number (int): Serial number (at most 9 digits)
+        prefix (str): 3-digit GS1 prefix
+
+    Returns:
+        str: Valid 13-digit ISBN
+    """
+    first12 = f"{prefix}{number:09d}"
+    return first12 + str(isbn13_check_digit(first12))
@@ -3,6 +3,72 @@ Library class for Library Management System
 Core class that manages books, borrowers, and their operations
 """
 
+import heapq
+import sys
+from collections import Counter
+
+from . import changelog as cdc
+from .autocomplete import PrefixIndex, tokenize
+from .borrower import is_contact_query, normalize_contact
+from .copies import AVAILABLE, DEFAULT_BRANCH, ON_LOAN, STATE_CODES, STATE_NAMES, parse_barcode
+from .encoding import AUTHORS, GENRES
+from .indexes import PREFIX_END, SortedIndex, prefix_range
+from .isbn import try_isbn_key
+from .search_index import document_fingerprint
+from .snapshot import VersionManager
+
+LOAN_PERIOD_DAYS = 14  # Default borrowing period
+BOOK_SORT_FIELDS = ('title', 'author', 'genre')  # Fields with an ordered index
+SUGGEST_FIELDS = ('title', 'author')  # Fields with prefix autocomplete
+CHECKPOINT_INTERVAL = 1000  # Change events between automatic time-travel checkpoints
+ROW_CHUNK_SIZE = 2000  # Listing rows joined per stdout write
+INDEX_SCAN_RATIO = 10  # Scan instead of using the search index above 1 candidate per this many books
+FACET_TOP = 10  # Genre and author facet values returned by default
+
+# Single-field search messages: (results found, no results), formatted with the query
+SEARCH_MESSAGES = {
+    'title': ("matching title '{query}'", "with title containing '{query}'"),
+    'author': ("by author matching '{query}'", "by author matching '{query}'"),
+    'genre': ("in genre matching '{query}'", "in genre matching '{query}'"),
+}
+
+# Buckets of copies on the shelf for the quantity facet: (lowest quantity, label)
+QUANTITY_FACETS = ((0, "0"), (1, "1"), (2, "2"), (3, "3-5"), (6, "6-10"), (11, "11+"))
+QUANTITY_FACET_OF = [max(i for i, (low, _) in enumerate(QUANTITY_FACETS) if low <= quantity)
+                     for quantity in range(QUANTITY_FACETS[-1][0] + 1)]  # Quantity (capped) -> bucket
+
+
+def write_rows(items, start=1, chunk_size=ROW_CHUNK_SIZE, note=None, render=str):
+    """
+    Write numbered listing rows to stdout in large chunks
+    
+    Rows are joined and written chunk_size at a time instead of one print()
+    per row, which dominates the cost of long listings.
+    
+    Args:
+        items (iterable): Books, borrowers or views (rendered with str())
+        start (int): Number of the first row
+        chunk_size (int): Rows per write
+        note (callable, optional): Returns an extra line shown under an item, or None
+        render (callable): Renders an item's row
+    """
+    write = sys.stdout.write
+    chunk = []
+    for i, item in enumerate(items, start):
+        chunk.append(f"{i}. {render(item)}")
+        if note is not None:
+            extra = note(item)
+            if extra:
+                chunk.append(f"   {extra}")
+        if len(chunk) >= chunk_size:
+            chunk.append("")
+            write("\n".join(chunk))
+            chunk = []
+    if chunk:
+        chunk.append("")
+        write("\n".join(chunk))
+
+
 class Library:
     """
     Library class to manage books and borrowers with CRUD operations
@@ -10,14 +76,328 @@ class Library:
     Attributes:
         books (list): List of Book objects
         borrowers (list): List of Borrower objects
+        verbose (bool): Print status messages for operations
+        last_message (str or None): Most recent status message (kept even in quiet mode)
+        changelog (ChangeLog or None): Change stream every mutation is published to
+        history (LoanHistoryStore or None): Archive that returned loans are written to
+        analytics (CirculationAnalytics or None): Circulation counters fed by borrows/returns
+        versions (VersionManager): Version bookkeeping behind snapshot()
+        inventory (SharedInventory or None): Cross-process available-copy counters
+        search_index (SearchIndex or None): Persistent title/author/genre index used by find_books
+        key_filters (KeyFilters or None): Bloom/cuckoo filters over ISBN keys and membership IDs
+        checkpoints (CheckpointStore or None): Periodic state checkpoints behind as_of()
+        checkpoint_interval (int): Change events between automatic checkpoints
+        clock (callable): Returns the current time (loan dates, overdue checks)
     """
     
-    def __init__(self):
+    def __init__(self, verbose=True, clock=None):
         """
         Initialize a Library object with empty lists for books and borrowers
+        
+        Args:
+            verbose (bool): Print status messages; pass False when the library
+                is driven programmatically (federation shards, batch mode)
+            clock (callable, optional): Returns the current time as a datetime
+                (defaults to datetime.now; tests and simulations inject their own)
         """
+        from datetime import datetime
+        
         self.books = []
         self.borrowers = []
+        self.verbose = verbose
+        self.last_message = None
+        self.changelog = None
+        self.history = None
+        self.analytics = None
+        self.versions = VersionManager()
+        self.inventory = None
+        self.search_index = None
+        self.key_filters = None
+        self.checkpoints = None
+        self.checkpoint_interval = CHECKPOINT_INTERVAL
+        self.clock = clock or datetime.now
+        
+        # Lookup maps and ordered indexes, kept in sync by every mutation
+        self._books_by_key = {}
+        self._catalog_positions = {}  # ISBN key -> sequence number of its add, for catalog order
+        self._next_position = 0
+        self._borrowers_by_id = {}
+        self._sorted_books = {field: SortedIndex() for field in BOOK_SORT_FIELDS}
+        self._sorted_borrowers = SortedIndex()
+        self._borrower_tokens = SortedIndex()  # (name token, membership ID)
+        self._borrowers_by_contact = {}        # normalized contact -> set of membership IDs
+        self._suggesters = {field: PrefixIndex() for field in SUGGEST_FIELDS}
+        self._borrow_counts = {}  # ISBN key -> number of loans, for suggestion ranking
+        self._author_borrow_counts = {}  # Lowercase author -> number of loans, for suggestion ranking
+        self._due_dates = {}      # ISBN key -> SortedIndex of (due date, membership ID, barcode)
+    
+    def _print(self, message):
+        """Print a status message unless the library is in quiet mode"""
+        self.last_message = message
+        if self.verbose:
+            print(message)
+    
+    def _print_rows(self, items, note=None):
+        """Write numbered listing rows unless the library is in quiet mode"""
+        if self.verbose:
+            write_rows(items, note=note)
+    
+    def _print_book_rows(self, books):
+        """Write numbered book rows with their shelf copies and when unavailable ones are due back"""
+        if self.verbose:
+            write_rows(books, note=self._availability_note, render=self._book_row)
+    
+    def attach_changelog(self, changelog):
+        """
+        Publish every subsequent mutation to a change stream
+        
+        Args:
+            changelog (ChangeLog): Change stream to append events to
+        """
+        self.changelog = changelog
+    
+    def attach_history(self, history):
+        """
+        Archive every subsequently returned loan
+        
+        Args:
+            history (LoanHistoryStore): Loan history archive
+        """
+        self.history = history
+    
+    def attach_analytics(self, analytics):
+        """
+        Feed every subsequent borrow and return into circulation analytics
+        
+        Args:
+            analytics (CirculationAnalytics): Analytics to update
+        """
+        self.analytics = analytics
+    
+    def attach_inventory(self, inventory):
+        """
+        Take availability of shared titles from counters shared with other processes
+        
+        Every desk process holds its own Library with the same catalog; a
+        copy of a shared title is only lent once the shared counter has been
+        atomically decremented, so desks can never lend more copies than
+        exist between them. Every stock change (copies added, copy states,
+        quantity updates, removal) is applied to the shared counter too,
+        and listings show the shared count. Barcodes stay per-desk.
+        
+        Args:
+            inventory (SharedInventory): Shared counters, attached in this process
+        """
+        self.inventory = inventory
+    
+    def _shelf_count(self, book):
+        """Get a book's copies on the shelf: the shared counter for shared titles, else this desk's"""
+        if self.inventory is not None:
+            shared = self.inventory.available(book.get_isbn_key())
+            if shared is not None:
+                return shared
+        return book.get_quantity()
+    
+    def _book_row(self, book):
+        """Render a book's listing row with its shelf copies (shared when an inventory is attached)"""
+        if self.inventory is None:
+            return str(book)
+        return book._render(self._shelf_count(book))
+    
+    def _share_stock_change(self, book, before):
+        """Apply the change in a book's copies on the shelf since `before` to its shared counter"""
+        if self.inventory is not None and book.get_isbn_key() in self.inventory.slots:
+            change = book.copies.available_count() - before
+            if change:
+                self.inventory.adjust_available(book.get_isbn_key(), change)
+    
+    def attach_search_index(self, index, sync=True):
+        """
+        Answer title, author and genre searches from a persistent search index
+        
+        The index stays on disk between runs, so attaching it doesn't
+        re-tokenize the catalog: with sync, only books whose fields differ
+        from the indexed fingerprint (or are missing) are indexed, and
+        indexed books no longer in the catalog are removed. Every later
+        add, update and remove is applied to the index.
+        
+        Args:
+            index (SearchIndex): Opened index
+            sync (bool): Reconcile the index with the current catalog
+            
+        Returns:
+            tuple: (books indexed, books removed from the index)
+        """
+        indexed, removed = 0, 0
+        if sync:
+            stale = index.fingerprints()
+            for book in self.books:
+                key = book.get_isbn_key()
+                fields = (book.get_title(), book.get_author(), book.get_genre())
+                if stale.pop(key, None) != document_fingerprint(*fields):
+                    index.add(key, *fields)
+                    indexed += 1
+            for key in stale:
+                index.remove(key)
+                removed += 1
+        self.search_index = index
+        return indexed, removed
+    
+    def attach_key_filters(self, filters):
+        """
+        Maintain approximate-membership filters over ISBN keys and membership IDs
+        
+        The filters are built from the current catalog and members and kept
+        in step by every add and remove. They let a caller whose lookups are
+        expensive (a remote shard, a store on disk) skip lookups of keys
+        this library certainly doesn't hold; see might_have_book and
+        might_have_borrower.
+        
+        Args:
+            filters (KeyFilters): Filters to fill and maintain
+        """
+        filters.rebuild('isbn', self._books_by_key)
+        filters.rebuild('member', self._borrowers_by_id)
+        self.key_filters = filters
+    
+    def might_have_book(self, isbn):
+        """
+        Check the ISBN filter before looking a book up
+        
+        Args:
+            isbn (str): ISBN in any spelling
+            
+        Returns:
+            bool: False if the library certainly has no such book (always
+                True without filters)
+        """
+        key = try_isbn_key(isbn)
+        if key is None:
+            return False
+        return self.key_filters is None or self.key_filters.might_contain('isbn', key)
+    
+    def might_have_borrower(self, membership_id):
+        """
+        Check the membership ID filter before looking a borrower up
+        
+        Args:
+            membership_id (str): Membership ID
+            
+        Returns:
+            bool: False if the library certainly has no such borrower
+                (always True without filters)
+        """
+        return self.key_filters is None or self.key_filters.might_contain('member', membership_id)
+    
+    def _update_search_index(self, book):
+        """Index the current title, author and genre of a book if a search index is attached"""
+        if self.search_index is not None:
+            self.search_index.add(book.get_isbn_key(), book.get_title(), book.get_author(), book.get_genre())
+    
+    def attach_checkpoints(self, store, interval=CHECKPOINT_INTERVAL):
+        """
+        Checkpoint the state every few change events, so past states can be queried
+        
+        Requires a change stream: the stream is the event log and the
+        checkpoints bound how much of it as_of() replays. A checkpoint of
+        the current state is taken right away.
+        
+        Args:
+            store (CheckpointStore): Store checkpoints are saved to
+            interval (int): Change events between checkpoints
+            
+        Raises:
+            ValueError: If no change stream is attached
+        """
+        if self.changelog is None:
+            raise ValueError("Checkpoints need a change stream (attach_changelog first)")
+        self.checkpoints = store
+        self.checkpoint_interval = interval
+        cdc.take_checkpoint(self, store, self.changelog)
+    
+    def _emit(self, op, data):
+        """Publish a change event if a change stream is attached (checkpointing when due)"""
+        if self.changelog is not None:
+            event = self.changelog.append(op, data, self.clock().timestamp())
+            if self.checkpoints is not None and \
+                    event.seq - (self.checkpoints.last_seq or 0) >= self.checkpoint_interval:
+                cdc.take_checkpoint(self, self.checkpoints, self.changelog)
+    
+    def as_of(self, when):
+        """
+        Get the library as it was at a past time (for audits)
+        
+        The nearest checkpoint at or before the time is loaded and the
+        change events after it are replayed up to the time, so the cost
+        grows with the gap since that checkpoint, not with the history.
+        
+        Args:
+            when (datetime or float): Point in time (datetime, or Unix time)
+            
+        Returns:
+            Library: New quiet Library holding the state at that time
+            (read-only by convention; it has no change stream)
+            
+        Raises:
+            ValueError: If checkpoints aren't attached or the time is before the first one
+        """
+        if self.checkpoints is None:
+            raise ValueError("Time travel needs checkpoints (attach_checkpoints first)")
+        return cdc.state_as_of(self.changelog, self.checkpoints, when)
+    
+    # ==================== INDEX MAINTENANCE ====================
+    
+    @staticmethod
+    def _book_sort_key(book, field):
+        """Get the normalized ordered-index key of a book for a field"""
+        if field == 'title':
+            return book.get_title().lower()
+        if field == 'author':
+            return AUTHORS.lowered[book.author_code]
+        return GENRES.lowered[book.genre_code]
+    
+    def _index_book(self, book):
+        """Add a book to the lookup map and ordered indexes (keyed by canonical ISBN)"""
+        key = book.get_isbn_key()
+        self._books_by_key[key] = book
+        for field, index in self._sorted_books.items():
+            index.insert((self._book_sort_key(book, field), key))
+        self._suggesters['title'].add(key, book.get_title(), self._borrow_counts.get(key, 0))
+        author = AUTHORS.lowered[book.author_code]
+        self._suggesters['author'].add(author, book.get_author(), self._author_borrow_counts.get(author, 0))
+    
+    def _unindex_book(self, book):
+        """Remove a book from the lookup map and ordered indexes"""
+        key = book.get_isbn_key()
+        self._books_by_key.pop(key, None)
+        for field, index in self._sorted_books.items():
+            index.discard((self._book_sort_key(book, field), key))
+        self._suggesters['title'].remove(key)
+        self._suggesters['author'].remove(AUTHORS.lowered[book.author_code])
+    
+    def _index_borrower(self, borrower):
+        """Add a borrower to the lookup map, name indexes and contact index"""
+        membership_id = borrower.get_membership_id()
+        self._borrowers_by_id[membership_id] = borrower
+        self._sorted_borrowers.insert((borrower.get_name().lower(), membership_id))
+        for token in set(tokenize(borrower.get_name())):
+            self._borrower_tokens.insert((token, membership_id))
+        contact = normalize_contact(borrower.get_contact())
+        self._borrowers_by_contact.setdefault(contact, set()).add(membership_id)
+    
+    def _unindex_borrower(self, borrower):
+        """Remove a borrower from the lookup map, name indexes and contact index"""
+        membership_id = borrower.get_membership_id()
+        self._borrowers_by_id.pop(membership_id, None)
+        self._sorted_borrowers.discard((borrower.get_name().lower(), membership_id))
+        for token in set(tokenize(borrower.get_name())):
+            self._borrower_tokens.discard((token, membership_id))
+        contact = normalize_contact(borrower.get_contact())
+        members = self._borrowers_by_contact.get(contact)
+        if members is not None:
+            members.discard(membership_id)
+            if not members:
+                del self._borrowers_by_contact[contact]
     
     # ==================== BOOK MANAGEMENT ====================
     
@@ -29,16 +409,28 @@ class Library:
             book (Book): Book object to add
             
         Returns:
-            bool: True if added successfully, False if ISBN already exists
+            bool: True if added successfully, False if ISBN is invalid or already exists
         """
-        # Check if book with same ISBN already exists
-        for existing_book in self.books:
-            if existing_book.get_isbn() == book.get_isbn():
-                print(f"Error: Book with ISBN {book.get_isbn()} already exists!")
-                return False
+        # Reject malformed ISBNs and bad checksums
+        if book.get_isbn_key() is None:
+            self._print(f"❌ Error: '{book.get_isbn()}' is not a valid ISBN-10 or ISBN-13!")
+            return False
+        
+        # Check if book with same ISBN already exists (in any spelling)
+        if book.get_isbn_key() in self._books_by_key:
+            self._print(f"Error: Book with ISBN {book.get_isbn()} already exists!")
+            return False
         
-        self.books.append(book)
-        print(f"✅ Book '{book.get_title()}' added successfully!")
+        with self.versions.adding(book):
+            self.books.append(book)
+        self._catalog_positions[book.get_isbn_key()] = self._next_position
+        self._next_position += 1
+        self._index_book(book)
+        if self.key_filters is not None:
+            self.key_filters.add('isbn', book.get_isbn_key(), self._books_by_key)
+        self._update_search_index(book)
+        self._emit(cdc.BOOK_ADDED, cdc.book_data(book))
+        self._print(f"✅ Book '{book.get_title()}' added successfully!")
         return True
     
     def remove_book(self, isbn):
@@ -51,13 +443,24 @@ class Library:
         Returns:
             bool: True if removed successfully, False if not found
         """
-        for i, book in enumerate(self.books):
-            if book.get_isbn() == isbn:
-                removed_book = self.books.pop(i)
-                print(f"✅ Book '{removed_book.get_title()}' removed successfully!")
-                return True
-        
-        print(f"❌ Error: Book with ISBN {isbn} not found!")
+        removed_book = self.find_book_by_isbn(isbn)
+        if removed_book:
+            position = self.books.index(removed_book)
+            with self.versions.removing(removed_book, position):
+                del self.books[position]
+            self._catalog_positions.pop(removed_book.get_isbn_key(), None)
+            self._unindex_book(removed_book)
+            if self.inventory is not None and removed_book.get_isbn_key() in self.inventory.slots:
+                self.inventory.set_available(removed_book.get_isbn_key(), 0)
+            if self.key_filters is not None:
+                self.key_filters.remove('isbn', removed_book.get_isbn_key(), self._books_by_key)
+            if self.search_index is not None:
+                self.search_index.remove(removed_book.get_isbn_key())
+            self._emit(cdc.BOOK_REMOVED, {'isbn': isbn})
+            self._print(f"✅ Book '{removed_book.get_title()}' removed successfully!")
+            return True
+        
+        self._print(f"❌ Error: Book with ISBN {isbn} not found!")
         return False
     
     def update_book(self, isbn, title=None, author=None, genre=None, quantity=None):
@@ -72,28 +475,42 @@ class Library:
             quantity (int, optional): New quantity
             
         Returns:
-            bool: True if updated successfully, False if not found
+            bool: True if updated successfully, False if not found or the quantity is negative
         """
-        for book in self.books:
-            if book.get_isbn() == isbn:
+        if quantity is not None and quantity < 0:
+            self._print("❌ Error: Quantity cannot be negative.")
+            return False
+        book = self.find_book_by_isbn(isbn)
+        if book:
+            before = book.copies.available_count()
+            self._unindex_book(book)
+            with self.versions.changing(book):
                 if title:
                     book.update_details(title=title)
                 if author:
                     book.update_details(author=author)
                 if genre:
                     book.update_details(genre=genre)
-                if quantity is not None:
-                    book.update_quantity(quantity)
-                
-                print(f"✅ Book with ISBN {isbn} updated successfully!")
-                return True
+                quantity_changed = quantity is not None and book.update_quantity(quantity)
+            self._index_book(book)
+            self._share_stock_change(book, before)
+            if title or author or genre:
+                self._update_search_index(book)
+            if quantity_changed:
+                self._emit(cdc.QUANTITY_CHANGED, {'isbn': isbn, 'quantity': quantity})
+            if title or author or genre:
+                self._emit(cdc.BOOK_UPDATED, {'isbn': isbn, 'title': title,
+                                              'author': author, 'genre': genre})
+            
+            self._print(f"✅ Book with ISBN {isbn} updated successfully!")
+            return True
         
-        print(f"❌ Error: Book with ISBN {isbn} not found!")
+        self._print(f"❌ Error: Book with ISBN {isbn} not found!")
         return False
     
     def find_book_by_isbn(self, isbn):
         """
-        Find a book by ISBN
+        Find a book by ISBN (any ISBN-10/13 spelling of the same book matches)
         
         Args:
             isbn (str): ISBN to search for
@@ -101,24 +518,123 @@ class Library:
         Returns:
             Book or None: Book object if found, None otherwise
         """
-        for book in self.books:
-            if book.get_isbn() == isbn:
-                return book
-        return None
+        return self._books_by_key.get(try_isbn_key(isbn))
+    
+    def find_book_by_barcode(self, barcode):
+        """
+        Find the book a copy barcode belongs to
+        
+        Args:
+            barcode (str): Copy barcode
+            
+        Returns:
+            Book or None: Book object if the barcode names one of its copies, None otherwise
+        """
+        prefix, _ = parse_barcode(barcode)
+        book = self.find_book_by_isbn(prefix) if prefix else None
+        if book is None or book.copies.index_of(barcode) is None:
+            return None
+        return book
+    
+    def add_copies(self, isbn, count, branch=DEFAULT_BRANCH):
+        """
+        Add physical copies of a book at a branch
+        
+        Args:
+            isbn (str): ISBN of the book
+            count (int): Number of copies to add
+            branch (str): Branch holding the new copies
+            
+        Returns:
+            list: Barcodes of the new copies (empty if the book was not found)
+        """
+        book = self.find_book_by_isbn(isbn)
+        if not book:
+            self._print(f"❌ Error: Book with ISBN {isbn} not found!")
+            return []
+        if count <= 0:
+            self._print("❌ Error: Number of copies must be positive!")
+            return []
+        
+        before = book.copies.available_count()
+        with self.versions.changing(book):
+            barcodes = book.add_copies(count, branch)
+        self._share_stock_change(book, before)
+        self._emit(cdc.COPIES_ADDED, {'isbn': book.get_isbn(), 'count': count, 'branch': branch})
+        self._print(f"✅ Added {count} copy(ies) of '{book.get_title()}' at {branch}!")
+        return barcodes
+    
+    def set_copy_state(self, barcode, state):
+        """
+        Mark a copy as available, damaged, lost or withdrawn
+        
+        Copies on loan change state only through borrowing and returning.
+        
+        Args:
+            barcode (str): Copy barcode
+            state (str): 'available', 'damaged', 'lost' or 'withdrawn'
+            
+        Returns:
+            bool: True if updated successfully, False otherwise
+        """
+        book = self.find_book_by_barcode(barcode)
+        if not book:
+            self._print(f"❌ Error: No copy with barcode {barcode} found!")
+            return False
+        if state not in STATE_CODES or state == STATE_NAMES[ON_LOAN]:
+            self._print(f"❌ Error: Invalid copy state '{state}'!")
+            return False
+        
+        index = book.copies.index_of(barcode)
+        if book.copies.state(index) == ON_LOAN:
+            self._print(f"❌ Error: Copy {barcode} is on loan; return it first!")
+            return False
+        
+        before = book.copies.available_count()
+        with self.versions.changing(book):
+            book.copies.set_state(index, STATE_CODES[state])
+        self._share_stock_change(book, before)
+        self._emit(cdc.COPY_STATE_CHANGED, {'isbn': book.get_isbn(), 'barcode': barcode, 'state': state})
+        self._print(f"✅ Copy {barcode} marked as {state}!")
+        return True
+    
+    def display_copies(self, isbn):
+        """
+        Display every copy of a book with its state and branch
+        
+        Args:
+            isbn (str): ISBN of the book
+        """
+        book = self.find_book_by_isbn(isbn)
+        if not book:
+            print(f"❌ Error: Book with ISBN {isbn} not found!")
+            return
+        
+        copies = book.copies
+        counts = copies.counts_by_state()
+        print("\n" + "=" * 80)
+        print(f"📚 COPIES - {book.get_title()} (ISBN: {book.get_isbn()})")
+        print("=" * 80)
+        print(" | ".join(f"{name.replace('_', ' ').title()}: {count}" for name, count in counts.items()))
+        print()
+        for index in range(len(copies)):
+            print(f"{copies.barcode(index)}  {STATE_NAMES[copies.state(index)]:<10} {copies.branch(index)}")
+        print("=" * 80 + "\n")
     
     def display_all_books(self):
         """
         Display all books in the library with their availability status
         """
-        if not self.books:
+        with self.snapshot() as view:
+            books = view.books
+        if not books:
             print("📚 No books in the library yet.")
             return
         
         print("\n" + "=" * 80)
         print("📚 ALL BOOKS IN LIBRARY")
         print("=" * 80)
-        for i, book in enumerate(self.books, 1):
-            print(f"{i}. {book}")
+        write_rows(books, render=self._book_row)
         print("=" * 80 + "\n")
     
     def get_total_books(self):
@@ -152,13 +668,17 @@ class Library:
             bool: True if added successfully, False if membership ID already exists
         """
         # Check if borrower with same membership ID already exists
-        for existing_borrower in self.borrowers:
-            if existing_borrower.get_membership_id() == borrower.get_membership_id():
-                print(f"Error: Borrower with ID {borrower.get_membership_id()} already exists!")
-                return False
+        if borrower.get_membership_id() in self._borrowers_by_id:
+            self._print(f"Error: Borrower with ID {borrower.get_membership_id()} already exists!")
+            return False
         
-        self.borrowers.append(borrower)
-        print(f"✅ Borrower '{borrower.get_name()}' registered successfully!")
+        with self.versions.adding(borrower):
+            self.borrowers.append(borrower)
+        self._index_borrower(borrower)
+        if self.key_filters is not None:
+            self.key_filters.add('member', borrower.get_membership_id(), self._borrowers_by_id)
+        self._emit(cdc.BORROWER_ADDED, cdc.borrower_data(borrower))
+        self._print(f"✅ Borrower '{borrower.get_name()}' registered successfully!")
         return True
     
     def remove_borrower(self, membership_id):
@@ -176,14 +696,19 @@ class Library:
             if borrower.get_membership_id() == membership_id:
                 # Check if borrower has borrowed books
                 if borrower.has_borrowed_books():
-                    print(f"❌ Error: Cannot remove borrower '{borrower.get_name()}' - they have unreturned books!")
+                    self._print(f"❌ Error: Cannot remove borrower '{borrower.get_name()}' - they have unreturned books!")
                     return False
                 
-                removed_borrower = self.borrowers.pop(i)
-                print(f"✅ Borrower '{removed_borrower.get_name()}' removed successfully!")
+                with self.versions.removing(borrower, i):
+                    removed_borrower = self.borrowers.pop(i)
+                self._unindex_borrower(removed_borrower)
+                if self.key_filters is not None:
+                    self.key_filters.remove('member', membership_id, self._borrowers_by_id)
+                self._emit(cdc.BORROWER_REMOVED, {'membership_id': membership_id})
+                self._print(f"✅ Borrower '{removed_borrower.get_name()}' removed successfully!")
                 return True
         
-        print(f"❌ Error: Borrower with ID {membership_id} not found!")
+        self._print(f"❌ Error: Borrower with ID {membership_id} not found!")
         return False
     
     def update_borrower(self, membership_id, name=None, contact=None):
@@ -198,17 +723,22 @@ class Library:
         Returns:
             bool: True if updated successfully, False if not found
         """
-        for borrower in self.borrowers:
-            if borrower.get_membership_id() == membership_id:
+        borrower = self._borrowers_by_id.get(membership_id)
+        if borrower:
+            self._unindex_borrower(borrower)
+            with self.versions.changing(borrower):
                 if name:
-                    borrower.update_name(name)
+                    borrower.update_name(name, verbose=self.verbose)
                 if contact:
-                    borrower.update_contact(contact)
-                
-                print(f"✅ Borrower with ID {membership_id} updated successfully!")
-                return True
+                    borrower.update_contact(contact, verbose=self.verbose)
+            self._index_borrower(borrower)
+            self._emit(cdc.BORROWER_UPDATED, {'membership_id': membership_id,
+                                              'name': name, 'contact': contact})
+            
+            self._print(f"✅ Borrower with ID {membership_id} updated successfully!")
+            return True
         
-        print(f"❌ Error: Borrower with ID {membership_id} not found!")
+        self._print(f"❌ Error: Borrower with ID {membership_id} not found!")
         return False
     
     def find_borrower_by_id(self, membership_id):
@@ -221,24 +751,97 @@ class Library:
         Returns:
             Borrower or None: Borrower object if found, None otherwise
         """
-        for borrower in self.borrowers:
-            if borrower.get_membership_id() == membership_id:
-                return borrower
-        return None
+        return self._borrowers_by_id.get(membership_id)
+    
+    def find_borrowers_by_name(self, name):
+        """
+        Find borrowers by name (case-insensitive, token prefix match)
+        
+        Every word of the query must start a word of the name, in any order:
+        "ali sm" matches "Alice Smith" and "Smith, Alistair". Candidates come
+        from the token index range matching the fewest names; the other
+        words are checked against each candidate's name.
+        
+        Args:
+            name (str): Name or partial name words
+            
+        Returns:
+            list: Matching Borrower objects in alphabetical order of name
+        """
+        words = set(tokenize(name))
+        if not words:
+            return []
+        # Scan the narrowest word's range; check the other words per candidate
+        first = min(words, key=lambda word: self._borrower_tokens.count((word,), (word + PREFIX_END,)))
+        rest = words - {first}
+        
+        matches = []
+        seen = set()
+        for _, membership_id in self._borrower_tokens.irange((first,), (first + PREFIX_END,)):
+            if membership_id in seen:
+                continue
+            seen.add(membership_id)
+            borrower = self._borrowers_by_id[membership_id]
+            tokens = tokenize(borrower.get_name())
+            if all(any(token.startswith(word) for token in tokens) for word in rest):
+                matches.append(borrower)
+        matches.sort(key=lambda b: (b.get_name().lower(), b.get_membership_id()))
+        return matches
+    
+    def find_borrowers_by_contact(self, contact):
+        """
+        Find borrowers by email or phone number (exact match after normalization)
+        
+        Args:
+            contact (str): Email address or phone number in any formatting
+            
+        Returns:
+            list: Borrower objects with that contact (households may share one)
+        """
+        members = self._borrowers_by_contact.get(normalize_contact(contact), ())
+        return sorted((self._borrowers_by_id[membership_id] for membership_id in members),
+                      key=lambda b: (b.get_name().lower(), b.get_membership_id()))
+    
+    def search_borrowers(self, query):
+        """
+        Search borrowers by name, email or phone number
+        
+        Queries containing '@' or made of digits and punctuation are looked
+        up as contacts; anything else is matched against names.
+        
+        Args:
+            query (str): Name words, email address or phone number
+            
+        Returns:
+            list: Matching Borrower objects
+        """
+        if is_contact_query(query):
+            results = self.find_borrowers_by_contact(query)
+        else:
+            results = self.find_borrowers_by_name(query)
+        
+        if results:
+            self._print(f"\n🔍 Found {len(results)} borrower(s) matching '{query}':\n")
+            self._print_rows(results)
+        else:
+            self._print(f"\n❌ No borrowers found matching '{query}'")
+        
+        return results
     
     def display_all_borrowers(self):
         """
         Display all registered borrowers
         """
-        if not self.borrowers:
+        with self.snapshot() as view:
+            borrowers = view.borrowers
+        if not borrowers:
             print("👥 No borrowers registered yet.")
             return
         
         print("\n" + "=" * 80)
         print("👥 ALL REGISTERED BORROWERS")
         print("=" * 80)
-        for i, borrower in enumerate(self.borrowers, 1):
-            print(f"{i}. {borrower}")
+        write_rows(borrowers)
         print("=" * 80 + "\n")
     
     def get_total_borrowers(self):
@@ -252,6 +855,140 @@ class Library:
     
     # ==================== BORROWING & RETURNING ====================
     
+    def checkout_copy(self, isbn):
+        """
+        Take one copy of a book off the shelf for a loan
+        
+        Args:
+            isbn (str): ISBN of book to check out
+            
+        Returns:
+            tuple: (Book, barcode of the copy taken), or (None, None) if no copy was taken
+        """
+        book = self.find_book_by_isbn(isbn)
+        if not book:
+            self._print(f"❌ Error: Book with ISBN {isbn} not found!")
+            return None, None
+        
+        shared = self.inventory is not None and book.get_isbn_key() in self.inventory.slots
+        if shared and not self.inventory.try_checkout(book.get_isbn_key()):
+            self._print_unavailable(book)
+            return None, None
+        
+        with self.versions.changing(book):
+            barcode = book.checkout_copy()
+        if barcode is None:
+            if shared:
+                self.inventory.checkin(book.get_isbn_key())
+            self._print_unavailable(book)
+            return None, None
+        
+        self._emit(cdc.COPY_STATE_CHANGED, {'isbn': book.get_isbn(), 'barcode': barcode,
+                                            'state': STATE_NAMES[ON_LOAN]})
+        return book, barcode
+    
+    def _print_unavailable(self, book):
+        """Report that a book has no copy on the shelf, with when one is due back"""
+        message = f"❌ Error: Book '{book.get_title()}' is currently unavailable!"
+        note = self._availability_note(book)
+        self._print(f"{message} {note}" if note else message)
+    
+    def checkin_copy(self, book, barcode=None):
+        """
+        Put one returned copy of a book back on the shelf
+        
+        Args:
+            book (Book): Book being returned
+            barcode (str, optional): Barcode of the returned copy; any copy on loan if omitted
+            
+        Returns:
+            str or None: Barcode of the copy put back, None if it was not on loan
+        """
+        with self.versions.changing(book):
+            barcode = book.checkin_copy(barcode)
+        if barcode is not None and self.inventory is not None:
+            self.inventory.checkin(book.get_isbn_key())
+        if barcode is not None:
+            self._emit(cdc.COPY_STATE_CHANGED, {'isbn': book.get_isbn(), 'barcode': barcode,
+                                                'state': STATE_NAMES[AVAILABLE]})
+        return barcode
+    
+    def record_loan(self, borrower, book, borrow_date=None, due_date=None, barcode=None):
+        """
+        Record a loan on a borrower's account
+        
+        Args:
+            borrower (Borrower): Borrower taking the book
+            book (Book): Book being borrowed
+            borrow_date (datetime, optional): Loan start (defaults to now)
+            due_date (datetime, optional): Due date (defaults to the loan period)
+            barcode (str, optional): Barcode of the copy lent out
+            
+        Returns:
+            tuple: (borrow_date, due_date)
+        """
+        from datetime import timedelta
+        
+        if borrow_date is None:
+            borrow_date = self.clock()
+        if due_date is None:
+            due_date = borrow_date + timedelta(days=LOAN_PERIOD_DAYS)
+        with self.versions.changing(borrower):
+            borrower.add_borrowed_book(book, borrow_date, due_date, barcode)
+        key = book.get_isbn_key()
+        self._due_dates.setdefault(key, SortedIndex()).insert(
+            (due_date, borrower.get_membership_id(), barcode or ''))
+        if self._books_by_key.get(key) is book:
+            author = AUTHORS.lowered[book.author_code]
+            self._borrow_counts[key] = self._borrow_counts.get(key, 0) + 1
+            self._author_borrow_counts[author] = self._author_borrow_counts.get(author, 0) + 1
+            self._suggesters['title'].bump(key)
+            self._suggesters['author'].bump(author)
+        if self.analytics is not None:
+            self.analytics.record_borrow(book, borrower, borrow_date)
+        self._emit(cdc.BOOK_BORROWED, {
+            'membership_id': borrower.get_membership_id(),
+            'isbn': book.get_isbn(),
+            'title': book.get_title(),
+            'author': book.get_author(),
+            'genre': book.get_genre(),
+            'borrow_date': borrow_date.isoformat(),
+            'due_date': due_date.isoformat(),
+            'barcode': barcode,
+        })
+        return borrow_date, due_date
+    
+    def close_loan(self, borrower, isbn, barcode=None):
+        """
+        Remove a returned loan from a borrower's account
+        
+        Args:
+            borrower (Borrower): Borrower returning the book
+            isbn (str): ISBN of the returned book
+            barcode (str, optional): Barcode of the returned copy
+            
+        Returns:
+            bool: True if the loan was found and removed
+        """
+        record = self.find_loan(borrower, isbn, barcode)
+        with self.versions.changing(borrower):
+            removed = borrower.remove_borrowed_book(isbn, barcode)
+        if removed:
+            key = record['book'].get_isbn_key()
+            due = self._due_dates.get(key)
+            if due is not None:
+                due.discard((record['due_date'], borrower.get_membership_id(), record.get('barcode') or ''))
+                if not due:
+                    del self._due_dates[key]
+            if self.history is not None:
+                self.history.append(borrower.get_membership_id(), record['book'],
+                                    record['borrow_date'], record['due_date'], self.clock())
+            if self.analytics is not None:
+                self.analytics.record_return(record['book'], borrower, self.clock())
+            self._emit(cdc.BOOK_RETURNED, {'membership_id': borrower.get_membership_id(),
+                                           'isbn': isbn, 'barcode': barcode})
+        return removed
+    
     def borrow_book(self, membership_id, isbn):
         """
         Process book borrowing with due date calculation (14 days)
@@ -263,126 +1000,151 @@ class Library:
         Returns:
             bool: True if borrowed successfully, False otherwise
         """
-        from datetime import datetime, timedelta
-        
         # Find borrower
         borrower = self.find_borrower_by_id(membership_id)
         if not borrower:
-            print(f"❌ Error: Borrower with ID {membership_id} not found!")
+            self._print(f"❌ Error: Borrower with ID {membership_id} not found!")
             return False
         
-        # Find book
-        book = self.find_book_by_isbn(isbn)
-        if not book:
-            print(f"❌ Error: Book with ISBN {isbn} not found!")
-            return False
-        
-        # Check availability
-        if not book.is_available():
-            print(f"❌ Error: Book '{book.get_title()}' is currently unavailable!")
-            return False
+        # Take a copy off the shelf and record the loan as one version
+        with self.versions.transaction():
+            book, barcode = self.checkout_copy(isbn)
+            if not book:
+                return False
+            borrow_date, due_date = self.record_loan(borrower, book, barcode=barcode)
         
-        # Process borrowing
-        book.update_quantity(book.get_quantity() - 1)
-        borrow_date = datetime.now()
-        due_date = borrow_date + timedelta(days=14)  # 14 days borrowing period
+        self._print(f"✅ Book '{book.get_title()}' borrowed successfully by {borrower.get_name()}!")
+        self._print(f"   Copy: {barcode}")
+        self._print(f"   Borrow Date: {borrow_date.strftime('%Y-%m-%d %H:%M:%S')}")
+        self._print(f"   Due Date: {due_date.strftime('%Y-%m-%d %H:%M:%S')}")
+        self._print(f"   Please return within {LOAN_PERIOD_DAYS} days!")
         
-        # Add to borrower's borrowed books list
-        borrower.add_borrowed_book(book, borrow_date, due_date)
+        return True
+    
+    def find_loan(self, borrower, isbn, barcode=None):
+        """
+        Find a borrower's loan record for a book
         
-        print(f"✅ Book '{book.get_title()}' borrowed successfully by {borrower.get_name()}!")
-        print(f"   Borrow Date: {borrow_date.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"   Due Date: {due_date.strftime('%Y-%m-%d %H:%M:%S')}")
-        print(f"   Please return within 14 days!")
+        Args:
+            borrower (Borrower): Borrower to check
+            isbn (str): ISBN of the borrowed book
+            barcode (str, optional): Barcode of the copy; any copy of the book if omitted
+            
+        Returns:
+            dict or None: Loan record if found, None otherwise
+        """
+        key = try_isbn_key(isbn)
+        for record in borrower.get_borrowed_books():
+            if record['book'].get_isbn_key() == key and barcode in (None, record.get('barcode')):
+                return record
+        return None
+    
+    def warn_if_overdue(self, record):
+        """
+        Print a warning when a loan being returned is overdue
         
-        return True
+        Args:
+            record (dict): Loan record
+        """
+        current_date = self.clock()
+        due_date = record['due_date']
+        if current_date > due_date:
+            days_overdue = (current_date - due_date).days
+            self._print(f"⚠️  Warning: Book is {days_overdue} day(s) overdue!")
     
-    def return_book(self, membership_id, isbn):
+    def return_book(self, membership_id, isbn=None, barcode=None):
         """
         Process book return
         
         Args:
             membership_id (str): Membership ID of borrower
-            isbn (str): ISBN of book to return
+            isbn (str, optional): ISBN of book to return (may be omitted when a barcode is given)
+            barcode (str, optional): Barcode of the returned copy
             
         Returns:
             bool: True if returned successfully, False otherwise
         """
-        from datetime import datetime
-        
         # Find borrower
         borrower = self.find_borrower_by_id(membership_id)
         if not borrower:
-            print(f"❌ Error: Borrower with ID {membership_id} not found!")
+            self._print(f"❌ Error: Borrower with ID {membership_id} not found!")
             return False
         
         # Find book
-        book = self.find_book_by_isbn(isbn)
-        if not book:
-            print(f"❌ Error: Book with ISBN {isbn} not found!")
-            return False
-        
-        # Check if borrower actually borrowed this book
-        borrowed_books = borrower.get_borrowed_books()
-        book_found = False
-        
-        for record in borrowed_books:
-            if record['book'].get_isbn() == isbn:
-                book_found = True
-                due_date = record['due_date']
-                
-                # Check if overdue
-                current_date = datetime.now()
-                if current_date > due_date:
-                    days_overdue = (current_date - due_date).days
-                    print(f"⚠️  Warning: Book is {days_overdue} day(s) overdue!")
-                
-                break
+        if isbn is None:
+            book = self.find_book_by_barcode(barcode)
+            if not book:
+                self._print(f"❌ Error: No copy with barcode {barcode} found!")
+                return False
+            isbn = book.get_isbn()
+        else:
+            book = self.find_book_by_isbn(isbn)
+            if not book:
+                self._print(f"❌ Error: Book with ISBN {isbn} not found!")
+                return False
         
-        if not book_found:
-            print(f"❌ Error: Borrower {borrower.get_name()} has not borrowed this book!")
+        # Check if borrower actually borrowed this book (or this copy)
+        record = self.find_loan(borrower, isbn, barcode)
+        if not record:
+            self._print(f"❌ Error: Borrower {borrower.get_name()} has not borrowed this book!")
             return False
+        self.warn_if_overdue(record)
         
         # Process return
-        book.update_quantity(book.get_quantity() + 1)
-        borrower.remove_borrowed_book(isbn)
+        barcode = record.get('barcode')
+        with self.versions.transaction():
+            self.checkin_copy(book, barcode)
+            self.close_loan(borrower, isbn, barcode)
         
-        print(f"✅ Book '{book.get_title()}' returned successfully by {borrower.get_name()}!")
-        print(f"   Return Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self._print(f"✅ Book '{book.get_title()}' returned successfully by {borrower.get_name()}!")
+        self._print(f"   Return Date: {self.clock().strftime('%Y-%m-%d %H:%M:%S')}")
         
         return True
     
+    def iter_overdue_records(self, current_date=None):
+        """
+        Iterate over all overdue loans across all borrowers
+        
+        Args:
+            current_date (datetime, optional): Reference time (defaults to now)
+            
+        Yields:
+            tuple: (borrower, loan record dict, days overdue)
+        """
+        if current_date is None:
+            current_date = self.clock()
+        
+        for borrower in self.borrowers:
+            for record in borrower.get_borrowed_books():
+                due_date = record['due_date']
+                if current_date > due_date:
+                    yield borrower, record, (current_date - due_date).days
+    
     def check_overdue_books(self):
         """
         Check and display all overdue books across all borrowers
         """
-        from datetime import datetime
-        
-        current_date = datetime.now()
         overdue_found = False
         
         print("\n" + "=" * 80)
         print("⚠️  OVERDUE BOOKS REPORT")
         print("=" * 80)
         
-        for borrower in self.borrowers:
-            borrowed_books = borrower.get_borrowed_books()
+        with self.snapshot() as view:
+            overdue = list(view.iter_overdue_records())
+        
+        for borrower, record, days_overdue in overdue:
+            overdue_found = True
+            book = record['book']
+            borrow_date = record['borrow_date']
+            due_date = record['due_date']
             
-            for record in borrowed_books:
-                due_date = record['due_date']
-                
-                if current_date > due_date:
-                    overdue_found = True
-                    days_overdue = (current_date - due_date).days
-                    book = record['book']
-                    borrow_date = record['borrow_date']
-                    
-                    print(f"\n📕 Book: {book.get_title()} (ISBN: {book.get_isbn()})")
-                    print(f"   Borrower: {borrower.get_name()} (ID: {borrower.get_membership_id()})")
-                    print(f"   Borrow Date: {borrow_date.strftime('%Y-%m-%d')}")
-                    print(f"   Due Date: {due_date.strftime('%Y-%m-%d')}")
-                    print(f"   Days Overdue: {days_overdue} day(s)")
-                    print(f"   Contact: {borrower.get_contact()}")
+            print(f"\n📕 Book: {book.get_title()} (ISBN: {book.get_isbn()})")
+            print(f"   Borrower: {borrower.get_name()} (ID: {borrower.get_membership_id()})")
+            print(f"   Borrow Date: {borrow_date.strftime('%Y-%m-%d')}")
+            print(f"   Due Date: {due_date.strftime('%Y-%m-%d')}")
+            print(f"   Days Overdue: {days_overdue} day(s)")
+            print(f"   Contact: {borrower.get_contact()}")
         
         if not overdue_found:
             print("\n✅ No overdue books! All borrowers are on time.")
@@ -396,8 +1158,6 @@ class Library:
         Args:
             membership_id (str): Membership ID of borrower
         """
-        from datetime import datetime
-        
         borrower = self.find_borrower_by_id(membership_id)
         if not borrower:
             print(f"❌ Error: Borrower with ID {membership_id} not found!")
@@ -412,7 +1172,7 @@ class Library:
         if not borrowed_books:
             print("No books currently borrowed.")
         else:
-            current_date = datetime.now()
+            current_date = self.clock()
             
             for i, record in enumerate(borrowed_books, 1):
                 book = record['book']
@@ -430,8 +1190,39 @@ class Library:
                 print(f"   Due: {due_date.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"   Status: {status}")
         
+        if self.history is not None:
+            past_loans = self.history.borrower_history(membership_id)
+            print(f"\n--- Past Loans ({len(past_loans)}) ---")
+            for i, loan in enumerate(past_loans, 1):
+                print(f"\n{i}. {loan['title']} by {loan['author']}")
+                print(f"   ISBN: {loan['isbn']}")
+                print(f"   Borrowed: {loan['borrow_date'].strftime('%Y-%m-%d')}")
+                print(f"   Returned: {loan['return_date'].strftime('%Y-%m-%d')}")
+        
         print("=" * 80 + "\n")
     
+    def iter_available_books(self):
+        """
+        Iterate over available books (quantity > 0) without building a list
+        
+        Yields:
+            Book: Available Book objects
+        """
+        for book in self.books:
+            if self._shelf_count(book) > 0:
+                yield book
+    
+    def iter_unavailable_books(self):
+        """
+        Iterate over unavailable books (quantity = 0) without building a list
+        
+        Yields:
+            Book: Unavailable Book objects
+        """
+        for book in self.books:
+            if self._shelf_count(book) <= 0:
+                yield book
+    
     def get_available_books(self):
         """
         Get list of all available books (quantity > 0)
@@ -439,7 +1230,7 @@ class Library:
         Returns:
             list: List of available Book objects
         """
-        return [book for book in self.books if book.is_available()]
+        return list(self.iter_available_books())
     
     def get_unavailable_books(self):
         """
@@ -448,30 +1239,191 @@ class Library:
         Returns:
             list: List of unavailable Book objects
         """
-        return [book for book in self.books if not book.is_available()]
+        return list(self.iter_unavailable_books())
+    
+    # ==================== AVAILABILITY FORECAST ====================
+    
+    def next_available(self, isbn, current_date=None):
+        """
+        Get when a copy of a book is next expected on the shelf
+        
+        Outstanding loans are kept per ISBN in due-date order, so this is an
+        O(log n) lookup of the earliest due date, without scanning borrowers.
+        
+        Args:
+            isbn (str): ISBN of the book
+            current_date (datetime, optional): Now (defaults to the current time)
+            
+        Returns:
+            datetime or None: current_date if a copy is on the shelf, else the
+                earliest due date of an outstanding loan (in the past if that
+                loan is overdue); None if no copy is on the shelf or on loan
+        """
+        key = try_isbn_key(isbn)
+        book = self._books_by_key.get(key)
+        if book is not None and self._shelf_count(book) > 0:
+            return current_date or self.clock()
+        due = self._due_dates.get(key)
+        if not due:
+            return None
+        return due.slice(0, 1)[0][0]
+    
+    def availability_timeline(self, isbn, days=14, current_date=None):
+        """
+        Forecast the copies of a book on the shelf for each of the next days
+        
+        Each day counts the copies on the shelf now plus the loans due back
+        by the end of that day; overdue loans are not counted, since there
+        is no date to expect them. Each day costs one range count over the
+        book's due-date index.
+        
+        Args:
+            isbn (str): ISBN of the book
+            days (int): Number of days, starting today
+            current_date (datetime, optional): Now (defaults to the current time)
+            
+        Returns:
+            list: (date, expected available copies) tuples, one per day
+        """
+        from datetime import datetime, time, timedelta
+        
+        if current_date is None:
+            current_date = self.clock()
+        key = try_isbn_key(isbn)
+        book = self._books_by_key.get(key)
+        on_shelf = self._shelf_count(book) if book is not None else 0
+        due = self._due_dates.get(key)
+        
+        timeline = []
+        for offset in range(days):
+            day = current_date.date() + timedelta(days=offset)
+            returning = 0
+            if due:
+                day_end = datetime.combine(day, time.max)
+                returning = due.count((current_date,), (day_end, PREFIX_END))
+            timeline.append((day, on_shelf + returning))
+        return timeline
+    
+    def _availability_note(self, book):
+        """Describe when an unavailable book is due back (None if it is available)"""
+        if self._shelf_count(book) > 0:
+            return None
+        now = self.clock()
+        due = self.next_available(book.get_isbn(), now)
+        if due is None:
+            return "⏳ No copies on loan to wait for"
+        if due < now:
+            return f"⏳ Next copy overdue since {due.strftime('%Y-%m-%d')}"
+        return f"⏳ Next copy due back {due.strftime('%Y-%m-%d')}"
+    
+    def display_availability_forecast(self, isbn, days=14):
+        """
+        Display when copies of a book are expected back, day by day
+        
+        Args:
+            isbn (str): ISBN of the book
+            days (int): Number of days to forecast
+        """
+        book = self.find_book_by_isbn(isbn)
+        if not book:
+            print(f"❌ Book with ISBN {isbn} not found!")
+            return
+        
+        print("\n" + "=" * 80)
+        print(f"📅 AVAILABILITY FORECAST: {book.get_title()}")
+        print("=" * 80)
+        note = self._availability_note(book)
+        print(note or f"✅ {book.get_quantity()} cop(ies) on the shelf now")
+        print(f"\n{'Date':<14}{'Expected on shelf':>18}")
+        for day, copies in self.availability_timeline(isbn, days):
+            print(f"{day.isoformat():<14}{copies:>18}")
+        print("=" * 80 + "\n")
     
     # ==================== SEARCH FUNCTIONALITY ====================
     
-    def search_by_title(self, title):
+    def _search_candidates(self, title=None, author=None, genre=None):
         """
-        Search for books by title (case-insensitive, partial match)
+        Get the books a search has to check: the search index's candidates
+        when it narrows the search enough, else the whole catalog (either
+        way in catalog order, so results don't depend on which was used)
+        """
+        if self.search_index is None:
+            return self.books
+        
+        # Narrow to the index's candidates (unless a scan is cheaper); callers verify them
+        candidates, limit = None, len(self.books) // INDEX_SCAN_RATIO
+        for field, text in (('title', title), ('author', author), ('genre', genre)):
+            keys = self.search_index.candidates(field, text, limit) if text else None
+            if keys is not None:
+                candidates = keys if candidates is None else candidates & keys
+        if candidates is None:
+            return self.books
+        books, positions = self._books_by_key, self._catalog_positions
+        return [books[key] for key in sorted((key for key in candidates if key in books),
+                                             key=positions.__getitem__)]
+    
+    def find_books(self, title=None, author=None, genre=None, sort_by=None):
+        """
+        Find books matching all given criteria without printing
+        (case-insensitive, partial match, AND logic)
         
         Args:
-            title (str): Title or partial title to search for
+            title (str, optional): Title to search for
+            author (str, optional): Author to search for
+            genre (str, optional): Genre to search for
+            sort_by (str, optional): Order the matches by 'title', 'author' or 'genre'
+                (then ISBN) instead of catalog order
             
         Returns:
-            list: List of matching Book objects
+            list: List of matching Book objects, in catalog order unless sort_by is given
+        
+        Raises:
+            ValueError: If sort_by is not a sortable field
         """
-        search_term = title.lower()
-        results = [book for book in self.books if search_term in book.get_title().lower()]
+        if sort_by is not None and sort_by not in BOOK_SORT_FIELDS:
+            raise ValueError(f"Cannot sort books by '{sort_by}'. Use one of: {', '.join(BOOK_SORT_FIELDS)}")
+        results = self._search_candidates(title, author, genre)
         
+        # Filter by title if provided
+        if title:
+            title_term = title.lower()
+            results = [book for book in results if title_term in book.get_title().lower()]
+        
+        # Filter by author if provided (matched once per distinct author)
+        if author:
+            author_codes = AUTHORS.matching_codes(author)
+            results = [book for book in results if book.author_code in author_codes]
+        
+        # Filter by genre if provided (matched once per distinct genre)
+        if genre:
+            genre_codes = GENRES.matching_codes(genre)
+            results = [book for book in results if book.genre_code in genre_codes]
+        
+        if sort_by is not None:
+            return sorted(results, key=lambda book: (self._book_sort_key(book, sort_by), book.get_isbn_key()))
+        return list(results)
+    
+    def _report_search(self, field, query, results):
+        """Print the results of a single-field search, with when unavailable books are due back"""
+        found, missing = SEARCH_MESSAGES[field]
         if results:
-            print(f"\n🔍 Found {len(results)} book(s) matching title '{title}':\n")
-            for i, book in enumerate(results, 1):
-                print(f"{i}. {book}")
+            self._print(f"\n🔍 Found {len(results)} book(s) {found.format(query=query)}:\n")
+            self._print_book_rows(results)
         else:
-            print(f"\n❌ No books found with title containing '{title}'")
+            self._print(f"\n❌ No books found {missing.format(query=query)}")
+    
+    def search_by_title(self, title):
+        """
+        Search for books by title (case-insensitive, partial match)
         
+        Args:
+            title (str): Title or partial title to search for
+            
+        Returns:
+            list: List of matching Book objects
+        """
+        results = self.find_books(title=title)
+        self._report_search('title', title, results)
         return results
     
     def search_by_author(self, author):
@@ -484,16 +1436,8 @@ class Library:
         Returns:
             list: List of matching Book objects
         """
-        search_term = author.lower()
-        results = [book for book in self.books if search_term in book.get_author().lower()]
-        
-        if results:
-            print(f"\n🔍 Found {len(results)} book(s) by author matching '{author}':\n")
-            for i, book in enumerate(results, 1):
-                print(f"{i}. {book}")
-        else:
-            print(f"\n❌ No books found by author matching '{author}'")
-        
+        results = self.find_books(author=author)
+        self._report_search('author', author, results)
         return results
     
     def search_by_genre(self, genre):
@@ -506,16 +1450,8 @@ class Library:
         Returns:
             list: List of matching Book objects
         """
-        search_term = genre.lower()
-        results = [book for book in self.books if search_term in book.get_genre().lower()]
-        
-        if results:
-            print(f"\n🔍 Found {len(results)} book(s) in genre matching '{genre}':\n")
-            for i, book in enumerate(results, 1):
-                print(f"{i}. {book}")
-        else:
-            print(f"\n❌ No books found in genre matching '{genre}'")
-        
+        results = self.find_books(genre=genre)
+        self._report_search('genre', genre, results)
         return results
     
     def search_by_isbn(self, isbn):
@@ -531,10 +1467,10 @@ class Library:
         book = self.find_book_by_isbn(isbn)
         
         if book:
-            print(f"\n🔍 Book found:\n")
-            print(f"1. {book}")
+            self._print(f"\n🔍 Book found:\n")
+            self._print_book_rows([book])
         else:
-            print(f"\n❌ No book found with ISBN '{isbn}'")
+            self._print(f"\n❌ No book found with ISBN '{isbn}'")
         
         return book
     
@@ -550,22 +1486,7 @@ class Library:
         Returns:
             list: List of books matching ALL provided criteria
         """
-        results = self.books
-        
-        # Filter by title if provided
-        if title:
-            title_term = title.lower()
-            results = [book for book in results if title_term in book.get_title().lower()]
-        
-        # Filter by author if provided
-        if author:
-            author_term = author.lower()
-            results = [book for book in results if author_term in book.get_author().lower()]
-        
-        # Filter by genre if provided
-        if genre:
-            genre_term = genre.lower()
-            results = [book for book in results if genre_term in book.get_genre().lower()]
+        results = self.find_books(title, author, genre)
         
         if results:
             criteria = []
@@ -577,12 +1498,11 @@ class Library:
                 criteria.append(f"genre='{genre}'")
             
             criteria_str = ", ".join(criteria)
-            print(f"\n🔍 Found {len(results)} book(s) matching criteria ({criteria_str}):\n")
+            self._print(f"\n🔍 Found {len(results)} book(s) matching criteria ({criteria_str}):\n")
             
-            for i, book in enumerate(results, 1):
-                print(f"{i}. {book}")
+            self._print_book_rows(results)
         else:
-            print(f"\n❌ No books found matching the search criteria")
+            self._print(f"\n❌ No books found matching the search criteria")
         
         return results
     
@@ -590,7 +1510,8 @@ class Library:
         """
         Display all books that are currently available for borrowing
         """
-        available = self.get_available_books()
+        with self.snapshot() as view:
+            available = [book for book in view.iter_books() if self._shelf_count(book) > 0]
         
         if not available:
             print("\n📚 No books currently available for borrowing.")
@@ -599,15 +1520,15 @@ class Library:
         print("\n" + "=" * 80)
         print("📗 AVAILABLE BOOKS FOR BORROWING")
         print("=" * 80)
-        for i, book in enumerate(available, 1):
-            print(f"{i}. {book}")
+        write_rows(available, render=self._book_row)
         print("=" * 80 + "\n")
     
     def display_unavailable_books(self):
         """
         Display all books that are currently unavailable (all copies borrowed)
         """
-        unavailable = self.get_unavailable_books()
+        with self.snapshot() as view:
+            unavailable = [book for book in view.iter_books() if self._shelf_count(book) <= 0]
         
         if not unavailable:
             print("\n✅ All books have available copies!")
@@ -616,8 +1537,7 @@ class Library:
         print("\n" + "=" * 80)
         print("📕 UNAVAILABLE BOOKS (All copies borrowed)")
         print("=" * 80)
-        for i, book in enumerate(unavailable, 1):
-            print(f"{i}. {book}")
+        write_rows(unavailable, render=self._book_row)
         print("=" * 80 + "\n")
     
     def search_with_availability(self, search_type, query):
@@ -628,34 +1548,368 @@ class Library:
             search_type (str): Type of search ('title', 'author', 'genre')
             query (str): Search query
         """
-        if search_type == 'title':
-            results = self.search_by_title(query)
-        elif search_type == 'author':
-            results = self.search_by_author(query)
-        elif search_type == 'genre':
-            results = self.search_by_genre(query)
-        else:
-            print("❌ Invalid search type. Use 'title', 'author', or 'genre'")
+        if search_type not in SEARCH_MESSAGES:
+            self._print("❌ Invalid search type. Use 'title', 'author', or 'genre'")
             return []
         
+        # Availability is counted while matching, not in a second pass over the results
+        search = self.faceted_search(**{search_type: query})
+        results = search['books']
+        self._report_search(search_type, query, results)
         if results:
-            print("\n📊 Availability Summary:")
-            available_count = sum(1 for book in results if book.is_available())
-            print(f"   Available: {available_count}/{len(results)}")
-            print(f"   Unavailable: {len(results) - available_count}/{len(results)}")
+            availability = search['facets']['availability']
+            if self.inventory is not None:  # Count the shared shelves, not this desk's
+                available = sum(1 for book in results if self._shelf_count(book) > 0)
+                availability = {'available': available, 'unavailable': len(results) - available}
+            self._print("\n📊 Availability Summary:")
+            self._print(f"   Available: {availability['available']}/{len(results)}")
+            self._print(f"   Unavailable: {availability['unavailable']}/{len(results)}")
         
         return results
     
+    def faceted_search(self, title=None, author=None, genre=None, top=FACET_TOP):
+        """
+        Find books matching all given criteria, with facet counts over the matches
+        
+        Matching and counting happen in one pass over the candidates (the
+        search index's when it narrows the search): each match bumps its
+        availability, genre, author and quantity-bucket counters, from its
+        copies on the shelf (shared ones when an inventory is attached). Genres and
+        authors are counted by their dictionary codes and decoded once.
+        
+        Args:
+            title (str, optional): Title to search for
+            author (str, optional): Author to search for
+            genre (str, optional): Genre to search for
+            top (int or None): Genre and author values to return (most matches first); None for all
+            
+        Returns:
+            dict: 'books' (as find_books returns them) and 'facets' with 'availability'
+                ({'available': n, 'unavailable': n}), 'genre' and 'author' ((value, count)
+                lists, most matches first), 'quantity' ((bucket label, count) list of copies
+                on the shelf, see QUANTITY_FACETS) and the distinct 'genres'/'authors' matched
+        """
+        title_term = title.lower() if title else None
+        author_codes = AUTHORS.matching_codes(author) if author else None
+        genre_codes = GENRES.matching_codes(genre) if genre else None
+        
+        results = []
+        available = 0
+        genre_counts = Counter()  # Code -> matches, sized by the matches, not the global tables
+        author_counts = Counter()
+        quantity_counts = [0] * len(QUANTITY_FACETS)
+        cap = len(QUANTITY_FACET_OF) - 1
+        for book in self._search_candidates(title, author, genre):
+            if title_term is not None and title_term not in book.get_title().lower():
+                continue
+            if author_codes is not None and book.author_code not in author_codes:
+                continue
+            if genre_codes is not None and book.genre_code not in genre_codes:
+                continue
+            results.append(book)
+            quantity = self._shelf_count(book)
+            if quantity:
+                available += 1
+            quantity_counts[QUANTITY_FACET_OF[quantity if quantity < cap else cap]] += 1
+            genre_counts[book.genre_code] += 1
+            author_counts[book.author_code] += 1
+        
+        def ranked(counts, table):
+            """Decode the counted codes: (top values, most matches first; distinct values)"""
+            entries = [(table.values[code], count) for code, count in counts.items()]
+            order = lambda entry: (-entry[1], entry[0].lower(), entry[0])
+            if top is None:
+                return sorted(entries, key=order), len(entries)
+            return heapq.nsmallest(top, entries, key=order), len(entries)
+        
+        genres, genre_total = ranked(genre_counts, GENRES)
+        authors, author_total = ranked(author_counts, AUTHORS)
+        return {
+            'books': results,
+            'facets': {
+                'availability': {'available': available, 'unavailable': len(results) - available},
+                'genre': genres,
+                'author': authors,
+                'quantity': [(label, count) for (_, label), count in zip(QUANTITY_FACETS, quantity_counts)],
+                'genres': genre_total,
+                'authors': author_total,
+            },
+        }
+    
+    def display_faceted_search(self, title=None, author=None, genre=None, top=FACET_TOP):
+        """
+        Display the books matching all given criteria with their facet counts
+        
+        Args:
+            title (str, optional): Title to search for
+            author (str, optional): Author to search for
+            genre (str, optional): Genre to search for
+            top (int or None): Genre and author values to show
+            
+        Returns:
+            dict: The faceted_search result
+        """
+        search = self.faceted_search(title, author, genre, top)
+        results, facets = search['books'], search['facets']
+        criteria = ", ".join(f"{name}='{value}'" for name, value in
+                             (('title', title), ('author', author), ('genre', genre)) if value)
+        if not results:
+            self._print(f"\n❌ No books found matching ({criteria})")
+            return search
+        
+        self._print(f"\n🔍 Found {len(results)} book(s) matching ({criteria}):\n")
+        self._print_book_rows(results)
+        
+        availability = facets['availability']
+        self._print("\n📊 Refine by:")
+        self._print(f"   Availability: Available ({availability['available']}) | "
+                    f"Unavailable ({availability['unavailable']})")
+        for name, plural in (('genre', 'genres'), ('author', 'authors')):
+            values = " | ".join(f"{value} ({count})" for value, count in facets[name])
+            more = facets[plural] - len(facets[name])
+            self._print(f"   {name.title()}: {values}" + (f" | +{more} more" if more > 0 else ""))
+        self._print("   Copies on shelf: " + " | ".join(f"{label}: {count}" for label, count in facets['quantity']))
+        return search
+    
+    def suggest(self, prefix, field='title', k=10):
+        """
+        Autocomplete a partial title or author name
+        
+        Suggestions are ranked by how often the books were borrowed, then
+        alphabetically, and served from a prefix index (no catalog scan).
+        
+        Args:
+            prefix (str): Text typed so far (e.g. "harry pot")
+            field (str): 'title' or 'author'
+            k (int): Maximum number of suggestions
+            
+        Returns:
+            list: Suggested titles or author names, most popular first
+        """
+        if field not in self._suggesters:
+            raise ValueError(f"Cannot suggest '{field}'. Use one of: {', '.join(SUGGEST_FIELDS)}")
+        return self._suggesters[field].suggest(prefix, k)
+    
+    # ==================== SORTED LISTINGS ====================
+    
+    def _sorted_book_index(self, field):
+        """Get the ordered index for a book field"""
+        if field not in self._sorted_books:
+            raise ValueError(f"Cannot sort books by '{field}'. Use one of: {', '.join(BOOK_SORT_FIELDS)}")
+        return self._sorted_books[field]
+    
+    def get_books_sorted(self, field='title', page=1, page_size=20):
+        """
+        Get one page of books in alphabetical order of a field
+        
+        Args:
+            field (str): 'title', 'author' or 'genre'
+            page (int): Page number (1-based)
+            page_size (int): Books per page
+            
+        Returns:
+            list: Book objects on the requested page
+        """
+        entries = self._sorted_book_index(field).slice((page - 1) * page_size, page_size)
+        return [self._books_by_key[key] for _, key in entries]
+    
+    def get_books_in_range(self, field, start, end):
+        """
+        Get books whose field falls alphabetically between two prefixes
+        (case-insensitive; e.g. start="M", end="N" returns titles from "M" through "N...")
+        
+        Args:
+            field (str): 'title', 'author' or 'genre'
+            start (str): First prefix (inclusive)
+            end (str): Last prefix (inclusive)
+            
+        Returns:
+            list: Book objects in sorted order
+        """
+        low, high = prefix_range(start.lower(), end.lower())
+        return [self._books_by_key[key]
+                for _, key in self._sorted_book_index(field).irange(low, high)]
+    
+    def get_borrowers_sorted(self, page=1, page_size=20):
+        """
+        Get one page of borrowers in alphabetical order of name
+        
+        Args:
+            page (int): Page number (1-based)
+            page_size (int): Borrowers per page
+            
+        Returns:
+            list: Borrower objects on the requested page
+        """
+        entries = self._sorted_borrowers.slice((page - 1) * page_size, page_size)
+        return [self._borrowers_by_id[membership_id] for _, membership_id in entries]
+    
+    def display_books_sorted(self, field='title', page=1, page_size=20):
+        """
+        Display one page of books sorted by a field
+        
+        Args:
+            field (str): 'title', 'author' or 'genre'
+            page (int): Page number (1-based)
+            page_size (int): Books per page
+        """
+        books = self.get_books_sorted(field, page, page_size)
+        total_pages = max(1, -(-self.get_total_books() // page_size))
+        
+        print("\n" + "=" * 80)
+        print(f"📚 BOOKS SORTED BY {field.upper()} (Page {page}/{total_pages})")
+        print("=" * 80)
+        if not books:
+            print("No books on this page.")
+        write_rows(books, (page - 1) * page_size + 1, render=self._book_row)
+        print("=" * 80 + "\n")
+    
+    def display_books_in_range(self, field, start, end):
+        """
+        Display books whose field falls alphabetically between two prefixes
+        
+        Args:
+            field (str): 'title', 'author' or 'genre'
+            start (str): First prefix (inclusive)
+            end (str): Last prefix (inclusive)
+        """
+        books = self.get_books_in_range(field, start, end)
+        
+        print("\n" + "=" * 80)
+        print(f"📚 BOOKS WITH {field.upper()} FROM '{start}' TO '{end}'")
+        print("=" * 80)
+        if not books:
+            print("No books in this range.")
+        write_rows(books, render=self._book_row)
+        print("=" * 80 + "\n")
+    
+    def display_borrowers_sorted(self, page=1, page_size=20):
+        """
+        Display one page of borrowers sorted by name
+        
+        Args:
+            page (int): Page number (1-based)
+            page_size (int): Borrowers per page
+        """
+        borrowers = self.get_borrowers_sorted(page, page_size)
+        total_pages = max(1, -(-self.get_total_borrowers() // page_size))
+        
+        print("\n" + "=" * 80)
+        print(f"👥 BORROWERS SORTED BY NAME (Page {page}/{total_pages})")
+        print("=" * 80)
+        if not borrowers:
+            print("No borrowers on this page.")
+        write_rows(borrowers, (page - 1) * page_size + 1)
+        print("=" * 80 + "\n")
+    
+    # ==================== SNAPSHOTS ====================
+    
+    def snapshot(self):
+        """
+        Open a consistent read-only view of the library as it is now
+        
+        The view is taken in O(1) and keeps showing this moment while books
+        and borrowers keep changing; writers are never blocked. Release it
+        (or use it in a with block) so old versions can be garbage-collected.
+        
+        Returns:
+            LibrarySnapshot: Read-only view with books, borrowers and report iterators
+        """
+        return self.versions.snapshot(self)
+    
     # ==================== LIBRARY STATISTICS ====================
     
     def display_library_stats(self):
         """
         Display overall library statistics
         """
+        with self.snapshot() as view:
+            total_books = view.get_total_books()
+            total_copies = view.get_total_copies()
+            total_borrowers = view.get_total_borrowers()
+        
         print("\n" + "=" * 60)
         print("📊 LIBRARY STATISTICS")
         print("=" * 60)
-        print(f"Total Books (Unique): {self.get_total_books()}")
-        print(f"Total Copies: {self.get_total_copies()}")
-        print(f"Total Registered Borrowers: {self.get_total_borrowers()}")
+        print(f"Total Books (Unique): {total_books}")
+        print(f"Total Copies: {total_copies}")
+        print(f"Total Registered Borrowers: {total_borrowers}")
         print("=" * 60 + "\n")
+    
+    def detailed_stats(self, current_date=None):
+        """
+        Compute copies and availability by genre, author concentration and
+        distributions of quantity, utilization and loans (NumPy columnar path)
+        
+        Args:
+            current_date (datetime, optional): Reference time for overdue loans
+            
+        Returns:
+            dict: Breakdowns (see catalog_stats.catalog_stats)
+            
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        from .catalog_stats import catalog_stats
+        with self.snapshot() as view:
+            return catalog_stats(view, current_date)
+    
+    def display_detailed_stats(self):
+        """
+        Display the detailed statistics report
+        """
+        from .catalog_stats import display_catalog_stats
+        try:
+            stats = self.detailed_stats()
+        except ImportError as e:
+            print(f"❌ {e}")
+            return
+        display_catalog_stats(stats)
+    
+    def find_duplicate_books(self, threshold=None):
+        """
+        Find clusters of near-duplicate titles in the catalog (the same work
+        under other ISBNs, editions or spellings), for review
+        
+        Args:
+            threshold (float, optional): Estimated title/author similarity to
+                match (defaults to dedup.DEFAULT_THRESHOLD)
+            
+        Returns:
+            list: Clusters of record dicts (see dedup.find_duplicates)
+        """
+        from .dedup import DEFAULT_THRESHOLD, catalog_duplicates
+        with self.snapshot() as view:
+            return catalog_duplicates(view, threshold or DEFAULT_THRESHOLD)
+    
+    def display_duplicate_books(self, threshold=None):
+        """
+        Display clusters of near-duplicate titles
+        
+        Args:
+            threshold (float, optional): Estimated similarity to match
+        """
+        from .dedup import display_clusters
+        display_clusters(self.find_duplicate_books(threshold))
+    
+    def memory_report(self):
+        """
+        Break down this library's memory use by component
+        
+        Counts Book and Borrower objects, loan records, the shared value
+        tables and every index and attachment, each object once, with
+        sys.getsizeof. When tracemalloc is tracing, traced bytes per source
+        file are included as well.
+        
+        Returns:
+            dict: Component name -> bytes, plus 'total' (see memory.library_memory)
+        """
+        from .memory import library_memory
+        return library_memory(self)
+    
+    def display_memory_report(self):
+        """
+        Display this library's memory use by component
+        """
+        from .memory import display_memory_report
+        display_memory_report(self.memory_report())
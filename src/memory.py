@@ -0,0 +1,253 @@
+"""
+Memory accounting for Library Management System
+Breaks a Library's footprint down by component and projects it to larger catalogs
+
+Usage:
+    python -m src.memory --books 1000000 --borrowers 200000 [--sample 20000] [--loans-per-borrower 2]
+"""
+
+import argparse
+import sys
+import tracemalloc
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+from .copies import BRANCHES
+from .encoding import AUTHORS, GENRES
+
+
+PACKAGE = __package__  # Objects of this package's classes are traversed
+
+_CONTAINERS = (dict, list, tuple, set, frozenset, deque)
+_OPAQUE = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def deep_sizeof(obj, seen):
+    """
+    Measure an object and everything it owns with sys.getsizeof
+
+    Builtin containers and objects of this package are traversed; other
+    objects (files, locks, threads) count only their own size. Objects
+    whose id is already in seen are skipped, so measuring components one
+    after another with the same set attributes shared objects to the
+    first component that reached them.
+
+    Args:
+        obj: Object to measure
+        seen (set): ids of objects already counted (updated in place)
+
+    Returns:
+        int: Bytes
+    """
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _OPAQUE):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, _CONTAINERS):
+            stack.extend(current)
+        elif type(current).__module__.startswith(PACKAGE + '.'):
+            if hasattr(current, '__dict__'):
+                stack.append(current.__dict__)
+            for name in getattr(type(current), '__slots__', ()):
+                if hasattr(current, name):
+                    stack.append(getattr(current, name))
+    return total
+
+
+def library_memory(library):
+    """
+    Break a Library's memory down by component
+
+    Components are measured in order (books, loans, borrowers, shared
+    value tables, indexes, snapshot versions, attachments); each object is
+    counted once, in the first component that owns it, so an index is
+    charged only for its own structure and not for the books it points to.
+    Key filters are counted by their tables' size_in_bytes(), and the
+    shared inventory by its counters' map plus its shared memory block.
+
+    Args:
+        library (Library): Library to measure
+
+    Returns:
+        dict: Component name -> bytes (plus 'total'); if tracemalloc is
+            tracing, 'tracemalloc' holds traced bytes per source file
+    """
+    seen = set()
+    report = {}
+
+    # Entity lists are charged to their component, not to a container line
+    report['books'] = sum(deep_sizeof(book, seen) for book in library.books)
+    report['loan records'] = sum(deep_sizeof(borrower.get_borrowed_books(), seen)
+                                 for borrower in library.borrowers)
+    report['borrowers'] = sum(deep_sizeof(borrower, seen) for borrower in library.borrowers)
+    report['book/borrower lists'] = (deep_sizeof(library.books, seen) +
+                                     deep_sizeof(library.borrowers, seen))
+    report['author/genre/branch tables'] = sum(deep_sizeof(table, seen)
+                                               for table in (AUTHORS, GENRES, BRANCHES))
+
+    report['index: isbn lookup'] = deep_sizeof(library._books_by_key, seen)
+    report['index: catalog positions'] = deep_sizeof(library._catalog_positions, seen)
+    report['index: member lookup'] = deep_sizeof(library._borrowers_by_id, seen)
+    for field, index in library._sorted_books.items():
+        report[f'index: sorted {field}'] = deep_sizeof(index, seen)
+    report['index: sorted borrower name'] = deep_sizeof(library._sorted_borrowers, seen)
+    report['index: borrower name tokens'] = deep_sizeof(library._borrower_tokens, seen)
+    report['index: borrower contact'] = deep_sizeof(library._borrowers_by_contact, seen)
+    for field, suggester in library._suggesters.items():
+        report[f'index: autocomplete {field}'] = deep_sizeof(suggester, seen)
+    report['index: borrow counts'] = (deep_sizeof(library._borrow_counts, seen)
+                                      + deep_sizeof(library._author_borrow_counts, seen))
+    report['index: loan due dates'] = deep_sizeof(library._due_dates, seen)
+    report['snapshot versions'] = deep_sizeof(library.versions, seen)
+
+    for name in ('analytics', 'changelog', 'history', 'checkpoints', 'search_index'):
+        attachment = getattr(library, name, None)
+        if attachment is not None:
+            report[f'attached: {name}'] = deep_sizeof(attachment, seen)
+    if library.key_filters is not None:
+        report['attached: key_filters'] = sum(key_filter.size_in_bytes()
+                                              for key_filter in library.key_filters.filters.values())
+    if library.inventory is not None:
+        report['attached: inventory'] = (deep_sizeof(library.inventory, seen)
+                                         + library.inventory.size_in_bytes())
+
+    report['total'] = sum(report.values())
+
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        report['tracemalloc'] = {stat.traceback[0].filename: stat.size
+                                 for stat in snapshot.statistics('filename')[:10]}
+    return report
+
+
+def format_bytes(size):
+    """Format a byte count for display"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(size) < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size:.0f} B"
+        size /= 1024
+
+
+def display_memory_report(report, title="MEMORY REPORT"):
+    """
+    Display a memory breakdown
+
+    Args:
+        report (dict): Output of library_memory (or a projection)
+        title (str): Banner title
+    """
+    total = report['total'] or 1
+    print("\n" + "=" * 80)
+    print(f"💾 {title}")
+    print("=" * 80)
+    for name, size in report.items():
+        if name in ('total', 'tracemalloc'):
+            continue
+        print(f"{name:<36}{format_bytes(size):>14}{size / total:>9.1%}")
+    print("-" * 80)
+    print(f"{'Total':<36}{format_bytes(report['total']):>14}")
+
+    if report.get('tracemalloc'):
+        print("\nTraced allocations by file (tracemalloc):")
+        for filename, size in report['tracemalloc'].items():
+            print(f"  {format_bytes(size):>12}  {filename}")
+    print("=" * 80 + "\n")
+
+
+# ==================== PROJECTION ====================
+
+def build_sample(books, borrowers, loans_per_borrower=0, copies=3):
+    """
+    Build a generated Library of a given size
+
+    Args:
+        books (int): Number of books
+        borrowers (int): Number of borrowers
+        loans_per_borrower (int): Loans opened per borrower
+        copies (int): Copies per book
+
+    Returns:
+        Library: Populated quiet Library
+    """
+    from .workload import build_library, member_id
+    from .isbn import make_isbn13
+
+    model = {'titles': books, 'borrowers': borrowers, 'copies': copies,
+             'authors': max(1, books // 10), 'genres': 12}
+    library = build_library({'model': model})
+    for i in range(borrowers):
+        for j in range(loans_per_borrower):
+            library.borrow_book(member_id(i), make_isbn13((i * loans_per_borrower + j) % books))
+    return library
+
+
+def project(books, borrowers, sample=20000, loans_per_borrower=0, copies=3):
+    """
+    Project the memory footprint of a catalog from two generated samples
+
+    Two libraries with the target's book:borrower ratio are built at
+    sample and 2 * sample books. Each component (and the tracemalloc
+    total) is fitted as fixed + per-item cost and extrapolated linearly.
+
+    Args:
+        books (int): Target number of books
+        borrowers (int): Target number of borrowers
+        sample (int): Books in the smaller sample
+        loans_per_borrower (int): Loans per borrower
+        copies (int): Copies per book
+
+    Returns:
+        tuple: (projected component dict, traced total bytes projected)
+    """
+    ratio = borrowers / books if books else 0
+    points = []
+    for size in (sample, 2 * sample):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        library = build_sample(size, max(1, round(size * ratio)), loans_per_borrower, copies)
+        traced = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        points.append((size, library_memory(library), traced))
+        del library
+
+    (x1, small, traced1), (x2, large, traced2) = points
+
+    def extrapolate(y1, y2):
+        slope = (y2 - y1) / (x2 - x1)
+        return max(0, round(y1 + slope * (books - x1)))
+
+    projected = {name: extrapolate(small[name], large.get(name, small[name]))
+                 for name in small if name not in ('total', 'tracemalloc')}
+    projected['total'] = sum(projected.values())
+    return projected, extrapolate(traced1, traced2)
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(prog='python -m src.memory',
+                                     description="Project Library memory for a catalog size")
+    parser.add_argument('--books', type=int, required=True, help="target number of books")
+    parser.add_argument('--borrowers', type=int, required=True, help="target number of borrowers")
+    parser.add_argument('--sample', type=int, default=20000, help="books in the smaller sample")
+    parser.add_argument('--loans-per-borrower', type=int, default=0)
+    parser.add_argument('--copies', type=int, default=3, help="copies per book")
+    args = parser.parse_args(argv)
+
+    projected, traced = project(args.books, args.borrowers, args.sample,
+                                args.loans_per_borrower, args.copies)
+    display_memory_report(projected, f"PROJECTED MEMORY - {args.books} books, "
+                                     f"{args.borrowers} borrowers")
+    print(f"Projected traced allocations (tracemalloc): {format_bytes(traced)}")
+    print("Measured with sys.getsizeof; interpreter and allocator overhead is not included.\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,585 @@
+"""
+Overdue notifications for Library Management System
+Batched asynchronous pipeline that reminds borrowers of overdue and soon-due loans
+
+Usage:
+    python -m src.notifications --changelog FILE --outbox DIR [--concurrency N] [--rate N] [--due-within DAYS]
+    python -m src.notifications --demo 20000 --simulate [--latency 0.05] [--failure-rate 0.02]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from .workload import percentile
+
+
+DEFAULT_CONCURRENCY = 100  # Notices in flight at once
+DEFAULT_RETRIES = 3        # Extra attempts after a transient failure
+DEFAULT_BACKOFF = 0.5      # Seconds before the first retry (doubled per attempt)
+DEFAULT_DUE_WITHIN = 2     # Days ahead that count as "due soon"
+SENDER = "library@localhost"
+
+
+class TransientError(Exception):
+    """A send failed in a way worth retrying (timeouts, 4xx replies, dropped connections)"""
+
+
+# ==================== NOTICES ====================
+
+class Notice:
+    """
+    Reminder to one borrower about all of their overdue and soon-due loans
+
+    Attributes:
+        membership_id (str): Borrower's membership ID
+        name (str): Borrower's name
+        contact (str): Email address or phone number
+        overdue (list): (title, isbn, barcode, due_date, days overdue) tuples
+        due_soon (list): (title, isbn, barcode, due_date, days left) tuples
+    """
+
+    def __init__(self, membership_id, name, contact):
+        """Initialize an empty Notice"""
+        self.membership_id = membership_id
+        self.name = name
+        self.contact = contact
+        self.overdue = []
+        self.due_soon = []
+
+    @property
+    def loans(self):
+        """Number of loans the notice covers"""
+        return len(self.overdue) + len(self.due_soon)
+
+    def subject(self):
+        """Subject line"""
+        if self.overdue:
+            return f"Library notice: {len(self.overdue)} overdue item(s)"
+        return f"Library reminder: {len(self.due_soon)} item(s) due soon"
+
+    def body(self):
+        """Plain-text message listing every loan"""
+        lines = [f"Dear {self.name},", ""]
+        if self.overdue:
+            lines.append("The following items are overdue:")
+            for title, isbn, barcode, due_date, days in self.overdue:
+                lines.append(f"  - {title} (ISBN {isbn}{', copy ' + barcode if barcode else ''}), "
+                             f"due {due_date.strftime('%Y-%m-%d')}, {days} day(s) overdue")
+            lines.append("")
+        if self.due_soon:
+            lines.append("The following items are due soon:")
+            for title, isbn, barcode, due_date, days in self.due_soon:
+                lines.append(f"  - {title} (ISBN {isbn}), due {due_date.strftime('%Y-%m-%d')} "
+                             f"(in {days} day(s))")
+            lines.append("")
+        lines.append(f"Membership ID: {self.membership_id}")
+        return "\n".join(lines)
+
+    def to_email(self, sender=SENDER):
+        """Build the notice as an email message"""
+        message = EmailMessage()
+        message['From'] = sender
+        message['To'] = self.contact
+        message['Subject'] = self.subject()
+        message.set_content(self.body())
+        return message
+
+
+def collect_notices(library, due_within=DEFAULT_DUE_WITHIN, current_date=None):
+    """
+    Group overdue and soon-due loans into one notice per borrower
+
+    Loans are read from a snapshot, so collecting never blocks checkouts.
+
+    Args:
+        library (Library): Library to read
+        due_within (int): Loans due within this many days get a reminder
+        current_date (datetime, optional): Now (defaults to the library's clock)
+
+    Returns:
+        list: Notice objects, borrowers with overdue loans first
+    """
+    notices = []
+    with library.snapshot() as view:
+        if current_date is None:
+            current_date = view.clock()
+        horizon = current_date + timedelta(days=due_within)
+        for borrower in view.iter_borrowers():
+            notice = None
+            for record in borrower.get_borrowed_books():
+                due_date = record['due_date']
+                if due_date > horizon:
+                    continue
+                if notice is None:
+                    notice = Notice(borrower.get_membership_id(), borrower.get_name(),
+                                    borrower.get_contact())
+                book = record['book']
+                item = (book.get_title(), book.get_isbn(), record.get('barcode'), due_date)
+                if due_date < current_date:
+                    notice.overdue.append(item + ((current_date - due_date).days,))
+                else:
+                    notice.due_soon.append(item + ((due_date - current_date).days,))
+            if notice is not None:
+                notices.append(notice)
+    notices.sort(key=lambda notice: not notice.overdue)
+    return notices
+
+
+# ==================== TRANSPORTS ====================
+
+class Transport:
+    """
+    Delivery channel for notices
+
+    Subclasses implement send(); it raises TransientError for failures worth
+    retrying and any other exception for permanent ones.
+    """
+
+    async def send(self, notice):
+        """Deliver one notice"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Release connections and files"""
+
+
+class FileTransport(Transport):
+    """
+    Local stand-in for a mail server: writes each notice as an .eml file
+
+    Attributes:
+        directory (str): Outbox directory
+    """
+
+    def __init__(self, directory, sender=SENDER):
+        """
+        Initialize a FileTransport
+
+        Args:
+            directory (str): Outbox directory (created if needed)
+            sender (str): From address
+        """
+        self.directory = directory
+        self.sender = sender
+        os.makedirs(directory, exist_ok=True)
+
+    def _write(self, notice):
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        path = os.path.join(self.directory, f"{stamp}-{notice.membership_id}.eml")
+        with open(path, 'wb') as f:
+            f.write(notice.to_email(self.sender).as_bytes())
+
+    async def send(self, notice):
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, notice)
+        except OSError as e:
+            raise TransientError(str(e)) from e
+
+
+class SMTPTransport(Transport):
+    """
+    Sends notices through an SMTP server (e.g. a local relay)
+
+    smtplib is blocking, so sends run on a thread pool with one connection
+    per thread, reused across notices.
+    """
+
+    def __init__(self, host='localhost', port=25, sender=SENDER, threads=8, timeout=30):
+        """
+        Initialize an SMTPTransport
+
+        Args:
+            host (str): SMTP server host
+            port (int): SMTP server port
+            sender (str): From address
+            threads (int): Connections (and sending threads)
+            timeout (float): Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _send(self, notice):
+        try:
+            self._connection().send_message(notice.to_email(self.sender))
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+            self._local.connection = None
+            raise TransientError(str(e)) from e
+        except smtplib.SMTPResponseException as e:
+            if 400 <= e.smtp_code < 500:
+                raise TransientError(str(e)) from e
+            raise
+
+    async def send(self, notice):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._send, notice)
+
+    async def close(self):
+        for connection in self._connections:
+            try:
+                connection.quit()
+            except smtplib.SMTPException:
+                pass
+        self._executor.shutdown(wait=False)
+
+
+class SimulatedTransport(Transport):
+    """
+    Stand-in with a fixed per-send latency and a random transient failure rate
+
+    Useful for sizing concurrency and rate limits without a mail server.
+
+    Attributes:
+        delivered (int): Notices delivered
+    """
+
+    def __init__(self, latency=0.05, failure_rate=0.0, seed=None):
+        """
+        Initialize a SimulatedTransport
+
+        Args:
+            latency (float): Seconds per send
+            failure_rate (float): Probability that a send fails transiently
+            seed (int, optional): Random seed
+        """
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.delivered = 0
+        self._random = random.Random(seed)
+
+    async def send(self, notice):
+        await asyncio.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise TransientError("simulated temporary failure")
+        self.delivered += 1
+
+
+# ==================== PIPELINE ====================
+
+class RateLimiter:
+    """
+    Token bucket: at most `rate` sends per second, with bursts of up to `burst`
+    """
+
+    def __init__(self, rate, burst=None):
+        """
+        Initialize a RateLimiter
+
+        Args:
+            rate (float): Sustained sends per second
+            burst (int, optional): Bucket size (defaults to one second's worth)
+        """
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for a token"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class NotificationRun:
+    """
+    Outcome and throughput of one pipeline run
+
+    Attributes:
+        started (datetime): Start of the run
+        elapsed (float): Wall time in seconds
+        notices (int): Notices queued
+        loans (int): Loans the notices covered
+        sent (int): Notices delivered
+        failed (list): (membership_id, error) of notices given up on
+        retries (int): Retry attempts made
+        latencies (list): Seconds from first attempt to delivery, ascending
+    """
+
+    def __init__(self, started, elapsed, notices, loans, sent, failed, retries, latencies):
+        """Initialize a NotificationRun"""
+        self.started = started
+        self.elapsed = elapsed
+        self.notices = notices
+        self.loans = loans
+        self.sent = sent
+        self.failed = failed
+        self.retries = retries
+        self.latencies = sorted(latencies)
+
+    @property
+    def throughput(self):
+        """Delivered notices per second"""
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self):
+        """Summary of the run as a JSON-serializable dict"""
+        return {
+            'started': self.started.isoformat(),
+            'elapsed_s': round(self.elapsed, 3),
+            'notices': self.notices,
+            'loans': self.loans,
+            'sent': self.sent,
+            'failed': len(self.failed),
+            'retries': self.retries,
+            'throughput_per_s': round(self.throughput, 1),
+            'p50_ms': round(percentile(self.latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(self.latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(self.latencies, 99) * 1000, 1),
+        }
+
+    def display(self):
+        """Display the run summary"""
+        summary = self.to_dict()
+        print("\n" + "=" * 80)
+        print("📨 OVERDUE NOTIFICATION RUN")
+        print("=" * 80)
+        print(f"Notices: {summary['notices']} ({summary['loans']} loans) | "
+              f"Sent: {summary['sent']} | Failed: {summary['failed']} | Retries: {summary['retries']}")
+        print(f"Elapsed: {summary['elapsed_s']:.2f}s | Throughput: {summary['throughput_per_s']:.0f} notices/s")
+        print(f"Delivery latency: p50 {summary['p50_ms']:.0f} ms | p95 {summary['p95_ms']:.0f} ms | "
+              f"p99 {summary['p99_ms']:.0f} ms")
+        for membership_id, error in self.failed[:10]:
+            print(f"  ❌ {membership_id}: {error}")
+        if len(self.failed) > 10:
+            print(f"  ... and {len(self.failed) - 10} more")
+        print("=" * 80 + "\n")
+
+
+class NotificationPipeline:
+    """
+    Sends notices through a transport with bounded concurrency, rate limiting and retries
+
+    A fixed pool of worker tasks drains a queue of notices, so at most
+    `concurrency` sends are in flight. Every send first takes a rate-limiter
+    token. Transient failures are retried with exponential backoff and
+    jitter; a worker waiting out a backoff does not hold up the others.
+    """
+
+    def __init__(self, transport, concurrency=DEFAULT_CONCURRENCY, rate=None,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, stats_path=None):
+        """
+        Initialize a NotificationPipeline
+
+        Args:
+            transport (Transport): Delivery channel
+            concurrency (int): Maximum sends in flight
+            rate (float, optional): Maximum sends per second (unlimited if None)
+            retries (int): Retries after a transient failure
+            backoff (float): Delay before the first retry in seconds
+            stats_path (str, optional): JSON Lines file each run's summary is appended to
+        """
+        self.transport = transport
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self.stats_path = stats_path
+
+    async def _deliver(self, notice, limiter, counters):
+        """Send one notice, retrying transient failures; returns an error or None"""
+        for attempt in range(self.retries + 1):
+            if limiter is not None:
+                await limiter.acquire()
+            try:
+                await self.transport.send(notice)
+                return None
+            except TransientError as e:
+                if attempt == self.retries:
+                    return f"gave up after {attempt + 1} attempts: {e}"
+                counters['retries'] += 1
+                delay = self.backoff * (2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            except Exception as e:
+                return f"{type(e).__name__}: {e}"
+
+    async def run(self, notices):
+        """
+        Send every notice
+
+        Args:
+            notices (list): Notice objects
+
+        Returns:
+            NotificationRun: Outcome and throughput of the run
+        """
+        started = datetime.now()
+        start = time.perf_counter()
+        queue = asyncio.Queue()
+        for notice in notices:
+            queue.put_nowait(notice)
+        limiter = RateLimiter(self.rate) if self.rate else None
+        counters = {'sent': 0, 'retries': 0}
+        failed = []
+        latencies = []
+
+        async def worker():
+            while True:
+                try:
+                    notice = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                began = time.perf_counter()
+                error = await self._deliver(notice, limiter, counters)
+                if error is None:
+                    counters['sent'] += 1
+                    latencies.append(time.perf_counter() - began)
+                else:
+                    failed.append((notice.membership_id, error))
+
+        workers = min(self.concurrency, len(notices)) or 1
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            await self.transport.close()
+
+        result = NotificationRun(started, time.perf_counter() - start, len(notices),
+                                 sum(notice.loans for notice in notices), counters['sent'],
+                                 failed, counters['retries'], latencies)
+        if self.stats_path:
+            record_run(result, self.stats_path)
+        return result
+
+
+def record_run(result, path):
+    """Append a run summary to a JSON Lines stats file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(result.to_dict()) + "\n")
+
+
+def send_notifications(library, transport, due_within=DEFAULT_DUE_WITHIN, notices=None, **options):
+    """
+    Collect and send notices for a library (blocks until the run is done)
+
+    Args:
+        library (Library): Library to read loans from
+        transport (Transport): Delivery channel
+        due_within (int): Days ahead that count as due soon
+        notices (list, optional): Notices already collected (skips collect_notices)
+        **options: NotificationPipeline options (concurrency, rate, retries, backoff, stats_path)
+
+    Returns:
+        NotificationRun: Outcome of the run
+    """
+    if notices is None:
+        notices = collect_notices(library, due_within)
+    return asyncio.run(NotificationPipeline(transport, **options).run(notices))
+
+
+def send_in_background(library, transport, due_within=DEFAULT_DUE_WITHIN, notices=None, **options):
+    """
+    Run send_notifications on a background thread so the desk keeps working
+
+    Returns:
+        concurrent.futures.Future: Resolves to the NotificationRun
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notifications')
+    future = executor.submit(send_notifications, library, transport, due_within, notices, **options)
+    executor.shutdown(wait=False)
+    return future
+
+
+# ==================== COMMAND LINE ====================
+
+def build_demo(borrowers, loans_per_borrower=2, current_date=None):
+    """Build a generated library where every borrower has overdue or soon-due loans"""
+    from .workload import build_library, member_id
+    from .isbn import make_isbn13
+
+    if current_date is None:
+        current_date = datetime.now()
+    titles = max(100, borrowers * loans_per_borrower // 2)
+    library = build_library({'model': {'titles': titles, 'borrowers': borrowers, 'copies': 3,
+                                       'authors': max(1, titles // 10), 'genres': 12}})
+    rng = random.Random(7)
+    for i in range(borrowers):
+        borrower = library.find_borrower_by_id(member_id(i))
+        for j in range(loans_per_borrower):
+            book, barcode = library.checkout_copy(make_isbn13((i * loans_per_borrower + j) % titles))
+            if book is None:
+                continue
+            due_date = current_date + timedelta(days=rng.randint(-20, 1))
+            library.record_loan(borrower, book, due_date - timedelta(days=14), due_date, barcode)
+    return library
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(prog='python -m src.notifications',
+                                     description="Send overdue and due-soon notices")
+    transport = parser.add_mutually_exclusive_group(required=True)
+    transport.add_argument('--outbox', help="write notices as .eml files to this directory")
+    transport.add_argument('--smtp', metavar='HOST[:PORT]', help="send notices through an SMTP server")
+    transport.add_argument('--simulate', action='store_true',
+                           help="deliver nowhere, only simulating latency and failures")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--changelog', metavar='FILE',
+                        help="rebuild the library from a change log (JSON Lines) and notify its borrowers")
+    source.add_argument('--demo', type=int, metavar='BORROWERS',
+                        help="generate a library with this many borrowers to notify")
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="simulated seconds per send (with --simulate)")
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help="simulated transient failure rate (with --simulate)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--rate', type=float, help="maximum sends per second")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES)
+    parser.add_argument('--due-within', type=int, default=DEFAULT_DUE_WITHIN)
+    parser.add_argument('--stats', help="append the run summary to this JSON Lines file")
+    args = parser.parse_args(argv)
+
+    if args.changelog:
+        from .changelog import LibraryReplica
+        replica = LibraryReplica(args.changelog)
+        replica.poll()
+        library = replica.library
+    else:
+        library = build_demo(args.demo)
+
+    if args.smtp:
+        host, _, port = args.smtp.partition(':')
+        transport = SMTPTransport(host, int(port or 25))
+    elif args.outbox:
+        transport = FileTransport(args.outbox)
+    else:
+        transport = SimulatedTransport(args.latency, args.failure_rate)
+
+    result = send_notifications(library, transport, args.due_within, concurrency=args.concurrency,
+                                rate=args.rate, retries=args.retries, stats_path=args.stats)
+    result.display()
+
+
+if __name__ == '__main__':
+    main()
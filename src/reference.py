@@ -0,0 +1,670 @@
+"""
+Reference engine for Library Management System
+Plain list-based Library with linear scans, the executable specification optimized engines are checked against
+
+Every query walks the books or borrowers list and every result is computed
+from scratch, so there is no index, cache or counter that can drift out of
+sync. The engine keeps its own book, copy and borrower records and states
+its own ISBN, barcode, contact and word rules rather than importing the
+production helpers, so a bug in one of those cannot pass by being on both
+sides. The harness (src/harness.py) runs the same random operations
+against this engine and a candidate (the indexed Library, a federation, a
+new storage backend) and reports the first result or state that differs.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+
+LOAN_PERIOD_DAYS = 14
+BOOK_SORT_FIELDS = ('title', 'author', 'genre')
+SUGGEST_FIELDS = ('title', 'author')
+FACET_TOP = 10
+# Quantity facet buckets: (lowest quantity, label), the last one open-ended
+QUANTITY_BUCKETS = ((0, "0"), (1, "1"), (2, "2"), (3, "3-5"), (6, "6-10"), (11, "11+"))
+
+
+# ==================== RULES ====================
+
+def isbn_key(text):
+    """
+    Canonical integer key of an ISBN-10 or ISBN-13, or None if it is invalid
+
+    Spaces and hyphens are ignored and a trailing 'x' counts as 'X'. An
+    ISBN-10 gets the key of its 978-prefixed ISBN-13, so both spellings of
+    a book are the same book.
+    """
+    digits = "".join(ch for ch in str(text).strip() if ch not in " -").upper()
+    if len(digits) == 10:
+        if not digits[:9].isdigit() or not (digits[9].isdigit() or digits[9] == 'X'):
+            return None
+        values = [int(ch) for ch in digits[:9]] + [10 if digits[9] == 'X' else int(digits[9])]
+        if sum(weight * value for weight, value in zip(range(10, 0, -1), values)) % 11:
+            return None
+        digits = "978" + digits[:9]
+        return int(digits + str(-sum(int(ch) * (1, 3)[i % 2] for i, ch in enumerate(digits)) % 10))
+    if len(digits) == 13 and digits.isdigit():
+        if sum(int(ch) * (1, 3)[i % 2] for i, ch in enumerate(digits)) % 10:
+            return None
+        return int(digits)
+    return None
+
+
+def split_barcode(barcode):
+    """Split "<13-digit ISBN>-C<n>" into (ISBN text, copy number from 1), or (None, None)"""
+    prefix, marker, number = str(barcode).strip().rpartition('-C')
+    if not marker or not prefix or not number.isdigit() or int(number) < 1:
+        return None, None
+    return prefix, int(number)
+
+
+def words_of(text):
+    """Lowercase words (runs of letters, digits and underscores)"""
+    return re.findall(r"\w+", text.lower())
+
+
+def contact_key(contact):
+    """Emails compare trimmed and lowercase, phone numbers by their digits alone"""
+    contact = contact.strip().lower()
+    if '@' in contact:
+        return contact
+    digits = "".join(ch for ch in contact if ch in "0123456789")
+    return digits or contact
+
+
+def looks_like_contact(query):
+    """A query is a contact if it has an '@', or no letters and at least five digits"""
+    if '@' in query:
+        return True
+    return not any(ch.isalpha() for ch in query) and sum(ch in "0123456789" for ch in query) >= 5
+
+
+# ==================== RECORDS ====================
+
+class ReferenceBook:
+    """
+    A title and its copies, kept as a plain list of copy state names
+
+    Copy i has barcode "<ISBN-13>-C<i+1>" (four digits at least); states
+    are 'available', 'on_loan', 'damaged', 'lost' and 'withdrawn'.
+    """
+
+    def __init__(self, title, author, isbn, genre, quantity=0):
+        """Initialize a ReferenceBook with `quantity` copies on the shelf"""
+        self.title = title
+        self.author = author
+        self.isbn = isbn
+        self.genre = genre
+        self.key = isbn_key(isbn)
+        self.states = ['available'] * max(quantity, 0)
+
+    def get_title(self):
+        """Get book title"""
+        return self.title
+
+    def get_author(self):
+        """Get book author"""
+        return self.author
+
+    def get_isbn(self):
+        """Get the ISBN as it was entered"""
+        return self.isbn
+
+    def get_isbn_key(self):
+        """Get canonical integer ISBN key"""
+        return self.key
+
+    def get_genre(self):
+        """Get book genre"""
+        return self.genre
+
+    def get_quantity(self):
+        """Get number of copies on the shelf"""
+        return self.states.count('available')
+
+    def is_available(self):
+        """Check if any copy is on the shelf"""
+        return 'available' in self.states
+
+    def copy_states(self):
+        """State names of the copies, in barcode order"""
+        return list(self.states)
+
+    def barcode(self, index):
+        """Barcode of copy `index` (0-based)"""
+        return f"{self.key:013d}-C{index + 1:04d}"
+
+    def set_quantity(self, quantity):
+        """Add copies, or withdraw the highest-numbered ones on the shelf, to reach a shelf count"""
+        available = self.get_quantity()
+        if quantity > available:
+            self.states.extend(['available'] * (quantity - available))
+        for index in range(len(self.states) - 1, -1, -1):
+            if available <= quantity:
+                break
+            if self.states[index] == 'available':
+                self.states[index] = 'withdrawn'
+                available -= 1
+
+    def copy(self):
+        """Independent copy of the record (for snapshots)"""
+        book = ReferenceBook(self.title, self.author, self.isbn, self.genre)
+        book.states = list(self.states)
+        return book
+
+    def __str__(self):
+        """Listing row"""
+        quantity = self.get_quantity()
+        status = "Available" if quantity > 0 else "Not Available"
+        return (f"[ISBN: {self.isbn}] {self.title} by {self.author} | Genre: {self.genre} | "
+                f"Quantity: {quantity} | Status: {status}")
+
+
+class ReferenceBorrower:
+    """A member and their loans, kept as a list of loan record dicts"""
+
+    def __init__(self, name, contact, membership_id):
+        """Initialize a ReferenceBorrower without loans"""
+        self.name = name
+        self.contact = contact
+        self.membership_id = membership_id
+        self.loans = []
+
+    def get_name(self):
+        """Get borrower name"""
+        return self.name
+
+    def get_contact(self):
+        """Get borrower contact"""
+        return self.contact
+
+    def get_membership_id(self):
+        """Get membership ID"""
+        return self.membership_id
+
+    def get_borrowed_books(self):
+        """Get loan records"""
+        return self.loans
+
+    def has_borrowed_books(self):
+        """Check if the borrower has any loans"""
+        return bool(self.loans)
+
+    def copy(self, books):
+        """Independent copy of the record; loans point at copies of their books (shared via books)"""
+        borrower = ReferenceBorrower(self.name, self.contact, self.membership_id)
+        for record in self.loans:
+            book = books.get(id(record['book']))
+            if book is None:
+                book = books[id(record['book'])] = record['book'].copy()
+            borrower.loans.append(dict(record, book=book))
+        return borrower
+
+    def __str__(self):
+        """Listing row"""
+        return (f"[ID: {self.membership_id}] {self.name} | Contact: {self.contact} | "
+                f"Borrowed Books: {len(self.loans)}")
+
+
+class ReferenceLibrary:
+    """
+    List-based Library with the same public methods and results as Library
+
+    Status messages are not printed; methods return what Library's return.
+    Books and borrowers passed in are read through their getters and kept
+    as the engine's own records.
+
+    Attributes:
+        books (list): ReferenceBook records in catalog order
+        borrowers (list): ReferenceBorrower records in registration order
+        clock (callable): Returns the current time
+    """
+
+    def __init__(self, clock=None):
+        """
+        Initialize an empty ReferenceLibrary
+
+        Args:
+            clock (callable, optional): Returns the current time (defaults to datetime.now)
+        """
+        self.books = []
+        self.borrowers = []
+        self.clock = clock or datetime.now
+        self._borrow_counts = {}  # ISBN key -> loans ever made (title suggestion ranking)
+        self._author_counts = {}  # Lowercase author -> loans ever made (author suggestion ranking)
+
+    # ==================== BOOKS ====================
+
+    def add_book(self, book):
+        """Add a book; False if its ISBN is invalid or already in the catalog"""
+        record = ReferenceBook(book.get_title(), book.get_author(), book.get_isbn(),
+                               book.get_genre(), book.get_quantity())
+        if record.key is None or self.find_book_by_isbn(record.isbn) is not None:
+            return False
+        self.books.append(record)
+        return True
+
+    def remove_book(self, isbn):
+        """Remove a book by ISBN; False if not found"""
+        book = self.find_book_by_isbn(isbn)
+        if book is None:
+            return False
+        self.books.remove(book)
+        return True
+
+    def update_book(self, isbn, title=None, author=None, genre=None, quantity=None):
+        """Update a book's details by ISBN; False if not found or the quantity is negative"""
+        if quantity is not None and quantity < 0:
+            return False
+        book = self.find_book_by_isbn(isbn)
+        if book is None:
+            return False
+        if title:
+            book.title = title
+        if author:
+            book.author = author
+        if genre:
+            book.genre = genre
+        if quantity is not None:
+            book.set_quantity(quantity)
+        return True
+
+    def find_book_by_isbn(self, isbn):
+        """Find a book by any ISBN-10/13 spelling"""
+        key = isbn_key(isbn)
+        if key is None:
+            return None
+        for book in self.books:
+            if book.key == key:
+                return book
+        return None
+
+    def find_book_by_barcode(self, barcode):
+        """Find the book a copy barcode belongs to (its ISBN part must be the 13-digit form)"""
+        prefix, number = split_barcode(barcode)
+        book = self.find_book_by_isbn(prefix) if prefix else None
+        if book is None or prefix != f"{book.key:013d}" or number > len(book.states):
+            return None
+        return book
+
+    def get_total_books(self):
+        """Number of titles"""
+        return len(self.books)
+
+    def get_total_copies(self):
+        """Number of copies on the shelf"""
+        return sum(book.get_quantity() for book in self.books)
+
+    # ==================== BORROWERS ====================
+
+    def add_borrower(self, borrower):
+        """Register a borrower; False if the membership ID is taken"""
+        if self.find_borrower_by_id(borrower.get_membership_id()) is not None:
+            return False
+        self.borrowers.append(ReferenceBorrower(borrower.get_name(), borrower.get_contact(),
+                                                borrower.get_membership_id()))
+        return True
+
+    def remove_borrower(self, membership_id):
+        """Remove a borrower without loans; False if not found or still borrowing"""
+        borrower = self.find_borrower_by_id(membership_id)
+        if borrower is None or borrower.loans:
+            return False
+        self.borrowers.remove(borrower)
+        return True
+
+    def update_borrower(self, membership_id, name=None, contact=None):
+        """Update a borrower's name or contact; False if not found"""
+        borrower = self.find_borrower_by_id(membership_id)
+        if borrower is None:
+            return False
+        if name:
+            borrower.name = name
+        if contact:
+            borrower.contact = contact
+        return True
+
+    def find_borrower_by_id(self, membership_id):
+        """Find a borrower by membership ID"""
+        for borrower in self.borrowers:
+            if borrower.membership_id == membership_id:
+                return borrower
+        return None
+
+    @staticmethod
+    def _by_name(borrowers):
+        """Sort borrowers alphabetically by name, then membership ID"""
+        return sorted(borrowers, key=lambda b: (b.name.lower(), b.membership_id))
+
+    def find_borrowers_by_name(self, name):
+        """Borrowers whose name has a word starting with every query word"""
+        words = set(words_of(name))
+        if not words:
+            return []
+        matches = []
+        for borrower in self.borrowers:
+            name_words = words_of(borrower.name)
+            if all(any(token.startswith(word) for token in name_words) for word in words):
+                matches.append(borrower)
+        return self._by_name(matches)
+
+    def find_borrowers_by_contact(self, contact):
+        """Borrowers whose normalized contact equals the query's"""
+        wanted = contact_key(contact)
+        return self._by_name(b for b in self.borrowers if contact_key(b.contact) == wanted)
+
+    def search_borrowers(self, query):
+        """Search by contact when the query looks like one, else by name"""
+        if looks_like_contact(query):
+            return self.find_borrowers_by_contact(query)
+        return self.find_borrowers_by_name(query)
+
+    def get_total_borrowers(self):
+        """Number of registered borrowers"""
+        return len(self.borrowers)
+
+    # ==================== LOANS ====================
+
+    def find_loan(self, borrower, isbn, barcode=None):
+        """A borrower's first loan record for a book (and copy), or None"""
+        key = isbn_key(isbn)
+        for record in borrower.loans:
+            if record['book'].key == key and barcode in (None, record['barcode']):
+                return record
+        return None
+
+    def borrow_book(self, membership_id, isbn):
+        """Lend the lowest-numbered copy on the shelf for LOAN_PERIOD_DAYS"""
+        borrower = self.find_borrower_by_id(membership_id)
+        book = self.find_book_by_isbn(isbn) if borrower else None
+        if book is None or not book.is_available():
+            return False
+        index = book.states.index('available')
+        book.states[index] = 'on_loan'
+        borrow_date = self.clock()
+        borrower.loans.append({'book': book, 'borrow_date': borrow_date,
+                               'due_date': borrow_date + timedelta(days=LOAN_PERIOD_DAYS),
+                               'barcode': book.barcode(index)})
+        author = book.author.lower()
+        self._borrow_counts[book.key] = self._borrow_counts.get(book.key, 0) + 1
+        self._author_counts[author] = self._author_counts.get(author, 0) + 1
+        return True
+
+    def return_book(self, membership_id, isbn=None, barcode=None):
+        """Return a borrowed book (by ISBN, barcode or both)"""
+        borrower = self.find_borrower_by_id(membership_id)
+        if borrower is None:
+            return False
+        book = self.find_book_by_barcode(barcode) if isbn is None else self.find_book_by_isbn(isbn)
+        if book is None:
+            return False
+        record = self.find_loan(borrower, book.isbn if isbn is None else isbn, barcode)
+        if record is None:
+            return False
+        # The copy goes back on the shelf of the title now in the catalog, if that copy is out
+        _, number = split_barcode(record['barcode'])
+        if number <= len(book.states) and book.states[number - 1] == 'on_loan':
+            book.states[number - 1] = 'available'
+        borrower.loans = [loan for loan in borrower.loans if loan is not record]
+        return True
+
+    def iter_overdue_records(self, current_date=None):
+        """Yield (borrower, loan record, days overdue) for every loan past its due date"""
+        if current_date is None:
+            current_date = self.clock()
+        for borrower in self.borrowers:
+            for record in borrower.loans:
+                if current_date > record['due_date']:
+                    yield borrower, record, (current_date - record['due_date']).days
+
+    def next_available(self, isbn, current_date=None):
+        """Now if a copy is on the shelf, else the earliest due date of a loan of the book"""
+        key = isbn_key(isbn)
+        book = self.find_book_by_isbn(isbn)
+        if book is not None and book.is_available():
+            return current_date or self.clock()
+        dues = [record['due_date'] for borrower in self.borrowers
+                for record in borrower.loans if record['book'].key == key]
+        return min(dues) if dues else None
+
+    # ==================== SEARCH ====================
+
+    def find_books(self, title=None, author=None, genre=None, sort_by=None):
+        """
+        Books whose title, author and genre contain the given terms (case-insensitive),
+        in catalog order or alphabetically by a field (then ISBN)
+        """
+        if sort_by is not None and sort_by not in BOOK_SORT_FIELDS:
+            raise ValueError(f"Cannot sort books by '{sort_by}'. Use one of: {', '.join(BOOK_SORT_FIELDS)}")
+        books = [book for book in self.books
+                 if (not title or title.lower() in book.title.lower())
+                 and (not author or author.lower() in book.author.lower())
+                 and (not genre or genre.lower() in book.genre.lower())]
+        if sort_by is not None:
+            books.sort(key=lambda book: (getattr(book, sort_by).lower(), book.key))
+        return books
+
+    def search_by_title(self, title):
+        """Books with the term in their title"""
+        return self.find_books(title=title)
+
+    def search_by_author(self, author):
+        """Books with the term in their author"""
+        return self.find_books(author=author)
+
+    def search_by_genre(self, genre):
+        """Books with the term in their genre"""
+        return self.find_books(genre=genre)
+
+    def search_by_isbn(self, isbn):
+        """The book with an ISBN, or None"""
+        return self.find_book_by_isbn(isbn)
+
+    def advanced_search(self, title=None, author=None, genre=None):
+        """Books matching every given criterion"""
+        return self.find_books(title, author, genre)
+
+    def search_with_availability(self, search_type, query):
+        """Search one field by name ([] for an unknown field)"""
+        if search_type not in ('title', 'author', 'genre'):
+            return []
+        return self.find_books(**{search_type: query})
+
+    def faceted_search(self, title=None, author=None, genre=None, top=FACET_TOP):
+        """Matching books with availability, genre, author and quantity-bucket counts"""
+        books = self.find_books(title, author, genre)
+        available = sum(1 for book in books if book.is_available())
+        genres, authors = {}, {}
+        for book in books:
+            genres[book.genre] = genres.get(book.genre, 0) + 1
+            authors[book.author] = authors.get(book.author, 0) + 1
+        order = lambda entry: (-entry[1], entry[0].lower(), entry[0])
+        lows = [low for low, _ in QUANTITY_BUCKETS] + [float('inf')]
+        quantity = [(label, sum(1 for book in books if lows[i] <= book.get_quantity() < lows[i + 1]))
+                    for i, (_, label) in enumerate(QUANTITY_BUCKETS)]
+        return {
+            'books': books,
+            'facets': {
+                'availability': {'available': available, 'unavailable': len(books) - available},
+                'genre': sorted(genres.items(), key=order)[:top],
+                'author': sorted(authors.items(), key=order)[:top],
+                'quantity': quantity,
+                'genres': len(genres),
+                'authors': len(authors),
+            },
+        }
+
+    def iter_available_books(self):
+        """Books with a copy on the shelf, in catalog order"""
+        return (book for book in self.books if book.is_available())
+
+    def iter_unavailable_books(self):
+        """Books with no copy on the shelf, in catalog order"""
+        return (book for book in self.books if not book.is_available())
+
+    def get_available_books(self):
+        """List of books with a copy on the shelf"""
+        return list(self.iter_available_books())
+
+    def get_unavailable_books(self):
+        """List of books with no copy on the shelf"""
+        return list(self.iter_unavailable_books())
+
+    def suggest(self, prefix, field='title', k=10):
+        """
+        Autocomplete a partial title or author name
+
+        The last word of the prefix starts any word of the entry, earlier
+        words must be whole words of it; entries rank by loans ever made,
+        then alphabetically, and repeated display strings are shown once.
+        """
+        if field not in SUGGEST_FIELDS:
+            raise ValueError(f"Cannot suggest '{field}'. Use one of: {', '.join(SUGGEST_FIELDS)}")
+        words = words_of(prefix)
+        if not words:
+            return []
+        *required, last = words
+
+        entries = {}  # key -> (display, score)
+        for book in self.books:
+            if field == 'title':
+                entries[book.key] = (book.title, self._borrow_counts.get(book.key, 0))
+            else:
+                key = book.author.lower()
+                entries.setdefault(key, (book.author, self._author_counts.get(key, 0)))
+
+        ranked = []
+        for key, (display, score) in entries.items():
+            entry_words = set(words_of(display))
+            if set(required) <= entry_words and any(word.startswith(last) for word in entry_words):
+                ranked.append((-score, display.lower(), key, display))
+        results = []
+        for *_, display in sorted(ranked):
+            if display not in results:
+                results.append(display)
+        return results[:k]
+
+    # ==================== SORTED LISTINGS ====================
+
+    def _sorted_books(self, field):
+        """Books as (lowercase field value, ISBN key, book), in sorted order"""
+        if field not in BOOK_SORT_FIELDS:
+            raise ValueError(f"Cannot sort books by '{field}'. Use one of: {', '.join(BOOK_SORT_FIELDS)}")
+        return sorted(((getattr(book, field).lower(), book.key, book) for book in self.books),
+                      key=lambda entry: entry[:2])
+
+    def get_books_sorted(self, field='title', page=1, page_size=20):
+        """One page of books in alphabetical order of a field"""
+        start = (page - 1) * page_size
+        return [book for *_, book in self._sorted_books(field)[start:start + page_size]]
+
+    def get_books_in_range(self, field, start, end):
+        """Books whose field falls alphabetically from one prefix through another (inclusive)"""
+        start, end = start.lower(), end.lower()
+        return [book for value, _, book in self._sorted_books(field)
+                if value >= start and (value <= end or value.startswith(end))]
+
+    def get_borrowers_sorted(self, page=1, page_size=20):
+        """One page of borrowers in alphabetical order of name"""
+        start = (page - 1) * page_size
+        return self._by_name(self.borrowers)[start:start + page_size]
+
+    # ==================== SNAPSHOTS AND REPORTS ====================
+
+    def snapshot(self):
+        """Copy the catalog, borrowers and loans as they are now"""
+        return ReferenceSnapshot(self)
+
+    @staticmethod
+    def _print_listing(banner, items, empty):
+        """Print numbered listing rows under a banner, or the empty message"""
+        if not items:
+            print(empty)
+            return
+        print("\n" + "=" * 80)
+        print(banner)
+        print("=" * 80)
+        for number, item in enumerate(items, 1):
+            print(f"{number}. {item}")
+        print("=" * 80 + "\n")
+
+    def display_all_books(self):
+        """Print every book"""
+        self._print_listing("📚 ALL BOOKS IN LIBRARY", self.books, "📚 No books in the library yet.")
+
+    def display_all_borrowers(self):
+        """Print every borrower"""
+        self._print_listing("👥 ALL REGISTERED BORROWERS", self.borrowers, "👥 No borrowers registered yet.")
+
+    def display_available_books(self):
+        """Print the books with a copy on the shelf"""
+        self._print_listing("📗 AVAILABLE BOOKS FOR BORROWING", self.get_available_books(),
+                            "\n📚 No books currently available for borrowing.")
+
+    def display_unavailable_books(self):
+        """Print the books with no copy on the shelf"""
+        self._print_listing("📕 UNAVAILABLE BOOKS (All copies borrowed)", self.get_unavailable_books(),
+                            "\n✅ All books have available copies!")
+
+    def display_library_stats(self):
+        """Print the title, shelf copy and borrower totals"""
+        print("\n" + "=" * 60)
+        print("📊 LIBRARY STATISTICS")
+        print("=" * 60)
+        print(f"Total Books (Unique): {self.get_total_books()}")
+        print(f"Total Copies: {self.get_total_copies()}")
+        print(f"Total Registered Borrowers: {self.get_total_borrowers()}")
+        print("=" * 60 + "\n")
+
+    def check_overdue_books(self):
+        """Print every overdue loan"""
+        print("\n" + "=" * 80)
+        print("⚠️  OVERDUE BOOKS REPORT")
+        print("=" * 80)
+        overdue = list(self.iter_overdue_records())
+        for borrower, record, days_overdue in overdue:
+            book = record['book']
+            print(f"\n📕 Book: {book.title} (ISBN: {book.isbn})")
+            print(f"   Borrower: {borrower.name} (ID: {borrower.membership_id})")
+            print(f"   Borrow Date: {record['borrow_date'].strftime('%Y-%m-%d')}")
+            print(f"   Due Date: {record['due_date'].strftime('%Y-%m-%d')}")
+            print(f"   Days Overdue: {days_overdue} day(s)")
+            print(f"   Contact: {borrower.contact}")
+        if not overdue:
+            print("\n✅ No overdue books! All borrowers are on time.")
+        print("=" * 80 + "\n")
+
+
+class ReferenceSnapshot(ReferenceLibrary):
+    """
+    Read-only view of a ReferenceLibrary: a copy of every record, taken at once
+
+    Isolation holds by construction, which is what Library's versioned
+    snapshots are checked against.
+    """
+
+    def __init__(self, library):
+        """Copy a library's books, borrowers and loans"""
+        super().__init__(library.clock)
+        books = {}
+        for book in library.books:
+            books[id(book)] = book.copy()
+            self.books.append(books[id(book)])
+        self.borrowers = [borrower.copy(books) for borrower in library.borrowers]
+
+    def iter_books(self):
+        """Iterate over the copied books"""
+        return iter(self.books)
+
+    def iter_borrowers(self):
+        """Iterate over the copied borrowers"""
+        return iter(self.borrowers)
+
+    def release(self):
+        """Nothing to release (kept for the snapshot interface)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
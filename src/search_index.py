@@ -0,0 +1,643 @@
+"""
+Persistent search index for Library Management System
+Trigram index over title, author and genre, kept in immutable segment files opened with mmap
+
+Layout of the index directory:
+    manifest.json       Live segments and the next generation number
+    seg-*.idx           Immutable segment files (see Segment)
+    tombstones.bin      Deleted or replaced documents, as (ISBN key, generation) records
+"""
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+
+
+MANIFEST_FILE = 'manifest.json'
+TOMBSTONE_FILE = 'tombstones.bin'
+
+MAGIC = b'LIBSEG01'
+# magic, generation, documents, terms, then byte offsets of keys, fingerprints, dictionary, terms, postings
+HEADER = struct.Struct('<8s8q')
+# term offset, term length, postings offset, postings count
+DICT_ENTRY = struct.Struct('<QIQI')
+TOMBSTONE = struct.Struct('<qq')
+
+FIELD_PREFIXES = {'title': 't', 'author': 'a', 'genre': 'g'}
+GRAM = 3
+
+DEFAULT_FLUSH_DOCS = 1000
+DEFAULT_FLUSH_INTERVAL = 30.0  # Seconds a change may wait in the memory segment
+DEFAULT_MERGE_FACTOR = 4
+
+
+def _little_endian(values):
+    """Return an array in little-endian byte order (the on-disk order)"""
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def _read_array(typecode, data):
+    """Read a little-endian array from bytes"""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def trigrams(text):
+    """
+    Get the trigrams of a text (lowercased)
+
+    Every substring of at least three characters contains all of its own
+    trigrams, so intersecting trigram postings finds every document the
+    substring could match.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        set: Distinct three-character strings (empty for shorter texts)
+    """
+    text = text.lower()
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+def document_terms(title, author, genre):
+    """
+    Get the index terms of a book: its trigrams prefixed with their field
+
+    Returns:
+        set: Encoded terms (bytes)
+    """
+    terms = set()
+    for prefix, text in (('t', title), ('a', author), ('g', genre)):
+        terms.update((prefix + gram).encode('utf-8') for gram in trigrams(text))
+    return terms
+
+
+def document_fingerprint(title, author, genre):
+    """
+    Get a checksum of the indexed fields of a book
+
+    Used when a library attaches an existing index, to re-index only books
+    whose fields changed since the index was written.
+
+    Returns:
+        int: CRC-32 of the fields
+    """
+    return zlib.crc32('\x1f'.join((title, author, genre)).encode('utf-8'))
+
+
+class Segment:
+    """
+    Immutable segment file mapped read-only into memory
+
+    A segment holds the sorted ISBN keys of its documents (a document's
+    ordinal is its position in that table), their fingerprints, a sorted
+    term dictionary and, per term, the ordinals of the documents containing
+    it. Terms are found by binary search directly over the mapped file and
+    only the postings of the query's terms are read.
+
+    Attributes:
+        path (str): Segment file
+        generation (int): Generation the segment was written at
+        keys (array): Sorted ISBN keys (ordinal -> key)
+        fingerprints (array): Document fingerprints by ordinal
+        term_count (int): Distinct terms in the segment
+    """
+
+    def __init__(self, path):
+        """
+        Map a segment file
+
+        Args:
+            path (str): Segment file written by Segment.write
+
+        Raises:
+            ValueError: If the file is not a segment
+        """
+        self.path = path
+        with open(path, 'rb') as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.generation, documents, self.term_count, keys_at, fingerprints_at,
+         self._dictionary_at, self._terms_at, self._postings_at) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a search index segment")
+        self.keys = _read_array('q', self._map[keys_at:keys_at + 8 * documents])
+        self.fingerprints = _read_array('I', self._map[fingerprints_at:fingerprints_at + 4 * documents])
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def size(self):
+        """Size of the segment file in bytes"""
+        return len(self._map)
+
+    def _entry(self, position):
+        """Read a dictionary entry: (term, postings offset, postings count)"""
+        term_at, length, postings_at, count = DICT_ENTRY.unpack_from(
+            self._map, self._dictionary_at + position * DICT_ENTRY.size)
+        start = self._terms_at + term_at
+        return self._map[start:start + length], postings_at, count
+
+    def lookup(self, term):
+        """
+        Find a term in the dictionary (binary search over the mapped file)
+
+        Args:
+            term (bytes): Encoded term
+
+        Returns:
+            tuple or None: (postings offset, postings count), None if absent
+        """
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < term:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count:
+            found, postings_at, count = self._entry(low)
+            if found == term:
+                return postings_at, count
+        return None
+
+    def postings(self, postings_at, count):
+        """Read the document ordinals of a term"""
+        start = self._postings_at + postings_at
+        return _read_array('I', self._map[start:start + 4 * count])
+
+    def terms(self):
+        """Iterate over (term, postings offset, postings count) in term order"""
+        for position in range(self.term_count):
+            yield self._entry(position)
+
+    def ordinal(self, key):
+        """Get the ordinal of a key, or None if the segment doesn't hold it"""
+        position = bisect_left(self.keys, key)
+        if position < len(self.keys) and self.keys[position] == key:
+            return position
+        return None
+
+    def close(self):
+        """Unmap the segment"""
+        self._map.close()
+
+    @staticmethod
+    def write(path, generation, keys, fingerprints, postings):
+        """
+        Write a segment file (atomically, through a temporary file)
+
+        Args:
+            path (str): Destination file
+            generation (int): Generation of the segment
+            keys (array): Sorted ISBN keys ('q')
+            fingerprints (array): Fingerprints in key order ('I')
+            postings (iterable): (term, sorted ordinals array 'I') in term order
+        """
+        dictionary, terms, blobs = [], [], []
+        term_bytes = postings_bytes = 0
+        for term, ordinals in postings:
+            dictionary.append(DICT_ENTRY.pack(term_bytes, len(term), postings_bytes, len(ordinals)))
+            terms.append(term)
+            blobs.append(_little_endian(ordinals).tobytes())
+            term_bytes += len(term)
+            postings_bytes += 4 * len(ordinals)
+
+        keys_at = HEADER.size
+        fingerprints_at = keys_at + 8 * len(keys)
+        dictionary_at = fingerprints_at + 4 * len(keys)
+        terms_at = dictionary_at + DICT_ENTRY.size * len(dictionary)
+        postings_at = terms_at + term_bytes
+
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as handle:
+            handle.write(HEADER.pack(MAGIC, generation, len(keys), len(dictionary), keys_at,
+                                     fingerprints_at, dictionary_at, terms_at, postings_at))
+            handle.write(_little_endian(keys).tobytes())
+            handle.write(_little_endian(fingerprints).tobytes())
+            handle.write(b''.join(dictionary))
+            handle.write(b''.join(terms))
+            handle.write(b''.join(blobs))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, path)
+
+
+class SearchIndex:
+    """
+    Persistent trigram index over book titles, authors and genres
+
+    Documents are keyed by canonical ISBN key. Changes go to a small
+    in-memory segment that is written out as a new immutable segment file
+    once it holds flush_docs changes or its oldest change is flush_interval
+    seconds old (checked on every change), and on flush()/close().
+    Removing or replacing a document already on disk records a tombstone
+    (key, generation): a document in a segment of generation g is live
+    only if its key has no tombstone newer than g. When merge_factor
+    segments have accumulated, a background thread merges the smallest of
+    them into one, dropping dead documents, and swaps it in atomically
+    through the manifest.
+
+    Queries are substring searches: the trigrams of the query are looked up
+    in every segment and their postings intersected, which gives a superset
+    of the matches that the caller verifies against the real text. Queries
+    shorter than three characters can't use the index.
+
+    Attributes:
+        directory (str): Directory holding the index files
+        flush_docs (int): Changes buffered before the memory segment is flushed
+        flush_interval (float): Seconds before buffered changes are flushed
+        merge_factor (int): Segment count that triggers a merge
+        background (bool): Merge in a background thread (False merges inline)
+    """
+
+    def __init__(self, directory, flush_docs=DEFAULT_FLUSH_DOCS, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 merge_factor=DEFAULT_MERGE_FACTOR, background=True):
+        """
+        Open an index, creating the directory if needed
+
+        Segment files are mapped, not read; files left behind by an
+        interrupted flush or merge are removed.
+
+        Args:
+            directory (str): Index directory
+            flush_docs (int): Changes buffered before a flush
+            flush_interval (float): Seconds before buffered changes are flushed
+            merge_factor (int): Segment count that triggers a merge (at least 2)
+            background (bool): Merge in a background thread
+        """
+        self.directory = directory
+        self.flush_docs = flush_docs
+        self.flush_interval = flush_interval
+        self.merge_factor = max(2, merge_factor)
+        self.background = background
+        self._lock = threading.RLock()
+        self._merger = None
+        self._segments = []
+        self._tombstones = {}          # ISBN key -> generation of the latest delete
+        self._pending_tombstones = []  # (key, generation) not yet written
+        self._memory = {}              # ISBN key -> (fingerprint, terms)
+        self._memory_postings = {}     # term -> set of ISBN keys
+        self._dirty_since = None
+        os.makedirs(directory, exist_ok=True)
+        self._open()
+
+    # ==================== FILES ====================
+
+    def _path(self, name):
+        """Get the path of a file in the index directory"""
+        return os.path.join(self.directory, name)
+
+    def _open(self):
+        """Load the manifest, map its segments and load the tombstones"""
+        manifest = {'next_generation': 1, 'next_file': 1, 'segments': []}
+        if os.path.exists(self._path(MANIFEST_FILE)):
+            with open(self._path(MANIFEST_FILE), 'r', encoding='utf-8') as handle:
+                manifest = json.load(handle)
+        self._generation = manifest['next_generation']  # Generation of the memory segment
+        self._next_file = manifest['next_file']
+        self._segments = [Segment(self._path(name)) for name in manifest['segments']]
+
+        live = set(manifest['segments']) | {MANIFEST_FILE, TOMBSTONE_FILE}
+        for name in os.listdir(self.directory):
+            if name not in live and (name.startswith('seg-') or name.endswith('.tmp')):
+                os.remove(self._path(name))
+
+        if os.path.exists(self._path(TOMBSTONE_FILE)):
+            with open(self._path(TOMBSTONE_FILE), 'rb') as handle:
+                data = handle.read()
+            records = _read_array('q', data[:len(data) - len(data) % TOMBSTONE.size])
+            for i in range(0, len(records), 2):
+                # Records from a flush whose manifest was never written don't count
+                if records[i + 1] < self._generation:
+                    self._tombstones[records[i]] = records[i + 1]
+
+    def _write_manifest(self):
+        """Atomically replace the manifest with the current segment list"""
+        manifest = {
+            'version': 1,
+            'next_generation': self._generation,
+            'next_file': self._next_file,
+            'segments': [os.path.basename(segment.path) for segment in self._segments],
+        }
+        temporary = self._path(MANIFEST_FILE + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as handle:
+            json.dump(manifest, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self._path(MANIFEST_FILE))
+
+    def _new_segment_path(self, generation):
+        """Reserve a file name for a new segment"""
+        name = f"seg-{generation:08d}-{self._next_file:06d}.idx"
+        self._next_file += 1
+        return self._path(name)
+
+    # ==================== CHANGES ====================
+
+    def _is_live(self, key, segment):
+        """Check whether a segment's copy of a document is still current"""
+        return self._tombstones.get(key, -1) <= segment.generation
+
+    def _on_disk(self, key):
+        """Check whether a live copy of a document is in a segment file"""
+        return any(segment.ordinal(key) is not None and self._is_live(key, segment)
+                   for segment in self._segments)
+
+    def _drop_from_memory(self, key):
+        """Remove a document from the memory segment"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            for term in entry[1]:
+                keys = self._memory_postings[term]
+                keys.discard(key)
+                if not keys:
+                    del self._memory_postings[term]
+
+    def _tombstone(self, key):
+        """Mark the on-disk copy of a document as deleted"""
+        if self._on_disk(key):
+            self._tombstones[key] = self._generation
+            self._pending_tombstones.append((key, self._generation))
+
+    def _changed(self):
+        """Flush the memory segment if it is large or old enough"""
+        now = time.monotonic()
+        if self._dirty_since is None:
+            self._dirty_since = now
+        if (len(self._memory) + len(self._pending_tombstones) >= self.flush_docs
+                or now - self._dirty_since >= self.flush_interval):
+            self.flush()
+
+    def add(self, key, title, author, genre):
+        """
+        Index a book, replacing any earlier version of it
+
+        Args:
+            key (int): Canonical ISBN key
+            title (str): Title
+            author (str): Author
+            genre (str): Genre
+        """
+        with self._lock:
+            self._drop_from_memory(key)
+            self._tombstone(key)
+            terms = document_terms(title, author, genre)
+            self._memory[key] = (document_fingerprint(title, author, genre), terms)
+            for term in terms:
+                self._memory_postings.setdefault(term, set()).add(key)
+            self._changed()
+
+    def remove(self, key):
+        """
+        Remove a book from the index
+
+        Args:
+            key (int): Canonical ISBN key
+        """
+        with self._lock:
+            self._drop_from_memory(key)
+            self._tombstone(key)
+            self._changed()
+
+    def flush(self):
+        """
+        Write the memory segment and pending tombstones to disk
+
+        The segment file is written first, then the tombstones, then the
+        manifest that makes both visible; an interrupted flush leaves the
+        previous state.
+        """
+        with self._lock:
+            if not self._memory and not self._pending_tombstones:
+                return
+            if self._memory:
+                keys = array('q', sorted(self._memory))
+                ordinal_of = {key: ordinal for ordinal, key in enumerate(keys)}
+                fingerprints = array('I', (self._memory[key][0] for key in keys))
+                postings = ((term, array('I', sorted(ordinal_of[key] for key in self._memory_postings[term])))
+                            for term in sorted(self._memory_postings))
+                path = self._new_segment_path(self._generation)
+                Segment.write(path, self._generation, keys, fingerprints, postings)
+                self._segments.append(Segment(path))
+            if self._pending_tombstones:
+                records = array('q', (value for record in self._pending_tombstones for value in record))
+                with open(self._path(TOMBSTONE_FILE), 'ab') as handle:
+                    handle.write(_little_endian(records).tobytes())
+            self._generation += 1
+            self._write_manifest()
+            self._memory, self._memory_postings = {}, {}
+            self._pending_tombstones = []
+            self._dirty_since = None
+            if len(self._segments) >= self.merge_factor:
+                self.merge(wait=not self.background)
+
+    # ==================== MERGING ====================
+
+    def merge(self, wait=True, everything=False):
+        """
+        Merge segments into one
+
+        Args:
+            wait (bool): Merge in this thread (False starts a background
+                merge unless one is already running)
+            everything (bool): Merge all segments instead of the
+                merge_factor smallest
+        """
+        if wait:
+            self.wait_for_merges()
+            self._merge(everything)
+            return
+        with self._lock:
+            if self._merger is not None and self._merger.is_alive():
+                return
+            self._merger = threading.Thread(target=self._merge, args=(everything,),
+                                            name='search-index-merge', daemon=True)
+            self._merger.start()
+
+    def wait_for_merges(self):
+        """Block until a running background merge has finished"""
+        merger = self._merger
+        if merger is not None and merger is not threading.current_thread():
+            merger.join()
+
+    def _merge(self, everything=False):
+        """Merge the chosen segments and swap the result in"""
+        with self._lock:
+            segments = sorted(self._segments, key=len)
+            sources = segments if everything else segments[:self.merge_factor]
+            if len(sources) < 2 and not (sources and everything):
+                return
+            generation = max(segment.generation for segment in sources)
+            path = self._new_segment_path(generation)
+
+        # Live documents of the sources, renumbered in key order
+        live = []
+        for segment in sources:
+            for ordinal, key in enumerate(segment.keys):
+                if self._is_live(key, segment):
+                    live.append((key, segment.fingerprints[ordinal]))
+        live.sort()
+        keys = array('q', (key for key, _ in live))
+        fingerprints = array('I', (fingerprint for _, fingerprint in live))
+        remaps = []
+        for segment in sources:
+            remap = array('i', [-1]) * len(segment)
+            for ordinal, key in enumerate(segment.keys):
+                if self._is_live(key, segment):
+                    remap[ordinal] = bisect_left(keys, key)
+            remaps.append(remap)
+
+        def merged_postings():
+            def stream(n):
+                return ((term, n, at, count) for term, at, count in sources[n].terms())
+
+            streams = [stream(n) for n in range(len(sources))]
+            current, ordinals = None, []
+            for term, n, at, count in heapq.merge(*streams):
+                if term != current:
+                    if ordinals:
+                        yield current, array('I', sorted(ordinals))
+                    current, ordinals = term, []
+                remap = remaps[n]
+                ordinals.extend(o for o in (remap[old] for old in sources[n].postings(at, count)) if o >= 0)
+            if ordinals:
+                yield current, array('I', sorted(ordinals))
+
+        if keys:
+            Segment.write(path, generation, keys, fingerprints, merged_postings())
+
+        with self._lock:
+            self._segments = [segment for segment in self._segments if segment not in sources]
+            if keys:
+                self._segments.append(Segment(path))
+                self._segments.sort(key=lambda segment: segment.generation)
+            self._write_manifest()
+            self._prune_tombstones()
+        for segment in sources:
+            segment.close()
+            os.remove(segment.path)
+
+    def _prune_tombstones(self):
+        """Drop tombstones older than every segment (they can no longer hide anything)"""
+        oldest = min((segment.generation for segment in self._segments), default=self._generation)
+        stale = [key for key, generation in self._tombstones.items() if generation <= oldest]
+        if not stale:
+            return
+        for key in stale:
+            del self._tombstones[key]
+        flushed = array('q')
+        for key, generation in self._tombstones.items():
+            if generation < self._generation:
+                flushed.extend((key, generation))
+        temporary = self._path(TOMBSTONE_FILE + '.tmp')
+        with open(temporary, 'wb') as handle:
+            handle.write(_little_endian(flushed).tobytes())
+        os.replace(temporary, self._path(TOMBSTONE_FILE))
+
+    # ==================== QUERIES ====================
+
+    def candidates(self, field, text, limit=None):
+        """
+        Find the books whose field may contain a text
+
+        Args:
+            field (str): 'title', 'author' or 'genre'
+            text (str): Substring to look for (case-insensitive)
+            limit (int, optional): Give up (return None) when the rarest
+                trigram alone matches more documents than this, i.e. when
+                a scan would be cheaper than the index
+
+        Returns:
+            set or None: ISBN keys of candidate books (a superset of the
+                matches), None if the text is too short for the index or
+                matches too many documents
+        """
+        prefix = FIELD_PREFIXES[field]
+        terms = [(prefix + gram).encode('utf-8') for gram in trigrams(text)]
+        if not terms:
+            return None
+        with self._lock:
+            plans, estimate = [], 0
+            for segment in self._segments:
+                located = [segment.lookup(term) for term in terms]
+                if None not in located:
+                    located.sort(key=lambda entry: entry[1])  # Rarest term first
+                    plans.append((segment, located))
+                    estimate += located[0][1]
+            postings = [self._memory_postings.get(term) for term in terms]
+            if None not in postings:
+                postings.sort(key=len)
+                estimate += len(postings[0])
+            if limit is not None and estimate > limit:
+                return None
+
+            found = set()
+            for segment, located in plans:
+                ordinals = set(segment.postings(*located[0]))
+                for entry in located[1:]:
+                    if not ordinals:
+                        break
+                    ordinals.intersection_update(segment.postings(*entry))
+                keys = segment.keys
+                found.update(key for key in map(keys.__getitem__, ordinals) if self._is_live(key, segment))
+            if None not in postings:
+                found.update(set.intersection(*postings))
+            return found
+
+    def fingerprints(self):
+        """
+        Get the fingerprint of every indexed book
+
+        Returns:
+            dict: ISBN key -> fingerprint of the indexed fields
+        """
+        with self._lock:
+            indexed = {}
+            for segment in self._segments:
+                for key, fingerprint in zip(segment.keys, segment.fingerprints):
+                    if self._is_live(key, segment):
+                        indexed[key] = fingerprint
+            indexed.update((key, entry[0]) for key, entry in self._memory.items())
+            return indexed
+
+    def stats(self):
+        """
+        Get the size of the index
+
+        Returns:
+            dict: Segment, document and tombstone counts and bytes on disk
+        """
+        with self._lock:
+            return {
+                'segments': len(self._segments),
+                'segment_documents': [len(segment) for segment in self._segments],
+                'memory_documents': len(self._memory),
+                'tombstones': len(self._tombstones),
+                'bytes': sum(segment.size for segment in self._segments),
+            }
+
+    def close(self):
+        """Flush pending changes, finish merging and unmap every segment"""
+        self.flush()
+        self.wait_for_merges()
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
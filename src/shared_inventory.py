@@ -0,0 +1,179 @@
+"""
+Shared-memory inventory for Library Management System
+Per-title available-copy counters shared by several front-desk processes
+"""
+
+from multiprocessing import Lock, resource_tracker, shared_memory
+
+
+COUNTER_SIZE = 8  # Bytes per counter (signed 64-bit)
+DEFAULT_STRIPES = 64
+
+
+class SharedInventory:
+    """
+    Available-copy counters in a shared memory block
+
+    One signed 64-bit counter per title lives in a
+    multiprocessing.shared_memory block that every process maps, so all
+    desks see the same inventory without an IPC round trip. Updates are
+    atomic per title: a counter is read and written under one of a fixed
+    set of striped locks (POSIX semaphores, no lock server), so unrelated
+    titles rarely contend.
+
+    The catalog of titles is fixed when the block is created; each
+    process maps ISBN keys to counter slots with the same table.
+
+    Attributes:
+        name (str): Shared memory block name
+        slots (dict): ISBN key -> counter index
+    """
+
+    def __init__(self, slots, name=None, locks=None, stripes=DEFAULT_STRIPES, create=True):
+        """
+        Create a new block, or attach to an existing one
+
+        Args:
+            slots (dict): ISBN key -> counter index
+            name (str, optional): Block name (required when attaching)
+            locks (list, optional): Striped locks shared with the creator
+            stripes (int): Number of striped locks to create
+            create (bool): Create the block (False attaches to `name`)
+        """
+        self.slots = slots
+        self._locks = locks if locks is not None else [Lock() for _ in range(stripes)]
+        size = max(1, len(slots)) * COUNTER_SIZE
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Only the creator owns the block; don't let this process's tracker unlink it
+            resource_tracker.unregister(self._shm._name, 'shared_memory')
+        self.name = self._shm.name
+        self._owner = create
+        self._counters = self._shm.buf.cast('q')
+
+    @classmethod
+    def from_library(cls, library, stripes=DEFAULT_STRIPES):
+        """
+        Create a block holding the available copies of every book in a library
+
+        Args:
+            library (Library): Library whose catalog and quantities to share
+            stripes (int): Number of striped locks
+
+        Returns:
+            SharedInventory: New inventory (the caller owns and must unlink it)
+        """
+        slots = {book.get_isbn_key(): index for index, book in enumerate(library.books)}
+        inventory = cls(slots, stripes=stripes)
+        for book in library.books:
+            inventory._counters[slots[book.get_isbn_key()]] = book.get_quantity()
+        return inventory
+
+    def __getstate__(self):
+        """Pickle as a handle other processes attach with"""
+        return {'slots': self.slots, 'name': self.name, 'locks': self._locks}
+
+    def __setstate__(self, state):
+        """Attach to the block described by a pickled handle"""
+        self.__init__(state['slots'], state['name'], state['locks'], create=False)
+
+    # ==================== COUNTERS ====================
+
+    def _lock_for(self, slot):
+        """Get the striped lock guarding a counter"""
+        return self._locks[slot % len(self._locks)]
+
+    def available(self, isbn_key):
+        """
+        Get the available copies of a title
+
+        Args:
+            isbn_key (int): Canonical ISBN key
+
+        Returns:
+            int or None: Available copies, None if the title is not shared
+        """
+        slot = self.slots.get(isbn_key)
+        return None if slot is None else self._counters[slot]
+
+    def try_checkout(self, isbn_key):
+        """
+        Atomically take one copy if any is available (decrement-if-positive)
+
+        Args:
+            isbn_key (int): Canonical ISBN key
+
+        Returns:
+            bool: True if a copy was taken
+        """
+        slot = self.slots.get(isbn_key)
+        if slot is None:
+            return False
+        with self._lock_for(slot):
+            if self._counters[slot] <= 0:
+                return False
+            self._counters[slot] -= 1
+            return True
+
+    def checkin(self, isbn_key):
+        """
+        Atomically put one copy back
+
+        Args:
+            isbn_key (int): Canonical ISBN key
+
+        Returns:
+            bool: True if the title is shared and was incremented
+        """
+        slot = self.slots.get(isbn_key)
+        if slot is None:
+            return False
+        with self._lock_for(slot):
+            self._counters[slot] += 1
+        return True
+
+    def set_available(self, isbn_key, count):
+        """Overwrite the available copies of a title (e.g. after a stock change)"""
+        slot = self.slots[isbn_key]
+        with self._lock_for(slot):
+            self._counters[slot] = count
+
+    def adjust_available(self, isbn_key, change):
+        """
+        Atomically add to (or take from) the available copies of a title
+
+        Unlike set_available this keeps other desks' concurrent checkouts,
+        so it is how one desk applies its own stock change.
+
+        Args:
+            isbn_key (int): Canonical ISBN key
+            change (int): Copies put on (positive) or taken off (negative) the shelf
+
+        Returns:
+            int: Available copies after the change
+        """
+        slot = self.slots[isbn_key]
+        with self._lock_for(slot):
+            self._counters[slot] += change
+            return self._counters[slot]
+
+    def size_in_bytes(self):
+        """Memory of the shared counter block"""
+        return self._shm.size
+
+    # ==================== LIFECYCLE ====================
+
+    def close(self):
+        """Unmap the block from this process"""
+        if self._counters is not None:
+            self._counters.release()
+            self._counters = None
+            self._shm.close()
+
+    def unlink(self):
+        """Destroy the block (creator only, after every process closed it)"""
+        self.close()
+        if self._owner:
+            self._shm.unlink()
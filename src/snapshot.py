@@ -0,0 +1,499 @@
+"""
+Snapshot reads for Library Management System
+Multi-version concurrency control: consistent read-only views while the library keeps changing
+"""
+
+import threading
+from contextlib import contextmanager
+
+from .book import Book
+from .borrower import Borrower
+
+
+class BookView:
+    """
+    Read-only state of a Book as of one version
+
+    Attributes mirror Book, so the Book getters and report code work on it.
+    While the Book still renders the same row, str() reuses the Book's cache.
+    """
+
+    __slots__ = ('title', 'author', 'author_code', 'isbn', 'isbn_key', 'genre', 'genre_code',
+                 'quantity', 'total_copies', 'on_loan', 'source', 'row')
+
+    def __init__(self, book):
+        """Capture the current state of a Book"""
+        self.title = book.title
+        self.author = book.author
+        self.author_code = book.author_code
+        self.isbn = book.isbn
+        self.isbn_key = book.isbn_key
+        self.genre = book.genre
+        self.genre_code = book.genre_code
+        self.quantity = book.copies.available_count()
+        self.total_copies = len(book.copies)
+        self.on_loan = book.copies.on_loan_count()
+        self.source = book
+        cached = book._row
+        self.row = cached[1] if cached is not None and cached[0] == self.quantity else None
+
+    def get_title(self):
+        """Get book title"""
+        return self.title
+
+    def get_author(self):
+        """Get book author"""
+        return self.author
+
+    def get_isbn(self):
+        """Get book ISBN"""
+        return self.isbn
+
+    def get_isbn_key(self):
+        """Get canonical integer ISBN key"""
+        return self.isbn_key
+
+    def get_genre(self):
+        """Get book genre"""
+        return self.genre
+
+    def get_quantity(self):
+        """Get number of available copies"""
+        return self.quantity
+
+    def get_total_copies(self):
+        """Get number of copy records"""
+        return self.total_copies
+
+    def is_available(self):
+        """Check if any copy was on the shelf"""
+        return self.quantity > 0
+
+    _render = Book._render
+
+    def __str__(self):
+        """Listing row as of this version"""
+        if self.row is None:
+            book = self.source
+            if book.title == self.title and book.author == self.author and book.genre == self.genre:
+                row = str(book)  # Fills the live Book's cache
+                if book._row[0] == self.quantity:
+                    self.row = row
+            if self.row is None:
+                self.row = self._render(self.quantity)
+        return self.row
+
+
+class BorrowerView:
+    """
+    Read-only state of a Borrower as of one version
+
+    Loan records hold BookViews of the same snapshot. While the Borrower
+    still renders the same row, str() reuses the Borrower's cache.
+    """
+
+    __slots__ = ('name', 'contact', 'membership_id', 'borrowed_books', 'source', 'row')
+
+    def __init__(self, name, contact, membership_id, borrowed_books, source=None):
+        """Initialize a BorrowerView (source: the Borrower it was read from)"""
+        self.name = name
+        self.contact = contact
+        self.membership_id = membership_id
+        self.borrowed_books = borrowed_books
+        self.source = source
+        self.row = None
+
+    def get_name(self):
+        """Get borrower name"""
+        return self.name
+
+    def get_contact(self):
+        """Get borrower contact"""
+        return self.contact
+
+    def get_membership_id(self):
+        """Get membership ID"""
+        return self.membership_id
+
+    def get_borrowed_books(self):
+        """Get loan records"""
+        return self.borrowed_books
+
+    def has_borrowed_books(self):
+        """Check if the borrower had any loans"""
+        return len(self.borrowed_books) > 0
+
+    _render = Borrower._render
+
+    def __str__(self):
+        """Listing row as of this version"""
+        if self.row is None:
+            borrower = self.source
+            count = len(self.borrowed_books)
+            if (borrower is not None and borrower.name == self.name and borrower.contact == self.contact
+                    and len(borrower.borrowed_books) == count):
+                self.row = str(borrower)  # Same row as the live Borrower: share its cache
+            else:
+                self.row = self._render(count)
+        return self.row
+
+
+def _capture(entity):
+    """Capture the state of a Book or Borrower as an immutable pre-image"""
+    if isinstance(entity, Book):
+        return BookView(entity)
+    loans = tuple((record['book'], record['borrow_date'], record['due_date'], record.get('barcode'))
+                  for record in entity.borrowed_books)
+    return (entity.name, entity.contact, entity.membership_id, loans)
+
+
+class VersionManager:
+    """
+    Version bookkeeping behind Library snapshots
+
+    Every committed write transaction advances the version. Before a
+    transaction changes a Book or Borrower in place, the entity's previous
+    state is kept as a pre-image; a snapshot taken at version v reads an
+    entity live if it has not changed since v, and otherwise takes the
+    pre-image valid at v. Additions and removals are versioned the same
+    way. Pre-images are dropped as soon as no open snapshot can need them.
+
+    Taking a snapshot is O(1); readers never wait for writers and writers
+    only take a short lock to publish a version. Library writes are
+    expected from one thread at a time, as before.
+
+    Attributes:
+        committed (int): Latest committed version
+    """
+
+    def __init__(self):
+        """Initialize an empty VersionManager"""
+        self.committed = 0
+        self._lock = threading.Lock()
+        self._readers = {}     # version -> number of open snapshots
+        self._depth = 0        # Nesting depth of the open write transaction
+        self._touched = set()  # ids changed by the open transaction
+        self._modified = {}    # id -> version of the entity's latest change
+        self._chains = {}      # id -> [entity, [(valid_through_version, pre-image), ...]]
+        self._created = {}     # id -> version the entity was added in
+        self._removed = {}     # id -> (entity, removed version, list position), in removal order
+
+    # ==================== WRITES ====================
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group changes into one version (nested transactions join the outer one)
+        """
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._commit()
+
+    @contextmanager
+    def changing(self, entity):
+        """Transaction that changes one Book or Borrower in place"""
+        with self.transaction():
+            self.touch(entity)
+            yield
+
+    @contextmanager
+    def adding(self, entity):
+        """Transaction that adds one Book or Borrower"""
+        with self.transaction():
+            self.added(entity)
+            yield
+
+    @contextmanager
+    def removing(self, entity, position):
+        """Transaction that removes one Book or Borrower from a list position"""
+        with self.transaction():
+            self.removed(entity, position)
+            yield
+
+    def _commit(self):
+        """Publish the open transaction's version and drop bookkeeping nobody needs"""
+        with self._lock:
+            self.committed += 1
+            if not self._readers:
+                self._forget(self._touched)
+            self._touched = set()
+
+    def touch(self, entity):
+        """
+        Record that a Book or Borrower is about to change in place
+
+        Must be called inside transaction(), before the change.
+
+        Args:
+            entity (Book or Borrower): Entity about to change
+        """
+        key = id(entity)
+        version = self.committed + 1
+        if key in self._touched or self._created.get(key) == version:
+            return
+        pre_image = _capture(entity)
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                chain = self._chains[key] = [entity, []]
+            chain[1].append((self.committed, pre_image))
+            self._touched.add(key)
+            self._modified[key] = version
+
+    def added(self, entity):
+        """Record that an entity is about to be added (inside transaction())"""
+        key = id(entity)
+        with self._lock:
+            self._created[key] = self.committed + 1
+            self._touched.add(key)
+
+    def removed(self, entity, position):
+        """Record that an entity is about to be removed from a list position (inside transaction())"""
+        key = id(entity)
+        with self._lock:
+            self._removed.pop(key, None)  # Re-insert so the dict stays in removal order
+            self._removed[key] = (entity, self.committed + 1, position)
+            self._touched.add(key)
+
+    # ==================== SNAPSHOTS ====================
+
+    def snapshot(self, library):
+        """
+        Open a snapshot of the latest committed version
+
+        Args:
+            library (Library): Library the versions belong to
+
+        Returns:
+            LibrarySnapshot: Read-only view (release it, or use it as a context manager)
+        """
+        with self._lock:
+            version = self.committed
+            self._readers[version] = self._readers.get(version, 0) + 1
+        return LibrarySnapshot(self, library, version)
+
+    def release(self, version):
+        """Close one snapshot and garbage-collect versions no reader needs"""
+        with self._lock:
+            self._readers[version] -= 1
+            if self._readers[version] == 0:
+                del self._readers[version]
+            if not self._readers:
+                self._forget(list(self._modified) + list(self._created) + list(self._removed),
+                             keep=self._touched)
+            elif version < min(self._readers):
+                self._prune(min(self._readers))
+
+    @property
+    def open_snapshots(self):
+        """Number of snapshots not yet released"""
+        return sum(self._readers.values())
+
+    @property
+    def retained_versions(self):
+        """Number of pre-images and removed entities currently kept"""
+        return sum(len(chain[1]) for chain in self._chains.values()) + len(self._removed)
+
+    def _forget(self, keys, keep=()):
+        """Drop all bookkeeping for entity ids (except those in keep)"""
+        for key in keys:
+            if key in keep:
+                continue
+            self._chains.pop(key, None)
+            self._modified.pop(key, None)
+            self._created.pop(key, None)
+            self._removed.pop(key, None)
+
+    def _prune(self, oldest):
+        """Drop pre-images and removed entities older than the oldest open snapshot"""
+        for key in list(self._chains):
+            versions = self._chains[key][1]
+            while versions and versions[0][0] < oldest:
+                versions.pop(0)
+            if not versions and key not in self._touched:
+                del self._chains[key]
+        for key, (_, removed, _) in list(self._removed.items()):
+            if removed <= oldest:
+                del self._removed[key]
+
+    # ==================== READS ====================
+
+    def visible(self, entity, version):
+        """Check whether an entity existed at a version"""
+        return self._created.get(id(entity), 0) <= version
+
+    def state(self, entity, version):
+        """
+        Get the state of an entity as of a version
+
+        Returns:
+            BookView or tuple: Live capture if unchanged since the version, else the pre-image
+        """
+        key = id(entity)
+        while True:
+            modified = self._modified.get(key, 0)
+            if modified <= version:
+                state = _capture(entity)
+                if self._modified.get(key, 0) == modified:
+                    return state
+                continue  # Changed while we read it; the pre-image is now recorded
+            chain = self._chains.get(key)
+            if chain is not None:
+                for valid_through, state in chain[1]:
+                    if valid_through >= version:
+                        return state
+            return _capture(entity)
+
+    def removed_since(self, version, kind):
+        """(entity, list position) of the entities of a type removed after a version, oldest removal first"""
+        return [(entity, position) for entity, removed, position in list(self._removed.values())
+                if isinstance(entity, kind) and version < removed]
+
+
+class LibrarySnapshot:
+    """
+    Consistent read-only view of a Library as of one committed version
+
+    Offers the read API reports use (books, borrowers, lookups, availability
+    and overdue iterators, totals). Book and Borrower states are resolved
+    lazily while the view is iterated and are not kept, so streaming a
+    report through the iterators needs constant memory.
+
+    Attributes:
+        version (int): Committed version the view reflects
+        clock (callable): The library's clock, used for "now" in overdue checks
+        inventory (SharedInventory or None): The library's shared availability, if attached
+    """
+
+    def __init__(self, manager, library, version):
+        """Initialize a LibrarySnapshot (use Library.snapshot())"""
+        self.version = version
+        self.clock = library.clock
+        self.inventory = library.inventory
+        self._manager = manager
+        self._library = library
+        self._released = False
+
+    def release(self):
+        """Close the snapshot so old versions can be garbage-collected"""
+        if not self._released:
+            self._released = True
+            self._manager.release(self.version)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+    def __del__(self):
+        self.release()
+
+    def _members(self, live, kind):
+        """Iterate over the entities of a type that existed at this version, in list order"""
+        manager = self._manager
+        members = list(live)  # References only, so later adds and removals cannot shift the walk
+        present = {id(entity) for entity in members}
+        # Undo the later removals newest first, so each position is relative to the list it was
+        # removed from. Adds only append, so they never shift a position; a removal recorded
+        # but not yet applied to the copy is the newest and its entity is still present.
+        for entity, position in reversed(manager.removed_since(self.version, kind)):
+            if id(entity) not in present:
+                members.insert(position, entity)
+                present.add(id(entity))
+        for entity in members:
+            if manager.visible(entity, self.version):
+                yield entity
+
+    def iter_books(self):
+        """Iterate over BookViews of the books in the library at this version"""
+        state = self._manager.state
+        for book in self._members(self._library.books, Book):
+            yield state(book, self.version)
+
+    def iter_borrowers(self):
+        """Iterate over BorrowerViews of the borrowers registered at this version"""
+        state = self._manager.state
+        for borrower in self._members(self._library.borrowers, Borrower):
+            name, contact, membership_id, loans = state(borrower, self.version)
+            records = [{'book': state(book, self.version), 'borrow_date': borrow_date,
+                        'due_date': due_date, 'barcode': barcode}
+                       for book, borrow_date, due_date, barcode in loans]
+            yield BorrowerView(name, contact, membership_id, records, borrower)
+
+    @property
+    def books(self):
+        """List of BookViews at this version (prefer iter_books() for streaming)"""
+        return list(self.iter_books())
+
+    @property
+    def borrowers(self):
+        """List of BorrowerViews at this version (prefer iter_borrowers() for streaming)"""
+        return list(self.iter_borrowers())
+
+    def find_book_by_isbn(self, isbn):
+        """Find a BookView by ISBN (any spelling)"""
+        from .isbn import try_isbn_key
+        key = try_isbn_key(isbn)
+        return next((book for book in self.iter_books() if book.isbn_key == key), None)
+
+    def find_borrower_by_id(self, membership_id):
+        """Find a BorrowerView by membership ID"""
+        return next((borrower for borrower in self.iter_borrowers()
+                     if borrower.membership_id == membership_id), None)
+
+    def shelf_count(self, book):
+        """
+        Get a BookView's copies on the shelf
+
+        With a shared inventory, shared titles read the live shared counter
+        (other desks change it outside this library's versions).
+        """
+        return self._library._shelf_count(book)
+
+    def iter_available_books(self):
+        """Iterate over books with a copy on the shelf"""
+        return (book for book in self.iter_books() if book.is_available())
+
+    def iter_unavailable_books(self):
+        """Iterate over books with no copy on the shelf"""
+        return (book for book in self.iter_books() if not book.is_available())
+
+    def get_available_books(self):
+        """Get list of available books"""
+        return list(self.iter_available_books())
+
+    def get_unavailable_books(self):
+        """Get list of unavailable books"""
+        return list(self.iter_unavailable_books())
+
+    def iter_overdue_records(self, current_date=None):
+        """
+        Iterate over overdue loans as of this version
+
+        Yields:
+            tuple: (BorrowerView, loan record dict, days overdue)
+        """
+        if current_date is None:
+            current_date = self.clock()
+        for borrower in self.iter_borrowers():
+            for record in borrower.borrowed_books:
+                due_date = record['due_date']
+                if current_date > due_date:
+                    yield borrower, record, (current_date - due_date).days
+
+    def get_total_books(self):
+        """Get number of unique books"""
+        return sum(1 for _ in self._members(self._library.books, Book))
+
+    def get_total_copies(self):
+        """Get number of available copies"""
+        return sum(book.quantity for book in self.iter_books())
+
+    def get_total_borrowers(self):
+        """Get number of borrowers"""
+        return sum(1 for _ in self._members(self._library.borrowers, Borrower))
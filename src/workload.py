@@ -0,0 +1,741 @@
+"""
+Workload tooling for Library Management System
+Records, generates and replays traces of Library operations and reports latency percentiles
+
+Usage:
+    python -m src.workload generate trace.jsonl [--ops N] [--rate R] [--zipf S] [--mix borrow=0.4,...]
+    python -m src.workload replay trace.jsonl [--mode open|closed] [--workers N] [--processes] [--rate R]
+    python -m src.workload sweep trace.jsonl --rates 500,1000,2000 [--slo-ms 50]
+"""
+
+import argparse
+import bisect
+import json
+import math
+import multiprocessing
+import random
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+from .book import Book
+from .borrower import Borrower
+from .changelog import book_data, borrower_data, dump_state, load_state
+from .isbn import make_isbn13
+
+
+TRACE_VERSION = 1
+
+# Library methods a trace may contain
+TRACED_METHODS = (
+    'add_book', 'update_book', 'remove_book', 'add_borrower', 'update_borrower', 'remove_borrower',
+    'borrow_book', 'return_book', 'find_books', 'find_book_by_isbn', 'suggest',
+    'search_by_title', 'search_by_author', 'search_by_genre', 'search_by_isbn', 'advanced_search',
+)
+
+# Relative arrival rate per hour of day (busy late morning and after work)
+HOURLY_PROFILE = (
+    0.05, 0.02, 0.02, 0.02, 0.02, 0.05, 0.15, 0.35, 0.6, 0.9, 1.2, 1.4,
+    1.3, 1.2, 1.1, 1.1, 1.3, 1.6, 1.7, 1.4, 1.0, 0.6, 0.3, 0.1,
+)
+
+DEFAULT_MIX = {'borrow': 0.35, 'return': 0.3, 'search': 0.3, 'suggest': 0.05}
+
+
+# ==================== TRACE FILES ====================
+
+def _encode_arg(value):
+    """Make a call argument JSON-serializable"""
+    if isinstance(value, Book):
+        return {'book': book_data(value)}
+    if isinstance(value, Borrower):
+        return {'borrower': borrower_data(value)}
+    return value
+
+
+def _decode_arg(value):
+    """Rebuild a call argument encoded by _encode_arg"""
+    if isinstance(value, dict):
+        if 'book' in value:
+            data = value['book']
+            return Book(data['title'], data['author'], data['isbn'], data['genre'], data['quantity'])
+        if 'borrower' in value:
+            data = value['borrower']
+            return Borrower(data['name'], data['contact'], data['membership_id'])
+    return value
+
+
+def write_trace(path, header, operations):
+    """
+    Write a trace file
+
+    Args:
+        path (str): Output path
+        header (dict): Trace header ('state' or 'model' describing the starting library)
+        operations (iterable): (t, op, args, kwargs) tuples, t in seconds from trace start
+
+    Returns:
+        int: Number of operations written
+    """
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(dict(header, version=TRACE_VERSION)) + "\n")
+        chunk = []
+        for t, op, args, kwargs in operations:
+            record = {'t': round(t, 6), 'op': op, 'args': [_encode_arg(arg) for arg in args]}
+            if kwargs:
+                record['kwargs'] = kwargs
+            chunk.append(json.dumps(record, ensure_ascii=False))
+            count += 1
+            if len(chunk) >= 1000:
+                f.write("\n".join(chunk) + "\n")
+                chunk = []
+        if chunk:
+            f.write("\n".join(chunk) + "\n")
+    return count
+
+
+def read_trace(path):
+    """
+    Read a trace file
+
+    Args:
+        path (str): Trace path
+
+    Returns:
+        tuple: (header dict, list of (t, op, args, kwargs) tuples)
+    """
+    with open(path, encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        operations = []
+        for line in f:
+            record = json.loads(line)
+            operations.append((record['t'], record['op'], record['args'], record.get('kwargs', {})))
+    return header, operations
+
+
+def build_library(header):
+    """
+    Build the starting Library described by a trace header
+
+    Args:
+        header (dict): Trace header
+
+    Returns:
+        Library: Quiet Library ready for replay
+    """
+    from .library import Library
+
+    library = Library(verbose=False)
+    if 'state' in header:
+        return load_state(header['state'], library)
+
+    model = header.get('model')
+    if model:
+        for i in range(model['titles']):
+            library.add_book(Book(f"Title {i}", f"Author {i % model['authors']}", make_isbn13(i),
+                                  f"Genre {i % model['genres']}", model['copies']))
+        for i in range(model['borrowers']):
+            library.add_borrower(Borrower(f"Borrower {i}", f"b{i}@example.org", member_id(i)))
+    return library
+
+
+def member_id(index):
+    """Membership ID of the index-th generated borrower"""
+    return f"M{index:06d}"
+
+
+# ==================== RECORDING ====================
+
+class TraceRecorder:
+    """
+    Record the Library operations of a live session
+
+    attach() wraps the traced methods of one Library instance so every
+    outermost call is logged with its arguments and time offset; calls a
+    traced method makes internally (e.g. search_by_title -> find_books)
+    are not logged twice. The library's state at attach time becomes the
+    trace header so the replay starts from the same catalog.
+
+    Attributes:
+        path (str): Trace file written by close()
+        operations (list): Recorded (t, op, args, kwargs) tuples
+    """
+
+    def __init__(self, path):
+        """
+        Initialize a TraceRecorder
+
+        Args:
+            path (str): Trace file to write on close()
+        """
+        self.path = path
+        self.operations = []
+        self._library = None
+        self._header = None
+        self._start = None
+        self._depth = 0
+
+    def attach(self, library):
+        """
+        Start recording a Library's operations
+
+        Args:
+            library (Library): Library to record
+        """
+        self._library = library
+        self._header = {'state': dump_state(library)}
+        self._start = time.perf_counter()
+        for name in TRACED_METHODS:
+            setattr(library, name, self._wrap(name, getattr(library, name)))
+
+    def _wrap(self, name, method):
+        """Wrap one bound method so its outermost calls are recorded"""
+        def traced(*args, **kwargs):
+            if self._depth == 0:
+                self.operations.append((time.perf_counter() - self._start, name,
+                                        [_encode_arg(arg) for arg in args], kwargs))
+            self._depth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+        return traced
+
+    def close(self):
+        """
+        Stop recording and write the trace file
+
+        Returns:
+            int: Number of operations written
+        """
+        if self._library is not None:
+            for name in TRACED_METHODS:
+                self._library.__dict__.pop(name, None)
+            self._library = None
+        return write_trace(self.path, self._header or {}, self.operations)
+
+
+# ==================== GENERATION ====================
+
+class ZipfSampler:
+    """
+    Sample ranks 0..n-1 with probability proportional to 1 / (rank + 1) ** s
+
+    Attributes:
+        n (int): Number of ranks
+        s (float): Skew exponent (0 is uniform; about 1 is typical for popularity)
+    """
+
+    def __init__(self, n, s, rng):
+        """
+        Initialize a ZipfSampler
+
+        Args:
+            n (int): Number of ranks
+            s (float): Skew exponent
+            rng (random.Random): Random source
+        """
+        self.n = n
+        self.s = s
+        self._rng = rng
+        total = 0.0
+        self._cumulative = []
+        for rank in range(n):
+            total += 1.0 / (rank + 1) ** s
+            self._cumulative.append(total)
+
+    def sample(self):
+        """Draw one rank"""
+        target = self._rng.random() * self._cumulative[-1]
+        return min(bisect.bisect_left(self._cumulative, target), self.n - 1)
+
+
+class WorkloadModel:
+    """
+    Synthetic circulation workload
+
+    Arrivals are a Poisson process whose rate follows HOURLY_PROFILE over a
+    simulated day (scaled by time_scale so a day can be replayed in
+    minutes). Titles are drawn from a Zipf distribution, borrowers
+    uniformly; returns always refer to a copy the model has lent out.
+
+    Attributes:
+        titles (int): Catalog size
+        borrowers (int): Registered borrowers
+        rate (float): Mean operations per second at profile level 1.0
+        zipf (float): Title popularity skew
+        mix (dict): Operation kind -> share ('borrow', 'return', 'search', 'suggest')
+    """
+
+    def __init__(self, titles=5000, borrowers=1000, copies=3, authors=500, genres=12,
+                 rate=200.0, zipf=1.1, mix=None, start_hour=8, time_scale=60.0, seed=42):
+        """
+        Initialize a WorkloadModel
+
+        Args:
+            titles (int): Catalog size
+            borrowers (int): Registered borrowers
+            copies (int): Copies per title
+            authors (int): Distinct authors
+            genres (int): Distinct genres
+            rate (float): Mean operations per second at profile level 1.0
+            zipf (float): Title popularity skew
+            mix (dict, optional): Operation kind -> share (defaults to DEFAULT_MIX)
+            start_hour (int): Simulated hour of day the trace starts at
+            time_scale (float): Simulated seconds per trace second
+            seed (int): Random seed
+        """
+        self.titles = titles
+        self.borrowers = borrowers
+        self.copies = copies
+        self.authors = authors
+        self.genres = genres
+        self.rate = rate
+        self.zipf = zipf
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.start_hour = start_hour
+        self.time_scale = time_scale
+        self.seed = seed
+
+    def header(self):
+        """Trace header describing the starting catalog"""
+        return {'model': {
+            'titles': self.titles, 'borrowers': self.borrowers, 'copies': self.copies,
+            'authors': self.authors, 'genres': self.genres, 'rate': self.rate,
+            'zipf': self.zipf, 'mix': self.mix, 'seed': self.seed,
+        }}
+
+    def _rate_at(self, t):
+        """Arrival rate (ops/s of trace time) at trace offset t"""
+        hour = int((self.start_hour * 3600 + t * self.time_scale) // 3600) % 24
+        return self.rate * HOURLY_PROFILE[hour]
+
+    def generate(self, count):
+        """
+        Generate operations
+
+        Args:
+            count (int): Number of operations
+
+        Yields:
+            tuple: (t, op, args, kwargs)
+        """
+        rng = random.Random(self.seed)
+        titles = ZipfSampler(self.titles, self.zipf, rng)
+        kinds = list(self.mix)
+        weights = [self.mix[kind] for kind in kinds]
+        peak = self.rate * max(HOURLY_PROFILE)
+        loans = []  # Outstanding (membership_id, isbn) pairs lent by the model
+        on_loan = defaultdict(int)
+
+        t = 0.0
+        produced = 0
+        while produced < count:
+            # Thinning: candidate arrivals at the peak rate, kept with probability rate(t) / peak
+            t += rng.expovariate(peak)
+            if rng.random() * peak > self._rate_at(t):
+                continue
+
+            kind = rng.choices(kinds, weights)[0]
+            if kind == 'return' and loans:
+                membership_id, isbn = loans.pop(rng.randrange(len(loans)))
+                on_loan[isbn] -= 1
+                yield t, 'return_book', [membership_id, isbn], {}
+            elif kind in ('borrow', 'return'):
+                isbn = make_isbn13(titles.sample())
+                membership_id = member_id(rng.randrange(self.borrowers))
+                if on_loan[isbn] < self.copies:
+                    on_loan[isbn] += 1
+                    loans.append((membership_id, isbn))
+                yield t, 'borrow_book', [membership_id, isbn], {}
+            elif kind == 'suggest':
+                title = f"Title {titles.sample()}"
+                yield t, 'suggest', [title[:rng.randint(3, len(title))]], {}
+            else:
+                index = titles.sample()
+                field = rng.choice(('title', 'author', 'genre', 'isbn'))
+                if field == 'title':
+                    yield t, 'find_books', [], {'title': f"Title {index}"}
+                elif field == 'author':
+                    yield t, 'find_books', [], {'author': f"Author {index % self.authors}"}
+                elif field == 'genre':
+                    yield t, 'find_books', [], {'genre': f"Genre {index % self.genres}"}
+                else:
+                    yield t, 'find_book_by_isbn', [make_isbn13(index)], {}
+            produced += 1
+
+
+# ==================== REPLAY ====================
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class ReplayResult:
+    """
+    Latencies and throughput of one replay run
+
+    In open-loop runs latency is measured from each operation's scheduled
+    start, so queueing behind a saturated library is included.
+
+    Attributes:
+        latencies (dict): Operation name -> list of latencies in seconds
+        errors (dict): Operation name -> number of calls that raised
+        elapsed (float): Wall time of the run in seconds
+        offered_rate (float or None): Target ops/s of an open-loop run
+    """
+
+    def __init__(self, latencies, errors, elapsed, offered_rate=None):
+        """Initialize a ReplayResult"""
+        self.latencies = latencies
+        self.errors = errors
+        self.elapsed = elapsed
+        self.offered_rate = offered_rate
+        for values in self.latencies.values():
+            values.sort()
+
+    @property
+    def operations(self):
+        """Total operations completed"""
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def throughput(self):
+        """Completed operations per second"""
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        """
+        Summarize per-operation latency
+
+        Returns:
+            dict: Operation name -> {count, errors, p50_ms, p95_ms, p99_ms, max_ms}
+        """
+        rows = {}
+        everything = sorted(value for values in self.latencies.values() for value in values)
+        for op, values in sorted(self.latencies.items()) + [('ALL', everything)]:
+            rows[op] = {
+                'count': len(values),
+                'errors': self.errors.get(op, 0) if op != 'ALL' else sum(self.errors.values()),
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'max_ms': (values[-1] if values else 0.0) * 1000,
+            }
+        return rows
+
+    def display(self):
+        """Display throughput and the latency table"""
+        print("\n" + "=" * 80)
+        print("⏱️  REPLAY RESULTS")
+        print("=" * 80)
+        offered = f" (offered {self.offered_rate:.0f} ops/s)" if self.offered_rate else ""
+        print(f"Operations: {self.operations} in {self.elapsed:.2f}s | "
+              f"Throughput: {self.throughput:.0f} ops/s{offered}\n")
+        print(f"{'Operation':<20}{'Count':>9}{'Errors':>8}{'p50 ms':>10}{'p95 ms':>10}"
+              f"{'p99 ms':>10}{'max ms':>10}")
+        for op, row in self.summary().items():
+            print(f"{op:<20}{row['count']:>9}{row['errors']:>8}{row['p50_ms']:>10.3f}"
+                  f"{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}{row['max_ms']:>10.3f}")
+        print("=" * 80 + "\n")
+
+
+def _call(library, op, args, kwargs):
+    """Invoke one traced operation on a Library"""
+    if op not in TRACED_METHODS:
+        raise ValueError(f"Operation '{op}' cannot be replayed")
+    return getattr(library, op)(*[_decode_arg(arg) for arg in args], **kwargs)
+
+
+def _run_worker(library, lock, operations, next_index, mode, schedule, think_time,
+                latencies, errors):
+    """
+    Execute operations until the shared index runs out
+
+    Args:
+        library (Library): Library to drive
+        lock (threading.Lock): Serializes Library access (it is not thread-safe)
+        operations (list): (t, op, args, kwargs) tuples
+        next_index (callable): Returns the next operation index, or None when done
+        mode (str): 'open' or 'closed'
+        schedule (list or None): Scheduled wall times (time.time()) for open-loop runs
+        think_time (float): Pause between operations in closed-loop runs
+        latencies (defaultdict): Operation name -> latency list to append to
+        errors (defaultdict): Operation name -> error count to increment
+    """
+    while True:
+        index = next_index()
+        if index is None:
+            return
+        _, op, args, kwargs = operations[index]
+        if mode == 'open':
+            start = schedule[index]
+            delay = start - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            start = time.time()
+        try:
+            with lock:
+                _call(library, op, args, kwargs)
+        except Exception:
+            errors[op] += 1
+        latencies[op].append(time.time() - start)
+        if mode == 'closed' and think_time:
+            time.sleep(think_time)
+
+
+def _replay_threads(library, operations, mode, schedule, workers, think_time):
+    """Replay with worker threads sharing one Library"""
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    counter = iter(range(len(operations)))
+    counter_lock = threading.Lock()
+
+    def next_index():
+        with counter_lock:
+            return next(counter, None)
+
+    threads = [threading.Thread(target=_run_worker,
+                                args=(library, lock, operations, next_index, mode, schedule,
+                                      think_time, latencies, errors))
+               for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def _process_worker(args):
+    """Replay one partition of a trace in a worker process against its own Library"""
+    header, operations, mode, schedule, think_time = args
+    library = build_library(header)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    indexes = iter(range(len(operations)))
+    started = time.time()
+    _run_worker(library, threading.Lock(), operations, lambda: next(indexes, None), mode,
+                schedule, think_time, latencies, errors)
+    return dict(latencies), dict(errors), started, time.time()
+
+
+def _partition(operations, parts):
+    """Split operations by borrower so each loan's borrow and return stay together"""
+    partitions = [[] for _ in range(parts)]
+    for position, operation in enumerate(operations):
+        op, args = operation[1], operation[2]
+        if op in ('borrow_book', 'return_book') and args:
+            part = zlib.crc32(str(args[0]).encode('utf-8')) % parts
+        else:
+            part = position % parts
+        partitions[part].append((position, operation))
+    return partitions
+
+
+def replay(header, operations, library=None, mode='closed', workers=1, processes=False,
+           rate=None, speed=1.0, think_time=0.0):
+    """
+    Replay a trace against a Library
+
+    Open-loop runs issue each operation at its (scaled) trace time whether
+    or not earlier ones finished, which shows queueing under overload.
+    Closed-loop runs have each worker issue its next operation as soon as
+    the previous one completes, which measures peak throughput.
+
+    With processes=True every worker process builds its own Library from
+    the header and replays the operations of its share of borrowers
+    (a shared-nothing, sharded deployment); otherwise worker threads share
+    one Library.
+
+    Args:
+        header (dict): Trace header
+        operations (list): (t, op, args, kwargs) tuples
+        library (Library, optional): Library for thread replay (built from header if omitted)
+        mode (str): 'open' or 'closed'
+        workers (int): Worker threads or processes
+        processes (bool): Use worker processes instead of threads
+        rate (float, optional): Open-loop target ops/s (rescales trace times)
+        speed (float): Open-loop time compression when rate is not given
+        think_time (float): Closed-loop pause between a worker's operations
+
+    Returns:
+        ReplayResult: Latencies and throughput
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if mode not in ('open', 'closed'):
+        raise ValueError(f"Unknown replay mode '{mode}'. Use 'open' or 'closed'")
+
+    offered = None
+    if mode == 'open' and operations:
+        duration = operations[-1][0] or 1.0
+        if rate:
+            speed = rate * duration / len(operations)
+        offered = len(operations) / (duration / speed)
+
+    if processes:
+        partitions = _partition(operations, workers)
+        start = time.time() + 0.5 + 0.02 * workers  # Let every process build its library first
+        jobs = []
+        for part in partitions:
+            part_ops = [operation for _, operation in part]
+            schedule = [start + operation[0] / speed for operation in part_ops] if mode == 'open' else None
+            jobs.append((header, part_ops, mode, schedule, think_time))
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_process_worker, jobs)
+        latencies = defaultdict(list)
+        errors = defaultdict(int)
+        for part_latencies, part_errors, _, _ in results:
+            for op, values in part_latencies.items():
+                latencies[op].extend(values)
+            for op, count in part_errors.items():
+                errors[op] += count
+        if mode == 'closed':
+            start = min(result[2] for result in results)
+        elapsed = max(result[3] for result in results) - start
+        return ReplayResult(dict(latencies), dict(errors), elapsed, offered)
+
+    if library is None:
+        library = build_library(header)
+    start = time.time()
+    schedule = None
+    if mode == 'open':
+        start += 0.05
+        schedule = [start + operation[0] / speed for operation in operations]
+    latencies, errors = _replay_threads(library, operations, mode, schedule, workers, think_time)
+    return ReplayResult(dict(latencies), dict(errors), time.time() - start, offered)
+
+
+def find_saturation(header, operations, rates, workers=1, processes=False, slo_ms=50.0,
+                    tolerance=0.9):
+    """
+    Replay open-loop at increasing rates to find where the library saturates
+
+    A rate counts as saturated when achieved throughput falls below
+    tolerance * offered rate or the overall p99 latency exceeds the SLO.
+
+    Args:
+        header (dict): Trace header
+        operations (list): (t, op, args, kwargs) tuples
+        rates (list): Offered rates to try, in ops/s
+        workers (int): Worker threads or processes
+        processes (bool): Use worker processes instead of threads
+        slo_ms (float): p99 latency objective in milliseconds
+        tolerance (float): Minimum achieved/offered throughput ratio
+
+    Returns:
+        tuple: (list of (rate, ReplayResult, saturated) rows, highest unsaturated rate or None)
+    """
+    rows = []
+    best = None
+    for rate in sorted(rates):
+        result = replay(header, operations, mode='open', workers=workers, processes=processes, rate=rate)
+        p99 = result.summary()['ALL']['p99_ms']
+        saturated = result.throughput < tolerance * rate or p99 > slo_ms
+        rows.append((rate, result, saturated))
+        if saturated:
+            break
+        best = rate
+    return rows, best
+
+
+def display_saturation(rows, best, slo_ms):
+    """Display a saturation sweep"""
+    print("\n" + "=" * 80)
+    print("📈 SATURATION SWEEP")
+    print("=" * 80)
+    print(f"{'Offered ops/s':>14}{'Achieved ops/s':>16}{'p50 ms':>10}{'p99 ms':>10}  Status")
+    for rate, result, saturated in rows:
+        overall = result.summary()['ALL']
+        status = "⚠️  SATURATED" if saturated else "✅ OK"
+        print(f"{rate:>14.0f}{result.throughput:>16.0f}{overall['p50_ms']:>10.3f}"
+              f"{overall['p99_ms']:>10.3f}  {status}")
+    if best is None:
+        print(f"\nSaturated at the lowest rate tried (p99 SLO {slo_ms} ms).")
+    else:
+        print(f"\nHighest sustainable rate: {best:.0f} ops/s (p99 SLO {slo_ms} ms)")
+    print("=" * 80 + "\n")
+
+
+# ==================== COMMAND LINE ====================
+
+def _parse_mix(text):
+    """Parse 'borrow=0.4,return=0.3,...' into a dict"""
+    mix = {}
+    for part in text.split(','):
+        kind, _, share = part.partition('=')
+        if kind not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown operation kind '{kind}'")
+        mix[kind] = float(share)
+    return mix
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(prog='python -m src.workload',
+                                     description="Generate and replay Library workload traces")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help="generate a synthetic trace")
+    generate.add_argument('trace')
+    generate.add_argument('--ops', type=int, default=100000)
+    generate.add_argument('--titles', type=int, default=5000)
+    generate.add_argument('--borrowers', type=int, default=1000)
+    generate.add_argument('--copies', type=int, default=3)
+    generate.add_argument('--rate', type=float, default=200.0, help="mean ops/s at profile level 1.0")
+    generate.add_argument('--zipf', type=float, default=1.1)
+    generate.add_argument('--mix', type=_parse_mix, default=None)
+    generate.add_argument('--start-hour', type=int, default=8)
+    generate.add_argument('--time-scale', type=float, default=60.0,
+                          help="simulated seconds per trace second")
+    generate.add_argument('--seed', type=int, default=42)
+
+    for name, help_text in (('replay', "replay a trace"), ('sweep', "find the saturation rate")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument('trace')
+        sub.add_argument('--workers', type=int, default=1)
+        sub.add_argument('--processes', action='store_true', help="use worker processes")
+        sub.add_argument('--limit', type=int, default=None, help="replay only the first N operations")
+        if name == 'replay':
+            sub.add_argument('--mode', choices=('open', 'closed'), default='closed')
+            sub.add_argument('--rate', type=float, default=None, help="open-loop target ops/s")
+            sub.add_argument('--speed', type=float, default=1.0, help="open-loop time compression")
+        else:
+            sub.add_argument('--rates', required=True, help="comma-separated offered rates")
+            sub.add_argument('--slo-ms', type=float, default=50.0)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        model = WorkloadModel(args.titles, args.borrowers, args.copies, rate=args.rate,
+                              zipf=args.zipf, mix=args.mix, start_hour=args.start_hour,
+                              time_scale=args.time_scale, seed=args.seed)
+        count = write_trace(args.trace, model.header(), model.generate(args.ops))
+        print(f"✅ Wrote {count} operations to {args.trace}")
+        return
+
+    header, operations = read_trace(args.trace)
+    if args.limit:
+        operations = operations[:args.limit]
+
+    if args.command == 'replay':
+        result = replay(header, operations, mode=args.mode, workers=args.workers,
+                        processes=args.processes, rate=args.rate, speed=args.speed)
+        result.display()
+    else:
+        rates = [float(rate) for rate in args.rates.split(',')]
+        rows, best = find_saturation(header, operations, rates, args.workers, args.processes, args.slo_ms)
+        display_saturation(rows, best, args.slo_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Shared fixtures for the Library Management System tests
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.book import Book  # noqa: E402
+from src.borrower import Borrower  # noqa: E402
+from src.isbn import make_isbn13  # noqa: E402
+from src.library import Library  # noqa: E402
+
+
+class Clock:
+    """Settable clock for Library(clock=...)"""
+
+    def __init__(self, now=datetime(2026, 1, 5, 9, 0, 0)):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, **delta):
+        self.now += timedelta(**delta)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def build_library(clock=None):
+    """A quiet library with five books and three borrowers"""
+    library = Library(verbose=False, clock=clock)
+    titles = [("Dune", "Frank Herbert", "Science Fiction", 2),
+              ("Emma", "Jane Austen", "Classic", 1),
+              ("Persuasion", "Jane Austen", "Classic", 3),
+              ("Neuromancer", "William Gibson", "Science Fiction", 0),
+              ("The Hobbit", "J. R. R. Tolkien", "Fantasy", 4)]
+    for number, (title, author, genre, quantity) in enumerate(titles):
+        library.add_book(Book(title, author, make_isbn13(number), genre, quantity))
+    for number, name in enumerate(("Alice Smith", "Bob Jones", "Carol Brown")):
+        library.add_borrower(Borrower(name, f"{name.split()[0].lower()}@example.com", f"M{number:03d}"))
+    return library
+
+
+@pytest.fixture
+def library(clock):
+    return build_library(clock)
@@ -0,0 +1,58 @@
+"""
+Tests for streaming circulation analytics
+"""
+
+from datetime import datetime, timedelta
+
+from src.analytics import CirculationAnalytics, CountMinSketch, SpaceSaving
+from src.isbn import make_isbn13
+
+
+def test_space_saving_keeps_heavy_hitters():
+    summary = SpaceSaving(10)
+    for key in range(1000):
+        summary.add(f"rare-{key}")
+        if key % 4 == 0:
+            summary.add("hot")
+    assert summary.top(1)[0][0] == "hot"
+
+
+def test_count_min_never_underestimates():
+    sketch = CountMinSketch()
+    for key in range(500):
+        sketch.add(key, key % 7 + 1)
+    assert all(sketch.estimate(key) >= key % 7 + 1 for key in range(500))
+
+
+def test_library_feeds_analytics_on_borrow(library):
+    analytics = CirculationAnalytics(capacity=10)
+    library.attach_analytics(analytics)
+    for member in ("M000", "M001", "M002"):
+        library.borrow_book(member, make_isbn13(4))
+        library.return_book(member, make_isbn13(4))
+    library.borrow_book("M000", make_isbn13(2))
+    assert analytics.total_borrows == 4 and analytics.total_returns == 3
+    assert analytics.top_titles(1) == [(make_isbn13(4), "The Hobbit", 3)]
+    assert analytics.top_genres(1)[0][0] == "Fantasy"
+    assert analytics.estimate_borrower_borrows("M000") >= 2
+
+
+def test_windows_forget_old_borrows(library):
+    analytics = CirculationAnalytics(windows={'last hour': (3600, 600)})
+    book, borrower = library.find_book_by_isbn(make_isbn13(0)), library.find_borrower_by_id("M000")
+    now = datetime.now()
+    analytics.record_borrow(book, borrower, when=now - timedelta(hours=3))
+    analytics.record_borrow(book, borrower, when=now)
+    assert analytics.windows['last hour'].total(now.timestamp()) == 1
+    assert analytics.top_titles(1, window='last hour')[0][2] == 1
+
+
+def test_windows_end_at_the_library_clock(library, clock):
+    analytics = CirculationAnalytics(windows={'last hour': (3600, 600)})
+    library.attach_analytics(analytics)
+    library.borrow_book("M000", make_isbn13(0))
+    clock.advance(minutes=30)
+    assert analytics.top_titles(1, window='last hour', now=clock()) == [(make_isbn13(0), "Dune", 1)]
+    assert analytics.top_borrowers(1, window='last hour', now=clock()) == [("M000", 1)]
+    clock.advance(hours=2)
+    assert analytics.top_genres(1, window='last hour', now=clock()) == []
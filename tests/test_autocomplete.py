@@ -0,0 +1,76 @@
+"""
+Tests for the prefix autocomplete index
+"""
+
+import random
+
+import pytest
+
+from src.autocomplete import PrefixIndex, tokenize
+
+WORDS = ["the", "war", "world", "wind", "a", "an", "and", "art", "sea", "sun", "stone", "night"]
+
+
+def brute_force(entries, prefix, k):
+    """Rank entries by (-score, display) and keep those matching the prefix"""
+    *required, last = tokenize(prefix)
+    matches = []
+    for key, (display, score) in entries.items():
+        tokens = tokenize(display)
+        if all(word in tokens for word in required) and any(token.startswith(last) for token in tokens):
+            matches.append(((-score, display.lower(), key), display))
+    results = []
+    for _, display in sorted(matches):
+        if display not in results:
+            results.append(display)
+    return results[:k]
+
+
+@pytest.fixture
+def entries():
+    rng = random.Random(7)
+    return {key: (" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) + f" {key}",
+                  rng.randint(0, 20))
+            for key in range(1500)}
+
+
+@pytest.fixture
+def index(entries):
+    index = PrefixIndex()
+    for key, (display, score) in entries.items():
+        index.add(key, display, score)
+    return index
+
+
+@pytest.mark.parametrize('prefix', ["a", "w", "wo", "the w", "the war a", "sun s", "night", "zzz"])
+@pytest.mark.parametrize('k', [1, 10, 50])
+def test_suggestions_match_brute_force(entries, index, prefix, k):
+    assert index.suggest(prefix, k) == brute_force(entries, prefix, k)
+
+
+def test_cached_rankings_follow_bumps_and_removals(entries, index):
+    index.warm()
+    top = index.suggest("s", 5)
+    assert top == brute_force(entries, "s", 5)
+
+    key = next(key for key, (display, _) in entries.items() if "stone" in display.split())
+    index.bump(key, 100)
+    entries[key] = (entries[key][0], entries[key][1] + 100)
+    assert index.suggest("s", 5)[0] == entries[key][0]
+    assert index.suggest("s", 5) == brute_force(entries, "s", 5)
+
+    index.remove(key)
+    del entries[key]
+    assert index.suggest("s", 5) == brute_force(entries, "s", 5)
+    assert index.suggest("st", 50) == brute_force(entries, "st", 50)
+
+
+def test_shared_keys_are_reference_counted():
+    index = PrefixIndex()
+    index.add("austen", "Jane Austen")
+    index.add("austen", "Jane Austen")
+    index.remove("austen")
+    assert index.suggest("jan") == ["Jane Austen"]
+    index.remove("austen")
+    assert index.suggest("jan") == []
+    assert len(index) == 0
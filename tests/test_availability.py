@@ -0,0 +1,32 @@
+"""
+Tests for copy availability forecasts
+"""
+
+from datetime import timedelta
+
+from src.isbn import make_isbn13
+
+DUNE, EMMA = make_isbn13(0), make_isbn13(1)
+
+
+def loan_start(library, membership_id):
+    return library.find_borrower_by_id(membership_id).get_borrowed_books()[-1]['borrow_date']
+
+
+def test_next_available_is_the_earliest_due_date(library):
+    library.borrow_book("M000", DUNE)
+    library.borrow_book("M001", DUNE)
+    first = loan_start(library, "M000")
+    assert library.next_available(DUNE) == first + timedelta(days=14)
+    library.return_book("M000", DUNE)
+    now = loan_start(library, "M001") + timedelta(days=1)
+    assert library.next_available(DUNE, now) == now
+    assert library.next_available(make_isbn13(3)) is None
+
+
+def test_timeline_counts_returns_day_by_day(library):
+    library.borrow_book("M000", EMMA)
+    timeline = library.availability_timeline(EMMA, days=16, current_date=loan_start(library, "M000"))
+    assert len(timeline) == 16
+    assert [count for _, count in timeline[:14]] == [0] * 14
+    assert [count for _, count in timeline[14:]] == [1, 1]
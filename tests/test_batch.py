@@ -0,0 +1,73 @@
+"""
+Tests for batch mode results
+"""
+
+import io
+import json
+
+from src.batch import BatchRunner
+from src.isbn import make_isbn13
+
+
+def run(library, *lines):
+    output = io.StringIO()
+    counts = BatchRunner(library, output).run(lines)
+    return counts, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_successful_commands(library):
+    (succeeded, failed), results = run(
+        library, f"borrow M000 {make_isbn13(0)}", "search title dune", f"book {make_isbn13(0)}")
+    assert (succeeded, failed) == (3, 0)
+    assert all(result['ok'] for result in results)
+    assert [result['line'] for result in results] == [1, 2, 3]
+
+
+def test_errors_are_results_not_exceptions(library):
+    (succeeded, failed), results = run(
+        library,
+        "frobnicate",
+        f"update_book {make_isbn13(0)} quantity=-1",
+        "search title",
+        "borrow M999 " + make_isbn13(0),
+        "add_copies",
+        '"unclosed',
+    )
+    assert (succeeded, failed) == (0, 6)
+    assert not any(result['ok'] for result in results)
+    unknown, negative, empty, missing, arity, quoting = results
+    assert "Unknown command" in unknown['error']
+    assert "negative" in negative['error']
+    assert "empty" in empty['error']
+    assert missing['error']
+    assert arity['error'] == "Wrong number of arguments"
+    assert arity['usage'].startswith("add_copies")
+    assert quoting['error']
+    assert library.find_book_by_isbn(make_isbn13(0)).get_quantity() == 2
+
+
+def test_unexpected_exception_is_reported(library, monkeypatch):
+    def explode(*args):
+        raise RuntimeError("disk on fire")
+    monkeypatch.setattr(library, 'find_book_by_isbn', explode)
+    (succeeded, failed), results = run(library, f"book {make_isbn13(0)}", "stats")
+    assert (succeeded, failed) == (1, 1)
+    assert results[0]['error'] == "RuntimeError: disk on fire"
+    assert results[1]['ok']
+
+
+def test_type_errors_inside_a_command_keep_their_message(library, monkeypatch):
+    def broken(*args):
+        raise TypeError("'NoneType' object is not subscriptable")
+    monkeypatch.setattr(library, 'find_book_by_isbn', broken)
+    (succeeded, failed), results = run(library, f"book {make_isbn13(0)}", f"book {make_isbn13(0)} extra")
+    assert (succeeded, failed) == (0, 2)
+    assert results[0]['error'] == "TypeError: 'NoneType' object is not subscriptable"
+    assert 'usage' not in results[0]
+    assert results[1]['error'] == "Wrong number of arguments"
+
+
+def test_blank_lines_and_comments_are_skipped(library):
+    (succeeded, failed), results = run(library, "", "# comment", "stats")
+    assert (succeeded, failed) == (1, 0)
+    assert results[0]['line'] == 3
@@ -0,0 +1,17 @@
+"""
+Tests for indexed borrower lookup by name and contact
+"""
+
+from src.borrower import Borrower
+
+
+def test_borrower_lookup_by_name_words_and_contact(library):
+    library.add_borrower(Borrower("Alice Smithers", "+1 (555) 010-2000", "M003"))
+    assert [b.get_membership_id() for b in library.find_borrowers_by_name("smi ali")] == ["M000", "M003"]
+    assert [b.get_membership_id() for b in library.find_borrowers_by_contact("15550102000")] == ["M003"]
+    assert [b.get_membership_id() for b in library.search_borrowers("BOB@example.com")] == ["M001"]
+    library.update_borrower("M001", name="Robert Jones")
+    assert library.find_borrowers_by_name("bob") == []
+    assert [b.get_membership_id() for b in library.find_borrowers_by_name("rob")] == ["M001"]
+    library.remove_borrower("M003")
+    assert library.find_borrowers_by_contact("+1 555 010 2000") == []
@@ -0,0 +1,59 @@
+"""
+Tests for the vectorized catalog analytics report
+"""
+
+import pytest
+
+from src import catalog_stats as stats_module
+from src.isbn import make_isbn13
+
+np = pytest.importorskip('numpy')
+
+
+def test_totals_and_genres_match_the_catalog(library, clock):
+    library.borrow_book("M000", make_isbn13(0))
+    library.borrow_book("M001", make_isbn13(0))
+    library.borrow_book("M001", make_isbn13(1))
+    clock.advance(days=20)
+    with library.snapshot() as view:
+        stats = stats_module.catalog_stats(view)
+
+    assert stats['totals'] == {'titles': 5, 'copies': 10, 'available': 7, 'on_loan': 3,
+                               'out_of_circulation': 0, 'borrowers': 3, 'active_borrowers': 2,
+                               'loans': 3, 'overdue_loans': 3}
+    by_genre = {row['genre']: row for row in stats['by_genre']}
+    assert by_genre["Science Fiction"]['titles'] == 2
+    assert by_genre["Science Fiction"]['on_loan'] == 2
+    assert by_genre["Classic"]['copies'] == 4
+    assert stats['authors']['top'][0][:2] == ("Jane Austen", 2)
+    assert stats['quantity']['no_copies'] == 1
+    assert stats['overdue_days']['max'] == 6
+
+
+def test_missing_numpy_explains_how_to_install(library, monkeypatch):
+    monkeypatch.setattr(stats_module, 'np', None)
+    with pytest.raises(ImportError, match="pip install numpy"):
+        with library.snapshot() as view:
+            stats_module.catalog_stats(view)
+
+
+def test_available_copies_come_from_the_shared_shelf(library):
+    from conftest import build_library
+    from src.shared_inventory import SharedInventory
+
+    inventory = SharedInventory.from_library(library)
+    other = build_library()
+    other.attach_inventory(SharedInventory(inventory.slots, inventory.name, inventory._locks, create=False))
+    library.attach_inventory(inventory)
+    try:
+        other.borrow_book("M000", make_isbn13(4))
+        other.borrow_book("M001", make_isbn13(4))
+        totals = library.detailed_stats()['totals']
+        assert (totals['available'], totals['on_loan'], totals['out_of_circulation']) == (8, 2, 0)
+        assert totals['loans'] == 0  # Borrowers are per desk
+        by_genre = {row['genre']: row for row in library.detailed_stats()['by_genre']}
+        assert (by_genre["Fantasy"]['available'], by_genre["Fantasy"]['utilization']) == (2, 0.5)
+    finally:
+        other.inventory.close()
+        inventory.close()
+        inventory.unlink()
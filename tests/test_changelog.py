@@ -0,0 +1,86 @@
+"""
+Tests for the change log and read replicas
+"""
+
+import pytest
+
+from src.book import Book
+from src.borrower import Borrower
+from src.changelog import ChangeLog, CheckpointStore, LibraryReplica
+from src.isbn import make_isbn13
+
+
+def test_read_from_and_truncate():
+    log = ChangeLog()
+    for number in range(10):
+        log.append('op', {'n': number})
+    assert [event.seq for event in log.read_from(7)] == [8, 9, 10]
+    assert [event.data['n'] for event in log.read_from(0, limit=2)] == [0, 1]
+    log.truncate_before(5)
+    assert [event.seq for event in log.read_from(0)] == [6, 7, 8, 9, 10]
+
+
+def test_max_events_bounds_memory():
+    log = ChangeLog(max_events=10)
+    for number in range(95):
+        log.append('op', {'n': number})
+    assert 10 <= len(log.read_from(0)) < 20
+    assert log.read_from(0)[-1].seq == 95
+    with pytest.raises(ValueError):
+        log.events_after(0)
+    with pytest.raises(ValueError):
+        ChangeLog(max_events=0)
+
+
+def test_truncated_events_are_read_back_from_the_file(tmp_path):
+    log = ChangeLog(str(tmp_path / "changes.jsonl"), max_events=5)
+    for number in range(40):
+        log.append('op', {'n': number})
+    assert len(log.read_from(0)) < 10
+    assert [event.data['n'] for event in log.events_after(3)] == list(range(3, 40))
+    log.close()
+
+
+def test_checkpoints_truncate_a_file_backed_log(tmp_path, library):
+    log = ChangeLog(str(tmp_path / "changes.jsonl"))
+    library.attach_changelog(log)
+    library.attach_checkpoints(CheckpointStore(), interval=5)
+    for number in range(23):
+        library.add_book(Book(f"Extra {number}", "Author", make_isbn13(100 + number), "Genre", 1))
+    assert len(log.read_from(0)) <= 5
+    log.close()
+
+
+@pytest.mark.parametrize('file_backed', [False, True])
+def test_replica_follows_the_log(tmp_path, library, file_backed):
+    path = str(tmp_path / "changes.jsonl")
+    log = ChangeLog(path if file_backed else None, max_events=4)
+    library.attach_changelog(log)
+    replica = LibraryReplica(path if file_backed else log)
+
+    library.add_book(Book("Extra", "Author", make_isbn13(100), "Genre", 2))
+    library.add_borrower(Borrower("Dan Green", "dan@example.com", "M003"))
+    library.borrow_book("M003", make_isbn13(100))
+    assert replica.poll() == log.last_seq
+    assert replica.lag() == 0
+    assert replica.poll() == 0
+    assert replica.library.find_book_by_isbn(make_isbn13(100)).get_quantity() == 1
+    assert replica.library.find_borrower_by_id("M003") is not None
+    log.close()
+
+
+def test_replica_resumes_from_its_checkpoint(tmp_path, library):
+    log = ChangeLog(str(tmp_path / "changes.jsonl"))
+    library.attach_changelog(log)
+    checkpoint = str(tmp_path / "replica.json")
+    replica = LibraryReplica(log.path, checkpoint_path=checkpoint)
+    library.add_book(Book("First", "Author", make_isbn13(100), "Genre", 1))
+    replica.poll()
+    assert replica.checkpoint() == 1
+
+    library.add_book(Book("Second", "Author", make_isbn13(101), "Genre", 1))
+    resumed = LibraryReplica(log.path, checkpoint_path=checkpoint)
+    assert resumed.applied_seq == 1
+    assert resumed.poll() == 1
+    assert resumed.library.get_total_books() == 2
+    log.close()
@@ -0,0 +1,54 @@
+"""
+Tests for per-copy tracking
+"""
+
+from src.copies import CopySet, is_barcode, parse_barcode
+from src.isbn import make_isbn13
+
+
+def test_checkout_takes_the_lowest_available_copy():
+    copies = CopySet("9780306406157", 3)
+    assert [copies.checkout() for _ in range(3)] == [0, 1, 2]
+    assert copies.checkout() is None
+    assert (copies.available_count(), copies.on_loan_count()) == (0, 3)
+    assert copies.checkin(1) == 1
+    assert copies.checkin(1) is None
+    assert copies.checkout() == 1
+
+
+def test_barcodes_identify_title_and_copy():
+    copies = CopySet("9780306406157")
+    barcode = copies.add_copies(2)[1]
+    assert is_barcode(barcode)
+    assert parse_barcode(barcode) == ("9780306406157", 1)
+    assert copies.index_of(barcode) == 1
+    assert copies.index_of(copies.barcode(5)) is None
+    assert parse_barcode("not-a-barcode")[0] is None
+
+
+def test_round_trip_keeps_states_and_branches():
+    copies = CopySet("9780306406157", 2, branch="north")
+    copies.add_copies(1, branch="south")
+    copies.checkout()
+    restored = CopySet.from_dict(copies.prefix, copies.to_dict())
+    assert restored.counts_by_state() == copies.counts_by_state()
+    assert [restored.branch(index) for index in range(3)] == ["north", "north", "south"]
+
+
+def test_library_copies_follow_loans(library):
+    isbn = make_isbn13(0)
+    library.add_copies(isbn, 2, branch="annex")
+    book = library.find_book_by_isbn(isbn)
+    assert (book.get_quantity(), len(book.copies)) == (4, 4)
+    assert library.borrow_book("M000", isbn)
+    barcode = library.find_borrower_by_id("M000").get_borrowed_books()[0]['barcode']
+    assert library.find_book_by_barcode(barcode) is book
+    assert library.return_book("M000", barcode=barcode)
+    assert book.get_quantity() == 4
+
+
+def test_withdrawing_stops_at_the_available_copies():
+    copies = CopySet("9780306406157", 3)
+    copies.checkout()
+    assert copies.withdraw_available(5) == 2
+    assert (copies.available_count(), copies.on_loan_count(), len(copies)) == (0, 1, 3)
@@ -0,0 +1,48 @@
+"""
+Tests for MinHash/LSH near-duplicate clustering
+"""
+
+import pytest
+
+from src import dedup
+from src.dedup import MinHashLSH, find_duplicates, normalize_title
+
+RECORDS = [
+    {'isbn': "1", 'title': "The Lord of the Rings", 'author': "J. R. R. Tolkien"},
+    {'isbn': "2", 'title': "Lord of the Rings (2nd Edition)", 'author': "Tolkien, J.R.R."},
+    {'isbn': "3", 'title': "The Lord of the Rings: Anniversary Edition", 'author': "J.R.R. Tolkien"},
+    {'isbn': "4", 'title': "Pride and Prejudice", 'author': "Jane Austen"},
+    {'isbn': "5", 'title': "Pride & Prejudice", 'author': "Austen, Jane"},
+    {'isbn': "6", 'title': "Neuromancer", 'author': "William Gibson"},
+    {'isbn': "7", 'title': "A Brief History of Time", 'author': "Stephen Hawking"},
+]
+
+
+def clusters_of(records, **options):
+    return sorted(sorted(record['isbn'] for record in cluster)
+                  for cluster in find_duplicates(records, **options))
+
+
+def test_editions_and_spellings_cluster_together():
+    assert clusters_of(RECORDS) == [["1", "2", "3"], ["4", "5"]]
+    assert normalize_title("The Lord of the Rings (2nd Edition)") == normalize_title("Lord of the Rings")
+
+
+def test_clusters_report_similarity_to_the_first_record():
+    cluster = find_duplicates(RECORDS)[0]
+    assert len(cluster) == 3
+    assert cluster[0]['similarity'] == 1.0
+    assert all(0.6 <= record['similarity'] <= 1.0 for record in cluster)
+
+
+def test_python_and_numpy_paths_agree(monkeypatch):
+    records = [{'isbn': str(n), 'title': f"Volume {n % 40} of the Collected Works",
+                'author': f"Author {n % 7}"} for n in range(300)] + RECORDS
+    expected = clusters_of(records)
+    monkeypatch.setattr(dedup, 'np', None)
+    assert clusters_of(records) == expected
+
+
+def test_threshold_is_validated():
+    with pytest.raises(ValueError):
+        MinHashLSH(threshold=0)
@@ -0,0 +1,55 @@
+"""
+Tests for dictionary-encoded value tables
+"""
+
+import random
+
+import pytest
+
+from src.encoding import ValueDictionary
+
+
+@pytest.fixture
+def values():
+    rng = random.Random(3)
+    syllables = ["an", "ber", "cla", "dor", "el", "fin", "gra", "ha", "is", "jo", " ", "-"]
+    return ["".join(rng.choice(syllables) for _ in range(rng.randint(1, 6))).title() for _ in range(3000)]
+
+
+@pytest.fixture
+def table(values):
+    table = ValueDictionary()
+    for value in values:
+        table.encode(value)
+    return table
+
+
+def test_codes_are_stable_and_interned(table, values):
+    assert len(table) == len(set(values))
+    code = table.encode(values[0])
+    assert table.encode(values[0]) == code
+    assert table.decode(code) == values[0]
+    assert table.encode("A Brand New Value") == len(table) - 1
+
+
+@pytest.mark.parametrize('term', ["", "a", "E", "an", "-j", "ber", "DOR", "anber", "cla fin",
+                                  "graisjo", "xyz"])
+def test_matching_codes_agree_with_a_scan(table, term):
+    expected = {code for code, value in enumerate(table.values) if term.lower() in value.lower()}
+    assert table.matching_codes(term) == expected
+
+
+def test_values_added_later_are_matched(table):
+    before = table.matching_codes("quokka")
+    code = table.encode("The Quokka Files")
+    assert before == set()
+    assert table.matching_codes("quokka") == {code}
+    assert table.matching_codes("qu") >= {code}
+
+
+def test_library_searches_match_encoded_values(library):
+    assert [book.get_title() for book in library.search_by_author("AUSTEN")] == ["Emma", "Persuasion"]
+    library.update_book(library.books[1].get_isbn(), author="J. Austen-Leigh")
+    authors = [book.get_author() for book in library.search_by_author("austen")]
+    assert authors == ["J. Austen-Leigh", "Jane Austen"]
+    assert [book.get_title() for book in library.search_by_genre("fantasy")] == ["The Hobbit"]
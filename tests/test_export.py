@@ -0,0 +1,66 @@
+"""
+Tests for streaming report exports
+"""
+
+import csv
+import gzip
+import json
+
+import pytest
+
+from src.export import BOOK_FIELDS, export_report
+from src.isbn import make_isbn13
+
+
+def read_csv(path, opener=open):
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def read_jsonl(path, opener=open):
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_books_csv_round_trip(library, tmp_path):
+    path = str(tmp_path / "books.csv")
+    assert export_report(library, 'books', path) == 5
+    rows = read_csv(path)
+    assert list(rows[0]) == BOOK_FIELDS
+    assert [row['title'] for row in rows] == [book.get_title() for book in library.books]
+    dune = rows[0]
+    assert dune == {'isbn': make_isbn13(0), 'title': 'Dune', 'author': 'Frank Herbert',
+                    'genre': 'Science Fiction', 'quantity': '2', 'status': 'Available'}
+    assert rows[3]['status'] == 'Not Available'
+
+
+def test_jsonl_and_gzip_match_csv(library, tmp_path):
+    export_report(library, 'borrowers', str(tmp_path / "b.csv"))
+    export_report(library, 'borrowers', str(tmp_path / "b.jsonl"), fmt='jsonl')
+    export_report(library, 'borrowers', str(tmp_path / "b.jsonl.gz"), fmt='jsonl')
+    from_csv = read_csv(str(tmp_path / "b.csv"))
+    from_jsonl = read_jsonl(str(tmp_path / "b.jsonl"))
+    assert read_jsonl(str(tmp_path / "b.jsonl.gz"), gzip.open) == from_jsonl
+    assert [{key: str(value) for key, value in row.items()} for row in from_jsonl] == from_csv
+
+
+def test_small_chunks_write_every_row(library, tmp_path):
+    path = str(tmp_path / "books.jsonl")
+    assert export_report(library, 'books', path, fmt='jsonl', chunk_size=2) == 5
+    assert len(read_jsonl(path)) == 5
+
+
+def test_overdue_report_uses_the_library_clock(library, clock, tmp_path):
+    library.borrow_book("M000", make_isbn13(0))
+    path = str(tmp_path / "overdue.csv")
+    assert export_report(library, 'overdue', path) == 0
+    clock.advance(days=20)
+    assert export_report(library, 'overdue', path) == 1
+    assert read_csv(path)[0]['membership_id'] == "M000"
+
+
+def test_unknown_report_and_format(library, tmp_path):
+    with pytest.raises(ValueError):
+        export_report(library, 'nope', str(tmp_path / "x.csv"))
+    with pytest.raises(ValueError):
+        export_report(library, 'books', str(tmp_path / "x.xml"), fmt='xml')
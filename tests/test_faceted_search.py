@@ -0,0 +1,55 @@
+"""
+Tests for faceted search counts
+"""
+
+from conftest import build_library
+from src.book import Book
+from src.isbn import make_isbn13
+from src.library import Library
+from src.shared_inventory import SharedInventory
+
+
+def test_counts_cover_only_the_matches(library):
+    search = library.faceted_search(genre="fiction")
+    facets = search['facets']
+    assert [book.get_title() for book in search['books']] == ["Dune", "Neuromancer"]
+    assert facets['availability'] == {'available': 1, 'unavailable': 1}
+    assert facets['genre'] == [("Science Fiction", 2)]
+    assert facets['author'] == [("Frank Herbert", 1), ("William Gibson", 1)]
+    assert dict(facets['quantity']) == {"0": 1, "1": 0, "2": 1, "3-5": 0, "6-10": 0, "11+": 0}
+    assert (facets['genres'], facets['authors']) == (1, 2)
+
+
+def test_top_limits_values_but_not_totals(library):
+    facets = library.faceted_search(top=1)['facets']
+    assert facets['author'] == [("Jane Austen", 2)]
+    assert facets['authors'] == 4
+    assert len(library.faceted_search(top=None)['facets']['author']) == 4
+
+
+def test_counts_ignore_values_interned_by_other_libraries(library):
+    other = Library(verbose=False)
+    for number in range(50):
+        other.add_book(Book("Elsewhere", f"Other Author {number}", make_isbn13(100 + number),
+                            f"Genre {number}", 1))
+    facets = library.faceted_search(author="austen")['facets']
+    assert facets['author'] == [("Jane Austen", 2)]
+    assert facets['genre'] == [("Classic", 2)]
+    assert facets['availability'] == {'available': 2, 'unavailable': 0}
+
+
+def test_counts_use_the_shared_shelf(library):
+    inventory = SharedInventory.from_library(library)
+    other = build_library()
+    other.attach_inventory(SharedInventory(inventory.slots, inventory.name, inventory._locks, create=False))
+    library.attach_inventory(inventory)
+    try:
+        other.add_copies(make_isbn13(3), 1)  # Neuromancer, out on this desk
+        other.borrow_book("M000", make_isbn13(0))
+        facets = library.faceted_search(genre="fiction")['facets']
+        assert facets['availability'] == {'available': 2, 'unavailable': 0}
+        assert dict(facets['quantity'])["1"] == 2
+    finally:
+        other.inventory.close()
+        inventory.close()
+        inventory.unlink()
@@ -0,0 +1,79 @@
+"""
+Tests for the sharded library federation
+"""
+
+from datetime import timedelta
+
+import pytest
+
+from src.book import Book
+from src.borrower import Borrower
+from src.federation import ConsistentHashRing, LibraryFederation
+from src.isbn import make_isbn13
+
+
+@pytest.fixture
+def federation():
+    federation = LibraryFederation(["north", "south", "east"])
+    for number in range(60):
+        federation.add_book(Book(f"Title {number}", f"Author {number % 6}", make_isbn13(number),
+                                 f"Genre {number % 3}", 1))
+    for number in range(12):
+        federation.add_borrower(Borrower(f"Member {number}", f"m{number}@example.com", f"M{number:03d}"))
+    yield federation
+    federation.close()
+
+
+def test_ring_spreads_keys_and_moves_few_on_growth():
+    ring = ConsistentHashRing(replicas=64)
+    for node in ("a", "b", "c"):
+        ring.add_node(node)
+    keys = [f"key-{n}" for n in range(3000)]
+    before = {key: ring.get_node(key) for key in keys}
+    assert min(list(before.values()).count(node) for node in "abc") > 500
+    ring.add_node("d")
+    moved = [key for key in keys if ring.get_node(key) != before[key]]
+    assert all(ring.get_node(key) == "d" for key in moved)
+    assert len(moved) < 0.4 * len(keys)
+
+
+def test_every_record_lives_on_its_owning_shard(federation):
+    for number in range(60):
+        isbn = make_isbn13(number)
+        assert federation.shard_for_isbn(isbn).find_book_by_isbn(isbn) is not None
+    assert sum(shard.get_total_books() for shard in federation.shards.values()) == 60
+    assert federation.find_borrower_by_id("M007").get_name() == "Member 7"
+    assert federation.find_book_by_isbn(make_isbn13(999)) is None
+
+
+def test_inter_branch_loans_round_trip(federation):
+    isbn = next(make_isbn13(n) for n in range(60)
+                if federation.shard_for_isbn(make_isbn13(n)) is not federation.shard_for_member("M000"))
+    assert federation.borrow_book("M000", isbn)
+    assert federation.inter_branch_loans == 1
+    assert federation.find_book_by_isbn(isbn).get_quantity() == 0
+    assert not federation.borrow_book("M001", isbn)
+    assert federation.return_book("M000", isbn)
+    assert federation.find_book_by_isbn(isbn).get_quantity() == 1
+
+
+def test_scatter_gather_search(federation):
+    titles = [book.get_title() for book in federation.search_by_author("Author 2")]
+    assert sorted(titles) == sorted(f"Title {n}" for n in range(2, 60, 6))
+    titles = [book.get_title() for book in federation.find_books(author="Author 2", sort_by='title')]
+    assert titles == sorted(f"Title {n}" for n in range(2, 60, 6))
+    assert len(federation.search_by_genre("Genre 1")) == 20
+    assert len(federation.get_overdue_records()) == 0
+
+
+def test_shards_share_the_federation_clock(clock):
+    federation = LibraryFederation(["north", "south"], clock=clock)
+    federation.add_book(Book("Title", "Author", make_isbn13(0), "Genre", 1))
+    federation.add_borrower(Borrower("Member", "m@example.com", "M000"))
+    assert federation.borrow_book("M000", make_isbn13(0))
+    assert federation.next_available(make_isbn13(0)) == clock() + timedelta(days=14)
+    assert federation.get_overdue_records() == []
+    clock.advance(days=20)
+    assert [days for _, _, days in federation.get_overdue_records()] == [6]
+    assert federation.availability_timeline(make_isbn13(0), days=1)[0][1] == 0
+    federation.close()
@@ -0,0 +1,35 @@
+"""
+Tests for the differential engine harness
+"""
+
+import pytest
+
+from src.harness import DEFAULT_TOLERANCE, check_budgets, load_engine, run_differential
+
+
+@pytest.mark.parametrize('candidate', ['library', 'indexed'])
+@pytest.mark.parametrize('seed', [1, 2])
+def test_engines_match_the_reference(candidate, seed):
+    mismatch = run_differential(load_engine(candidate), seed, ops=600)
+    assert mismatch is None, mismatch and mismatch.display()
+
+
+def test_a_broken_engine_is_caught():
+    def broken(clock, directory):
+        library = load_engine('library')(clock, directory)
+        library.get_total_books = lambda: -1
+        return library
+
+    mismatch = run_differential(broken, seed=1, ops=600)
+    assert mismatch is not None
+
+
+def test_budgets_flag_slow_operations():
+    failures = check_budgets({'find': 50.0, 'borrow': 5.0}, budgets={'find': 10.0}, baseline={'borrow': 1.0})
+    reasons = [(name, reason) for name, _, _, reason in failures]
+    assert reasons == [('find', "budget"), ('borrow', f"baseline x{DEFAULT_TOLERANCE}")]
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        load_engine('nonexistent')
@@ -0,0 +1,86 @@
+"""
+Tests for the partitioned loan history store
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.book import Book
+from src.history import INDEX_FILE, LoanHistoryStore
+from src.isbn import make_isbn13
+
+
+def archive(store, member, book, returned):
+    store.append(member, book, returned - timedelta(days=10), returned - timedelta(days=3), returned)
+
+
+@pytest.fixture
+def books():
+    return [Book(f"Title {n}", "Author", make_isbn13(n), "Genre", 1) for n in range(3)]
+
+
+@pytest.mark.parametrize('compress', [False, True])
+def test_history_survives_reopening(tmp_path, books, compress):
+    store = LoanHistoryStore(str(tmp_path), compress=compress, buffer_size=2)
+    archive(store, "M000", books[0], datetime(2026, 1, 10))
+    archive(store, "M001", books[1], datetime(2026, 2, 10))
+    archive(store, "M000", books[1], datetime(2026, 3, 10))
+    assert [loan['isbn'] for loan in store.borrower_history("M000")] == [make_isbn13(0), make_isbn13(1)]
+    store.close()
+
+    reopened = LoanHistoryStore(str(tmp_path), compress=compress)
+    assert reopened.partitions() == ["2026-01", "2026-02", "2026-03"]
+    loans = reopened.title_history(make_isbn13(1))
+    assert [loan['membership_id'] for loan in loans] == ["M001", "M000"]
+    assert loans[0]['return_date'] == datetime(2026, 2, 10)
+    assert reopened.borrower_history("M999") == []
+
+
+def test_each_partition_has_an_append_only_index(tmp_path, books):
+    store = LoanHistoryStore(str(tmp_path), buffer_size=100)
+    archive(store, "M000", books[0], datetime(2026, 1, 10))
+    store.flush()
+    january = (tmp_path / "index-2026-01.jsonl").read_text()
+
+    archive(store, "M000", books[0], datetime(2026, 1, 20))  # Keys already indexed
+    archive(store, "M002", books[2], datetime(2026, 2, 1))
+    store.flush()
+    assert (tmp_path / "index-2026-01.jsonl").read_text() == january
+    assert json.loads((tmp_path / "index-2026-02.jsonl").read_text()) == [["M002"], [make_isbn13(2)]]
+    assert not (tmp_path / INDEX_FILE).exists()
+
+
+def test_unflushed_loans_are_queryable(tmp_path, books):
+    store = LoanHistoryStore(str(tmp_path), buffer_size=100)
+    archive(store, "M001", books[2], datetime(2026, 4, 1))
+    assert [loan['title'] for loan in store.borrower_history("M001")] == ["Title 2"]
+
+
+def test_legacy_index_is_split_into_partitions(tmp_path, books):
+    store = LoanHistoryStore(str(tmp_path))
+    archive(store, "M000", books[0], datetime(2026, 1, 10))
+    archive(store, "M001", books[1], datetime(2026, 2, 10))
+    store.close()
+    for name in os.listdir(tmp_path):
+        if name.startswith("index-"):
+            os.remove(tmp_path / name)
+    legacy = {'members': {"M000": ["2026-01"], "M001": ["2026-02"]},
+              'isbns': {make_isbn13(0): ["2026-01"], make_isbn13(1): ["2026-02"]}}
+    (tmp_path / INDEX_FILE).write_text(json.dumps(legacy))
+
+    reopened = LoanHistoryStore(str(tmp_path))
+    assert not (tmp_path / INDEX_FILE).exists()
+    assert [loan['isbn'] for loan in reopened.borrower_history("M001")] == [make_isbn13(1)]
+    assert [loan['membership_id'] for loan in reopened.title_history(make_isbn13(0))] == ["M000"]
+
+
+def test_library_archives_returned_loans(tmp_path, library):
+    store = LoanHistoryStore(str(tmp_path))
+    library.attach_history(store)
+    library.borrow_book("M000", make_isbn13(0))
+    assert store.borrower_history("M000") == []
+    library.return_book("M000", make_isbn13(0))
+    assert [loan['title'] for loan in store.borrower_history("M000")] == ["Dune"]
@@ -0,0 +1,65 @@
+"""
+Tests for ordered indexes and sorted listings
+"""
+
+import random
+from bisect import bisect_left, bisect_right
+
+from src.book import Book
+from src.indexes import PREFIX_END, SortedIndex, prefix_range
+from src.isbn import make_isbn13
+
+
+def test_sorted_index_matches_a_sorted_list():
+    rng = random.Random(5)
+    index, expected = SortedIndex(load=8), []
+    for _ in range(2000):
+        item = (rng.randint(0, 300), rng.randint(0, 10))
+        if expected and rng.random() < 0.3:
+            victim = rng.choice(expected)
+            expected.remove(victim)
+            index.remove(victim)
+        else:
+            expected.append(item)
+            index.insert(item)
+    expected.sort()
+    assert list(index) == expected
+    assert index.slice(100, 25) == expected[100:125]
+    low, high = (50, 0), (120, 10)
+    in_range = [item for item in expected if low <= item <= high]
+    assert list(index.irange(low, high)) == in_range
+    assert index.count(low, high) == len(in_range)
+    assert index.count((400, 0), (500, 0)) == 0
+
+
+def test_positions_follow_splits_and_dropped_blocks():
+    rng = random.Random(11)
+    index, expected = SortedIndex(load=4), []
+    for step in range(3000):
+        if expected and rng.random() < 0.45:
+            victim = expected.pop(rng.randrange(len(expected)))
+            index.remove(victim)
+        else:
+            item = rng.randint(0, 10_000)
+            expected.insert(bisect_right(expected, item), item)
+            index.insert(item)
+        if step % 50 == 0:
+            start = rng.randrange(len(expected) + 2)
+            assert index.slice(start, 7) == expected[start:start + 7]
+            low, high = sorted((rng.randint(0, 10_000), rng.randint(0, 10_000)))
+            assert index.count(low, high) == bisect_right(expected, high) - bisect_left(expected, low)
+    assert index.slice(0, len(expected)) == expected
+    assert index.slice(len(expected), 5) == []
+
+
+def test_pages_and_prefix_ranges(library):
+    for number in range(40):
+        library.add_book(Book(f"Volume {number:02d}", "Anon", make_isbn13(100 + number), "Serial", 1))
+    titles = [book.get_title() for book in library.get_books_sorted('title', page=1, page_size=6)]
+    assert titles == ["Dune", "Emma", "Neuromancer", "Persuasion", "The Hobbit", "Volume 00"]
+    assert library.get_books_sorted('title', page=8, page_size=6)[-1].get_title() == "Volume 39"
+    in_range = [book.get_title() for book in library.get_books_in_range('title', "e", "p")]
+    assert in_range == ["Emma", "Neuromancer", "Persuasion"]
+    library.update_book(make_isbn13(1), title="Zuleika")
+    assert library.get_books_sorted('title', page=1, page_size=2)[1].get_title() == "Neuromancer"
+    assert prefix_range("a", "b") == (("a",), ("b" + PREFIX_END,))
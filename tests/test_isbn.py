@@ -0,0 +1,32 @@
+"""
+Tests for ISBN validation and canonical keys
+"""
+
+import pytest
+
+from src.isbn import canonical_isbn, isbn_key, make_isbn13, try_isbn_key
+
+
+def test_isbn10_and_isbn13_share_a_key():
+    assert isbn_key("0-306-40615-2") == isbn_key("978-0-306-40615-7") == 9780306406157
+    assert canonical_isbn(isbn_key("0306406152")) == "9780306406157"
+    assert isbn_key("0-8044-2957-x") == isbn_key("9780804429573")
+
+
+@pytest.mark.parametrize('text', ["0-306-40615-3", "978-0-306-40615-8", "12345", "abcdefghij", ""])
+def test_invalid_isbns_are_rejected(text):
+    with pytest.raises(ValueError):
+        isbn_key(text)
+    assert try_isbn_key(text) is None
+
+
+def test_generated_isbns_are_valid_and_distinct():
+    isbns = [make_isbn13(number) for number in range(1000)]
+    assert len({isbn_key(isbn) for isbn in isbns}) == 1000
+    assert all(canonical_isbn(isbn_key(isbn)) == isbn for isbn in isbns)
+
+
+def test_library_finds_books_by_any_spelling(library):
+    assert library.find_book_by_isbn("978-0-00-000000-2").get_title() == "Dune"
+    assert library.find_book_by_isbn("0000000000").get_title() == "Dune"
+    assert library.find_book_by_isbn("9780000000003") is None
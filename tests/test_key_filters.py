@@ -0,0 +1,45 @@
+"""
+Tests for Bloom and cuckoo key filters
+"""
+
+import pytest
+
+from src.bloom import FILTER_KINDS, KeyFilters, make_filter
+from src.book import Book
+from src.isbn import make_isbn13
+from src.library import Library
+
+
+@pytest.mark.parametrize('kind', FILTER_KINDS)
+def test_no_false_negatives_and_bounded_false_positives(kind):
+    key_filter = make_filter(kind, capacity=5000, error_rate=0.01)
+    for key in range(5000):
+        key_filter.add(key)
+    assert all(key_filter.might_contain(key) for key in range(5000))
+    false_positives = sum(key_filter.might_contain(key) for key in range(5000, 25000))
+    assert false_positives / 20000 < 0.03
+
+
+@pytest.mark.parametrize('kind', FILTER_KINDS)
+def test_filter_is_sized_from_capacity_and_error_rate(kind):
+    small = make_filter(kind, capacity=1000, error_rate=0.01)
+    large = make_filter(kind, capacity=100000, error_rate=0.01)
+    strict = make_filter(kind, capacity=1000, error_rate=0.0001)
+    assert 0 < small.size_in_bytes() < large.size_in_bytes()
+    assert small.size_in_bytes() < strict.size_in_bytes()
+    assert large.size_in_bytes() < 100000 * 4  # Far below storing the keys
+
+
+@pytest.mark.parametrize('kind', FILTER_KINDS)
+def test_library_filters_grow_with_the_catalog(kind):
+    library = Library(verbose=False)
+    filters = KeyFilters(kind, capacity=16)
+    library.attach_key_filters(filters)
+    for number in range(200):
+        library.add_book(Book(f"Title {number}", "Author", make_isbn13(number), "Genre", 1))
+    assert filters.rebuilds > 0
+    assert filters.filters['isbn'].capacity >= 200
+    assert all(library.might_have_book(make_isbn13(number)) for number in range(200))
+    library.remove_book(make_isbn13(7))
+    assert library.might_have_book(make_isbn13(8))
+    assert not library.might_have_book("not an isbn")
@@ -0,0 +1,25 @@
+"""
+Tests for the memory footprint report
+"""
+
+from src.bloom import KeyFilters
+from src.memory import library_memory, project
+
+
+def test_report_covers_components_and_attachments(library):
+    library.attach_key_filters(KeyFilters(capacity=1000))
+    with library.snapshot():
+        report = library_memory(library)
+    for name in ('books', 'borrowers', 'index: isbn lookup', 'index: catalog positions',
+                 'snapshot versions', 'attached: key_filters'):
+        assert report[name] > 0, name
+    components = {name: size for name, size in report.items() if name not in ('total', 'tracemalloc')}
+    assert report['total'] == sum(components.values())
+
+
+def test_projection_grows_with_the_catalog():
+    small, small_traced = project(1000, 100, sample=500)
+    large, large_traced = project(100000, 100, sample=500)
+    assert small['books'] < large['books']
+    assert small['total'] < large['total']
+    assert small_traced < large_traced
@@ -0,0 +1,69 @@
+"""
+Tests for overdue notices and the delivery pipeline
+"""
+
+import pytest
+
+from src.isbn import make_isbn13
+from src.notifications import (FileTransport, SimulatedTransport, collect_notices, main,
+                               send_in_background, send_notifications)
+
+
+def lend(library, clock):
+    library.borrow_book("M000", make_isbn13(0))
+    clock.advance(days=10)
+    library.borrow_book("M001", make_isbn13(1))
+    clock.advance(days=8)  # M000 is 4 days overdue, M001 due in 6 days
+
+
+def test_one_notice_per_borrower_overdue_first(library, clock):
+    lend(library, clock)
+    notices = collect_notices(library, due_within=7)
+    assert [notice.membership_id for notice in notices] == ["M000", "M001"]
+    assert notices[0].overdue[0][0] == "Dune" and notices[0].overdue[0][-1] == 4
+    assert notices[1].due_soon[0][-1] == 6
+    assert "1 overdue item(s)" in notices[0].subject()
+    assert notices[1].to_email()['To'] == "bob@example.com"
+    assert [notice.membership_id for notice in collect_notices(library, due_within=1)] == ["M000"]
+
+
+def test_transient_failures_are_retried(library, clock):
+    lend(library, clock)
+    transport = SimulatedTransport(latency=0, failure_rate=0.5, seed=4)
+    run = send_notifications(library, transport, due_within=7, retries=20, backoff=0.001)
+    assert run.sent == 2 and not run.failed
+    assert transport.delivered == 2
+
+
+def test_exhausted_retries_are_reported(library, clock):
+    lend(library, clock)
+    transport = SimulatedTransport(latency=0, failure_rate=1.0)
+    run = send_notifications(library, transport, due_within=7, retries=2, backoff=0.001)
+    assert run.sent == 0
+    assert sorted(member for member, _ in run.failed) == ["M000", "M001"]
+
+
+def test_file_transport_writes_emails(library, clock, tmp_path):
+    lend(library, clock)
+    stats = tmp_path / "stats" / "runs.jsonl"
+    run = send_notifications(library, FileTransport(str(tmp_path / "outbox")), due_within=7,
+                             stats_path=str(stats))
+    assert run.sent == 2
+    assert len(list((tmp_path / "outbox").glob("*.eml"))) == 2
+    assert len(stats.read_text().splitlines()) == 1
+
+
+def test_collected_notices_are_sent_in_the_background(library, clock):
+    lend(library, clock)
+    notices = collect_notices(library, due_within=1)
+    transport = SimulatedTransport(latency=0)
+    run = send_in_background(library, transport, due_within=7, notices=notices).result(timeout=10)
+    assert (run.notices, run.sent) == (1, 1)
+
+
+def test_command_line_needs_an_explicit_transport(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        main(['--demo', '5'])
+    assert "--simulate" in capsys.readouterr().err
+    main(['--demo', '5', '--outbox', str(tmp_path)])
+    assert list(tmp_path.glob("*.eml"))
@@ -0,0 +1,31 @@
+"""
+Tests for cached listing rows and chunked listings
+"""
+
+from src.isbn import make_isbn13
+from src.library import write_rows
+
+
+def test_listing_rows_follow_quantity_changes(library):
+    book = library.find_book_by_isbn(make_isbn13(1))
+    row = str(book)
+    assert str(book) is row  # Cached while nothing changes
+    library.borrow_book("M000", make_isbn13(1))
+    assert str(book) != row
+    library.return_book("M000", make_isbn13(1))
+    assert str(book) == row
+
+
+def test_listing_rows_follow_edits(library):
+    book = library.find_book_by_isbn(make_isbn13(0))
+    str(book)
+    library.update_book(make_isbn13(0), title="Dune Messiah")
+    assert "Dune Messiah" in str(book)
+
+
+def test_write_rows_numbers_every_row_across_chunks(library, capsys):
+    write_rows(library.books, start=3, chunk_size=2)
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 5
+    assert lines[0].startswith("3.") and "Dune" in lines[0]
+    assert lines[-1].startswith("7.") and "The Hobbit" in lines[-1]
@@ -0,0 +1,65 @@
+"""
+Tests for the persistent search index and search result order
+"""
+
+import pytest
+
+from src.book import Book
+from src.isbn import make_isbn13
+from src.library import Library
+from src.search_index import SearchIndex
+
+TITLES = ["Zebra Crossing", "Yellow Lantern", "Xenon Lantern", "Winter Lantern", "Violet Garden"]
+
+
+def build(clock, count=200):
+    """A library whose catalog order is the reverse of title order for the lantern books"""
+    library = Library(verbose=False, clock=clock)
+    for number, title in enumerate(TITLES):
+        library.add_book(Book(title, "Ada Writer", make_isbn13(number), "Fiction", 1))
+    for number in range(len(TITLES), count):
+        library.add_book(Book(f"Filler {number}", "Bob Filler", make_isbn13(number), "History", 1))
+    return library
+
+
+def titles(books):
+    return [book.get_title() for book in books]
+
+
+def test_index_survives_reopening(clock, tmp_path):
+    library = build(clock)
+    index = SearchIndex(str(tmp_path), background=False)
+    assert library.attach_search_index(index) == (200, 0)
+    lanterns = {book.get_isbn_key() for book in library.find_books(title="lantern")}
+    assert len(lanterns) == 3 and lanterns <= index.candidates('title', 'lantern')
+    index.close()
+
+    reopened = SearchIndex(str(tmp_path), background=False)
+    assert len(reopened.fingerprints()) == 200
+    library = build(clock)
+    library.remove_book(make_isbn13(0))
+    library.update_book(make_isbn13(1), title="Yellow Lamp")
+    assert library.attach_search_index(reopened) == (1, 1)
+    assert titles(library.find_books(title="lantern")) == ["Xenon Lantern", "Winter Lantern"]
+    reopened.close()
+
+
+def test_results_keep_catalog_order_with_or_without_the_index(clock, tmp_path):
+    plain = build(clock)
+    indexed = build(clock)
+    index = SearchIndex(str(tmp_path), background=False)
+    indexed.attach_search_index(index)
+    for criteria in ({'title': 'lantern'}, {'title': 'filler 1'}, {'author': 'ada'}, {'genre': 'fict'}):
+        assert titles(indexed.find_books(**criteria)) == titles(plain.find_books(**criteria))
+        assert titles(indexed.faceted_search(**criteria)['books']) == titles(plain.find_books(**criteria))
+    expected = ["Yellow Lantern", "Xenon Lantern", "Winter Lantern"]
+    assert titles(indexed.find_books(title="lantern")) == expected
+    index.close()
+
+
+def test_sort_by(clock):
+    library = build(clock, count=len(TITLES))
+    assert titles(library.find_books(title="lantern", sort_by='title')) == [
+        "Winter Lantern", "Xenon Lantern", "Yellow Lantern"]
+    with pytest.raises(ValueError):
+        library.find_books(sort_by='isbn')
@@ -0,0 +1,68 @@
+"""
+Tests for availability shared between desk processes
+"""
+
+import pytest
+
+from conftest import build_library
+from src.isbn import make_isbn13
+from src.shared_inventory import SharedInventory
+
+DUNE, EMMA, NEUROMANCER = make_isbn13(0), make_isbn13(1), make_isbn13(3)
+
+
+@pytest.fixture
+def desks():
+    """Two desks with the same catalog, attached to one inventory (as a second process would)"""
+    first, second = build_library(), build_library()
+    inventory = SharedInventory.from_library(first)
+    attached = SharedInventory(inventory.slots, inventory.name, inventory._locks, create=False)
+    first.attach_inventory(inventory)
+    second.attach_inventory(attached)
+    yield first, second
+    attached.close()
+    inventory.close()
+    inventory.unlink()
+
+
+def shared(desk, isbn):
+    return desk.inventory.available(desk.find_book_by_isbn(isbn).get_isbn_key())
+
+
+def test_desks_never_lend_more_copies_than_exist(desks):
+    first, second = desks
+    assert first.borrow_book("M000", EMMA)
+    assert not second.borrow_book("M001", EMMA)
+    assert shared(second, EMMA) == 0
+    assert first.return_book("M000", EMMA)
+    assert second.borrow_book("M001", EMMA)
+    assert shared(first, EMMA) == 0
+
+
+def test_stock_changes_reach_the_shared_counter(desks):
+    first, second = desks
+    first.add_copies(NEUROMANCER, 2)
+    assert shared(second, NEUROMANCER) == 2
+    first.update_book(DUNE, quantity=5)
+    assert shared(second, DUNE) == 5
+    first.remove_book(DUNE)
+    assert shared(second, DUNE) == 0
+
+
+def test_listings_use_the_shared_count(desks):
+    first, second = desks
+    first.add_copies(NEUROMANCER, 1)
+    assert second.find_book_by_isbn(NEUROMANCER).get_quantity() == 0
+    assert NEUROMANCER in {book.get_isbn() for book in second.get_available_books()}
+    first.borrow_book("M000", EMMA)
+    assert EMMA in {book.get_isbn() for book in second.get_unavailable_books()}
+
+
+def test_forecasts_use_the_shared_count(desks):
+    first, second = desks
+    first.add_copies(NEUROMANCER, 1)
+    now = second.clock()
+    assert second.next_available(NEUROMANCER, now) == now
+    assert second.availability_timeline(NEUROMANCER, days=1, current_date=now)[0][1] == 1
+    first.borrow_book("M000", EMMA)
+    assert second.next_available(EMMA, now) is None
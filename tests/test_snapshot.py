@@ -0,0 +1,71 @@
+"""
+Tests for MVCC snapshots
+"""
+
+from src.book import Book
+from src.borrower import Borrower
+from src.isbn import make_isbn13
+
+
+def test_snapshot_is_isolated_from_later_changes(library):
+    with library.snapshot() as view:
+        library.borrow_book("M000", make_isbn13(0))
+        library.update_book(make_isbn13(1), title="Emma (Annotated)")
+        library.remove_book(make_isbn13(2))
+        library.add_book(Book("Ubik", "Philip K. Dick", make_isbn13(9), "Science Fiction", 1))
+        library.add_borrower(Borrower("Dan Green", "dan@example.com", "M009"))
+
+        assert sorted(book.get_title() for book in view.iter_books()) == [
+            "Dune", "Emma", "Neuromancer", "Persuasion", "The Hobbit"]
+        assert view.find_book_by_isbn(make_isbn13(0)).get_quantity() == 2
+        assert view.find_book_by_isbn(make_isbn13(9)) is None
+        assert view.find_borrower_by_id("M009") is None
+        assert view.find_borrower_by_id("M000").get_borrowed_books() == []
+
+    assert library.find_book_by_isbn(make_isbn13(0)).get_quantity() == 1
+    assert library.find_book_by_isbn(make_isbn13(2)) is None
+
+
+def test_iteration_is_lazy_and_repeatable(library):
+    view = library.snapshot()
+    try:
+        books = view.iter_books()
+        assert next(books).get_title() == "Dune"
+        library.remove_book(make_isbn13(4))
+        assert [book.get_title() for book in books][-1] == "The Hobbit"
+        assert len(view.books) == 5
+    finally:
+        view.release()
+
+
+def test_available_split_and_overdue_use_the_library_clock(library, clock):
+    library.borrow_book("M001", make_isbn13(1))
+    clock.advance(days=30)
+    with library.snapshot() as view:
+        assert [book.get_title() for book in view.get_unavailable_books()] == ["Emma", "Neuromancer"]
+        overdue = list(view.iter_overdue_records())
+    assert [(borrower.get_membership_id(), days) for borrower, _, days in overdue] == [("M001", 16)]
+
+
+def test_released_snapshots_stop_retaining_versions(library):
+    view = library.snapshot()
+    library.update_book(make_isbn13(0), title="Dune Messiah")
+    assert library.versions.retained_versions > 0
+    view.release()
+    library.update_book(make_isbn13(0), title="Children of Dune")
+    assert library.versions.open_snapshots == 0
+    assert library.versions.retained_versions == 0
+
+
+def test_removed_entities_keep_their_positions(library):
+    with library.snapshot() as view:
+        library.add_book(Book("Ubik", "Philip K. Dick", make_isbn13(9), "Science Fiction", 1))
+        library.remove_book(make_isbn13(1))
+        library.remove_book(make_isbn13(9))
+        library.remove_book(make_isbn13(0))
+        library.remove_book(make_isbn13(3))
+        library.remove_borrower("M001")
+        assert [book.get_title() for book in view.iter_books()] == [
+            "Dune", "Emma", "Persuasion", "Neuromancer", "The Hobbit"]
+        assert [borrower.get_membership_id() for borrower in view.iter_borrowers()] == [
+            "M000", "M001", "M002"]
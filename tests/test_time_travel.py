@@ -0,0 +1,49 @@
+"""
+Tests for time-travel queries over the change log
+"""
+
+import pytest
+
+from src.book import Book
+from src.changelog import ChangeLog, CheckpointStore
+from src.isbn import make_isbn13
+
+
+@pytest.mark.parametrize('file_backed', [False, True])
+def test_as_of_replays_from_the_nearest_checkpoint(tmp_path, library, clock, file_backed):
+    log = ChangeLog(str(tmp_path / "changes.jsonl") if file_backed else None)
+    library.attach_changelog(log)
+    library.attach_checkpoints(CheckpointStore(), interval=3)
+    marks = []
+    for number in range(8):
+        clock.advance(seconds=1)
+        library.add_book(Book(f"Extra {number}", "Author", make_isbn13(100 + number), "Genre", 1))
+        marks.append(clock())
+    library.remove_book(make_isbn13(100))
+
+    past = library.as_of(marks[4])
+    assert past.find_book_by_isbn(make_isbn13(104)) is not None
+    assert past.find_book_by_isbn(make_isbn13(105)) is None
+    assert past.find_book_by_isbn(make_isbn13(100)) is not None
+    assert library.find_book_by_isbn(make_isbn13(100)) is None
+    with pytest.raises(ValueError):
+        library.as_of(0)
+    log.close()
+
+
+def test_checkpoints_on_disk_keep_the_newest(tmp_path, library, clock):
+    library.attach_changelog(ChangeLog())
+    store = CheckpointStore(str(tmp_path), keep=2)
+    library.attach_checkpoints(store, interval=2)
+    for number in range(10):
+        clock.advance(seconds=1)
+        library.add_book(Book(f"Extra {number}", "Author", make_isbn13(100 + number), "Genre", 1))
+    assert len(store) == 2
+    assert store.nearest(clock().timestamp())['seq'] == store.last_seq
+
+
+def test_checkpoints_need_a_change_stream(library):
+    with pytest.raises(ValueError):
+        library.attach_checkpoints(CheckpointStore())
+    with pytest.raises(ValueError):
+        library.as_of(0)
@@ -0,0 +1,37 @@
+"""
+Tests for trace recording, workload generation and replay
+"""
+
+from src.isbn import make_isbn13
+from src.workload import TraceRecorder, WorkloadModel, build_library, read_trace, replay, write_trace
+
+
+def test_recorded_session_replays_from_the_same_state(library, tmp_path):
+    path = str(tmp_path / "session.trace")
+    recorder = TraceRecorder(path)
+    recorder.attach(library)
+    library.borrow_book("M000", make_isbn13(0))
+    library.search_by_title("emma")
+    library.return_book("M000", make_isbn13(0))
+    recorder.close()
+
+    header, operations = read_trace(path)
+    assert [op for _, op, _, _ in operations] == ["borrow_book", "search_by_title", "return_book"]
+    result = replay(header, operations, workers=1)
+    assert result.operations == 3 and not any(result.errors.values())
+    assert build_library(header).find_book_by_isbn(make_isbn13(0)).get_quantity() == 2
+
+
+def test_generated_workload_is_deterministic_and_replayable(tmp_path):
+    model = WorkloadModel(titles=200, borrowers=50, rate=1000.0, seed=3)
+    operations = list(model.generate(400))
+    assert operations == list(WorkloadModel(titles=200, borrowers=50, rate=1000.0, seed=3).generate(400))
+    assert all(earlier[0] <= later[0] for earlier, later in zip(operations, operations[1:]))
+
+    path = str(tmp_path / "model.trace")
+    assert write_trace(path, model.header(), operations) == 400
+    header, loaded = read_trace(path)
+    assert build_library(header).get_total_books() == 200
+    result = replay(header, loaded, workers=2)
+    assert result.operations == 400
+    assert sum(result.errors.values()) == 0